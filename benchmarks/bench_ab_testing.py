@@ -0,0 +1,49 @@
+# Benchmarks des statistiques A/B (scripts/ab_testing)
+
+import pandas as pd
+import pytest
+
+from ab_test_simulation import simulate_ab_test
+from generate_ab_test_simulation_csv import generate_ab_test_daily_simulation
+from test_ab_conversions import ABConversionTester
+
+
+@pytest.mark.benchmark(group='ab_testing')
+def test_simulate_ab_test(benchmark, rounds):
+    result = benchmark.pedantic(simulate_ab_test, args=(0.03, 0.033, 10_000),
+                                kwargs={'simulations': 2_000}, rounds=rounds, iterations=1)
+    assert 0 <= result['statistical_power'] <= 1
+
+
+@pytest.mark.benchmark(group='ab_testing')
+def test_bayesian_ab_test(benchmark):
+    tester = ABConversionTester()
+    result = benchmark(tester.bayesian_ab_test, 300, 10_000, 345, 10_000)
+    assert 0.5 < result['prob_b_beats_a'] < 1
+
+
+# Moyennes de funnel_daily_detailed.csv (baseline de la simulation quotidienne)
+FUNNEL_BASELINE = pd.DataFrame({
+    'unique_users': [10_000], 'view': [19_000], 'addtocart': [500], 'transaction': [160],
+})
+
+
+def make_scenarios(n_scenarios):
+    """Scénarios au format ab_test_simulation_summary.json"""
+    scenarios = [{
+        'id': f'S{i}', 'name': f'Scénario {i}', 'priority': 'HIGH', 'target_metric': 'view_to_cart',
+        'baseline': 0.026, 'variant': 0.026 * (1.05 + i % 10 / 100), 'expected_lift': 0.05 + i % 10 / 100,
+        'sample_size_per_group': 60_000, 'test_duration_days': 21,
+        'implementation_cost': 10_000, 'implementation_weeks': 3,
+    } for i in range(n_scenarios)]
+    return scenarios, [{'scenario_id': s['id']} for s in scenarios]
+
+
+@pytest.mark.benchmark(group='ab_testing')
+def test_daily_simulation_capacity(benchmark, rounds):
+    # 1000 scénarios × 365 jours (planification de capacité)
+    scenarios, results = make_scenarios(1_000)
+    result = benchmark.pedantic(generate_ab_test_daily_simulation,
+                                args=(FUNNEL_BASELINE, scenarios, results),
+                                kwargs={'days': 365, 'seed': 0}, rounds=rounds, iterations=1)
+    assert len(result) == 365_000
@@ -0,0 +1,53 @@
+# Benchmarks des filtres du dashboard
+
+import dash
+import pytest
+
+import synthetic
+from product_index import ProductIndex
+
+
+@pytest.fixture(scope='module')
+def home():
+    """Module pages.home (register_page nécessite une application avec use_pages)"""
+    dash.Dash(__name__, use_pages=True, pages_folder='')
+    import pages.home
+    return pages.home
+
+
+@pytest.fixture(scope='module')
+def daily_frame(n_rows):
+    # Une ligne par jour : le volume reste celui d'une table agrégée
+    return synthetic.make_daily_frame(max(n_rows // 1_000, 365))
+
+
+@pytest.fixture(scope='module')
+def product_index(n_rows):
+    return ProductIndex(synthetic.make_products_summary(max(n_rows // 10, 1_000)))
+
+
+@pytest.mark.benchmark(group='dashboard')
+def test_home_filter_data(benchmark, home, daily_frame):
+    start, end = daily_frame['date'].iloc[[10, -10]]
+    result = benchmark(home.filter_data, daily_frame, str(start.date()), str(end.date()), 'all', 'weekend')
+    assert result['is_weekend'].all()
+
+
+@pytest.mark.benchmark(group='dashboard')
+def test_products_index_build(benchmark, n_rows):
+    products = synthetic.make_products_summary(max(n_rows // 10, 1_000))
+    index = benchmark.pedantic(ProductIndex, args=(products,), rounds=3, iterations=1)
+    assert len(index) == len(products)
+
+
+@pytest.mark.benchmark(group='dashboard')
+def test_products_page_filtered(benchmark, product_index):
+    rows, total = benchmark(product_index.page, sort_by='views', descending=True,
+                            page=3, category='Popular')
+    assert len(rows) == 25 and total > 0
+
+
+@pytest.mark.benchmark(group='dashboard')
+def test_products_page_search(benchmark, product_index):
+    rows, total = benchmark(product_index.page, sort_by='total_revenue', search='12')
+    assert total >= len(rows)
@@ -0,0 +1,67 @@
+# Benchmarks des scripts de préparation des données (scripts/data_prep)
+
+import pytest
+
+import clean_events
+import clean_item_properties
+import generate_daily_metrics
+import generate_products_summary
+import merge_data
+
+
+def run_clean_events(df):
+    """Étape de nettoyage de clean_events.main() (sans lecture/écriture)"""
+    return clean_events.clean_events_data(df)[0]
+
+
+@pytest.mark.benchmark(group='data_prep')
+def test_clean_events(benchmark, raw_events, rounds):
+    result = benchmark.pedantic(run_clean_events, args=(raw_events,), rounds=rounds, iterations=1)
+    assert result['timestamp'].is_monotonic_increasing
+    assert len(result) < len(raw_events)
+
+
+@pytest.mark.benchmark(group='data_prep')
+def test_enrich_events(benchmark, raw_events, users_df, products_df, rounds):
+    result = benchmark.pedantic(merge_data.enrich_events, args=(raw_events, users_df, products_df),
+                                rounds=rounds, iterations=1)
+    assert len(result) == len(raw_events)
+
+
+@pytest.mark.benchmark(group='data_prep')
+def test_user_journey(benchmark, raw_events, rounds):
+    result = benchmark.pedantic(merge_data.create_user_journey, args=(raw_events,),
+                                rounds=rounds, iterations=1)
+    assert result['total_events'].sum() == len(raw_events)
+
+
+@pytest.mark.benchmark(group='data_prep')
+def test_structure_item_properties(benchmark, item_properties, rounds):
+    # structure_data ajoute des colonnes en place : une copie par répétition
+    result = benchmark.pedantic(clean_item_properties.structure_data,
+                                setup=lambda: ((item_properties.copy(),), {}),
+                                rounds=rounds, iterations=1)
+    assert set(result['value_type']) <= {'numeric', 'mixed', 'multiple', 'text'}
+
+
+@pytest.mark.benchmark(group='data_prep')
+def test_generate_daily_metrics(benchmark, data_clean, transactions_df, rounds):
+    result = benchmark.pedantic(generate_daily_metrics.compute_daily_metrics,
+                                args=(data_clean, transactions_df), rounds=rounds, iterations=1)
+    assert result['date'].is_unique
+
+
+def build_products_summary(data_clean, transactions_df, chunk_size=500_000):
+    """Même découpage en chunks que generate_products_summary.main()"""
+    chunks = [
+        generate_products_summary.compute_chunk_metrics(data_clean.iloc[start:start + chunk_size])
+        for start in range(0, len(data_clean), chunk_size)
+    ]
+    return generate_products_summary.build_products_summary(chunks, transactions_df)
+
+
+@pytest.mark.benchmark(group='data_prep')
+def test_generate_products_summary(benchmark, data_clean, transactions_df, rounds):
+    result = benchmark.pedantic(build_products_summary, args=(data_clean, transactions_df),
+                                rounds=rounds, iterations=1)
+    assert result['product_id'].is_unique
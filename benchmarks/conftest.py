@@ -0,0 +1,62 @@
+# Configuration des micro-benchmarks (pytest-benchmark)
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.append(str(ROOT))
+sys.path.append(str(ROOT / 'scripts' / 'data_prep'))
+sys.path.append(str(ROOT / 'scripts' / 'ab_testing'))
+sys.path.append(str(ROOT / 'dashboard'))
+sys.path.append(str(Path(__file__).parent))
+
+import synthetic
+
+
+def pytest_addoption(parser):
+    parser.addoption('--bench-scale', default='1M', choices=list(synthetic.SCALES),
+                     help="Nombre de lignes des données synthétiques (défaut: 1M)")
+    parser.addoption('--bench-rounds', type=int, default=3,
+                     help="Répétitions par benchmark sur les grands volumes (défaut: 3)")
+
+
+@pytest.fixture(scope='session')
+def n_rows(request):
+    return synthetic.SCALES[request.config.getoption('--bench-scale')]
+
+
+@pytest.fixture(scope='session')
+def rounds(request):
+    return request.config.getoption('--bench-rounds')
+
+
+@pytest.fixture(scope='session')
+def raw_events(n_rows):
+    return synthetic.make_events(n_rows)
+
+
+@pytest.fixture(scope='session')
+def users_df(raw_events):
+    return synthetic.make_users(raw_events)
+
+
+@pytest.fixture(scope='session')
+def products_df(raw_events):
+    return synthetic.make_products(raw_events)
+
+
+@pytest.fixture(scope='session')
+def data_clean(n_rows):
+    return synthetic.make_data_clean(n_rows)
+
+
+@pytest.fixture(scope='session')
+def transactions_df(data_clean):
+    return synthetic.make_transactions(data_clean)
+
+
+@pytest.fixture(scope='session')
+def item_properties(n_rows):
+    return synthetic.make_item_properties(n_rows)
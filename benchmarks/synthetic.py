@@ -0,0 +1,191 @@
+"""
+Générateurs de données synthétiques au format RetailRocket
+Reproduisent les proportions du dataset réel (types d'événements, visiteurs
+et produits par événement, valeurs de item_properties) pour mesurer les
+traitements à 1M / 10M / 50M lignes sans télécharger les données.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.preprocessing import schema
+
+# Tailles disponibles (option --bench-scale)
+SCALES = {
+    'smoke': 100_000,
+    '1M': 1_000_000,
+    '10M': 10_000_000,
+    '50M': 50_000_000,
+}
+
+# Proportions du dataset RetailRocket (2 756 101 événements)
+EVENT_TYPES = np.array(schema.EVENT_TYPES, dtype=object)
+EVENT_SHARES = [0.9667, 0.0251, 0.0082]
+VISITORS_PER_EVENT = 1_407_580 / 2_756_101
+ITEMS_PER_EVENT = 235_061 / 2_756_101
+
+SEGMENTS = np.array(schema.SEGMENTS, dtype=object)
+SEGMENT_SHARES = [0.55, 0.30, 0.12, 0.03]
+
+# 2015-05-03 -> 2015-09-18, comme les données réelles
+START_MS = 1_430_622_004_384
+DURATION_MS = 139 * 86_400_000
+
+
+def _skewed_ids(rng, n, n_ids):
+    """Identifiants à popularité très inégale (quelques produits/visiteurs très actifs)"""
+    return (rng.zipf(1.3, n) - 1) % n_ids
+
+
+def make_events(n_rows, seed=0, duplicate_rate=0.001, invalid_rate=0.0005):
+    """
+    events.csv brut : timestamp, visitorid, event, itemid, transactionid
+
+    Contient des doublons exacts et des lignes invalides (timestamps et
+    identifiants négatifs) pour exercer les étapes de nettoyage. Types de
+    lecture de schema.read_csv(raw=True).
+    """
+    rng = np.random.default_rng(seed)
+    n_visitors = max(1, int(n_rows * VISITORS_PER_EVENT))
+    n_items = max(1, int(n_rows * ITEMS_PER_EVENT))
+
+    codes = rng.choice(len(EVENT_TYPES), size=n_rows, p=EVENT_SHARES)
+    transactionid = np.full(n_rows, np.nan)
+    is_transaction = codes == 2
+    transactionid[is_transaction] = rng.integers(0, max(1, is_transaction.sum() // 2), is_transaction.sum())
+
+    df = pd.DataFrame({
+        'timestamp': rng.integers(START_MS, START_MS + DURATION_MS, n_rows),
+        'visitorid': _skewed_ids(rng, n_rows, n_visitors),
+        'event': EVENT_TYPES[codes],
+        'itemid': _skewed_ids(rng, n_rows, n_items),
+        'transactionid': transactionid,
+    })
+
+    n_invalid = int(n_rows * invalid_rate)
+    if n_invalid:
+        rows = rng.choice(n_rows, n_invalid, replace=False)
+        df.loc[rows[: n_invalid // 2], 'timestamp'] = -1
+        df.loc[rows[n_invalid // 2:], 'visitorid'] = -1
+
+    n_duplicates = int(n_rows * duplicate_rate)
+    if n_duplicates:
+        df = pd.concat([df, df.iloc[rng.integers(0, n_rows, n_duplicates)]], ignore_index=True)
+    return df.astype({column: schema.READ_TYPES[column] for column in df.columns})
+
+
+def make_users(events, seed=0):
+    """users.csv : user_id, segment"""
+    rng = np.random.default_rng(seed)
+    user_id = np.unique(events['visitorid'].to_numpy())
+    return schema.to_compact(pd.DataFrame({
+        'user_id': user_id,
+        'segment': SEGMENTS[rng.choice(len(SEGMENTS), size=len(user_id), p=SEGMENT_SHARES)],
+    }))
+
+
+def make_products(events):
+    """products.csv : product_id, view_count, purchase_count"""
+    counts = pd.crosstab(events['itemid'], events['event'])
+    return schema.to_compact(pd.DataFrame({
+        'product_id': counts.index.to_numpy(),
+        'view_count': counts.get('view', 0).to_numpy(),
+        'purchase_count': counts.get('transaction', 0).to_numpy(),
+    }))
+
+
+def make_data_clean(n_rows, seed=0):
+    """
+    data_clean.csv : date, user_id, session_id, product_id, timestamp,
+    event_type, segment (trié par timestamp, comme après nettoyage)
+    """
+    rng = np.random.default_rng(seed)
+    n_visitors = max(1, int(n_rows * VISITORS_PER_EVENT))
+    n_items = max(1, int(n_rows * ITEMS_PER_EVENT))
+
+    timestamp = np.sort(rng.integers(START_MS, START_MS + DURATION_MS, n_rows))
+    user_id = _skewed_ids(rng, n_rows, n_visitors)
+    user_segment = SEGMENTS[rng.choice(len(SEGMENTS), size=n_visitors, p=SEGMENT_SHARES)]
+    return schema.to_compact(pd.DataFrame({
+        'date': pd.to_datetime(timestamp, unit='ms').strftime('%Y-%m-%d'),
+        'user_id': user_id,
+        'session_id': user_id * 100 + rng.integers(0, 5, n_rows),
+        'product_id': _skewed_ids(rng, n_rows, n_items),
+        'timestamp': timestamp,
+        'event_type': EVENT_TYPES[rng.choice(len(EVENT_TYPES), size=n_rows, p=EVENT_SHARES)],
+        'segment': user_segment[user_id],
+    }))
+
+
+def make_transactions(data_clean, seed=0):
+    """transactions.csv : date, product_id, amount (prix log-normaux)"""
+    rng = np.random.default_rng(seed)
+    purchases = data_clean.loc[data_clean['event_type'] == 'transaction', ['date', 'product_id']]
+    return purchases.assign(amount=rng.lognormal(4.0, 1.0, len(purchases)).round(2)).reset_index(drop=True)
+
+
+def make_item_properties(n_rows, seed=0):
+    """
+    item_properties.csv : timestamp, itemid, property, value
+
+    Valeurs au format RetailRocket : nombres simples, valeurs préfixées 'n',
+    listes d'identifiants et combinaisons des deux.
+    """
+    rng = np.random.default_rng(seed)
+    n_items = max(1, int(n_rows * ITEMS_PER_EVENT))
+    ids = rng.integers(1000, 1_300_000, size=(n_rows, 3)).astype(str)
+    prices = np.char.add('n', (rng.integers(1, 100_000, n_rows) * 12).astype(str))
+    prices = np.char.add(prices, '.000')
+
+    kind = rng.choice(4, size=n_rows, p=[0.35, 0.25, 0.25, 0.15])
+    value = np.where(kind == 0, rng.integers(0, 2000, n_rows).astype(str), ids[:, 0])
+    value = np.where(kind == 1, prices, value)
+    value = np.where(kind == 2, np.char.add(np.char.add(ids[:, 0], ' '), ids[:, 1]), value)
+    value = np.where(kind == 3, np.char.add(np.char.add(ids[:, 2], ' '), prices), value)
+
+    return pd.DataFrame({
+        'timestamp': rng.integers(START_MS, START_MS + DURATION_MS, n_rows),
+        'itemid': rng.integers(0, n_items, n_rows),
+        'property': np.array(['categoryid', 'available', '790', '888', '6'], dtype=object)[
+            rng.integers(0, 5, n_rows)],
+        'value': value.astype(object),
+    })
+
+
+def make_daily_frame(n_rows, seed=0):
+    """Table au format daily_metrics.csv chargée par le dashboard"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2015-05-03', periods=n_rows, freq='D')
+    return pd.DataFrame({
+        'date': dates,
+        'day_of_week': dates.day_name(),
+        'is_weekend': dates.dayofweek >= 5,
+        'unique_users': rng.integers(5_000, 15_000, n_rows),
+        'transactions': rng.integers(50, 200, n_rows),
+        'daily_revenue': rng.lognormal(9.0, 0.3, n_rows).round(2),
+        'view_to_purchase_rate': rng.uniform(0.5, 1.5, n_rows).round(2),
+    })
+
+
+def make_products_summary(n_rows, seed=0):
+    """Table au format products_summary.csv (tableau produits du dashboard)"""
+    rng = np.random.default_rng(seed)
+    views = rng.zipf(1.5, n_rows).clip(max=100_000)
+    purchases = rng.binomial(views, 0.01)
+    revenue = (purchases * rng.lognormal(4.0, 1.0, n_rows)).round(2)
+    categories = np.array(['Top Performer', 'High Revenue', 'High Conversion',
+                           'Popular', 'Low Performer', 'No Sales'], dtype=object)
+    df = pd.DataFrame({
+        'product_id': rng.permutation(n_rows * 5)[:n_rows],
+        'category': categories[rng.integers(0, len(categories), n_rows)],
+        'unique_users': (views * 0.8).astype(int),
+        'views': views,
+        'add_to_carts': rng.binomial(views, 0.03),
+        'purchases': purchases,
+        'view_to_purchase_rate': (purchases / views * 100).round(2),
+        'total_revenue': revenue,
+        'avg_price': np.where(purchases > 0, revenue / np.maximum(purchases, 1), np.nan).round(2),
+    })
+    df = df.sort_values('total_revenue', ascending=False, ignore_index=True)
+    df['rank'] = np.arange(1, n_rows + 1)
+    return df
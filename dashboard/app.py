@@ -46,45 +46,21 @@ server.auth_manager = auth_manager
 from ddos_protection import setup_ddos_protection
 setup_ddos_protection(server)
 
-# SECURITY: Add security headers to all responses
-@server.after_request
-def add_security_headers(response):
-    """Add security headers to protect against common web vulnerabilities"""
-    # Prevent clickjacking attacks
-    response.headers['X-Frame-Options'] = 'SAMEORIGIN'
-    
-    # Prevent MIME type sniffing
-    response.headers['X-Content-Type-Options'] = 'nosniff'
-    
-    # Enable XSS protection in older browsers
-    response.headers['X-XSS-Protection'] = '1; mode=block'
-    
-    # Content Security Policy - restrict resource loading
-    # Ajout de media-src pour l'assistant vocal et domaines CDN nécessaires
-    response.headers['Content-Security-Policy'] = (
-        "default-src 'self'; "
-        "script-src 'self' 'unsafe-inline' 'unsafe-eval' https://cdn.jsdelivr.net https://cdn.plot.ly https://cdnjs.cloudflare.com; "
-        "style-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net https://fonts.googleapis.com https://cdnjs.cloudflare.com; "
-        "font-src 'self' https://cdn.jsdelivr.net https://fonts.gstatic.com https://cdnjs.cloudflare.com; "
-        "img-src 'self' data: https:; "
-        "connect-src 'self' https://cdn.jsdelivr.net; "
-        "media-src 'self' blob:"
-    )
-    
-    # Control referrer information
-    response.headers['Referrer-Policy'] = 'strict-origin-when-cross-origin'
-    
-    # Permissions policy (formerly Feature-Policy)
-    # Autoriser le microphone pour l'assistant vocal (permissif pour localhost)
-    response.headers['Permissions-Policy'] = (
-        'geolocation=(), microphone=*, camera=(), '
-        'payment=(), usb=(), magnetometer=(), gyroscope=()'
-    )
-    
-    # HSTS for HTTPS enforcement (commented out for dev, enable in production with HTTPS)
-    # response.headers['Strict-Transport-Security'] = 'max-age=31536000; includeSubDomains'
-    
-    return response
+# PERFORMANCE: Compress callback responses (/_dash-update-component) and pages
+# Registered first so it runs after the other after_request handlers
+from compression import setup_compression
+setup_compression(server)
+
+# PERFORMANCE: Classify request paths once, serve /assets/ from memory and
+# add the precomputed security headers to all responses
+from request_routing import setup_request_routing, classify
+setup_request_routing(server, app.config.assets_folder)
+
+# PERFORMANCE: Logging never blocks the request path - console output goes
+# through a bounded queue, and logs plus query/callback timings are written
+# in batches to dashboard_logs / query_performance (DASHBOARD_DB_LOGGING=true)
+from log_pipeline import setup_async_logging
+setup_async_logging(server)
 
 # Main layout with sidebar navigation
 app.layout = html.Div([
@@ -284,12 +260,8 @@ app.layout = html.Div([
 @server.before_request
 def check_authentication():
     """Check if user is authenticated before allowing access"""
-    # Allow access to login page, landing page and static assets
-    if request.path == '/' or \
-       request.path.startswith('/login') or \
-       request.path.startswith('/assets') or \
-       request.path.startswith('/_dash') or \
-       request.path.startswith('/logout'):
+    # Allow access to login page, landing page, Dash internals and static assets
+    if classify(request.path).public:
         return None
     
     # Check if user is authenticated
@@ -312,12 +284,16 @@ def check_authentication():
 @server.before_request
 def log_request():
     """Log each incoming HTTP request"""
+    if not classify(request.path).log:
+        return
     logger.info(f"Request: {request.method} {request.path} from {request.remote_addr} - User: {current_user.username if current_user.is_authenticated else 'Anonymous'}")
 
 
 @server.after_request
 def log_response(response):
     """Log each HTTP response"""
+    if not classify(request.path).log:
+        return response
     logger.info(f"Response: {request.method} {request.path} - Status {response.status_code}")
     return response
 
@@ -391,6 +367,12 @@ def toggle_header_sidebar(pathname):
     return header_style, sidebar_style, content_style
 
 
+# PERFORMANCE: Opt-in callback profiling (CALLBACK_PROFILING=true) - wraps every
+# registered callback, so it must stay after the last callback definition
+from callback_profiling import setup_callback_profiling
+setup_callback_profiling(app)
+
+
 if __name__ == '__main__':
     print("\n" + "="*60)
     print("🎩 Bonjour Docteur Christh !")
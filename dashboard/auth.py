@@ -7,10 +7,23 @@ import os
 from flask import Flask, session, redirect, url_for
 from flask_login import LoginManager, UserMixin, login_user, logout_user, current_user
 from werkzeug.security import check_password_hash, generate_password_hash
+import atexit
 import json
+import logging
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
 from datetime import timedelta
 from functools import wraps
 
+try:
+    import fcntl
+except ImportError:  # Windows: single process, no file lock needed
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
 
 class User(UserMixin):
     """User model for Flask-Login"""
@@ -26,6 +39,261 @@ class User(UserMixin):
         return f'<User {self.username}>'
 
 
+class UserStore:
+    """
+    In-memory user store backed by users.json
+    
+    - Username and id indexes: lookups are O(1) whatever the user count
+    - User objects are built once per record and reused by the user_loader
+    - Write-behind: changes are applied in memory and flushed by a background
+      thread with an atomic rename; bursts of changes are coalesced
+    - Cross-worker invalidation: the file signature (mtime, size, inode) is
+      polled at most every poll_interval seconds and the file reloaded when
+      another worker has written it
+    """
+    
+    def __init__(self, path, default_users=None, poll_interval=2.0, write_delay=0.05):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.write_delay = write_delay
+        
+        self.users = {}
+        self._by_id = {}
+        self._user_objects = {}
+        self._dirty = set()
+        self._signature = None
+        self._next_check = 0.0
+        
+        self._lock = threading.RLock()
+        self._flush_event = threading.Event()
+        self._writer = None
+        
+        if not self._load():
+            # Missing or unreadable file: start from the default users
+            self._index(dict(default_users or {}))
+            self._dirty.update(self.users)
+            self.flush()
+        
+        atexit.register(self.flush)
+    
+    # ------------------------------------------------------------------
+    # Loading and invalidation
+    # ------------------------------------------------------------------
+    
+    def _stat(self):
+        """File signature, None if the file does not exist"""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+    
+    def _read(self):
+        with open(self.path, 'r') as f:
+            return json.load(f)
+    
+    def _index(self, users):
+        """Rebuild the indexes from a {username: record} dict"""
+        self.users = users
+        self._by_id = {str(data['id']): username for username, data in users.items()}
+        self._user_objects = {}
+    
+    def _load(self):
+        """Load the file, keeping local changes that are not flushed yet"""
+        signature = self._stat()
+        if signature is None:
+            return False
+        try:
+            users = self._read()
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read {self.path}: {e}")
+            return False
+        
+        with self._lock:
+            for username in self._dirty:
+                if username in self.users:
+                    users[username] = self.users[username]
+            self._index(users)
+            self._signature = signature
+        return True
+    
+    def refresh(self, force=False):
+        """Reload users.json if another worker changed it (polled)"""
+        now = time.monotonic()
+        if not force and now < self._next_check:
+            return
+        self._next_check = now + self.poll_interval
+        
+        signature = self._stat()
+        if signature is not None and signature != self._signature:
+            self._load()
+    
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+    
+    def _user(self, username):
+        """Cached User object for a username"""
+        user = self._user_objects.get(username)
+        if user is None:
+            user_data = self.users.get(username)
+            if user_data is None:
+                return None
+            user = User(
+                id=user_data['id'],
+                username=user_data['username'],
+                email=user_data.get('email'),
+                role=user_data.get('role', 'user'),
+                force_password_change=user_data.get('force_password_change', False)
+            )
+            self._user_objects[username] = user
+        return user
+    
+    def get(self, username):
+        """Raw record of a user"""
+        self.refresh()
+        return self.users.get(username)
+    
+    def get_user_by_username(self, username):
+        self.refresh()
+        return self._user(username)
+    
+    def get_user_by_id(self, user_id):
+        self.refresh()
+        username = self._by_id.get(str(user_id))
+        return self._user(username) if username is not None else None
+    
+    def __contains__(self, username):
+        self.refresh()
+        return username in self.users
+    
+    # ------------------------------------------------------------------
+    # Changes and write-behind persistence
+    # ------------------------------------------------------------------
+    
+    def update(self, username, **fields):
+        """Update fields of an existing user"""
+        with self._lock:
+            if username not in self.users:
+                return False
+            self.users[username] = {**self.users[username], **fields}
+            self._user_objects.pop(username, None)
+            self._dirty.add(username)
+        self._schedule_flush()
+        return True
+    
+    def add(self, record):
+        """
+        Add a new user record, assigning the next free id
+        
+        The id is computed from the current file and written before the
+        file lock is released, so two workers never assign the same id.
+        """
+        try:
+            with self._file_lock():
+                self._load()
+                with self._lock:
+                    if record['username'] in self.users:
+                        return False
+                    new_id = max((int(i) for i in self._by_id if str(i).isdigit()), default=0) + 1
+                    record = {**record, 'id': str(new_id)}
+                    self.users[record['username']] = record
+                    self._by_id[record['id']] = record['username']
+                    self._dirty.add(record['username'])
+                self._write_pending()
+        except OSError as e:
+            logger.error(f"Could not lock {self.path}: {e}")
+            return False
+        return True
+    
+    def _schedule_flush(self):
+        """Wake the writer thread (started on first change)"""
+        with self._lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._writer_loop, name='users-writer', daemon=True)
+                self._writer.start()
+        self._flush_event.set()
+    
+    def _writer_loop(self):
+        while True:
+            self._flush_event.wait()
+            time.sleep(self.write_delay)  # Coalesce bursts of changes
+            self._flush_event.clear()
+            self.flush()
+    
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock shared by all workers writing users.json"""
+        if fcntl is None:
+            yield
+            return
+        with open(self.path + '.lock', 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    def flush(self):
+        """
+        Write pending changes now
+        
+        Changed records are merged into the current file content (other
+        workers may have written it) and the result is renamed over
+        users.json, so readers never see a partial file.
+        
+        Returns:
+            True if nothing is left to write, False on write error
+        """
+        with self._lock:
+            if not self._dirty:
+                return True
+        try:
+            with self._file_lock():
+                return self._write_pending()
+        except OSError as e:
+            logger.error(f"Could not lock {self.path}: {e}")
+            return False
+    
+    def _write_pending(self):
+        """Merge pending changes into users.json (caller holds the file lock)"""
+        with self._lock:
+            if not self._dirty:
+                return True
+            pending = {username: dict(self.users[username]) for username in self._dirty}
+            self._dirty.clear()
+        
+        try:
+            try:
+                current = self._read()
+            except (OSError, ValueError):
+                current = {}
+            current.update(pending)
+            
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path) or '.', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(current, f, indent=2)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            signature = self._stat()
+        except OSError as e:
+            logger.error(f"Could not write {self.path}: {e}")
+            with self._lock:
+                self._dirty.update(pending)
+            return False
+        
+        with self._lock:
+            # Pick up records written by other workers in the meantime
+            for username in self._dirty:
+                current[username] = self.users[username]
+            self._index(current)
+            self._signature = signature
+        return True
+
+
 class AuthManager:
     """Manages authentication for the Dash application"""
     
@@ -46,13 +314,18 @@ class AuthManager:
         self.server.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=24)
         
         # User database (in production, use a real database)
-        self.users_db = self._load_users()
+        self.store = self._load_users()
         
         # Set up user loader
         @self.login_manager.user_loader
         def load_user(user_id):
             return self.get_user_by_id(user_id)
     
+    @property
+    def users_db(self):
+        """Users keyed by username"""
+        return self.store.users
+    
     def _load_users(self):
         """Load users from config file or environment"""
         users_file = os.path.join(os.path.dirname(__file__), 'users.json')
@@ -77,51 +350,20 @@ class AuthManager:
             }
         }
         
-        if os.path.exists(users_file):
-            try:
-                with open(users_file, 'r') as f:
-                    return json.load(f)
-            except:
-                pass
-        
-        # Save default users
-        try:
-            with open(users_file, 'w') as f:
-                json.dump(default_users, f, indent=2)
-        except:
-            pass
-        
-        return default_users
+        # Default users are written if the file is missing or unreadable
+        return UserStore(users_file, default_users)
     
     def get_user_by_username(self, username):
         """Get user by username"""
-        user_data = self.users_db.get(username)
-        if user_data:
-            return User(
-                id=user_data['id'],
-                username=user_data['username'],
-                email=user_data.get('email'),
-                role=user_data.get('role', 'user'),
-                force_password_change=user_data.get('force_password_change', False)
-            )
-        return None
+        return self.store.get_user_by_username(username)
     
     def get_user_by_id(self, user_id):
-        """Get user by ID"""
-        for user_data in self.users_db.values():
-            if user_data['id'] == user_id:
-                return User(
-                    id=user_data['id'],
-                    username=user_data['username'],
-                    email=user_data.get('email'),
-                    role=user_data.get('role', 'user'),
-                    force_password_change=user_data.get('force_password_change', False)
-                )
-        return None
+        """Get user by ID (called by Flask-Login once per request)"""
+        return self.store.get_user_by_id(user_id)
     
     def verify_password(self, username, password):
         """Verify username and password"""
-        user_data = self.users_db.get(username)
+        user_data = self.store.get(username)
         if user_data and check_password_hash(user_data['password'], password):
             return True
         return False
@@ -151,20 +393,12 @@ class AuthManager:
         Returns:
             True if successful, False otherwise
         """
-        if username not in self.users_db:
-            return False
-        
-        self.users_db[username]['password'] = generate_password_hash(new_password)
-        self.users_db[username]['force_password_change'] = False
-        
-        # Save to file
-        try:
-            users_file = os.path.join(os.path.dirname(__file__), 'users.json')
-            with open(users_file, 'w') as f:
-                json.dump(self.users_db, f, indent=2)
-            return True
-        except:
-            return False
+        # Persisted to users.json by the store's writer thread
+        return self.store.update(
+            username,
+            password=generate_password_hash(new_password),
+            force_password_change=False
+        )
     
     def add_user(self, username, password, email=None, role='user'):
         """
@@ -173,27 +407,17 @@ class AuthManager:
         Returns:
             True if successful, False otherwise
         """
-        if username in self.users_db:
+        if username in self.store:
             return False
         
-        new_id = str(len(self.users_db) + 1)
-        self.users_db[username] = {
-            'id': new_id,
+        # Persisted to users.json by the store's writer thread
+        return self.store.add({
             'username': username,
             'password': generate_password_hash(password),
             'email': email,
             'role': role,
             'force_password_change': False
-        }
-        
-        # Save to file
-        try:
-            users_file = os.path.join(os.path.dirname(__file__), 'users.json')
-            with open(users_file, 'w') as f:
-                json.dump(self.users_db, f, indent=2)
-            return True
-        except:
-            return False
+        })
 
 
 def require_login(func):
@@ -0,0 +1,380 @@
+"""
+Profilage des callbacks Dash (optionnel, CALLBACK_PROFILING=true)
+Chaque callback enregistré est enveloppé pour mesurer le temps réel, le temps
+CPU, la sérialisation JSON des figures et la taille de la réponse. Une
+fraction des appels est exécutée sous cProfile pour estimer la part pandas.
+Les mesures sont exportées en histogrammes Prometheus (si prometheus_client
+est installé) et résumées par /debug/profile.
+"""
+
+import cProfile
+import io
+import logging
+import os
+import pstats
+import random
+import threading
+import time
+from collections import defaultdict
+from functools import wraps
+
+from flask import jsonify, request
+
+try:
+    from prometheus_client import Histogram, start_http_server
+except ImportError:  # prometheus_client est optionnel, le rapport JSON suffit
+    Histogram = None
+    start_http_server = None
+
+logger = logging.getLogger(__name__)
+
+PROFILING_ENABLED = os.getenv('CALLBACK_PROFILING', 'false').lower() in ('true', '1', 'yes')
+
+# Part des appels exécutés sous cProfile (mesure de la part pandas)
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0.01'))
+
+# Port du serveur de métriques Prometheus (comme tools/ecommerce_exporter.py)
+METRICS_PORT = int(os.getenv('CALLBACK_METRICS_PORT', '9201'))
+
+# Application chargée avant fork (gunicorn preload_app, voir gunicorn_conf.py) :
+# le serveur de métriques démarre dans un worker, pas dans le maître
+PRELOAD = os.getenv('DASHBOARD_PRELOAD', 'false').lower() in ('true', '1', 'yes')
+
+# Regroupement du temps CPU par bibliothèque dans les profils
+PACKAGES = ('pandas', 'numpy', 'plotly', 'dash', 'flask')
+
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1e3, 5e3, 1e4, 5e4, 1e5, 5e5, 1e6, 5e6)
+
+_local = threading.local()
+
+# Port du serveur de métriques en attente du fork (mode preload)
+_deferred_metrics_port = None
+
+
+def _package_of(filename, dashboard_dir=os.path.dirname(os.path.abspath(__file__))):
+    """Bibliothèque à laquelle appartient un fichier source"""
+    for package in PACKAGES:
+        if f'{os.sep}{package}{os.sep}' in filename:
+            return package
+    if filename.startswith(dashboard_dir):
+        return 'dashboard'
+    return 'other'
+
+
+def package_times(stats):
+    """Temps propre (secondes) par bibliothèque dans un pstats.Stats"""
+    totals = defaultdict(float)
+    for (filename, _, _), (_, _, tottime, _, _) in stats.stats.items():
+        totals[_package_of(filename)] += tottime
+    return dict(totals)
+
+
+class CallbackStats:
+    """Agrégats par callback pour le rapport des chemins chauds"""
+
+    FIELDS = ('wall', 'cpu', 'serialization', 'bytes')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = {}
+        self._pandas = {}
+
+    def record(self, callback, page, wall, cpu, serialization, size):
+        with self._lock:
+            entry = self._totals.get(callback)
+            if entry is None:
+                entry = self._totals[callback] = {
+                    'page': page, 'calls': 0, 'wall': 0.0, 'cpu': 0.0,
+                    'serialization': 0.0, 'bytes': 0, 'max_wall': 0.0,
+                }
+            entry['calls'] += 1
+            entry['wall'] += wall
+            entry['cpu'] += cpu
+            entry['serialization'] += serialization
+            entry['bytes'] += size
+            entry['max_wall'] = max(entry['max_wall'], wall)
+
+    def record_pandas(self, callback, seconds):
+        with self._lock:
+            count, total = self._pandas.get(callback, (0, 0.0))
+            self._pandas[callback] = (count + 1, total + seconds)
+
+    def report(self):
+        """Callbacks triés par temps réel cumulé (le plus coûteux en premier)"""
+        with self._lock:
+            items = [(callback, dict(entry)) for callback, entry in self._totals.items()]
+            pandas = dict(self._pandas)
+
+        total_wall = sum(entry['wall'] for _, entry in items) or 1.0
+        rows = []
+        for callback, entry in items:
+            calls = entry['calls']
+            sampled, pandas_total = pandas.get(callback, (0, 0.0))
+            rows.append({
+                'callback': callback,
+                'page': entry['page'],
+                'calls': calls,
+                'wall_total_ms': round(entry['wall'] * 1000, 1),
+                'wall_share': round(entry['wall'] / total_wall, 4),
+                'wall_avg_ms': round(entry['wall'] / calls * 1000, 2),
+                'wall_max_ms': round(entry['max_wall'] * 1000, 2),
+                'cpu_avg_ms': round(entry['cpu'] / calls * 1000, 2),
+                'serialization_avg_ms': round(entry['serialization'] / calls * 1000, 2),
+                'pandas_avg_ms': round(pandas_total / sampled * 1000, 2) if sampled else None,
+                'profiled_calls': sampled,
+                'response_avg_bytes': int(entry['bytes'] / calls),
+            })
+        rows.sort(key=lambda row: row['wall_total_ms'], reverse=True)
+        return rows
+
+
+class PageCapture:
+    """Profil cProfile cumulé des prochains appels de callbacks d'une page"""
+
+    def __init__(self, page, calls):
+        self.page = page
+        self.remaining = calls
+        self.profiled = 0
+        self.stats = None
+        self._lock = threading.Lock()
+
+    def matches(self, page):
+        return page == self.page or page.rsplit('.', 1)[-1] == self.page
+
+    def claim(self):
+        """Réserve un appel à profiler (False quand la capture est terminée)"""
+        with self._lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+    def add(self, profile):
+        with self._lock:
+            if self.stats is None:
+                self.stats = pstats.Stats(profile, stream=io.StringIO())
+            else:
+                self.stats.add(profile)
+            self.profiled += 1
+
+    def summary(self, limit=25):
+        """Répartition par bibliothèque et fonctions les plus coûteuses"""
+        with self._lock:
+            result = {'page': self.page, 'profiled_calls': self.profiled, 'remaining_calls': self.remaining}
+            if self.stats is None:
+                return result
+
+            by_package = package_times(self.stats)
+            total = sum(by_package.values()) or 1.0
+            result['by_package'] = {
+                package: {'ms': round(seconds * 1000, 1), 'share': round(seconds / total, 4)}
+                for package, seconds in sorted(by_package.items(), key=lambda item: -item[1])
+            }
+
+            top = sorted(self.stats.stats.items(), key=lambda item: -item[1][3])[:limit]
+            result['top_functions'] = [
+                {
+                    'function': f"{os.path.basename(filename)}:{line}({name})",
+                    'package': _package_of(filename),
+                    'calls': calls,
+                    'tottime_ms': round(tottime * 1000, 2),
+                    'cumtime_ms': round(cumtime * 1000, 2),
+                }
+                for (filename, line, name), (_, calls, tottime, cumtime, _) in top
+            ]
+            return result
+
+
+class CallbackProfiler:
+    """
+    Instrumentation des callbacks Dash
+
+    Usage:
+        profiler = CallbackProfiler()
+        profiler.instrument(app)   # après l'enregistrement de tous les callbacks
+    """
+
+    def __init__(self, sample_rate=PROFILE_SAMPLE_RATE, use_prometheus=True):
+        self.sample_rate = sample_rate
+        self.stats = CallbackStats()
+        self.capture = None
+        self.histograms = None
+        if use_prometheus and Histogram is not None:
+            labels = ['callback', 'page']
+            self.histograms = {
+                'wall': Histogram('dash_callback_wall_seconds', 'Callback wall time', labels, buckets=TIME_BUCKETS),
+                'cpu': Histogram('dash_callback_cpu_seconds', 'Callback CPU time', labels, buckets=TIME_BUCKETS),
+                'serialization': Histogram('dash_callback_serialization_seconds',
+                                           'Callback response JSON serialization time', labels, buckets=TIME_BUCKETS),
+                'pandas': Histogram('dash_callback_pandas_seconds',
+                                    'Time spent in pandas (sampled calls)', labels, buckets=TIME_BUCKETS),
+                'bytes': Histogram('dash_callback_response_bytes', 'Callback response size', labels, buckets=SIZE_BUCKETS),
+            }
+
+    def start_capture(self, page, calls):
+        self.capture = PageCapture(page, calls)
+        return self.capture
+
+    def _observe(self, callback, page, **values):
+        if self.histograms is None:
+            return
+        for name, value in values.items():
+            self.histograms[name].labels(callback=callback, page=page).observe(value)
+
+    def wrap(self, callback_id, func):
+        """Enveloppe la fonction enregistrée par Dash pour un callback"""
+        if getattr(func, '_profiled', False):
+            return func
+        page = getattr(func, '__module__', None) or 'app'
+
+        @wraps(func)
+        def profiled(*args, **kwargs):
+            capture = self.capture
+            profile = None
+            if capture is not None and capture.matches(page) and capture.claim():
+                profile = cProfile.Profile()
+            elif self.sample_rate > 0 and random.random() < self.sample_rate:
+                capture = None
+                profile = cProfile.Profile()
+
+            _local.serialization = 0.0
+            wall_start = time.perf_counter()
+            cpu_start = time.thread_time()
+            try:
+                if profile is not None:
+                    try:
+                        profile.enable()
+                    except ValueError:  # un autre profileur est déjà actif
+                        profile = None
+                try:
+                    result = func(*args, **kwargs)
+                finally:
+                    if profile is not None:
+                        profile.disable()
+            finally:
+                wall = time.perf_counter() - wall_start
+                cpu = time.thread_time() - cpu_start
+                serialization = _local.serialization
+                _local.serialization = None
+
+            size = len(result) if isinstance(result, (str, bytes)) else 0
+            self.stats.record(callback_id, page, wall, cpu, serialization, size)
+            self._observe(callback_id, page, wall=wall, cpu=cpu, serialization=serialization, bytes=size)
+
+            if profile is not None:
+                profile.create_stats()
+                pandas_seconds = package_times(pstats.Stats(profile, stream=io.StringIO())).get('pandas', 0.0)
+                self.stats.record_pandas(callback_id, pandas_seconds)
+                self._observe(callback_id, page, pandas=pandas_seconds)
+                if capture is not None:
+                    capture.add(profile)
+            return result
+
+        profiled._profiled = True
+        return profiled
+
+    def instrument(self, app):
+        """Enveloppe tous les callbacks enregistrés (app.callback et dash.callback)"""
+        from dash import _callback
+
+        count = 0
+        for callback_map in (app.callback_map, _callback.GLOBAL_CALLBACK_MAP):
+            for callback_id, entry in callback_map.items():
+                if 'callback' in entry:
+                    entry['callback'] = self.wrap(callback_id, entry['callback'])
+                    count += 1
+        return count
+
+
+def _patch_serializer():
+    """Mesure le temps passé dans plotly.io.json.to_json_plotly (utilisé par Dash)"""
+    import plotly.io.json as plotly_json
+
+    original = plotly_json.to_json_plotly
+    if getattr(original, '_profiled', False):
+        return
+
+    @wraps(original)
+    def to_json_plotly(*args, **kwargs):
+        if getattr(_local, 'serialization', None) is None:
+            return original(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            _local.serialization += time.perf_counter() - start
+
+    to_json_plotly._profiled = True
+    plotly_json.to_json_plotly = to_json_plotly
+
+
+def _start_metrics_server(port):
+    try:
+        start_http_server(port)
+    except OSError as e:  # port déjà pris par un autre worker
+        logger.warning(f"⚠️ Prometheus metrics server not started on port {port}: {e}")
+
+
+def reinit_after_fork():
+    """Démarre dans le worker le serveur de métriques différé (mode preload)"""
+    if _deferred_metrics_port:
+        _start_metrics_server(_deferred_metrics_port)
+
+
+def setup_callback_profiling(app, enabled=PROFILING_ENABLED, metrics_port=METRICS_PORT):
+    """
+    Active le profilage des callbacks (à appeler après leur enregistrement)
+
+    Args:
+        app: Instance Dash
+        enabled: Activer l'instrumentation (CALLBACK_PROFILING)
+        metrics_port: Port du serveur Prometheus (None pour ne pas le démarrer)
+
+    Returns:
+        CallbackProfiler ou None si désactivé
+    """
+    global _deferred_metrics_port
+
+    if not enabled:
+        return None
+
+    profiler = CallbackProfiler()
+    _patch_serializer()
+    count = profiler.instrument(app)
+
+    if profiler.histograms is not None and metrics_port:
+        if PRELOAD:
+            _deferred_metrics_port = metrics_port
+        else:
+            _start_metrics_server(metrics_port)
+
+    @app.server.route('/debug/profile')
+    def debug_profile():
+        """
+        Rapport de profilage
+
+        /debug/profile                    -> callbacks triés par temps cumulé
+        /debug/profile?page=home&calls=20 -> profile les 20 prochains appels de la page
+        /debug/profile?page=home          -> résumé du profil capturé
+        """
+        page = request.args.get('page')
+        if not page:
+            return jsonify({'sample_rate': profiler.sample_rate, 'callbacks': profiler.stats.report()})
+
+        calls = request.args.get('calls', type=int)
+        if calls:
+            capture = profiler.start_capture(page, min(calls, 1000))
+            return jsonify({'page': capture.page, 'remaining_calls': capture.remaining})
+
+        if profiler.capture is None or not profiler.capture.matches(page):
+            return jsonify({'error': f"No capture for page '{page}'",
+                            'hint': f"/debug/profile?page={page}&calls=20"}), 404
+        return jsonify(profiler.capture.summary(limit=request.args.get('limit', 25, type=int)))
+
+    print("✅ Profilage des callbacks activé")
+    print(f"   - {count} callbacks instrumentés, {profiler.sample_rate:.0%} des appels sous cProfile")
+    if profiler.histograms is not None:
+        print(f"   - Histogrammes Prometheus sur le port {metrics_port}")
+    print("   - Rapport: /debug/profile")
+    return profiler
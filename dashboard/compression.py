@@ -0,0 +1,110 @@
+"""
+Compression des réponses HTTP pour Flask/Dash
+Compresse en brotli (si disponible) ou gzip les réponses JSON des callbacks
+(/_dash-update-component) et les autres réponses textuelles volumineuses.
+"""
+
+import gzip
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # brotli est optionnel, gzip suffit
+    brotli = None
+
+# Types de contenu compressibles (les images et fonts sont déjà compressées)
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'text/html',
+    'text/css',
+    'text/plain',
+    'application/javascript',
+    'text/javascript',
+}
+
+# En dessous de cette taille le gain ne compense pas le coût CPU
+MIN_SIZE = 500
+
+# Niveaux rapides : les réponses de callbacks sont générées à chaque interaction
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+
+def choose_encoding(accept_encoding):
+    """
+    Choisit l'encodage à utiliser d'après l'en-tête Accept-Encoding
+
+    Returns:
+        'br', 'gzip' ou None
+    """
+    accepted = set()
+    for token in (accept_encoding or '').lower().split(','):
+        name, _, params = token.strip().partition(';')
+        if params.strip().replace(' ', '') in ('q=0', 'q=0.0'):
+            continue
+        accepted.add(name.strip())
+
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted or '*' in accepted:
+        return 'gzip'
+    return None
+
+
+def compress(data, encoding):
+    """Compresse des octets avec l'encodage choisi"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL)
+
+
+def compress_response(response, accept_encoding, min_size=MIN_SIZE):
+    """
+    Compresse une réponse Flask en place si c'est pertinent
+
+    Args:
+        response: Réponse Flask
+        accept_encoding: Valeur de l'en-tête Accept-Encoding de la requête
+        min_size: Taille minimale (octets) pour compresser
+    """
+    if (response.direct_passthrough
+            or response.is_streamed
+            or response.status_code < 200
+            or response.status_code in (204, 206, 304)
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+
+    encoding = choose_encoding(accept_encoding)
+    if encoding is None:
+        return response
+
+    data = response.get_data()
+    if len(data) < min_size:
+        return response
+
+    response.set_data(compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def setup_compression(app, min_size=MIN_SIZE):
+    """
+    Configure la compression des réponses sur l'application Flask
+
+    Args:
+        app: Instance Flask/Dash server
+        min_size: Taille minimale (octets) pour compresser
+    """
+
+    @app.after_request
+    def compress_after_request(response):
+        """Compresse la réponse si le client l'accepte"""
+        return compress_response(response, request.headers.get('Accept-Encoding', ''), min_size)
+
+    print("✅ Compression des réponses activée")
+    print(f"   - Encodage: {'brotli, gzip' if brotli is not None else 'gzip'}")
+    print(f"   - Taille minimale: {min_size} octets")
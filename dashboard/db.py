@@ -4,12 +4,16 @@ Handles all database connections and queries for the dashboard
 """
 
 import os
+import sys
+import time
 import pandas as pd
 from sqlalchemy import create_engine, text
 from sqlalchemy.pool import QueuePool
 import logging
 from contextlib import contextmanager
 
+from log_pipeline import record_query
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -62,27 +66,36 @@ def test_connection():
         return False
 
 
-def execute_query(query, params=None):
+def execute_query(query, params=None, name=None):
     """
     Execute a SQL query and return results as DataFrame
+
+    The execution time is queued for the query_performance table
+    (see log_pipeline); this never blocks the caller.
     
     Args:
         query (str): SQL query to execute
         params (dict, optional): Query parameters
+        name (str, optional): Name recorded in query_performance
+            (defaults to the calling function, e.g. get_daily_metrics)
     
     Returns:
         pd.DataFrame: Query results
     """
+    name = name or sys._getframe(1).f_code.co_name
+    start = time.perf_counter()
     try:
         with get_db_connection() as conn:
             if params:
                 df = pd.read_sql_query(text(query), conn, params=params)
             else:
                 df = pd.read_sql_query(query, conn)
-        return df
     except Exception as e:
+        record_query(name, (time.perf_counter() - start) * 1000, error=str(e))
         logger.error(f"❌ Query execution failed: {e}")
         raise
+    record_query(name, (time.perf_counter() - start) * 1000, rows_returned=len(df))
+    return df
 
 
 # =============================================================================
@@ -5,71 +5,275 @@ Implémente rate limiting et détection d'abus
 
 from flask import request, jsonify
 from functools import wraps
-from collections import defaultdict
 from datetime import datetime, timedelta
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
 import time
 
+from request_routing import classify
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de verrou inter-processus, backend mémoire
+    fcntl = None
+
+# Durée de blocage après dépassement
+BLOCK_SECONDS = 300
+
+# Les clés inactives depuis plus longtemps sont évincées
+KEY_TTL_SECONDS = 600
+
+
+def sliding_window_hit(state, now, max_requests, window_seconds, block_seconds=BLOCK_SECONDS):
+    """
+    Compteur à fenêtre glissante : enregistre une requête en O(1)
+
+    L'état d'une clé tient en quelques nombres quel que soit le trafic :
+    (fenêtre courante, compteur courant, compteur précédent, bloquée jusqu'à, vue le).
+    Le nombre de requêtes sur la dernière fenêtre est estimé en pondérant
+    le compteur de la fenêtre précédente par la part encore couverte.
+
+    Args:
+        state: État précédent de la clé (None si inconnue)
+        now: Temps monotone (secondes)
+
+    Returns:
+        tuple: (nouvel état, True si la requête doit être refusée)
+    """
+    window_id, current, previous, blocked_until, _ = state or (0, 0, 0, 0.0, 0.0)
+
+    if blocked_until > now:
+        return (window_id, current, previous, blocked_until, now), True
+
+    now_window = int(now // window_seconds)
+    if now_window != window_id:
+        previous = current if now_window == window_id + 1 else 0
+        current = 0
+        window_id = now_window
+
+    elapsed = (now % window_seconds) / window_seconds
+    if previous * (1 - elapsed) + current >= max_requests:
+        return (window_id, current, previous, now + block_seconds, now), True
+
+    return (window_id, current + 1, previous, 0.0, now), False
+
+
+def sliding_window_count(state, now, window_seconds):
+    """Estimation du nombre de requêtes sur la dernière fenêtre"""
+    if state is None:
+        return 0
+    window_id, current, previous, _, _ = state
+    now_window = int(now // window_seconds)
+    if now_window == window_id + 1:
+        current, previous = 0, current
+    elif now_window != window_id:
+        return 0
+    elapsed = (now % window_seconds) / window_seconds
+    return int(round(previous * (1 - elapsed) + current))
+
+
+class MemoryBackend:
+    """État des clés en mémoire du processus (un worker)"""
+
+    def __init__(self, ttl_seconds=KEY_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._states = {}
+        self._lock = threading.Lock()
+        self._next_sweep = 0.0
+
+    def update(self, key, func, now):
+        """Applique func(état) -> (nouvel état, résultat) de façon atomique"""
+        with self._lock:
+            state, result = func(self._states.get(key))
+            self._states[key] = state
+            self._evict_idle(now)
+        return result
+
+    def get(self, key, now):
+        with self._lock:
+            return self._states.get(key)
+
+    def reinit_after_fork(self):
+        """Nouveau verrou dans un worker forké (celui du maître a pu être copié verrouillé)"""
+        self._lock = threading.Lock()
+
+    def _evict_idle(self, now):
+        """Balayage au plus une fois par TTL : coût amorti O(1) par requête"""
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + self.ttl_seconds
+        self._states = {
+            key: state for key, state in self._states.items()
+            if now - state[4] <= self.ttl_seconds or state[3] > now
+        }
+
+    def __len__(self):
+        return len(self._states)
+
+
+class SharedMemoryBackend:
+    """
+    État des clés partagé entre les workers gunicorn d'un même hôte
+
+    Table de hachage de taille fixe dans un fichier mappé en mémoire
+    (/dev/shm si disponible), protégée par un verrou fcntl. Chaque clé occupe
+    un slot de SLOT.size octets ; une clé inactive depuis plus de ttl_seconds
+    (ou la plus ancienne des slots sondés si la table est pleine) est remplacée.
+    Le temps monotone (CLOCK_MONOTONIC) est commun à tous les processus.
+    """
+
+    # hash de clé, fenêtre, compteur courant, compteur précédent, bloquée jusqu'à, vue le
+    SLOT = struct.Struct('<Qqiidd')
+    MAX_PROBES = 8
+
+    def __init__(self, path=None, slots=65536, ttl_seconds=KEY_TTL_SECONDS):
+        if fcntl is None:
+            raise RuntimeError("SharedMemoryBackend requiert fcntl (Linux/macOS)")
+        if path is None:
+            shm_dir = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+            path = os.path.join(shm_dir, 'ecommerce_dashboard_ratelimit')
+
+        self.path = path
+        self.slots = slots
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+        size = slots * self.SLOT.size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size != size:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(self._fd).st_size != size:
+                    os.ftruncate(self._fd, 0)
+                    os.ftruncate(self._fd, size)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._map = mmap.mmap(self._fd, size)
+
+    @staticmethod
+    def _hash(key):
+        """Hash 64 bits non nul (0 = slot libre)"""
+        digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, 'little') or 1
+
+    def _read(self, slot):
+        return self.SLOT.unpack_from(self._map, slot * self.SLOT.size)
+
+    def _is_live(self, record, now):
+        """Slot occupé et encore valide (un last_seen futur vient d'un boot précédent)"""
+        key_hash, _, _, _, blocked_until, last_seen = record
+        if key_hash == 0 or last_seen > now:
+            return False
+        return now - last_seen <= self.ttl_seconds or blocked_until > now
+
+    def _find(self, key_hash, now):
+        """Slot de la clé, ou slot à (ré)utiliser : libre, expiré ou le plus ancien"""
+        start = key_hash % self.slots
+        reusable, oldest, oldest_seen = None, start, float('inf')
+        for probe in range(self.MAX_PROBES):
+            slot = (start + probe) % self.slots
+            record = self._read(slot)
+            live = self._is_live(record, now)
+            if record[0] == key_hash and live:
+                return slot, record[1:]
+            if not live and reusable is None:
+                reusable = slot
+            if record[5] < oldest_seen:
+                oldest, oldest_seen = slot, record[5]
+        return (oldest if reusable is None else reusable), None
+
+    def update(self, key, func, now):
+        """Applique func(état) -> (nouvel état, résultat) sous verrou inter-processus"""
+        key_hash = self._hash(key)
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                slot, state = self._find(key_hash, now)
+                state, result = func(state)
+                self.SLOT.pack_into(self._map, slot * self.SLOT.size, key_hash, *state)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        return result
+
+    def get(self, key, now):
+        """État de la clé à l'instant now (horloge du RateLimiter)"""
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_SH)
+            try:
+                return self._find(self._hash(key), now)[1]
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def reinit_after_fork(self):
+        """
+        Rouvre le fichier d'état dans un worker forké (gunicorn --preload)
+
+        Un verrou flock porte sur la description de fichier, partagée entre le
+        maître et ses workers après fork : sans réouverture, les workers ne
+        s'excluraient pas entre eux. Le mapping mémoire (MAP_SHARED) est conservé.
+        """
+        self._lock = threading.Lock()
+        inherited_fd, self._fd = self._fd, os.open(self.path, os.O_RDWR)
+        os.close(inherited_fd)
+
+
+def create_backend(name=None):
+    """
+    Backend choisi par RATE_LIMIT_BACKEND : 'shared' (défaut si fcntl est
+    disponible, limite commune à tous les workers) ou 'memory'
+    """
+    name = (name or os.environ.get('RATE_LIMIT_BACKEND', '')).lower()
+    if name == 'memory' or (not name and fcntl is None):
+        return MemoryBackend()
+    return SharedMemoryBackend(os.environ.get('RATE_LIMIT_STATE_FILE'))
+
+
 class RateLimiter:
-    """Rate limiter simple en mémoire"""
+    """Rate limiter à fenêtre glissante, mémoire fixe par clé"""
     
-    def __init__(self):
-        self.requests = defaultdict(list)
-        self.blocked_ips = {}
+    def __init__(self, backend=None, clock=time.monotonic):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.clock = clock
         
-    def is_rate_limited(self, ip, max_requests=100, window_seconds=60):
+    def is_rate_limited(self, ip, max_requests=100, window_seconds=60, scope='global'):
         """
-        Vérifie si une IP dépasse le rate limit
+        Vérifie si une IP dépasse le rate limit (et compte la requête)
         
         Args:
             ip: Adresse IP
             max_requests: Nombre max de requêtes
             window_seconds: Fenêtre de temps en secondes
+            scope: Limite concernée (compteurs séparés par scope)
         """
-        now = datetime.now()
-        window_start = now - timedelta(seconds=window_seconds)
-        
-        # Nettoyer les anciennes requêtes
-        self.requests[ip] = [
-            req_time for req_time in self.requests[ip]
-            if req_time > window_start
-        ]
-        
-        # Vérifier si bloqué
-        if ip in self.blocked_ips:
-            if datetime.now() < self.blocked_ips[ip]:
-                return True
-            else:
-                del self.blocked_ips[ip]
-        
-        # Vérifier le nombre de requêtes
-        if len(self.requests[ip]) >= max_requests:
-            # Bloquer pour 5 minutes
-            self.blocked_ips[ip] = datetime.now() + timedelta(minutes=5)
-            return True
-        
-        # Enregistrer la requête
-        self.requests[ip].append(now)
-        return False
+        now = self.clock()
+        key = f"{scope}:{window_seconds}:{ip}"
+        return self.backend.update(
+            key,
+            lambda state: sliding_window_hit(state, now, max_requests, window_seconds),
+            now
+        )
     
-    def get_stats(self, ip):
+    def get_stats(self, ip, window_seconds=60, scope='global'):
         """Obtenir les statistiques pour une IP"""
-        now = datetime.now()
-        window_start = now - timedelta(seconds=60)
-        
-        recent_requests = [
-            req_time for req_time in self.requests[ip]
-            if req_time > window_start
-        ]
+        now = self.clock()
+        state = self.backend.get(f"{scope}:{window_seconds}:{ip}", now)
+        blocked_until = None
+        if state is not None and state[3] > now:
+            blocked_until = datetime.now() + timedelta(seconds=state[3] - now)
         
         return {
             'ip': ip,
-            'requests_last_minute': len(recent_requests),
-            'is_blocked': ip in self.blocked_ips,
-            'blocked_until': self.blocked_ips.get(ip)
+            'requests_last_minute': sliding_window_count(state, now, window_seconds),
+            'is_blocked': blocked_until is not None,
+            'blocked_until': blocked_until
         }
 
-# Instance globale
-rate_limiter = RateLimiter()
+# Instance globale (partagée entre workers avec le backend 'shared')
+rate_limiter = RateLimiter(create_backend())
 
 def rate_limit(max_requests=100, window_seconds=60):
     """
@@ -86,11 +290,11 @@ def rate_limit(max_requests=100, window_seconds=60):
         def decorated_function(*args, **kwargs):
             ip = request.remote_addr
             
-            if rate_limiter.is_rate_limited(ip, max_requests, window_seconds):
+            if rate_limiter.is_rate_limited(ip, max_requests, window_seconds, scope=f.__name__):
                 return jsonify({
                     'error': 'Rate limit exceeded',
                     'message': f'Too many requests. Maximum {max_requests} per {window_seconds}s',
-                    'retry_after': 300
+                    'retry_after': BLOCK_SECONDS
                 }), 429
             
             return f(*args, **kwargs)
@@ -103,22 +307,28 @@ def setup_ddos_protection(app):
     
     Args:
         app: Instance Flask/Dash server
+    
+    RATE_LIMIT_ENABLED=false désactive la protection (instance locale de
+    benchmark, voir run_benchmark.py) ; ne jamais l'utiliser en production.
     """
+    if os.getenv('RATE_LIMIT_ENABLED', 'true').lower() not in ('true', '1', 'yes'):
+        print("⚠️  Protection DDoS désactivée (RATE_LIMIT_ENABLED=false)")
+        return
     
     @app.before_request
     def check_rate_limit():
         """Vérifie le rate limit avant chaque requête"""
         ip = request.remote_addr
         
-        # Exclure certaines routes du rate limiting
-        excluded_paths = ['/health', '/_dash-', '/assets/']
-        if any(request.path.startswith(path) for path in excluded_paths):
+        route = classify(request.path)
+        
+        # Routes exclues du rate limiting (assets, Dash, health checks)
+        if route.rate_limit is None:
             return None
         
         # Rate limit agressif pour les routes sensibles
-        sensitive_paths = ['/login', '/api/']
-        if any(request.path.startswith(path) for path in sensitive_paths):
-            if rate_limiter.is_rate_limited(ip, max_requests=20, window_seconds=60):
+        if route.rate_limit == 'sensitive':
+            if rate_limiter.is_rate_limited(ip, max_requests=20, window_seconds=60, scope='sensitive'):
                 return jsonify({
                     'error': 'Rate limit exceeded',
                     'message': 'Too many requests to sensitive endpoint',
@@ -144,6 +354,7 @@ def setup_ddos_protection(app):
     print("   - Rate limiting: 200 req/min (général)")
     print("   - Rate limiting: 20 req/min (endpoints sensibles)")
     print("   - Blocage automatique: 5 minutes")
+    print(f"   - Backend: {type(rate_limiter.backend).__name__}")
 
 # Exemple d'utilisation dans app.py:
 """
@@ -0,0 +1,228 @@
+"""
+Construction de figures pour les séries temporelles volumineuses
+Sous-échantillonnage côté serveur (LTTB / min-max) sur la plage visible,
+bascule automatique en rendu WebGL (Scattergl) au-delà d'un seuil de points,
+template partagé et mises à jour partielles (Dash Patch) des figures.
+"""
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+
+# Nombre max de points envoyés au navigateur par trace
+MAX_POINTS = 1000
+
+# Au-delà de ce nombre de points, rendu WebGL plutôt que SVG
+WEBGL_THRESHOLD = 1000
+
+# Propriétés non supportées par Scattergl
+SVG_ONLY_PROPS = ('stackgroup', 'groupnorm', 'stackgaps')
+
+# Template partagé par toutes les pages
+TEMPLATE = 'dashboard_dark'
+
+# Types de traces utilisés par le dashboard : les valeurs par défaut des autres
+# types (surface, mesh3d, carpet...) de plotly_dark sont retirées du template,
+# qui est sérialisé dans chaque figure envoyée au navigateur
+TEMPLATE_TRACE_TYPES = ('bar', 'scatter', 'scattergl', 'heatmap', 'histogram', 'pie')
+
+
+def register_template(name=TEMPLATE, base='plotly_dark', trace_types=TEMPLATE_TRACE_TYPES):
+    """Enregistre une seule fois le template allégé dérivé de plotly_dark"""
+    if name not in pio.templates:
+        base_template = pio.templates[base]
+        data = {
+            trace_type: base_template.data[trace_type]
+            for trace_type in trace_types
+            if base_template.data[trace_type]
+        }
+        pio.templates[name] = go.layout.Template(layout=base_template.layout, data=data)
+    return name
+
+
+register_template()
+
+
+def visible_range(relayout_data):
+    """
+    Extrait la plage x visible d'un relayoutData Plotly
+
+    Returns:
+        tuple (x0, x1) ou None si l'axe est en autorange
+    """
+    if not relayout_data or relayout_data.get('xaxis.autorange'):
+        return None
+    if 'xaxis.range[0]' in relayout_data and 'xaxis.range[1]' in relayout_data:
+        return relayout_data['xaxis.range[0]'], relayout_data['xaxis.range[1]']
+    if 'xaxis.range' in relayout_data:
+        x0, x1 = relayout_data['xaxis.range']
+        return x0, x1
+    return None
+
+
+def _as_numeric(x):
+    """Convertit un axe x (dates ou nombres) en float64 pour les calculs"""
+    x = pd.Series(x)
+    if pd.api.types.is_datetime64_any_dtype(x):
+        return x.astype('int64').to_numpy(dtype=np.float64)
+    return x.to_numpy(dtype=np.float64)
+
+
+def _range_mask(x, x_range):
+    """Masque des points dans la plage visible, plus un point de chaque côté"""
+    x = pd.Series(x)
+    if pd.api.types.is_datetime64_any_dtype(x):
+        x0, x1 = pd.to_datetime(x_range[0]), pd.to_datetime(x_range[1])
+    else:
+        x0, x1 = float(x_range[0]), float(x_range[1])
+
+    values = x.to_numpy()
+    start = max(np.searchsorted(values, x0, side='left') - 1, 0)
+    stop = min(np.searchsorted(values, x1, side='right') + 1, len(values))
+    mask = np.zeros(len(values), dtype=bool)
+    mask[start:stop] = True
+    return mask
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets : indices des n_out points qui
+    préservent le mieux la forme visuelle de la série (x trié)
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = _as_numeric(x)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Bornes des n_out - 2 buckets intérieurs (premier et dernier points conservés)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        next_stop = edges[i + 2] if i + 2 < len(edges) else n
+        next_start = stop if i + 2 < len(edges) else n - 1
+
+        avg_x = x[next_start:next_stop].mean()
+        avg_y = y[next_start:next_stop].mean()
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:stop] - y[a])
+            - (x[a] - x[start:stop]) * (avg_y - y[a])
+        )
+        a = start + int(np.nanargmax(area)) if np.isfinite(area).any() else start
+        indices[i + 1] = a
+
+    return indices
+
+
+def minmax_indices(y, n_out):
+    """Min et max de chaque bucket : conserve les pics (séries très bruitées)"""
+    n = len(y)
+    if n_out >= n or n_out < 2:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=np.float64)
+    n_buckets = n_out // 2
+    edges = np.linspace(0, n, n_buckets + 1).astype(np.int64)
+    picks = []
+    for start, stop in zip(edges[:-1], edges[1:]):
+        if stop <= start:
+            continue
+        bucket = y[start:stop]
+        picks.append(start + int(np.nanargmin(bucket)) if np.isfinite(bucket).any() else start)
+        picks.append(start + int(np.nanargmax(bucket)) if np.isfinite(bucket).any() else stop - 1)
+    return np.unique(picks)
+
+
+def downsample(x, y, x_range=None, max_points=MAX_POINTS, method='lttb'):
+    """
+    Restreint (x, y) à la plage visible puis sous-échantillonne
+
+    Returns:
+        tuple (x, y) prêts à être envoyés au navigateur
+    """
+    x = pd.Series(x).reset_index(drop=True)
+    y = pd.Series(y).reset_index(drop=True)
+
+    if x_range is not None and len(x):
+        mask = _range_mask(x, x_range)
+        x, y = x[mask].reset_index(drop=True), y[mask].reset_index(drop=True)
+
+    if len(x) > max_points:
+        if method == 'minmax':
+            idx = minmax_indices(y, max_points)
+        else:
+            idx = lttb_indices(x, y, max_points)
+        x, y = x.iloc[idx], y.iloc[idx]
+
+    return x, y
+
+
+def time_series(x, y, x_range=None, max_points=MAX_POINTS,
+                webgl_threshold=WEBGL_THRESHOLD, method='lttb', **trace_kwargs):
+    """
+    Trace de série temporelle sous-échantillonnée sur la plage visible
+
+    Utilise go.Scattergl lorsque la plage visible dépasse webgl_threshold
+    points (sauf propriétés SVG uniquement comme stackgroup), go.Scatter sinon.
+
+    Usage:
+        x_range = visible_range(relayout_data)
+        fig.add_trace(time_series(df['date'], df['unique_users'], x_range, name='Users'))
+    """
+    n_visible = len(x)
+    if x_range is not None and n_visible:
+        n_visible = int(_range_mask(x, x_range).sum())
+
+    x, y = downsample(x, y, x_range=x_range, max_points=max_points, method=method)
+
+    use_webgl = n_visible > webgl_threshold and not any(k in trace_kwargs for k in SVG_ONLY_PROPS)
+    trace_cls = go.Scattergl if use_webgl else go.Scatter
+    return trace_cls(x=x, y=y, **trace_kwargs)
+
+
+def keep_zoom(fig, x_range, revision='zoom'):
+    """Conserve le zoom de l'utilisateur lorsque la figure est re-générée"""
+    fig.update_layout(uirevision=revision)
+    if x_range is not None:
+        fig.update_xaxes(range=list(x_range))
+    return fig
+
+
+def patch_series(patched, index, x, y, x_range=None, max_points=MAX_POINTS,
+                 webgl_threshold=WEBGL_THRESHOLD, method='lttb', webgl=True):
+    """
+    Remplace les données de la trace `index` dans un Patch Dash
+
+    Seuls x, y et le type de trace sont renvoyés au navigateur : le layout
+    et le template déjà affichés ne sont pas re-sérialisés.
+    Passer webgl=False pour les traces SVG uniquement (stackgroup).
+    """
+    n_visible = len(x)
+    if x_range is not None and n_visible:
+        n_visible = int(_range_mask(x, x_range).sum())
+
+    x, y = downsample(x, y, x_range=x_range, max_points=max_points, method=method)
+
+    patched['data'][index]['x'] = x
+    patched['data'][index]['y'] = y
+    if webgl:
+        patched['data'][index]['type'] = 'scattergl' if n_visible > webgl_threshold else 'scatter'
+    return patched
+
+
+def patch_zoom(patched, x_range, revision='zoom'):
+    """Équivalent de keep_zoom pour un Patch Dash"""
+    patched['layout']['uirevision'] = revision
+    if x_range is not None:
+        patched['layout']['xaxis']['range'] = list(x_range)
+    else:
+        patched['layout']['xaxis']['autorange'] = True
+    return patched
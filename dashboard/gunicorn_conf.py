@@ -0,0 +1,151 @@
+"""
+Configuration gunicorn du dashboard (production)
+L'application et les DataFrames de data/clean sont chargés une fois dans le
+maître (preload_app) puis partagés en copy-on-write par les workers forkés.
+Le nombre de workers découle des limites CPU / mémoire du conteneur
+(k8s/dashboard-deployment.yaml, exposées par la Downward API), chaque
+valeur restant modifiable par variable d'environnement.
+
+Usage:
+    gunicorn -c gunicorn_conf.py wsgi:application
+"""
+
+import math
+import os
+import sys
+
+# Mémoire d'un worker en plus des pages partagées avec le maître (Mo)
+WORKER_MEMORY_MB = int(os.getenv('WORKER_MEMORY_MB', '150'))
+# Mémoire du maître après chargement de l'application et des données (Mo)
+PRELOAD_MEMORY_MB = int(os.getenv('PRELOAD_MEMORY_MB', '300'))
+
+WORKER_CLASSES = ('gthread', 'gevent', 'sync')
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def cpu_limit():
+    """
+    Nombre de CPU alloués : CPU_LIMIT_MILLICORES (Downward API limits.cpu),
+    sinon quota cgroup (v2 puis v1), sinon nombre de CPU de l'hôte
+    """
+    millicores = os.getenv('CPU_LIMIT_MILLICORES')
+    if millicores:
+        return int(millicores) / 1000
+
+    cpu_max = _read('/sys/fs/cgroup/cpu.max')  # cgroup v2 : "quota période" ou "max période"
+    if cpu_max and not cpu_max.startswith('max'):
+        quota, period = cpu_max.split()
+        return int(quota) / int(period)
+
+    quota = _read('/sys/fs/cgroup/cpu/cpu.cfs_quota_us')  # cgroup v1
+    period = _read('/sys/fs/cgroup/cpu/cpu.cfs_period_us')
+    if quota and period and int(quota) > 0:
+        return int(quota) / int(period)
+
+    return float(os.cpu_count() or 1)
+
+
+def memory_limit_mb():
+    """Mémoire allouée (Mo) : MEMORY_LIMIT_MB (Downward API limits.memory), sinon cgroup, sinon None"""
+    limit = os.getenv('MEMORY_LIMIT_MB')
+    if limit:
+        return int(limit)
+
+    for path in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        value = _read(path)
+        # cgroup v1 sans limite : valeur proche de 2^63
+        if value and value != 'max' and int(value) < 2 ** 60:
+            return int(value) // 1024 ** 2
+    return None
+
+
+def worker_count(cpus, memory_mb=None):
+    """
+    2 × CPU + 1 workers, plafonné par la mémoire disponible après le
+    chargement partagé (au moins un worker)
+    """
+    workers = 2 * math.ceil(cpus) + 1
+    if memory_mb is not None:
+        workers = min(workers, (memory_mb - PRELOAD_MEMORY_MB) // WORKER_MEMORY_MB)
+    return max(1, workers)
+
+
+def resolve_worker_class(name):
+    """Classe de workers demandée ; gthread si gevent n'est pas installé"""
+    name = name.lower()
+    if name not in WORKER_CLASSES:
+        raise ValueError(f"GUNICORN_WORKER_CLASS doit être parmi {', '.join(WORKER_CLASSES)}: {name}")
+    if name == 'gevent':
+        try:
+            import gevent  # noqa: F401
+        except ImportError:
+            print("⚠️ gevent non installé, workers gthread utilisés", file=sys.stderr)
+            return 'gthread'
+    return name
+
+
+CPUS = cpu_limit()
+MEMORY_MB = memory_limit_mb()
+
+# Serveur
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8050')
+workers = int(os.getenv('GUNICORN_WORKERS', '0')) or worker_count(CPUS, MEMORY_MB)
+worker_class = resolve_worker_class(os.getenv('GUNICORN_WORKER_CLASS', 'gthread'))
+# gthread : threads par worker (callbacks en parallèle pendant les I/O et le code numpy sans GIL)
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+# gevent : connexions simultanées par worker
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', '100'))
+
+# Chargement unique avant fork (pages partagées en copy-on-write)
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() in ('true', '1', 'yes')
+# Exporté par le maître avant le chargement (voir callback_profiling.PRELOAD)
+raw_env = [f"DASHBOARD_PRELOAD={str(preload_app).lower()}"]
+
+# Recyclage des workers (fuites mémoire, fragmentation du tas pandas)
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '200'))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+# Fichiers temporaires de heartbeat en mémoire (pas d'I/O disque bloquante)
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+def when_ready(server):
+    server.log.info(
+        f"Dashboard: {workers} workers {worker_class}"
+        f"{f' x {threads} threads' if worker_class == 'gthread' else ''}"
+        f" (CPU: {CPUS:g}, mémoire: {f'{MEMORY_MB} Mo' if MEMORY_MB else 'non limitée'}, preload: {preload_app})"
+    )
+
+
+def post_fork(server, worker):
+    """Ressources non partageables entre processus, recréées dans chaque worker"""
+    if not preload_app:
+        return
+
+    import callback_profiling
+    import ddos_protection
+    import log_pipeline
+
+    log_pipeline.reinit_after_fork()
+    ddos_protection.rate_limiter.backend.reinit_after_fork()
+    callback_profiling.reinit_after_fork()
+
+    # Connexions PostgreSQL éventuellement ouvertes par le maître
+    db = sys.modules.get('db')
+    if db is not None:
+        db.engine.dispose(close=False)
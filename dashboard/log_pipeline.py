@@ -0,0 +1,322 @@
+"""
+Pipeline de journalisation asynchrone
+Les logs applicatifs et les durées des requêtes SQL et des callbacks sont
+placés dans une file bornée en mémoire, puis écrits par lots par un thread
+d'arrière-plan dans les tables dashboard_logs et query_performance. Le thread
+de la requête n'attend jamais : file pleine = entrée abandonnée (et comptée).
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime
+
+from flask import has_request_context, request, g
+
+logger = logging.getLogger(__name__)
+
+# Valeurs par défaut, modifiables par variables d'environnement
+QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+BATCH_SIZE = int(os.getenv('LOG_BATCH_SIZE', '500'))
+FLUSH_INTERVAL = float(os.getenv('LOG_FLUSH_INTERVAL', '2.0'))
+
+# Part des logs INFO/DEBUG écrits dans dashboard_logs (WARNING et au-delà toujours gardés)
+LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', '0.1'))
+
+# Part des durées requêtes / callbacks gardées (erreurs et lenteurs toujours gardées)
+TIMING_SAMPLE_RATE = float(os.getenv('TIMING_SAMPLE_RATE', '1.0'))
+SLOW_THRESHOLD_MS = int(os.getenv('SLOW_THRESHOLD_MS', '500'))
+
+INSERT_STATEMENTS = {
+    'dashboard_logs': """
+        INSERT INTO dashboard_logs
+            (log_level, message, module, function_name, user_id, ip_address, created_at)
+        VALUES
+            (:log_level, :message, :module, :function_name, :user_id, :ip_address, :created_at)
+    """,
+    'query_performance': """
+        INSERT INTO query_performance
+            (query_name, execution_time_ms, rows_returned, error_message, created_at)
+        VALUES
+            (:query_name, :execution_time_ms, :rows_returned, :error_message, :created_at)
+    """,
+}
+
+
+class AsyncLogPipeline:
+    """
+    File bornée + écriture par lots en arrière-plan
+
+    Args:
+        sink: callable(table, rows) écrivant une liste de lignes (dict) dans une table
+        queue_size: Nombre maximal de lignes en attente, au-delà elles sont abandonnées
+        batch_size: Nombre maximal de lignes par écriture
+        flush_interval: Délai maximal (secondes) avant écriture des lignes en attente
+    """
+
+    def __init__(self, sink, queue_size=QUEUE_SIZE, batch_size=BATCH_SIZE,
+                 flush_interval=FLUSH_INTERVAL):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='log-pipeline', daemon=True)
+        self._thread.start()
+
+    def submit(self, table, row):
+        """Ajoute une ligne sans bloquer ; False si elle a été abandonnée"""
+        try:
+            self.queue.put_nowait((table, row))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _drain(self, first):
+        """Récupère jusqu'à batch_size lignes en attente, groupées par table"""
+        batches = {}
+        item = first
+        count = 0
+        while item is not None:
+            table, row = item
+            batches.setdefault(table, []).append(row)
+            count += 1
+            if count >= self.batch_size:
+                break
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                item = None
+        return batches
+
+    def _write(self, batches):
+        for table, rows in batches.items():
+            try:
+                self.sink(table, rows)
+                self.written += len(rows)
+            except Exception as e:
+                self.failed += len(rows)
+                # Jamais renvoyé dans le pipeline (voir DatabaseLogHandler)
+                logger.error(f"❌ Écriture des logs dans {table} échouée: {e}")
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                first = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            self._write(self._drain(first))
+
+    def flush(self):
+        """Écrit tout ce qui est en attente (appelé à l'arrêt)"""
+        while True:
+            try:
+                first = self.queue.get_nowait()
+            except queue.Empty:
+                return
+            self._write(self._drain(first))
+
+    def close(self, timeout=5.0):
+        self._stop.set()
+        self._thread.join(timeout)
+        self.flush()
+
+    def stats(self):
+        return {
+            'pending': self.queue.qsize(),
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed,
+        }
+
+
+# Pipeline utilisé par record_query / record_callback (None tant que non configuré)
+pipeline = None
+
+# Sortie console asynchrone (relancée dans chaque worker forké)
+_listener = None
+_queue_handler = None
+
+
+def _sampled(rate):
+    return rate >= 1.0 or random.random() < rate
+
+
+def _record_timing(name, elapsed_ms, rows_returned=None, error=None):
+    if pipeline is None:
+        return
+    if error is None and elapsed_ms < SLOW_THRESHOLD_MS and not _sampled(TIMING_SAMPLE_RATE):
+        return
+    pipeline.submit('query_performance', {
+        'query_name': name[:255],
+        'execution_time_ms': int(round(elapsed_ms)),
+        'rows_returned': rows_returned,
+        'error_message': error,
+        'created_at': datetime.now(),
+    })
+
+
+def record_query(name, elapsed_ms, rows_returned=None, error=None):
+    """Enregistre la durée d'une requête SQL (sans effet si le pipeline est inactif)"""
+    _record_timing(name, elapsed_ms, rows_returned, error)
+
+
+def record_callback(output, elapsed_ms, error=None):
+    """Enregistre la durée d'un callback Dash, stockée sous le nom 'callback:<output>'"""
+    _record_timing(f"callback:{output}", elapsed_ms, None, error)
+
+
+class DatabaseLogHandler(logging.Handler):
+    """Handler logging plaçant les enregistrements en file pour dashboard_logs (échantillonnés sous WARNING)"""
+
+    def __init__(self, level=logging.INFO, sample_rate=LOG_SAMPLE_RATE):
+        super().__init__(level)
+        self.sample_rate = sample_rate
+
+    def emit(self, record):
+        if pipeline is None or record.name == __name__:
+            return
+        if record.levelno < logging.WARNING and not _sampled(self.sample_rate):
+            return
+
+        user_id, ip_address = None, None
+        if has_request_context():
+            ip_address = request.remote_addr
+            user = getattr(g, '_login_user', None)
+            if user is not None and getattr(user, 'is_authenticated', False):
+                user_id = str(user.id)
+
+        try:
+            message = record.getMessage()
+        except Exception:
+            message = str(record.msg)
+
+        pipeline.submit('dashboard_logs', {
+            'log_level': record.levelname,
+            'message': message,
+            'module': (record.module or '')[:100],
+            'function_name': (record.funcName or '')[:100],
+            'user_id': user_id,
+            'ip_address': ip_address,
+            'created_at': datetime.fromtimestamp(record.created),
+        })
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler qui abandonne les enregistrements au lieu de lever une erreur si la file est pleine"""
+
+    dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DroppingQueueHandler.dropped += 1
+
+
+def database_sink(table, rows):
+    """Insertion multi-lignes dans dashboard_logs / query_performance"""
+    # Import différé : le moteur nécessite le driver PostgreSQL
+    from sqlalchemy import text
+    from db import engine
+
+    with engine.begin() as conn:
+        conn.execute(text(INSERT_STATEMENTS[table]), rows)
+
+
+def setup_async_logging(app, sink=None, root_logger=None):
+    """
+    Configure le pipeline de journalisation asynchrone
+
+    - Les handlers console du logger racine passent derrière une file bornée
+      (thread QueueListener) : un appel de log ne bloque jamais sur stderr
+    - Logs et durées requêtes/callbacks sont écrits par lots dans PostgreSQL
+      si DASHBOARD_DB_LOGGING est activé (ou si un sink est fourni)
+    - La durée de chaque callback est mesurée autour de /_dash-update-component
+
+    Args:
+        app: Instance Flask/Dash server
+        sink: callable(table, rows), database_sink par défaut si activé
+        root_logger: Logger à configurer (logger racine par défaut)
+    """
+    global pipeline, _listener, _queue_handler
+
+    root_logger = root_logger or logging.getLogger()
+
+    # Sortie console via une file bornée
+    console_handlers = list(root_logger.handlers)
+    log_queue = queue.Queue(maxsize=QUEUE_SIZE)
+    listener = logging.handlers.QueueListener(log_queue, *console_handlers, respect_handler_level=True)
+    for handler in console_handlers:
+        root_logger.removeHandler(handler)
+    _queue_handler = DroppingQueueHandler(log_queue)
+    root_logger.addHandler(_queue_handler)
+    listener.start()
+    atexit.register(listener.stop)
+    _listener = listener
+
+    db_logging = os.getenv('DASHBOARD_DB_LOGGING', 'false').lower() in ('true', '1', 'yes')
+    if sink is None and db_logging:
+        sink = database_sink
+
+    if sink is not None:
+        pipeline = AsyncLogPipeline(sink)
+        root_logger.addHandler(DatabaseLogHandler())
+        atexit.register(pipeline.close)
+
+    @app.before_request
+    def start_callback_timer():
+        """Démarre le chronomètre des callbacks Dash"""
+        if request.path.endswith('/_dash-update-component'):
+            g.callback_start = time.perf_counter()
+
+    @app.after_request
+    def record_callback_timing(response):
+        """Place la durée du callback en file"""
+        start = g.pop('callback_start', None)
+        if start is not None and pipeline is not None:
+            body = request.get_json(silent=True) or {}
+            error = None if response.status_code < 400 else f"HTTP {response.status_code}"
+            record_callback(body.get('output', 'unknown'), (time.perf_counter() - start) * 1000, error)
+        return response
+
+    print("✅ Logging asynchrone activé")
+    print(f"   - File bornée: {QUEUE_SIZE} entrées (au-delà: abandon)")
+    if pipeline is not None:
+        print(f"   - Écriture par lots de {BATCH_SIZE} toutes les {FLUSH_INTERVAL}s "
+              f"(dashboard_logs, query_performance)")
+        print(f"   - Échantillonnage: logs INFO {LOG_SAMPLE_RATE:.0%}, timings {TIMING_SAMPLE_RATE:.0%}")
+
+
+def reinit_after_fork():
+    """
+    Relance les threads du pipeline dans un worker forké (gunicorn --preload)
+
+    Les threads du processus maître n'existent pas dans les workers et leurs
+    files ont pu être copiées verrouillées : chaque worker repart de files
+    neuves avec les mêmes handlers et le même sink.
+    """
+    global pipeline, _listener
+
+    if _listener is not None:
+        log_queue = queue.Queue(maxsize=QUEUE_SIZE)
+        _queue_handler.queue = log_queue
+        _listener = logging.handlers.QueueListener(
+            log_queue, *_listener.handlers, respect_handler_level=True
+        )
+        _listener.start()
+        atexit.register(_listener.stop)
+
+    if pipeline is not None:
+        pipeline = AsyncLogPipeline(pipeline.sink, pipeline.queue.maxsize,
+                                    pipeline.batch_size, pipeline.flush_interval)
+        atexit.register(pipeline.close)
@@ -12,6 +12,8 @@ import numpy as np
 from scipy import stats
 import os
 
+from figures import TEMPLATE
+
 # Register page
 dash.register_page(__name__, path='/ab-testing/calculator', name='Calculateur Simulation')
 
@@ -422,7 +424,7 @@ def run_simulation(n_clicks, baseline_rate, improvement, daily_visitors, duratio
         xaxis_title="Jour",
         yaxis_title="Taux de Conversion (%)",
         hovermode='x unified',
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400
     )
     
@@ -466,7 +468,7 @@ def run_simulation(n_clicks, baseline_rate, improvement, daily_visitors, duratio
         title=f"Intervalles de Confiance ({int(confidence*100)}%)",
         xaxis_title="Jour",
         yaxis_title="Taux de Conversion (%)",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400
     )
     
@@ -484,7 +486,7 @@ def run_simulation(n_clicks, baseline_rate, improvement, daily_visitors, duratio
         title="Puissance Statistique au Fil du Temps",
         xaxis_title="Jour",
         yaxis_title="Puissance (%)",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400
     )
     
@@ -512,7 +514,7 @@ def run_simulation(n_clicks, baseline_rate, improvement, daily_visitors, duratio
         title="Distribution Probabiliste des Taux",
         xaxis_title="Taux de Conversion (%)",
         yaxis_title="Densité de Probabilité",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400
     )
     
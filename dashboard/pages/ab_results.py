@@ -12,6 +12,8 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 
+from figures import TEMPLATE
+
 # Register this page
 dash.register_page(__name__, path='/ab-testing/results', name='Résultats A/B Tests')
 
@@ -284,7 +286,8 @@ def update_scenarios_ranking(_):
         return go.Figure()
     
     # Sort by ROI
-    df_sorted = df_summary.sort_values('roi_30d_pct', ascending=True)
+    df_sorted = df_summary.sort_values('roi_period_pct', ascending=True)
+    period_days = int(df_summary['period_days'].iloc[0])
     
     # Color by priority
     colors = {'HIGH': '#e74c3c', 'MEDIUM': '#f39c12', 'LOW': '#3498db'}
@@ -295,25 +298,25 @@ def update_scenarios_ranking(_):
     # ROI bars
     fig.add_trace(go.Bar(
         y=df_sorted['scenario_name'],
-        x=df_sorted['roi_30d_pct'],
+        x=df_sorted['roi_period_pct'],
         orientation='h',
         marker=dict(
             color=bar_colors,
             line=dict(color='rgba(0,0,0,0.3)', width=1)
         ),
-        text=[f"{val:.0f}%" for val in df_sorted['roi_30d_pct']],
+        text=[f"{val:.0f}%" for val in df_sorted['roi_period_pct']],
         textposition='outside',
-        name='ROI 30j',
+        name=f'ROI {period_days}j',
         hovertemplate='<b>%{y}</b><br>' +
                       'ROI: %{x:.1f}%<br>' +
                       '<extra></extra>'
     ))
     
     fig.update_layout(
-        title="ROI 30 Jours par Scénario",
+        title=f"ROI {period_days} Jours par Scénario",
         xaxis_title="ROI (%)",
         yaxis_title="",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=500,
         showlegend=False
     )
@@ -356,7 +359,7 @@ def update_statistical_power(_):
         title="Puissance Statistique (10,000 simulations)",
         xaxis_title="Scénario",
         yaxis_title="Statistical Power (%)",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400,
         xaxis=dict(tickangle=-45)
     )
@@ -400,7 +403,7 @@ def update_pvalue_distribution(_):
         title="Significance Testing (Chi-Square)",
         xaxis_title="Scénario",
         yaxis_title="-log10(p-value)",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400,
         xaxis=dict(tickangle=-45)
     )
@@ -443,7 +446,7 @@ def update_control_vs_variant(_):
         title="Control vs Variant: Taux de Conversion View→Cart",
         xaxis_title="Scénario",
         yaxis_title="Taux de Conversion (%)",
-        template='plotly_dark',
+        template=TEMPLATE,
         barmode='group',
         height=450,
         xaxis=dict(tickangle=-45),
@@ -502,7 +505,7 @@ def update_daily_revenue_lift(_):
         title="Évolution du Revenue Lift Quotidien (Tous Scénarios)",
         xaxis_title="Jour",
         yaxis_title="Revenue Lift (€)",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400,
         hovermode='x unified'
     )
@@ -540,7 +543,7 @@ def update_significance_timeline(_):
         title="Tests Significatifs par Jour",
         xaxis_title="Jour",
         yaxis_title="Nombre de Tests",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400,
         showlegend=False
     )
@@ -584,7 +587,7 @@ def update_roi_analysis(_):
         title="Matrice ROI Annuel vs Coût d'Implémentation",
         xaxis_title="Coût d'Implémentation (€)",
         yaxis_title="ROI Annuel (%)",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=450
     )
     
@@ -606,6 +609,7 @@ def update_results_table(_):
         on='scenario_id',
         how='left'
     )
+    period_days = int(df_summary['period_days'].iloc[0])
     
     # Create table
     table_header = [
@@ -617,8 +621,8 @@ def update_results_table(_):
             html.Th("Lift %"),
             html.Th("P-Value"),
             html.Th("Power"),
-            html.Th("Revenue 30j"),
-            html.Th("ROI 30j"),
+            html.Th(f"Revenue {period_days}j"),
+            html.Th(f"ROI {period_days}j"),
         ]))
     ]
     
@@ -636,8 +640,8 @@ def update_results_table(_):
             html.Td(html.Span(f"+{row['avg_lift_view_to_cart_pct']:.1f}%", className="text-success")),
             html.Td(f"{row['p_value_chi2']:.2e}"),
             html.Td(f"{row['statistical_power']*100:.1f}%"),
-            html.Td(f"€{row['total_revenue_lift_30d']:,.0f}"),
-            html.Td(html.Strong(f"{row['roi_30d_pct']:.0f}%", className="text-warning")),
+            html.Td(f"€{row['total_revenue_lift_period']:,.0f}"),
+            html.Td(html.Strong(f"{row['roi_period_pct']:.0f}%", className="text-warning")),
         ]) for idx, row in df_merged.iterrows()
     ])]
     
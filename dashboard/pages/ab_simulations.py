@@ -4,7 +4,8 @@ Simulation et prédiction des tests A/B
 """
 
 import dash
-from dash import html, dcc, callback, Input, Output
+from dash import html, dcc, callback, Input, Output, Patch
+from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
 import plotly.express as px
@@ -12,6 +13,8 @@ import pandas as pd
 import numpy as np
 import os
 
+from figures import time_series, visible_range, patch_series, patch_zoom, TEMPLATE
+
 # Register page
 dash.register_page(__name__, path='/ab-testing/simulations', name='Simulations A/B')
 
@@ -31,6 +34,325 @@ except Exception as e:
     df_simulation = None
     df_results = None
 
+NO_SCENARIO_DATA = dict(
+    text="Aucune donnée pour ce scénario",
+    xref="paper", yref="paper",
+    x=0.5, y=0.5, showarrow=False
+)
+
+LIFT_METRICS = ['View → Cart', 'Cart → Purchase', 'View → Purchase']
+COMPARE_CATEGORIES = ['Views', 'Carts', 'Purchases', 'Revenue']
+
+
+def get_scenario_data(scenario_id):
+    """Lignes de simulation d'un scénario"""
+    return df_simulation[df_simulation['scenario_id'] == scenario_id]
+
+
+def get_last_day(scenario_data):
+    """Dernier jour simulé d'un scénario (None si aucune donnée)"""
+    if len(scenario_data) == 0:
+        return None
+    return scenario_data[scenario_data['day_number'] == scenario_data['day_number'].max()].iloc[0]
+
+
+def lift_values(scenario_data):
+    """Lift final par métrique"""
+    last_day = get_last_day(scenario_data)
+    if last_day is None:
+        return []
+    return [
+        last_day['lift_view_to_cart_pct'],
+        last_day['lift_cart_to_purchase_pct'],
+        last_day['lift_view_to_purchase_pct']
+    ]
+
+
+def control_variant_values(scenario_data):
+    """Valeurs finales Control / Variant (revenue ramené à l'échelle /100)"""
+    last_day = get_last_day(scenario_data)
+    if last_day is None:
+        return [], []
+    control_values = [
+        last_day['control_views'],
+        last_day['control_carts'],
+        last_day['control_purchases'],
+        last_day['control_revenue'] / 100  # Scale down for visibility
+    ]
+    variant_values = [
+        last_day['variant_views'],
+        last_day['variant_carts'],
+        last_day['variant_purchases'],
+        last_day['variant_revenue'] / 100
+    ]
+    return control_values, variant_values
+
+
+def unavailable_figure():
+    """Figure affichée lorsque les simulations ne sont pas chargées"""
+    return go.Figure().add_annotation(
+        text="Données non disponibles",
+        xref="paper", yref="paper",
+        x=0.5, y=0.5, showarrow=False
+    )
+
+
+def conversion_evolution_figure(scenario_data):
+    """Conversion evolution over 30 days"""
+    fig = go.Figure()
+    
+    fig.add_trace(time_series(
+        scenario_data['day_number'],
+        scenario_data['control_view_to_purchase_pct'],
+        mode='lines+markers',
+        name='Control',
+        line=dict(color='#e74c3c', width=2),
+        marker=dict(size=6)
+    ))
+    
+    fig.add_trace(time_series(
+        scenario_data['day_number'],
+        scenario_data['variant_view_to_purchase_pct'],
+        mode='lines+markers',
+        name='Variant',
+        line=dict(color='#2ecc71', width=2),
+        marker=dict(size=6)
+    ))
+    
+    fig.update_layout(
+        title="Taux de Conversion View → Purchase",
+        xaxis_title="Jour",
+        yaxis_title="Taux de Conversion (%)",
+        hovermode='x unified',
+        template=TEMPLATE,
+        height=400
+    )
+    
+    return fig
+
+
+def revenue_evolution_figure(scenario_data):
+    """Revenue evolution over time"""
+    fig = go.Figure()
+    
+    fig.add_trace(time_series(
+        scenario_data['day_number'],
+        scenario_data['control_revenue'],
+        mode='lines',
+        name='Control',
+        fill='tozeroy',
+        line=dict(color='#e74c3c', width=2),
+        fillcolor='rgba(231, 76, 60, 0.1)'
+    ))
+    
+    fig.add_trace(time_series(
+        scenario_data['day_number'],
+        scenario_data['variant_revenue'],
+        mode='lines',
+        name='Variant',
+        fill='tozeroy',
+        line=dict(color='#2ecc71', width=2),
+        fillcolor='rgba(46, 204, 113, 0.1)'
+    ))
+    
+    fig.update_layout(
+        title="Revenue Control vs Variant",
+        xaxis_title="Jour",
+        yaxis_title="Revenue ($)",
+        hovermode='x unified',
+        template=TEMPLATE,
+        height=400
+    )
+    
+    return fig
+
+
+def lift_metrics_figure(scenario_data):
+    """Lift by metric"""
+    values = lift_values(scenario_data)
+    colors = ['#3498db', '#f39c12', '#2ecc71']
+    
+    fig = go.Figure()
+    
+    fig.add_trace(go.Bar(
+        x=LIFT_METRICS,
+        y=values,
+        marker_color=colors,
+        text=[f"{v:.2f}%" for v in values],
+        textposition='outside'
+    ))
+    
+    fig.update_layout(
+        title="Lift par Métrique (Jour 30)",
+        yaxis_title="Lift (%)",
+        template=TEMPLATE,
+        height=400,
+        showlegend=False,
+        annotations=[] if values else [NO_SCENARIO_DATA]
+    )
+    
+    return fig
+
+
+def cumulative_revenue_figure(scenario_data):
+    """Cumulative revenue lift"""
+    fig = go.Figure()
+    
+    fig.add_trace(go.Scatter(
+        x=scenario_data['day_number'],
+        y=scenario_data['cumulative_revenue_lift'],
+        mode='lines',
+        name='Revenue Lift Cumulatif',
+        fill='tozeroy',
+        line=dict(color='#667eea', width=3),
+        fillcolor='rgba(102, 126, 234, 0.2)'
+    ))
+    
+    fig.update_layout(
+        title="Revenue Lift Cumulatif",
+        xaxis_title="Jour",
+        yaxis_title="Revenue Lift Cumulatif ($)",
+        template=TEMPLATE,
+        height=400
+    )
+    
+    return fig
+
+
+def significance_evolution_figure(scenario_data):
+    """Statistical significance evolution"""
+    fig = go.Figure()
+    
+    # P-value evolution
+    fig.add_trace(go.Scatter(
+        x=scenario_data['day_number'],
+        y=scenario_data['p_value'],
+        mode='lines+markers',
+        name='P-value',
+        line=dict(color='#e74c3c', width=2),
+        marker=dict(size=6)
+    ))
+    
+    # Significance threshold
+    fig.add_hline(y=0.05, line_dash="dash", line_color="yellow", 
+                  annotation_text="Seuil α = 0.05")
+    
+    fig.update_layout(
+        title="Évolution de la P-Value",
+        xaxis_title="Jour",
+        yaxis_title="P-Value",
+        template=TEMPLATE,
+        height=400
+    )
+    
+    return fig
+
+
+def zscore_evolution_figure(scenario_data):
+    """Z-score evolution"""
+    fig = go.Figure()
+    
+    fig.add_trace(go.Scatter(
+        x=scenario_data['day_number'],
+        y=scenario_data['z_score'],
+        mode='lines+markers',
+        name='Z-Score',
+        line=dict(color='#3498db', width=2),
+        marker=dict(size=6)
+    ))
+    
+    # Critical value for 95% confidence
+    fig.add_hline(y=1.96, line_dash="dash", line_color="green", 
+                  annotation_text="Z = 1.96 (95% confiance)")
+    fig.add_hline(y=-1.96, line_dash="dash", line_color="green")
+    
+    fig.update_layout(
+        title="Évolution du Z-Score",
+        xaxis_title="Jour",
+        yaxis_title="Z-Score",
+        template=TEMPLATE,
+        height=400
+    )
+    
+    return fig
+
+
+def sample_size_growth_figure(scenario_data):
+    """Sample size growth"""
+    fig = go.Figure()
+    
+    fig.add_trace(go.Scatter(
+        x=scenario_data['day_number'],
+        y=scenario_data['sample_size_control'],
+        mode='lines',
+        name='Control',
+        stackgroup='one',
+        line=dict(color='#e74c3c', width=0),
+        fillcolor='rgba(231, 76, 60, 0.5)'
+    ))
+    
+    fig.add_trace(go.Scatter(
+        x=scenario_data['day_number'],
+        y=scenario_data['sample_size_variant'],
+        mode='lines',
+        name='Variant',
+        stackgroup='one',
+        line=dict(color='#2ecc71', width=0),
+        fillcolor='rgba(46, 204, 113, 0.5)'
+    ))
+    
+    fig.update_layout(
+        title="Croissance de la Taille d'Échantillon",
+        xaxis_title="Jour",
+        yaxis_title="Nombre d'Utilisateurs",
+        hovermode='x unified',
+        template=TEMPLATE,
+        height=400
+    )
+    
+    return fig
+
+
+def control_variant_compare_figure(scenario_data):
+    """Control vs variant comparison"""
+    control_values, variant_values = control_variant_values(scenario_data)
+    
+    fig = go.Figure()
+    
+    fig.add_trace(go.Bar(
+        name='Control',
+        x=COMPARE_CATEGORIES,
+        y=control_values,
+        marker_color='#e74c3c'
+    ))
+    
+    fig.add_trace(go.Bar(
+        name='Variant',
+        x=COMPARE_CATEGORIES,
+        y=variant_values,
+        marker_color='#2ecc71'
+    ))
+    
+    fig.update_layout(
+        title="Control vs Variant (Jour 30)",
+        yaxis_title="Valeur",
+        barmode='group',
+        template=TEMPLATE,
+        height=400,
+        annotations=[] if control_values else [NO_SCENARIO_DATA]
+    )
+    
+    return fig
+
+
+def initial_figure(build_figure):
+    """Figure complète du premier scénario, envoyée une seule fois avec le layout"""
+    if df_simulation is None:
+        return unavailable_figure()
+    scenario_id = df_results.iloc[0]['scenario_id'] if df_results is not None and len(df_results) else None
+    return build_figure(get_scenario_data(scenario_id))
+
+
 # Layout
 layout = dbc.Container([
     # Page Header
@@ -130,7 +452,8 @@ layout = dbc.Container([
                     "Évolution des Conversions (30 jours)"
                 ]),
                 dbc.CardBody([
-                    dcc.Graph(id='sim-conversion-evolution', config={'displayModeBar': False})
+                    dcc.Graph(id='sim-conversion-evolution', figure=initial_figure(conversion_evolution_figure),
+                              config={'displayModeBar': False})
                 ])
             ], className="shadow-sm border-0 mb-4")
         ], width=6),
@@ -142,7 +465,8 @@ layout = dbc.Container([
                     "Évolution du Revenue (30 jours)"
                 ]),
                 dbc.CardBody([
-                    dcc.Graph(id='sim-revenue-evolution', config={'displayModeBar': False})
+                    dcc.Graph(id='sim-revenue-evolution', figure=initial_figure(revenue_evolution_figure),
+                              config={'displayModeBar': False})
                 ])
             ], className="shadow-sm border-0 mb-4")
         ], width=6),
@@ -157,7 +481,8 @@ layout = dbc.Container([
                     "Lift par Métrique"
                 ]),
                 dbc.CardBody([
-                    dcc.Graph(id='sim-lift-metrics', config={'displayModeBar': False})
+                    dcc.Graph(id='sim-lift-metrics', figure=initial_figure(lift_metrics_figure),
+                              config={'displayModeBar': False})
                 ])
             ], className="shadow-sm border-0 mb-4")
         ], width=6),
@@ -169,7 +494,8 @@ layout = dbc.Container([
                     "Revenue Lift Cumulatif"
                 ]),
                 dbc.CardBody([
-                    dcc.Graph(id='sim-cumulative-revenue', config={'displayModeBar': False})
+                    dcc.Graph(id='sim-cumulative-revenue', figure=initial_figure(cumulative_revenue_figure),
+                              config={'displayModeBar': False})
                 ])
             ], className="shadow-sm border-0 mb-4")
         ], width=6),
@@ -184,7 +510,8 @@ layout = dbc.Container([
                     "Évolution de la Significativité Statistique"
                 ]),
                 dbc.CardBody([
-                    dcc.Graph(id='sim-significance-evolution', config={'displayModeBar': False})
+                    dcc.Graph(id='sim-significance-evolution', figure=initial_figure(significance_evolution_figure),
+                              config={'displayModeBar': False})
                 ])
             ], className="shadow-sm border-0 mb-4")
         ], width=6),
@@ -196,7 +523,8 @@ layout = dbc.Container([
                     "Évolution du Z-Score"
                 ]),
                 dbc.CardBody([
-                    dcc.Graph(id='sim-zscore-evolution', config={'displayModeBar': False})
+                    dcc.Graph(id='sim-zscore-evolution', figure=initial_figure(zscore_evolution_figure),
+                              config={'displayModeBar': False})
                 ])
             ], className="shadow-sm border-0 mb-4")
         ], width=6),
@@ -211,7 +539,8 @@ layout = dbc.Container([
                     "Croissance de la Taille d'Échantillon"
                 ]),
                 dbc.CardBody([
-                    dcc.Graph(id='sim-sample-size-growth', config={'displayModeBar': False})
+                    dcc.Graph(id='sim-sample-size-growth', figure=initial_figure(sample_size_growth_figure),
+                              config={'displayModeBar': False})
                 ])
             ], className="shadow-sm border-0 mb-4")
         ], width=6),
@@ -223,7 +552,8 @@ layout = dbc.Container([
                     "Comparaison Control vs Variant"
                 ]),
                 dbc.CardBody([
-                    dcc.Graph(id='sim-control-variant-compare', config={'displayModeBar': False})
+                    dcc.Graph(id='sim-control-variant-compare', figure=initial_figure(control_variant_compare_figure),
+                              config={'displayModeBar': False})
                 ])
             ], className="shadow-sm border-0 mb-4")
         ], width=6),
@@ -316,100 +646,48 @@ def update_kpis(scenario_id):
         return "Erreur", "Erreur", "Erreur", "Erreur"
 
 
+# Les graphiques par scénario sont construits une fois dans le layout puis mis à
+# jour par Patch : un changement de scénario ne renvoie que les séries de données
 @callback(
     Output('sim-conversion-evolution', 'figure'),
-    Input('scenario-selector', 'value')
+    [Input('scenario-selector', 'value'),
+     Input('sim-conversion-evolution', 'relayoutData')]
 )
-def update_conversion_evolution(scenario_id):
+def update_conversion_evolution(scenario_id, relayout_data):
     """Conversion evolution over 30 days"""
     if df_simulation is None or scenario_id is None:
-        return go.Figure().add_annotation(
-            text="Données non disponibles",
-            xref="paper", yref="paper",
-            x=0.5, y=0.5, showarrow=False
-        )
-    
-    scenario_data = df_simulation[df_simulation['scenario_id'] == scenario_id]
-    
-    fig = go.Figure()
+        raise PreventUpdate
     
-    fig.add_trace(go.Scatter(
-        x=scenario_data['day_number'],
-        y=scenario_data['control_view_to_purchase_pct'],
-        mode='lines+markers',
-        name='Control',
-        line=dict(color='#e74c3c', width=2),
-        marker=dict(size=6)
-    ))
-    
-    fig.add_trace(go.Scatter(
-        x=scenario_data['day_number'],
-        y=scenario_data['variant_view_to_purchase_pct'],
-        mode='lines+markers',
-        name='Variant',
-        line=dict(color='#2ecc71', width=2),
-        marker=dict(size=6)
-    ))
+    scenario_data = get_scenario_data(scenario_id)
     
-    fig.update_layout(
-        title="Taux de Conversion View → Purchase",
-        xaxis_title="Jour",
-        yaxis_title="Taux de Conversion (%)",
-        hovermode='x unified',
-        template='plotly_dark',
-        height=400
-    )
+    # A scenario change resets the zoom
+    x_range = visible_range(relayout_data) if dash.ctx.triggered_id == 'sim-conversion-evolution' else None
     
-    return fig
+    patched = Patch()
+    patch_series(patched, 0, scenario_data['day_number'], scenario_data['control_view_to_purchase_pct'], x_range)
+    patch_series(patched, 1, scenario_data['day_number'], scenario_data['variant_view_to_purchase_pct'], x_range)
+    return patch_zoom(patched, x_range, revision=scenario_id)
 
 
 @callback(
     Output('sim-revenue-evolution', 'figure'),
-    Input('scenario-selector', 'value')
+    [Input('scenario-selector', 'value'),
+     Input('sim-revenue-evolution', 'relayoutData')]
 )
-def update_revenue_evolution(scenario_id):
+def update_revenue_evolution(scenario_id, relayout_data):
     """Revenue evolution over time"""
     if df_simulation is None or scenario_id is None:
-        return go.Figure().add_annotation(
-            text="Données non disponibles",
-            xref="paper", yref="paper",
-            x=0.5, y=0.5, showarrow=False
-        )
+        raise PreventUpdate
     
-    scenario_data = df_simulation[df_simulation['scenario_id'] == scenario_id]
+    scenario_data = get_scenario_data(scenario_id)
     
-    fig = go.Figure()
+    # A scenario change resets the zoom
+    x_range = visible_range(relayout_data) if dash.ctx.triggered_id == 'sim-revenue-evolution' else None
     
-    fig.add_trace(go.Scatter(
-        x=scenario_data['day_number'],
-        y=scenario_data['control_revenue'],
-        mode='lines',
-        name='Control',
-        fill='tozeroy',
-        line=dict(color='#e74c3c', width=2),
-        fillcolor='rgba(231, 76, 60, 0.1)'
-    ))
-    
-    fig.add_trace(go.Scatter(
-        x=scenario_data['day_number'],
-        y=scenario_data['variant_revenue'],
-        mode='lines',
-        name='Variant',
-        fill='tozeroy',
-        line=dict(color='#2ecc71', width=2),
-        fillcolor='rgba(46, 204, 113, 0.1)'
-    ))
-    
-    fig.update_layout(
-        title="Revenue Control vs Variant",
-        xaxis_title="Jour",
-        yaxis_title="Revenue ($)",
-        hovermode='x unified',
-        template='plotly_dark',
-        height=400
-    )
-    
-    return fig
+    patched = Patch()
+    patch_series(patched, 0, scenario_data['day_number'], scenario_data['control_revenue'], x_range)
+    patch_series(patched, 1, scenario_data['day_number'], scenario_data['variant_revenue'], x_range)
+    return patch_zoom(patched, x_range, revision=scenario_id)
 
 
 @callback(
@@ -419,57 +697,15 @@ def update_revenue_evolution(scenario_id):
 def update_lift_metrics(scenario_id):
     """Lift by metric"""
     if df_simulation is None or scenario_id is None:
-        return go.Figure().add_annotation(
-            text="Données non disponibles",
-            xref="paper", yref="paper",
-            x=0.5, y=0.5, showarrow=False
-        )
-    
-    try:
-        scenario_data = df_simulation[df_simulation['scenario_id'] == scenario_id]
-        if len(scenario_data) == 0:
-            return go.Figure().add_annotation(
-                text="Aucune donnée pour ce scénario",
-                xref="paper", yref="paper",
-                x=0.5, y=0.5, showarrow=False
-            )
-        
-        last_day = scenario_data[scenario_data['day_number'] == scenario_data['day_number'].max()].iloc[0]
-        
-        metrics = ['View → Cart', 'Cart → Purchase', 'View → Purchase']
-        values = [
-            last_day['lift_view_to_cart_pct'],
-            last_day['lift_cart_to_purchase_pct'],
-            last_day['lift_view_to_purchase_pct']
-        ]
-    except Exception as e:
-        return go.Figure().add_annotation(
-            text=f"Erreur: {str(e)}",
-            xref="paper", yref="paper",
-            x=0.5, y=0.5, showarrow=False
-        )
-    
-    colors = ['#3498db', '#f39c12', '#2ecc71']
+        raise PreventUpdate
     
-    fig = go.Figure()
-    
-    fig.add_trace(go.Bar(
-        x=metrics,
-        y=values,
-        marker_color=colors,
-        text=[f"{v:.2f}%" for v in values],
-        textposition='outside'
-    ))
+    values = lift_values(get_scenario_data(scenario_id))
     
-    fig.update_layout(
-        title="Lift par Métrique (Jour 30)",
-        yaxis_title="Lift (%)",
-        template='plotly_dark',
-        height=400,
-        showlegend=False
-    )
-    
-    return fig
+    patched = Patch()
+    patched['data'][0]['y'] = values
+    patched['data'][0]['text'] = [f"{v:.2f}%" for v in values]
+    patched['layout']['annotations'] = [] if values else [NO_SCENARIO_DATA]
+    return patched
 
 
 @callback(
@@ -479,35 +715,13 @@ def update_lift_metrics(scenario_id):
 def update_cumulative_revenue(scenario_id):
     """Cumulative revenue lift"""
     if df_simulation is None or scenario_id is None:
-        return go.Figure().add_annotation(
-            text="Données non disponibles",
-            xref="paper", yref="paper",
-            x=0.5, y=0.5, showarrow=False
-        )
-    
-    scenario_data = df_simulation[df_simulation['scenario_id'] == scenario_id]
+        raise PreventUpdate
     
-    fig = go.Figure()
+    scenario_data = get_scenario_data(scenario_id)
     
-    fig.add_trace(go.Scatter(
-        x=scenario_data['day_number'],
-        y=scenario_data['cumulative_revenue_lift'],
-        mode='lines',
-        name='Revenue Lift Cumulatif',
-        fill='tozeroy',
-        line=dict(color='#667eea', width=3),
-        fillcolor='rgba(102, 126, 234, 0.2)'
-    ))
-    
-    fig.update_layout(
-        title="Revenue Lift Cumulatif",
-        xaxis_title="Jour",
-        yaxis_title="Revenue Lift Cumulatif ($)",
-        template='plotly_dark',
-        height=400
-    )
-    
-    return fig
+    patched = Patch()
+    patch_series(patched, 0, scenario_data['day_number'], scenario_data['cumulative_revenue_lift'], webgl=False)
+    return patched
 
 
 @callback(
@@ -517,39 +731,13 @@ def update_cumulative_revenue(scenario_id):
 def update_significance_evolution(scenario_id):
     """Statistical significance evolution"""
     if df_simulation is None or scenario_id is None:
-        return go.Figure().add_annotation(
-            text="Données non disponibles",
-            xref="paper", yref="paper",
-            x=0.5, y=0.5, showarrow=False
-        )
-    
-    scenario_data = df_simulation[df_simulation['scenario_id'] == scenario_id]
-    
-    fig = go.Figure()
-    
-    # P-value evolution
-    fig.add_trace(go.Scatter(
-        x=scenario_data['day_number'],
-        y=scenario_data['p_value'],
-        mode='lines+markers',
-        name='P-value',
-        line=dict(color='#e74c3c', width=2),
-        marker=dict(size=6)
-    ))
-    
-    # Significance threshold
-    fig.add_hline(y=0.05, line_dash="dash", line_color="yellow", 
-                  annotation_text="Seuil α = 0.05")
+        raise PreventUpdate
     
-    fig.update_layout(
-        title="Évolution de la P-Value",
-        xaxis_title="Jour",
-        yaxis_title="P-Value",
-        template='plotly_dark',
-        height=400
-    )
+    scenario_data = get_scenario_data(scenario_id)
     
-    return fig
+    patched = Patch()
+    patch_series(patched, 0, scenario_data['day_number'], scenario_data['p_value'], webgl=False)
+    return patched
 
 
 @callback(
@@ -559,39 +747,13 @@ def update_significance_evolution(scenario_id):
 def update_zscore_evolution(scenario_id):
     """Z-score evolution"""
     if df_simulation is None or scenario_id is None:
-        return go.Figure().add_annotation(
-            text="Données non disponibles",
-            xref="paper", yref="paper",
-            x=0.5, y=0.5, showarrow=False
-        )
+        raise PreventUpdate
     
-    scenario_data = df_simulation[df_simulation['scenario_id'] == scenario_id]
+    scenario_data = get_scenario_data(scenario_id)
     
-    fig = go.Figure()
-    
-    fig.add_trace(go.Scatter(
-        x=scenario_data['day_number'],
-        y=scenario_data['z_score'],
-        mode='lines+markers',
-        name='Z-Score',
-        line=dict(color='#3498db', width=2),
-        marker=dict(size=6)
-    ))
-    
-    # Critical value for 95% confidence
-    fig.add_hline(y=1.96, line_dash="dash", line_color="green", 
-                  annotation_text="Z = 1.96 (95% confiance)")
-    fig.add_hline(y=-1.96, line_dash="dash", line_color="green")
-    
-    fig.update_layout(
-        title="Évolution du Z-Score",
-        xaxis_title="Jour",
-        yaxis_title="Z-Score",
-        template='plotly_dark',
-        height=400
-    )
-    
-    return fig
+    patched = Patch()
+    patch_series(patched, 0, scenario_data['day_number'], scenario_data['z_score'], webgl=False)
+    return patched
 
 
 @callback(
@@ -601,46 +763,15 @@ def update_zscore_evolution(scenario_id):
 def update_sample_size_growth(scenario_id):
     """Sample size growth"""
     if df_simulation is None or scenario_id is None:
-        return go.Figure().add_annotation(
-            text="Données non disponibles",
-            xref="paper", yref="paper",
-            x=0.5, y=0.5, showarrow=False
-        )
+        raise PreventUpdate
     
-    scenario_data = df_simulation[df_simulation['scenario_id'] == scenario_id]
+    scenario_data = get_scenario_data(scenario_id)
     
-    fig = go.Figure()
-    
-    fig.add_trace(go.Scatter(
-        x=scenario_data['day_number'],
-        y=scenario_data['sample_size_control'],
-        mode='lines',
-        name='Control',
-        stackgroup='one',
-        line=dict(color='#e74c3c', width=0),
-        fillcolor='rgba(231, 76, 60, 0.5)'
-    ))
-    
-    fig.add_trace(go.Scatter(
-        x=scenario_data['day_number'],
-        y=scenario_data['sample_size_variant'],
-        mode='lines',
-        name='Variant',
-        stackgroup='one',
-        line=dict(color='#2ecc71', width=0),
-        fillcolor='rgba(46, 204, 113, 0.5)'
-    ))
-    
-    fig.update_layout(
-        title="Croissance de la Taille d'Échantillon",
-        xaxis_title="Jour",
-        yaxis_title="Nombre d'Utilisateurs",
-        hovermode='x unified',
-        template='plotly_dark',
-        height=400
-    )
-    
-    return fig
+    # stackgroup n'est pas supporté par Scattergl
+    patched = Patch()
+    patch_series(patched, 0, scenario_data['day_number'], scenario_data['sample_size_control'], webgl=False)
+    patch_series(patched, 1, scenario_data['day_number'], scenario_data['sample_size_variant'], webgl=False)
+    return patched
 
 
 @callback(
@@ -650,74 +781,20 @@ def update_sample_size_growth(scenario_id):
 def update_control_variant_compare(scenario_id):
     """Control vs variant comparison"""
     if df_simulation is None or scenario_id is None:
-        return go.Figure().add_annotation(
-            text="Données non disponibles",
-            xref="paper", yref="paper",
-            x=0.5, y=0.5, showarrow=False
-        )
+        raise PreventUpdate
     
-    try:
-        scenario_data = df_simulation[df_simulation['scenario_id'] == scenario_id]
-        if len(scenario_data) == 0:
-            return go.Figure().add_annotation(
-                text="Aucune donnée pour ce scénario",
-                xref="paper", yref="paper",
-                x=0.5, y=0.5, showarrow=False
-            )
-        
-        last_day = scenario_data[scenario_data['day_number'] == scenario_data['day_number'].max()].iloc[0]
-        
-        categories = ['Views', 'Carts', 'Purchases', 'Revenue']
-        control_values = [
-            last_day['control_views'],
-            last_day['control_carts'],
-            last_day['control_purchases'],
-            last_day['control_revenue'] / 100  # Scale down for visibility
-        ]
-        variant_values = [
-            last_day['variant_views'],
-            last_day['variant_carts'],
-            last_day['variant_purchases'],
-            last_day['variant_revenue'] / 100
-        ]
-        
-        fig = go.Figure()
-        
-        fig.add_trace(go.Bar(
-            name='Control',
-            x=categories,
-            y=control_values,
-            marker_color='#e74c3c'
-        ))
-        
-        fig.add_trace(go.Bar(
-            name='Variant',
-            x=categories,
-            y=variant_values,
-            marker_color='#2ecc71'
-        ))
-        
-        fig.update_layout(
-            title="Control vs Variant (Jour 30)",
-            yaxis_title="Valeur",
-            barmode='group',
-            template='plotly_dark',
-            height=400
-        )
-        
-        return fig
-        
-    except Exception as e:
-        return go.Figure().add_annotation(
-            text=f"Erreur: {str(e)}",
-            xref="paper", yref="paper",
-            x=0.5, y=0.5, showarrow=False
-        )
+    control_values, variant_values = control_variant_values(get_scenario_data(scenario_id))
+    
+    patched = Patch()
+    patched['data'][0]['y'] = control_values
+    patched['data'][1]['y'] = variant_values
+    patched['layout']['annotations'] = [] if control_values else [NO_SCENARIO_DATA]
+    return patched
 
 
 @callback(
     Output('sim-all-scenarios', 'figure'),
-    Input('scenario-selector', 'value')
+    Input('scenario-store', 'data')
 )
 def update_all_scenarios(_):
     """Compare all scenarios"""
@@ -750,7 +827,7 @@ def update_all_scenarios(_):
         title="Comparaison: Lift vs Puissance Statistique (Taille = Coût)",
         xaxis_title="Expected Lift (%)",
         yaxis_title="Statistical Power (%)",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=500
     )
     
@@ -759,7 +836,7 @@ def update_all_scenarios(_):
 
 @callback(
     Output('sim-scenarios-table', 'children'),
-    Input('scenario-selector', 'value')
+    Input('scenario-store', 'data')
 )
 def update_scenarios_table(_):
     """Display scenarios summary table"""
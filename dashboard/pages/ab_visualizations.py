@@ -12,6 +12,8 @@ import numpy as np
 from scipy import stats
 import os
 
+from figures import TEMPLATE
+
 # Register page
 dash.register_page(__name__, path='/ab-testing/visualizations', name='Visualisations A/B')
 
@@ -292,7 +294,7 @@ def update_performance_overview(selected_test):
     fig.update_layout(
         xaxis_title="Métrique",
         yaxis_title="Valeur",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400,
         showlegend=False
     )
@@ -338,7 +340,7 @@ def update_control_variant_compare(selected_test):
         barmode='group',
         xaxis_title="",
         yaxis_title="Taux (%)",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400,
         showlegend=True
     )
@@ -375,7 +377,7 @@ def update_daily_evolution(selected_test):
     fig.update_layout(
         xaxis_title="Jour",
         yaxis_title="Purchases",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400,
         hovermode='x unified'
     )
@@ -411,7 +413,7 @@ def update_revenue_analysis(selected_test):
         barmode='group',
         xaxis_title="Jour",
         yaxis_title="Revenue ($)",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400
     )
     
@@ -452,7 +454,7 @@ def update_cumulative_revenue(selected_test):
     fig.update_layout(
         xaxis_title="Jour",
         yaxis_title="Revenue Cumulatif ($)",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400,
         hovermode='x unified'
     )
@@ -496,7 +498,7 @@ def update_statistical_analysis(selected_test):
     fig.update_layout(
         xaxis_title="Métrique Statistique",
         yaxis_title="Valeur",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400
     )
     
@@ -547,7 +549,7 @@ def update_conversion_distribution(selected_test):
     fig.update_layout(
         xaxis_title="Taux de Conversion (%)",
         yaxis_title="Densité de Probabilité",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400
     )
     
@@ -588,7 +590,7 @@ def update_test_matrix(selected_test):
     fig.update_layout(
         xaxis_title="Métrique",
         yaxis_title="Test",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400
     )
     
@@ -621,7 +623,7 @@ def update_lift_analysis(selected_test):
     fig.update_layout(
         xaxis_title="Lift (%)",
         yaxis_title="Test",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400
     )
     
@@ -12,6 +12,9 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 
+from figures import TEMPLATE
+from rollup_store import store as rollups
+
 # Register page
 dash.register_page(__name__, path='/cohorts', name='Cohorts & Rétention')
 
@@ -45,44 +48,54 @@ except Exception as e:
     df_conversion = None
 
 # Create cohort analysis data
+def load_cohort_data(path):
+    """Load the precomputed cohort x week-offset retention table (cohort_analysis.py)"""
+    if not os.path.exists(path):
+        return None
+    
+    cohorts = pd.read_csv(path, parse_dates=['cohort_week'])
+    print(f"[OK] Cohortes chargees: {cohorts['cohort_week'].nunique()} cohortes")
+    return cohorts
+
+
+def weekly_users(df):
+    """Sum of daily unique users per week (Monday), from the rollup store when available"""
+    if rollups is not None:
+        weekly = rollups.query(level='week', metrics=['unique_users'], rates=False)
+        return pd.Series(weekly['unique_users'].to_numpy(), index=weekly['period'])
+    week = df['date'].dt.to_period('W').dt.start_time
+    return df.groupby(week)['unique_users'].sum()
+
+
 def create_cohort_data(df):
-    """Create cohort analysis from daily data"""
-    if df is None or len(df) == 0:
+    """Approximate cohorts from weekly user totals when no precomputed table exists"""
+    if rollups is None and (df is None or len(df) == 0):
         return None
     
-    # Group by week for cohort analysis
-    df = df.copy()
-    df['week'] = df['date'].dt.to_period('W').apply(lambda x: x.start_time)
-    
-    weekly_data = df.groupby('week').agg({
-        'unique_users': 'sum',
-        'unique_sessions': 'sum',
-        'transactions': 'sum'
-    }).reset_index()
-    
-    # Calculate retention rates (simplified version)
-    cohorts = []
-    for i, row in weekly_data.iterrows():
-        cohort_week = row['week']
-        cohort_size = row['unique_users']
-        
-        for j in range(len(weekly_data) - i):
-            week_offset = j
-            if i + j < len(weekly_data):
-                retained_users = weekly_data.iloc[i + j]['unique_users']
-                retention_rate = (retained_users / cohort_size * 100) if cohort_size > 0 else 0
-                
-                cohorts.append({
-                    'cohort_week': cohort_week,
-                    'week_number': week_offset,
-                    'retention_rate': retention_rate,
-                    'cohort_size': cohort_size,
-                    'retained_users': retained_users
-                })
-    
-    return pd.DataFrame(cohorts)
+    weekly_data = weekly_users(df)
+    weeks = weekly_data.index.to_numpy()
+    users = weekly_data.to_numpy(dtype=float)
+    
+    # Every (cohort, later week) pair at once instead of a double loop
+    i, j = np.triu_indices(len(weekly_data))
+    cohort_size = users[i]
+    retained_users = users[j]
+    retention_rate = np.divide(
+        retained_users * 100, cohort_size,
+        out=np.zeros_like(retained_users), where=cohort_size > 0
+    )
+    
+    return pd.DataFrame({
+        'cohort_week': weeks[i],
+        'week_number': j - i,
+        'retention_rate': retention_rate,
+        'cohort_size': cohort_size,
+        'retained_users': retained_users
+    })
 
-cohort_df = create_cohort_data(df_daily) if df_daily is not None else None
+cohort_df = load_cohort_data(os.path.join(data_path, 'cohort_retention.csv'))
+if cohort_df is None and df_daily is not None:
+    cohort_df = create_cohort_data(df_daily)
 
 # Layout
 layout = dbc.Container([
@@ -331,7 +344,7 @@ def update_cohort_heatmap(_):
         title="Taux de Rétention par Cohorte (%)",
         xaxis_title="Semaines depuis la création de la cohorte",
         yaxis_title="Date de Cohorte",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=500
     )
     
@@ -371,7 +384,7 @@ def update_retention_curves(_):
         xaxis_title="Semaines",
         yaxis_title="Taux de Rétention (%)",
         hovermode='x unified',
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400,
         showlegend=True,
         legend=dict(
@@ -416,7 +429,7 @@ def update_avg_retention(_):
         title="Rétention Moyenne par Semaine",
         xaxis_title="Semaine",
         yaxis_title="Rétention Moyenne (%)",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400,
         showlegend=False
     )
@@ -455,7 +468,7 @@ def update_cohort_size(_):
         title="Taille de Chaque Cohorte",
         xaxis_title="Date de Cohorte",
         yaxis_title="Nombre d'Utilisateurs",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400,
         showlegend=False
     )
@@ -477,12 +490,17 @@ def update_retention_conversion(_):
         )
     
     # Calculate weekly conversion rates
-    df_weekly = df_daily.copy()
-    df_weekly['week'] = df_weekly['date'].dt.to_period('W').apply(lambda x: x.start_time)
-    weekly_conv = df_weekly.groupby('week').agg({
-        'view_to_purchase_rate': 'mean',
-        'unique_users': 'sum'
-    }).reset_index()
+    if rollups is not None:
+        # Niveau semaine du store: conversion = achats / vues de la semaine
+        weekly = rollups.query(level='week', metrics=['views', 'add_to_carts', 'transactions', 'unique_users'])
+        weekly_conv = weekly.rename(columns={'period': 'week', 'view_to_purchase_pct': 'view_to_purchase_rate'})
+    else:
+        df_weekly = df_daily.copy()
+        df_weekly['week'] = df_weekly['date'].dt.to_period('W').apply(lambda x: x.start_time)
+        weekly_conv = df_weekly.groupby('week').agg({
+            'view_to_purchase_rate': 'mean',
+            'unique_users': 'sum'
+        }).reset_index()
     
     # Get week 1 retention for each cohort
     week1_retention = cohort_df[cohort_df['week_number'] == 1].groupby('cohort_week')['retention_rate'].mean().reset_index()
@@ -512,7 +530,7 @@ def update_retention_conversion(_):
         title="Corrélation Rétention vs Conversion",
         xaxis_title="Taux de Rétention Semaine 1 (%)",
         yaxis_title="Taux de Conversion (%)",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400
     )
     
@@ -552,7 +570,7 @@ def update_weekly_trend(_):
         xaxis_title="Date de Cohorte",
         yaxis_title="Taux de Rétention (%)",
         hovermode='x unified',
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400,
         showlegend=True
     )
@@ -589,7 +607,7 @@ def update_retention_distribution(_):
         title="Distribution des Taux de Rétention",
         xaxis_title="Taux de Rétention (%)",
         yaxis_title="Fréquence",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400,
         showlegend=False
     )
@@ -645,7 +663,7 @@ def update_early_late_comparison(_):
         xaxis_title="Semaines",
         yaxis_title="Rétention Moyenne (%)",
         hovermode='x unified',
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400,
         showlegend=True
     )
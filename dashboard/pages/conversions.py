@@ -12,6 +12,8 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 
+from figures import TEMPLATE
+
 # Register this page
 dash.register_page(__name__, path='/conversions', name='Conversions')
 
@@ -323,7 +325,7 @@ def update_conversion_evolution(_):
         title="Taux de Conversion Quotidiens avec Moyenne Mobile 7 Jours",
         xaxis_title="Date",
         yaxis_title="Taux de Conversion (%)",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=450,
         hovermode='x unified',
         legend=dict(
@@ -376,7 +378,7 @@ def update_conversion_weekday(_):
         title="Taux de Conversion par Jour de la Semaine",
         xaxis_title="Jour",
         yaxis_title="Taux de Conversion (%)",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400,
         barmode='group'
     )
@@ -415,7 +417,7 @@ def update_conversion_segment(_):
         title="Taux de Conversion par Segment",
         xaxis_title="Segment",
         yaxis_title="Conversion Rate (%)",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400,
         showlegend=False
     )
@@ -463,7 +465,7 @@ def update_aov_evolution(_):
         title="Évolution du Panier Moyen (AOV)",
         xaxis_title="Date",
         yaxis_title="AOV (€)",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400,
         hovermode='x unified'
     )
@@ -494,7 +496,7 @@ def update_aov_segment(_):
     
     fig.update_layout(
         title="AOV Moyen par Segment",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400,
         showlegend=True
     )
@@ -530,7 +532,7 @@ def update_conversion_efficiency(_):
         title="Efficacité de Conversion Quotidienne",
         xaxis_title="Date",
         yaxis_title="Efficiency Index",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400,
         showlegend=False
     )
@@ -569,7 +571,7 @@ def update_revenue_per_user(_):
         title="Revenue Moyen par Utilisateur (Segment)",
         xaxis_title="Segment",
         yaxis_title="Revenue/User (€)",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400,
         showlegend=False
     )
@@ -610,7 +612,7 @@ def update_conversion_rate_heatmap(_):
         title="Heatmap des Taux de Conversion (View→Purchase)",
         xaxis_title="Semaine",
         yaxis_title="Jour",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400
     )
     
@@ -12,6 +12,9 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 
+from figures import time_series, visible_range, keep_zoom, TEMPLATE
+from rollup_store import store as rollups
+
 # Register this page
 dash.register_page(__name__, path='/funnel', name='Funnel')
 
@@ -323,7 +326,7 @@ def update_main_funnel(_):
     
     fig.update_layout(
         title="Funnel Global de Conversion",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=500,
         showlegend=False
     )
@@ -357,7 +360,7 @@ def update_funnel_distribution(_):
     
     fig.update_layout(
         title="Distribution",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=500,
         showlegend=True
     )
@@ -396,7 +399,7 @@ def update_funnel_segment(_):
         title="Taux de Conversion par Segment",
         xaxis_title="Segment",
         yaxis_title="Taux (%)",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400,
         barmode='group'
     )
@@ -438,7 +441,7 @@ def update_funnel_weekday(_):
         title="Taux de Conversion par Jour",
         xaxis_title="Jour",
         yaxis_title="Taux (%)",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400,
         barmode='group'
     )
@@ -448,19 +451,21 @@ def update_funnel_weekday(_):
 
 @callback(
     Output('funnel-daily-evolution', 'figure'),
-    Input('funnel-daily-evolution', 'id')
+    Input('funnel-daily-evolution', 'relayoutData')
 )
-def update_funnel_daily_evolution(_):
+def update_funnel_daily_evolution(relayout_data):
     """Create daily funnel evolution"""
     if df_daily is None:
         return go.Figure()
     
+    x_range = visible_range(relayout_data)
     fig = go.Figure()
     
     # Views
-    fig.add_trace(go.Scatter(
-        x=df_daily['date'],
-        y=df_daily['view'],
+    fig.add_trace(time_series(
+        df_daily['date'],
+        df_daily['view'],
+        x_range,
         mode='lines',
         name='Views',
         line=dict(color='#3498db', width=1),
@@ -469,9 +474,10 @@ def update_funnel_daily_evolution(_):
     ))
     
     # Add to cart
-    fig.add_trace(go.Scatter(
-        x=df_daily['date'],
-        y=df_daily['addtocart'],
+    fig.add_trace(time_series(
+        df_daily['date'],
+        df_daily['addtocart'],
+        x_range,
         mode='lines',
         name='Add to Cart',
         line=dict(color='#f39c12', width=1),
@@ -479,20 +485,22 @@ def update_funnel_daily_evolution(_):
     ))
     
     # Purchases
-    fig.add_trace(go.Scatter(
-        x=df_daily['date'],
-        y=df_daily['transaction'],
+    fig.add_trace(time_series(
+        df_daily['date'],
+        df_daily['transaction'],
+        x_range,
         mode='lines',
         name='Purchases',
         line=dict(color='#2ecc71', width=2),
         yaxis='y'
     ))
     
+    keep_zoom(fig, x_range)
     fig.update_layout(
         title="Évolution Quotidienne des Étapes du Funnel",
         xaxis_title="Date",
         yaxis_title="Nombre",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=450,
         hovermode='x unified',
         legend=dict(
@@ -539,7 +547,7 @@ def update_funnel_waterfall(_):
     fig.update_layout(
         title="Analyse des Abandons (Waterfall)",
         yaxis_title="Utilisateurs",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400,
         showlegend=False
     )
@@ -578,7 +586,7 @@ def update_top_performers(_):
         title="Top 10 Produits (View→Purchase)",
         xaxis_title="Conversion %",
         yaxis_title="",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400,
         showlegend=False,
         yaxis=dict(autorange='reversed')
@@ -593,15 +601,21 @@ def update_top_performers(_):
 )
 def update_funnel_monthly(_):
     """Create monthly trends"""
-    if df_monthly is None:
+    if rollups is not None:
+        # Niveau mois du store, taux recalculés sur les sommes du mois
+        monthly = rollups.query(level='month', metrics=['views', 'add_to_carts', 'transactions'])
+        df_months = monthly.assign(month=monthly['period'].dt.strftime('%Y-%m'))
+    elif df_monthly is not None:
+        df_months = df_monthly
+    else:
         return go.Figure()
     
     fig = go.Figure()
     
     # View to cart
     fig.add_trace(go.Scatter(
-        x=df_monthly['month'],
-        y=df_monthly['view_to_cart_pct'],
+        x=df_months['month'],
+        y=df_months['view_to_cart_pct'],
         mode='lines+markers',
         name='View → Cart %',
         line=dict(color='#3498db', width=3),
@@ -610,8 +624,8 @@ def update_funnel_monthly(_):
     
     # View to purchase
     fig.add_trace(go.Scatter(
-        x=df_monthly['month'],
-        y=df_monthly['view_to_purchase_pct'],
+        x=df_months['month'],
+        y=df_months['view_to_purchase_pct'],
         mode='lines+markers',
         name='View → Purchase %',
         line=dict(color='#2ecc71', width=3),
@@ -622,7 +636,7 @@ def update_funnel_monthly(_):
         title="Évolution Mensuelle des Taux de Conversion",
         xaxis_title="Mois",
         yaxis_title="Taux (%)",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400,
         hovermode='x unified'
     )
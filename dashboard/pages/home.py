@@ -12,6 +12,8 @@ import pandas as pd
 from pathlib import Path
 from datetime import datetime
 
+from figures import time_series, visible_range, keep_zoom, TEMPLATE
+
 # Register this page with dash.page_registry (changed path to /dashboard)
 dash.register_page(__name__, path='/dashboard', name='Accueil')
 
@@ -565,9 +567,10 @@ def filter_data(df, start_date, end_date, weekday, daytype):
     [Input('home-date-range', 'start_date'),
      Input('home-date-range', 'end_date'),
      Input('home-weekday-filter', 'value'),
-     Input('home-daytype-filter', 'value')]
+     Input('home-daytype-filter', 'value'),
+     Input('traffic-chart', 'relayoutData')]
 )
-def update_traffic_chart(start_date, end_date, weekday, daytype):
+def update_traffic_chart(start_date, end_date, weekday, daytype, relayout_data):
     """Create traffic evolution chart"""
     try:
         if df_daily is None:
@@ -587,12 +590,15 @@ def update_traffic_chart(start_date, end_date, weekday, daytype):
                 x=0.5, y=0.5, showarrow=False
             )
         
+        # Zoom only applies to the current filters: a filter change resets it
+        x_range = visible_range(relayout_data) if dash.ctx.triggered_id == 'traffic-chart' else None
         fig = go.Figure()
         
         # Daily traffic
-        fig.add_trace(go.Scatter(
-            x=df_filtered['date'],
-            y=df_filtered['unique_users'],
+        fig.add_trace(time_series(
+            df_filtered['date'],
+            df_filtered['unique_users'],
+            x_range,
             mode='lines',
             name='Utilisateurs Quotidiens',
             line=dict(color='#667eea', width=2),
@@ -601,20 +607,22 @@ def update_traffic_chart(start_date, end_date, weekday, daytype):
         ))
         
         # 7-day moving average
-        fig.add_trace(go.Scatter(
-            x=df_filtered['date'],
-            y=df_filtered['ma7_users'],
+        fig.add_trace(time_series(
+            df_filtered['date'],
+            df_filtered['ma7_users'],
+            x_range,
             mode='lines',
             name='Moyenne Mobile 7j',
             line=dict(color='#764ba2', width=2, dash='dash')
         ))
         
+        keep_zoom(fig, x_range, revision=f"{start_date}|{end_date}|{weekday}|{daytype}")
         fig.update_layout(
             title="Évolution du Trafic (Mai - Sept 2015)",
             xaxis_title="Date",
             yaxis_title="Utilisateurs Uniques",
             hovermode='x unified',
-            template='plotly_dark',
+            template=TEMPLATE,
             height=350,
             showlegend=True,
             legend=dict(
@@ -687,7 +695,7 @@ def update_revenue_chart(start_date, end_date, weekday, daytype):
             xaxis_title="Date",
             yaxis_title="Revenue (€)",
             hovermode='x unified',
-            template='plotly_dark',
+            template=TEMPLATE,
             height=350,
             showlegend=True,
             legend=dict(
@@ -772,7 +780,7 @@ def update_conversion_chart(start_date, end_date, weekday, daytype):
             xaxis_title="Date",
             yaxis_title="Taux de Conversion (%)",
             hovermode='x unified',
-            template='plotly_dark',
+            template=TEMPLATE,
             height=350,
             showlegend=True,
             legend=dict(
@@ -877,7 +885,7 @@ def update_weekday_chart(start_date, end_date, weekday, daytype):
                 side='right'
             ),
             hovermode='x unified',
-            template='plotly_dark',
+            template=TEMPLATE,
             height=350,
             showlegend=True,
             legend=dict(
@@ -945,7 +953,7 @@ def update_ab_roi_chart(start_date, end_date, weekday, daytype):
         title="ROI Annuel par Scénario A/B (Top 8)",
         xaxis_title="ROI Annuel (%)",
         yaxis_title="",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400,
         showlegend=False,
         xaxis=dict(
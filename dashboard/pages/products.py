@@ -4,14 +4,22 @@ Issue #22 - Top Products + Conversion
 """
 
 import dash
-from dash import html, dcc, callback, Input, Output
+from dash import html, dcc, callback, Input, Output, dash_table
 import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
 import plotly.express as px
 import pandas as pd
 import numpy as np
+import sys
 from pathlib import Path
 
+from figures import TEMPLATE
+from product_index import ProductIndex
+
+# Analyses produits partagées avec les scripts batch (src/kpis/products.py)
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from src.kpis import products as product_analytics
+
 # Register this page
 dash.register_page(__name__, path='/products', name='Produits')
 
@@ -24,6 +32,33 @@ try:
 except FileNotFoundError:
     df_products = None
 
+# Sorted index of the full catalogue, built once for the paginated table
+product_index = ProductIndex(df_products) if df_products is not None else None
+
+PRODUCTS_PAGE_SIZE = 25
+
+PRODUCTS_TABLE_COLUMNS = [
+    {'name': 'Rank', 'id': 'rank'},
+    {'name': 'Produit ID', 'id': 'product_id'},
+    {'name': 'Catégorie', 'id': 'category'},
+    {'name': 'Users', 'id': 'unique_users', 'type': 'numeric'},
+    {'name': 'Views', 'id': 'views', 'type': 'numeric'},
+    {'name': 'Carts', 'id': 'add_to_carts', 'type': 'numeric'},
+    {'name': 'Achats', 'id': 'purchases', 'type': 'numeric'},
+    {'name': 'Conv. %', 'id': 'view_to_purchase_rate', 'type': 'numeric'},
+    {'name': 'Revenue', 'id': 'total_revenue', 'type': 'numeric'},
+    {'name': 'AOV', 'id': 'avg_price', 'type': 'numeric'},
+]
+
+CATEGORY_COLORS = {
+    'Top Performer': '#00bc8c',
+    'High Revenue': '#375a7f',
+    'High Conversion': '#3498db',
+    'Popular': '#f39c12',
+    'Low Performer': '#6c757d',
+    'No Sales': '#e74c3c',
+}
+
 
 # Layout
 layout = dbc.Container([
@@ -158,6 +193,16 @@ layout = dbc.Container([
                     ], className="mb-0")
                 ]),
                 dbc.CardBody([
+                    html.Label("Objectif de revenue (%)", className="fw-bold"),
+                    dcc.Slider(
+                        id='pareto-target',
+                        min=50,
+                        max=95,
+                        step=5,
+                        value=80,
+                        marks={50: '50%', 80: '80%', 95: '95%'},
+                        className='mb-3'
+                    ),
                     dcc.Graph(id='pareto-chart', config={'displayModeBar': False})
                 ])
             ], className="shadow-sm border-0 mb-4")
@@ -189,6 +234,16 @@ layout = dbc.Container([
                     ], className="mb-0")
                 ]),
                 dbc.CardBody([
+                    html.Label("Seuil « High Revenue » (quantile du revenue)", className="fw-bold"),
+                    dcc.Slider(
+                        id='category-revenue-quantile',
+                        min=0.5,
+                        max=0.95,
+                        step=0.05,
+                        value=0.75,
+                        marks={0.5: 'Q50', 0.75: 'Q75', 0.95: 'Q95'},
+                        className='mb-3'
+                    ),
                     dcc.Graph(id='category-funnel', config={'displayModeBar': False})
                 ])
             ], className="shadow-sm border-0 mb-4")
@@ -202,11 +257,62 @@ layout = dbc.Container([
                 dbc.CardHeader([
                     html.H5([
                         html.I(className="fas fa-table me-2"),
-                        "Top 50 Produits Détaillés"
+                        "Catalogue Produits Détaillé"
                     ], className="mb-0")
                 ]),
                 dbc.CardBody([
-                    html.Div(id='products-table')
+                    dbc.Row([
+                        dbc.Col([
+                            dcc.Dropdown(
+                                id='products-category-filter',
+                                options=[{'label': c, 'value': c}
+                                         for c in (product_index.categories if product_index else [])],
+                                placeholder="Toutes les catégories",
+                                clearable=True
+                            )
+                        ], width=4),
+                        dbc.Col([
+                            dbc.Input(
+                                id='products-search',
+                                placeholder="Rechercher un produit ID...",
+                                type='text',
+                                debounce=True
+                            )
+                        ], width=4),
+                        dbc.Col([
+                            html.Small(id='products-table-count', className="text-muted")
+                        ], width=4, className="d-flex align-items-center justify-content-end"),
+                    ], className="mb-3"),
+                    dash_table.DataTable(
+                        id='products-table',
+                        columns=PRODUCTS_TABLE_COLUMNS,
+                        page_current=0,
+                        page_size=PRODUCTS_PAGE_SIZE,
+                        page_action='custom',
+                        sort_action='custom',
+                        sort_mode='single',
+                        sort_by=[{'column_id': 'total_revenue', 'direction': 'desc'}],
+                        style_table={'overflowX': 'auto'},
+                        style_header={
+                            'backgroundColor': '#303030',
+                            'color': 'white',
+                            'fontWeight': 'bold'
+                        },
+                        style_cell={
+                            'backgroundColor': '#222',
+                            'color': 'white',
+                            'border': '1px solid #444',
+                            'fontSize': '0.85rem'
+                        },
+                        style_data_conditional=[
+                            {
+                                'if': {'filter_query': f'{{category}} = "{category}"', 'column_id': 'category'},
+                                'color': color,
+                                'fontWeight': 'bold'
+                            }
+                            for category, color in CATEGORY_COLORS.items()
+                        ]
+                    )
                 ])
             ], className="shadow-sm border-0 mb-4")
         ])
@@ -274,7 +380,7 @@ def update_top_products_revenue(_):
         title="Top 20 Produits par Revenue Total",
         xaxis_title="Revenue Total (€)",
         yaxis_title="",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=600,
         showlegend=False,
         yaxis=dict(autorange="reversed")
@@ -292,7 +398,7 @@ def update_products_conversion(_):
     if df_products is None or len(df_products) == 0:
         return go.Figure().update_layout(
             title="Aucune donnée disponible",
-            template='plotly_dark',
+            template=TEMPLATE,
             height=500
         )
     
@@ -305,7 +411,7 @@ def update_products_conversion(_):
         if len(df_with_sales) == 0:
             return go.Figure().update_layout(
                 title="Aucun produit avec conversions",
-                template='plotly_dark',
+                template=TEMPLATE,
                 height=500
             )
         
@@ -316,7 +422,7 @@ def update_products_conversion(_):
         if len(df_with_sales) == 0:
             return go.Figure().update_layout(
                 title="Données invalides",
-                template='plotly_dark',
+                template=TEMPLATE,
                 height=500
             )
         
@@ -350,7 +456,7 @@ def update_products_conversion(_):
             title="Taux de Conversion View → Purchase (Top 30)",
             xaxis_title="Taux de Conversion (%)",
             yaxis_title="Rank",
-            template='plotly_dark',
+            template=TEMPLATE,
             height=500,
             showlegend=False,
             yaxis=dict(showticklabels=False)
@@ -361,7 +467,7 @@ def update_products_conversion(_):
     except Exception as e:
         return go.Figure().update_layout(
             title=f"Erreur: {str(e)}",
-            template='plotly_dark',
+            template=TEMPLATE,
             height=500
         )
 
@@ -400,7 +506,7 @@ def update_products_aov(_):
         title="Valeur Moyenne Panier par Produit (Top 30)",
         xaxis_title="Produit",
         yaxis_title="AOV (€)",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=500,
         showlegend=False,
         xaxis=dict(tickangle=-45)
@@ -411,14 +517,14 @@ def update_products_aov(_):
 
 @callback(
     Output('pareto-chart', 'figure'),
-    Input('pareto-chart', 'id')
+    Input('pareto-target', 'value')
 )
-def update_pareto_chart(_):
+def update_pareto_chart(target):
     """Create Pareto analysis chart"""
     if df_products is None or len(df_products) == 0:
         return go.Figure().update_layout(
             title="Aucune donnée disponible",
-            template='plotly_dark',
+            template=TEMPLATE,
             height=500
         )
     
@@ -429,7 +535,7 @@ def update_pareto_chart(_):
         if len(df_with_revenue) == 0:
             return go.Figure().update_layout(
                 title="Aucun produit avec revenue",
-                template='plotly_dark',
+                template=TEMPLATE,
                 height=500
             )
         
@@ -440,14 +546,17 @@ def update_pareto_chart(_):
         if len(df_with_revenue) == 0:
             return go.Figure().update_layout(
                 title="Données invalides",
-                template='plotly_dark',
+                template=TEMPLATE,
                 height=500
             )
         
-        # Sort by revenue and calculate cumulative
-        df_sorted = df_with_revenue.sort_values('total_revenue', ascending=False).reset_index(drop=True)
-        df_sorted['cumulative_revenue_pct'] = (df_sorted['total_revenue'].cumsum() / df_sorted['total_revenue'].sum()) * 100
+        # Sort by revenue and calculate cumulative (un tri, une somme cumulée)
+        target = target or 80
+        order, _, cumulative_pct = product_analytics.pareto_curve(df_with_revenue['total_revenue'])
+        df_sorted = df_with_revenue.iloc[order].reset_index(drop=True)
+        df_sorted['cumulative_revenue_pct'] = cumulative_pct
         df_sorted['product_pct'] = ((df_sorted.index + 1) / len(df_with_revenue)) * 100
+        products_pct = product_analytics.products_for_share(cumulative_pct, [target])[0] / len(df_sorted) * 100
         
         fig = go.Figure()
         
@@ -471,25 +580,25 @@ def update_pareto_chart(_):
             yaxis='y2'
         ))
         
-        # 80% line - add as a shape on y2 axis
+        # Target line - add as a shape on y2 axis
         fig.add_shape(
             type="line",
             x0=0, x1=100,
-            y0=80, y1=80,
+            y0=target, y1=target,
             yref='y2',
             line=dict(color="green", width=2, dash="dash")
         )
         fig.add_annotation(
-            x=50, y=80,
+            x=50, y=target,
             yref='y2',
-            text="80% du revenue",
+            text=f"{target}% du revenue",
             showarrow=False,
             yshift=10,
             font=dict(color="green")
         )
         
         fig.update_layout(
-            title="Analyse Pareto: 2.55% des produits = 80% du revenue",
+            title=f"Analyse Pareto: {products_pct:.2f}% des produits vendus = {target}% du revenue",
             xaxis_title="% des Produits",
             yaxis_title="Revenue (€)",
             yaxis2=dict(
@@ -498,7 +607,7 @@ def update_pareto_chart(_):
                 side='right',
                 range=[0, 100]
             ),
-            template='plotly_dark',
+            template=TEMPLATE,
             height=400,
             hovermode='x unified',
             legend=dict(
@@ -515,7 +624,7 @@ def update_pareto_chart(_):
     except Exception as e:
         return go.Figure().update_layout(
             title=f"Erreur: {str(e)}",
-            template='plotly_dark',
+            template=TEMPLATE,
             height=500
         )
 
@@ -560,7 +669,7 @@ def update_scatter_traffic_conversion(_):
     
     fig.update_layout(
         title="Matrice Performance: Trafic vs Conversion (Top 100)",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=500
     )
     
@@ -569,15 +678,18 @@ def update_scatter_traffic_conversion(_):
 
 @callback(
     Output('category-funnel', 'figure'),
-    Input('category-funnel', 'id')
+    Input('category-revenue-quantile', 'value')
 )
-def update_category_funnel(_):
+def update_category_funnel(revenue_quantile):
     """Create funnel by category"""
     if df_products is None:
         return go.Figure()
     
+    # Catégories recalculées avec le seuil choisi (mêmes règles que le batch)
+    categories = product_analytics.categorize_products(df_products, revenue_quantile=revenue_quantile or 0.75)
+    
     # Aggregate by category
-    category_stats = df_products.groupby('category').agg({
+    category_stats = df_products.assign(category=categories).groupby('category').agg({
         'views': 'sum',
         'add_to_carts': 'sum',
         'purchases': 'sum',
@@ -586,17 +698,12 @@ def update_category_funnel(_):
     
     fig = go.Figure()
     
-    categories = category_stats['category'].tolist()
-    colors = {'Top Performer': '#2ecc71', 
-              'High Performer': '#3498db',
-              'Dead Stock': '#e74c3c'}
-    
     for idx, row in category_stats.iterrows():
         fig.add_trace(go.Bar(
             name=row['category'],
             x=['Views', 'Add to Cart', 'Purchases'],
             y=[row['views'], row['add_to_carts'], row['purchases']],
-            marker_color=colors.get(row['category'], '#95a5a6'),
+            marker_color=CATEGORY_COLORS.get(row['category'], '#95a5a6'),
             hovertemplate='<b>%{fullData.name}</b><br>' +
                          '%{x}: %{y:,.0f}<br>' +
                          '<extra></extra>'
@@ -606,7 +713,7 @@ def update_category_funnel(_):
         title="Distribution du Funnel par Catégorie",
         xaxis_title="Étape du Funnel",
         yaxis_title="Nombre",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=500,
         barmode='group',
         legend=dict(
@@ -622,55 +729,38 @@ def update_category_funnel(_):
 
 
 @callback(
-    Output('products-table', 'children'),
-    Input('products-table', 'id')
+    [Output('products-table', 'data'),
+     Output('products-table', 'page_count'),
+     Output('products-table', 'page_current'),
+     Output('products-table-count', 'children')],
+    [Input('products-table', 'page_current'),
+     Input('products-table', 'page_size'),
+     Input('products-table', 'sort_by'),
+     Input('products-category-filter', 'value'),
+     Input('products-search', 'value')]
 )
-def update_products_table(_):
-    """Create products data table"""
-    if df_products is None:
-        return html.P("Données non disponibles")
-    
-    # Top 50 products
-    top50 = df_products.nlargest(50, 'total_revenue')
-    
-    # Create table
-    table_header = [
-        html.Thead(html.Tr([
-            html.Th("Rank"),
-            html.Th("Produit ID"),
-            html.Th("Catégorie"),
-            html.Th("Users"),
-            html.Th("Views"),
-            html.Th("Carts"),
-            html.Th("Achats"),
-            html.Th("Conv. %"),
-            html.Th("Revenue"),
-            html.Th("AOV"),
-        ]))
-    ]
-    
-    table_body = [html.Tbody([
-        html.Tr([
-            html.Td(row['rank']),
-            html.Td(row['product_id']),
-            html.Td(html.Span(row['category'], 
-                   className=f"badge bg-{'success' if row['category']=='Top Performer' else 'primary' if row['category']=='High Performer' else 'danger'}")),
-            html.Td(f"{row['unique_users']:,.0f}"),
-            html.Td(f"{row['views']:,.0f}"),
-            html.Td(f"{row['add_to_carts']:,.0f}"),
-            html.Td(f"{row['purchases']:,.0f}"),
-            html.Td(f"{row['view_to_purchase_rate']:.2f}%"),
-            html.Td(f"€{row['total_revenue']:,.2f}"),
-            html.Td(f"€{row['avg_price']:.2f}"),
-        ]) for idx, row in top50.iterrows()
-    ])]
-    
-    return dbc.Table(
-        table_header + table_body,
-        bordered=True,
-        hover=True,
-        responsive=True,
-        striped=True,
-        size='sm',
-        className='table-sm'
+def update_products_table(page_current, page_size, sort_by, category, search):
+    """Return only the visible page of the products catalogue"""
+    if product_index is None:
+        return [], 0, 0, "Données non disponibles"
+    
+    sort_column = sort_by[0]['column_id'] if sort_by else 'total_revenue'
+    descending = sort_by[0]['direction'] == 'desc' if sort_by else True
+    
+    # A filter change goes back to the first page
+    if page_current is None or dash.ctx.triggered_id in ('products-category-filter', 'products-search'):
+        page_current = 0
+    
+    page, total = product_index.page(
+        sort_by=sort_column,
+        descending=descending,
+        page=page_current,
+        page_size=page_size,
+        category=category,
+        search=search
     )
+    
+    page = page.round({'view_to_purchase_rate': 2, 'total_revenue': 2, 'avg_price': 2})
+    page_count = max(-(-total // page_size), 1)
+    
+    return page.to_dict('records'), page_count, page_current, f"{total:,} produits"
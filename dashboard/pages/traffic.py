@@ -12,6 +12,9 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 
+from figures import time_series, visible_range, keep_zoom, TEMPLATE
+from rollup_store import store as rollups
+
 # Register this page
 dash.register_page(__name__, path='/traffic', name='Trafic & Utilisateurs')
 
@@ -291,19 +294,21 @@ layout = dbc.Container([
 # Callbacks
 @callback(
     Output('daily-traffic', 'figure'),
-    Input('daily-traffic', 'id')
+    Input('daily-traffic', 'relayoutData')
 )
-def update_daily_traffic(_):
+def update_daily_traffic(relayout_data):
     """Create daily traffic evolution chart"""
     if df_daily is None:
         return go.Figure()
     
+    x_range = visible_range(relayout_data)
     fig = go.Figure()
     
     # Daily users
-    fig.add_trace(go.Scatter(
-        x=df_daily['date'],
-        y=df_daily['unique_users'],
+    fig.add_trace(time_series(
+        df_daily['date'],
+        df_daily['unique_users'],
+        x_range,
         mode='lines',
         name='Users Quotidiens',
         line=dict(color='#3498db', width=1),
@@ -312,9 +317,10 @@ def update_daily_traffic(_):
     ))
     
     # 7-day moving average
-    fig.add_trace(go.Scatter(
-        x=df_daily['date'],
-        y=df_daily['ma7_users'],
+    fig.add_trace(time_series(
+        df_daily['date'],
+        df_daily['ma7_users'],
+        x_range,
         mode='lines',
         name='Moyenne Mobile 7j',
         line=dict(color='#e74c3c', width=3),
@@ -330,11 +336,12 @@ def update_daily_traffic(_):
         marker=dict(color='#f39c12', size=6, symbol='diamond'),
     ))
     
+    keep_zoom(fig, x_range)
     fig.update_layout(
         title="Trafic Quotidien avec Moyenne Mobile 7 Jours",
         xaxis_title="Date",
         yaxis_title="Utilisateurs Uniques",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=450,
         hovermode='x unified',
         legend=dict(
@@ -351,19 +358,21 @@ def update_daily_traffic(_):
 
 @callback(
     Output('sessions-events', 'figure'),
-    Input('sessions-events', 'id')
+    Input('sessions-events', 'relayoutData')
 )
-def update_sessions_events(_):
+def update_sessions_events(relayout_data):
     """Create sessions and events chart"""
     if df_daily is None:
         return go.Figure()
     
+    x_range = visible_range(relayout_data)
     fig = go.Figure()
     
     # Sessions
-    fig.add_trace(go.Scatter(
-        x=df_daily['date'],
-        y=df_daily['unique_sessions'],
+    fig.add_trace(time_series(
+        df_daily['date'],
+        df_daily['unique_sessions'],
+        x_range,
         mode='lines',
         name='Sessions',
         line=dict(color='#2ecc71', width=2),
@@ -371,21 +380,23 @@ def update_sessions_events(_):
     ))
     
     # Events
-    fig.add_trace(go.Scatter(
-        x=df_daily['date'],
-        y=df_daily['total_events'],
+    fig.add_trace(time_series(
+        df_daily['date'],
+        df_daily['total_events'],
+        x_range,
         mode='lines',
         name='Événements',
         line=dict(color='#9b59b6', width=2),
         yaxis='y2'
     ))
     
+    keep_zoom(fig, x_range)
     fig.update_layout(
         title="Sessions et Événements Quotidiens",
         xaxis_title="Date",
         yaxis=dict(title="Sessions", side='left'),
         yaxis2=dict(title="Événements", overlaying='y', side='right'),
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400,
         hovermode='x unified',
         legend=dict(
@@ -439,7 +450,7 @@ def update_weekday_traffic(_):
         title="Trafic Moyen par Jour de la Semaine",
         xaxis_title="Jour",
         yaxis_title="Utilisateurs Moyens",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400,
         showlegend=False
     )
@@ -485,7 +496,7 @@ def update_user_segments(_):
         xaxis_title="Segment",
         yaxis=dict(title="Nombre d'Utilisateurs", side='left'),
         yaxis2=dict(title="Transactions/User", overlaying='y', side='right'),
-        template='plotly_dark',
+        template=TEMPLATE,
         height=450,
         barmode='group',
         legend=dict(
@@ -533,7 +544,7 @@ def update_segment_revenue(_):
         title="Revenue Total par Segment",
         xaxis_title="Segment",
         yaxis_title="Revenue (€)",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=450,
         showlegend=False
     )
@@ -547,11 +558,20 @@ def update_segment_revenue(_):
 )
 def update_weekly_growth(_):
     """Create weekly growth chart"""
-    if df_weekly is None:
+    if rollups is not None:
+        # Niveau semaine du store (somme des utilisateurs uniques quotidiens)
+        weekly = rollups.query(level='week', metrics=['unique_users'], rates=False)
+        df_growth = pd.DataFrame({
+            'week_start': weekly['period'],
+            'users_growth_pct': weekly['unique_users'].pct_change() * 100,
+        })
+    elif df_weekly is not None:
+        df_growth = df_weekly
+    else:
         return go.Figure()
     
     # Skip first week (no growth data)
-    df_growth = df_weekly[df_weekly['users_growth_pct'].notna()].copy()
+    df_growth = df_growth[df_growth['users_growth_pct'].notna()].copy()
     
     fig = go.Figure()
     
@@ -574,7 +594,7 @@ def update_weekly_growth(_):
         title="Croissance Hebdomadaire des Utilisateurs",
         xaxis_title="Semaine",
         yaxis_title="Croissance (%)",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400,
         showlegend=False
     )
@@ -611,7 +631,7 @@ def update_engagement_metrics(_):
         title="Engagement Quotidien (Événements par Utilisateur)",
         xaxis_title="Date",
         yaxis_title="Événements/User",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400,
         showlegend=False
     )
@@ -643,7 +663,7 @@ def update_segment_distribution(_):
     
     fig.update_layout(
         title="Distribution des Segments",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400,
         showlegend=True
     )
@@ -707,7 +727,7 @@ def update_weekend_comparison(_):
         title="Comparaison Weekend vs Semaine (Moyennes)",
         xaxis_title="Période",
         yaxis_title="Volume",
-        template='plotly_dark',
+        template=TEMPLATE,
         height=400,
         barmode='group',
         legend=dict(
@@ -0,0 +1,141 @@
+"""
+Index en mémoire du catalogue produits (products_summary)
+Tableaux d'ordre pré-calculés par colonne de tri et par catégorie : une page
+du tableau produits se lit par découpage d'indices, sans trier ni filtrer
+tout le catalogue à chaque interaction.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Colonnes affichées dans le tableau produits
+TABLE_COLUMNS = [
+    'rank', 'product_id', 'category', 'unique_users', 'views',
+    'add_to_carts', 'purchases', 'view_to_purchase_rate',
+    'total_revenue', 'avg_price',
+]
+
+# Colonnes triables (un tableau d'ordre par colonne)
+SORT_COLUMNS = [
+    'rank', 'product_id', 'unique_users', 'views', 'add_to_carts',
+    'purchases', 'view_to_purchase_rate', 'total_revenue', 'avg_price',
+]
+
+DEFAULT_SORT = 'total_revenue'
+
+
+class ProductIndex:
+    """
+    Index trié du catalogue produits
+
+    Pour chaque colonne triable, l'ordre croissant des lignes est stocké une
+    fois (valeurs manquantes en fin), globalement et par catégorie. Une page
+    triée dans un sens ou dans l'autre est alors un simple découpage : son coût
+    dépend de la taille de la page, pas de celle du catalogue.
+
+    Usage:
+        index = ProductIndex(df_products)
+        rows, total = index.page(sort_by='views', descending=True, page=3)
+    """
+
+    def __init__(self, df, columns=TABLE_COLUMNS, sort_columns=SORT_COLUMNS,
+                 category_col='category', id_col='product_id'):
+        columns = [c for c in columns if c in df.columns]
+        self.data = df[columns].reset_index(drop=True)
+        self.sort_columns = [c for c in sort_columns if c in df.columns]
+
+        codes, categories = pd.factorize(self.data[category_col], sort=True)
+        self.categories = list(categories)
+        self._category_codes = {category: code for code, category in enumerate(self.categories)}
+
+        # (colonne, code catégorie ou -1) -> (ordre croissant, nb de valeurs non manquantes)
+        self._orders = {}
+        self._ranks = {}
+        self._missing = {}
+        for col in self.sort_columns:
+            values = self.data[col]
+            missing = values.isna().to_numpy()
+            if pd.api.types.is_numeric_dtype(values):
+                keys = values.to_numpy(dtype=np.float64, na_value=np.inf)
+            else:
+                keys = np.asarray(values.astype(str), dtype=str)
+            self._missing[col] = missing
+            order = np.lexsort((keys, missing)).astype(np.int32)
+            self._orders[(col, -1)] = (order, int((~missing).sum()))
+
+            rank = np.empty(len(order), dtype=np.int32)
+            rank[order] = np.arange(len(order), dtype=np.int32)
+            self._ranks[col] = rank
+
+            ordered_codes = codes[order]
+            ordered_missing = missing[order]
+            for code in range(len(self.categories)):
+                in_category = ordered_codes == code
+                self._orders[(col, code)] = (
+                    order[in_category],
+                    int((in_category & ~ordered_missing).sum())
+                )
+
+        # Recherche par préfixe d'identifiant produit
+        ids = np.asarray(self.data[id_col].astype(str), dtype=str)
+        self._id_order = np.argsort(ids, kind='stable').astype(np.int32)
+        self._ids_sorted = ids[self._id_order]
+        self._codes = codes
+
+    def __len__(self):
+        return len(self.data)
+
+    def _search(self, prefix):
+        """Lignes dont l'identifiant commence par prefix (recherche dichotomique)"""
+        start = np.searchsorted(self._ids_sorted, prefix, side='left')
+        stop = np.searchsorted(self._ids_sorted, prefix + '\uffff', side='right')
+        return self._id_order[start:stop]
+
+    @staticmethod
+    def _positions(start, stop, n_valid, descending):
+        """Positions dans l'ordre croissant pour une page, valeurs manquantes toujours en fin"""
+        idx = np.arange(start, stop)
+        if not descending:
+            return idx
+        return np.where(idx < n_valid, n_valid - 1 - idx, idx)
+
+    def page(self, sort_by=DEFAULT_SORT, descending=True, page=0, page_size=25,
+             category=None, search=None):
+        """
+        Page du catalogue triée et filtrée
+
+        Args:
+            sort_by (str): Colonne de tri (voir SORT_COLUMNS)
+            descending (bool): Tri décroissant
+            page (int): Numéro de page (0 = première)
+            page_size (int): Nombre de lignes par page
+            category (str, optional): Filtre sur la catégorie
+            search (str, optional): Préfixe d'identifiant produit
+
+        Returns:
+            tuple: (DataFrame de la page, nombre total de lignes filtrées)
+        """
+        if sort_by not in self.sort_columns:
+            sort_by = DEFAULT_SORT
+
+        code = -1
+        if category:
+            if category not in self._category_codes:
+                return self.data.iloc[0:0], 0
+            code = self._category_codes[category]
+
+        if search:
+            # Coût proportionnel au nombre de correspondances, pas au catalogue
+            rows = self._search(str(search).strip())
+            if code >= 0:
+                rows = rows[self._codes[rows] == code]
+            rows = rows[np.argsort(self._ranks[sort_by][rows], kind='stable')]
+            order, n_valid = rows, int((~self._missing[sort_by][rows]).sum())
+        else:
+            order, n_valid = self._orders[(sort_by, code)]
+
+        total = len(order)
+        start = min(max(int(page), 0) * page_size, total)
+        stop = min(start + page_size, total)
+        rows = order[self._positions(start, stop, n_valid, descending)]
+        return self.data.iloc[rows], total
@@ -0,0 +1,243 @@
+"""
+Routage rapide des requêtes du dashboard
+Classe chaque chemin une seule fois (arbre de préfixes pré-compilé) pour que
+les hooks Flask sachent immédiatement quoi faire, sert les fichiers /assets/
+depuis la mémoire sans passer par Flask, et applique des en-têtes
+de sécurité pré-calculés.
+"""
+
+import hashlib
+import mimetypes
+import os
+from collections import namedtuple
+from functools import lru_cache
+
+from compression import COMPRESSIBLE_MIMETYPES, MIN_SIZE, choose_encoding, compress
+
+# Traitement à appliquer à une classe de chemins
+#   public: accessible sans authentification
+#   rate_limit: None, 'general' ou 'sensitive'
+#   log: journaliser la requête et la réponse
+RouteClass = namedtuple('RouteClass', ['name', 'public', 'rate_limit', 'log'])
+
+STATIC = RouteClass('static', public=True, rate_limit=None, log=False)
+DASH_BOOT = RouteClass('dash_boot', public=True, rate_limit=None, log=False)
+DASH_CALLBACK = RouteClass('dash_callback', public=True, rate_limit=None, log=True)
+LANDING = RouteClass('landing', public=True, rate_limit='general', log=True)
+LOGIN = RouteClass('login', public=True, rate_limit='sensitive', log=True)
+API = RouteClass('api', public=False, rate_limit='sensitive', log=True)
+HEALTH = RouteClass('health', public=False, rate_limit=None, log=True)
+PAGE = RouteClass('page', public=False, rate_limit='general', log=True)
+
+# (préfixe, classe, correspondance exacte)
+ROUTES = [
+    ('/assets/', STATIC, False),
+    ('/_dash-component-suites/', STATIC, False),
+    ('/_dash-layout', DASH_BOOT, False),
+    ('/_dash-dependencies', DASH_BOOT, False),
+    ('/_dash', DASH_CALLBACK, False),
+    ('/', LANDING, True),
+    ('/login', LOGIN, False),
+    ('/logout', LANDING, False),
+    ('/api/', API, False),
+    ('/health', HEALTH, False),
+]
+
+# Cache navigateur des fichiers statiques
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE = 'no-cache'
+
+# En-têtes de sécurité, construits une seule fois
+SECURITY_HEADERS = {
+    # Prevent clickjacking attacks
+    'X-Frame-Options': 'SAMEORIGIN',
+    # Prevent MIME type sniffing
+    'X-Content-Type-Options': 'nosniff',
+    # Enable XSS protection in older browsers
+    'X-XSS-Protection': '1; mode=block',
+    # Content Security Policy - restrict resource loading
+    # Ajout de media-src pour l'assistant vocal et domaines CDN nécessaires
+    'Content-Security-Policy': (
+        "default-src 'self'; "
+        "script-src 'self' 'unsafe-inline' 'unsafe-eval' https://cdn.jsdelivr.net https://cdn.plot.ly https://cdnjs.cloudflare.com; "
+        "style-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net https://fonts.googleapis.com https://cdnjs.cloudflare.com; "
+        "font-src 'self' https://cdn.jsdelivr.net https://fonts.gstatic.com https://cdnjs.cloudflare.com; "
+        "img-src 'self' data: https:; "
+        "connect-src 'self' https://cdn.jsdelivr.net; "
+        "media-src 'self' blob:"
+    ),
+    # Control referrer information
+    'Referrer-Policy': 'strict-origin-when-cross-origin',
+    # Permissions policy (formerly Feature-Policy)
+    # Autoriser le microphone pour l'assistant vocal (permissif pour localhost)
+    'Permissions-Policy': (
+        'geolocation=(), microphone=*, camera=(), '
+        'payment=(), usb=(), magnetometer=(), gyroscope=()'
+    ),
+    # HSTS for HTTPS enforcement (enable in production with HTTPS)
+    # 'Strict-Transport-Security': 'max-age=31536000; includeSubDomains',
+}
+
+
+class PrefixTrie:
+    """
+    Arbre de préfixes caractère par caractère
+
+    match() renvoie la valeur du plus long préfixe enregistré (ou d'une
+    entrée exacte) en un seul parcours du chemin.
+    """
+
+    _VALUE = object()
+    _EXACT = object()
+
+    def __init__(self, routes=()):
+        self._root = {}
+        for prefix, value, exact in routes:
+            self.add(prefix, value, exact)
+
+    def add(self, prefix, value, exact=False):
+        node = self._root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node[self._EXACT if exact else self._VALUE] = value
+
+    def match(self, path, default=None):
+        node = self._root
+        best = default
+        for char in path:
+            if self._VALUE in node:
+                best = node[self._VALUE]
+            node = node.get(char)
+            if node is None:
+                return best
+        if self._EXACT in node:
+            return node[self._EXACT]
+        return node.get(self._VALUE, best)
+
+
+_ROUTE_TRIE = PrefixTrie(ROUTES)
+
+
+@lru_cache(maxsize=4096)
+def classify(path):
+    """Classe d'un chemin (mise en cache : les chemins d'une app Dash sont peu nombreux)"""
+    return _ROUTE_TRIE.match(path, PAGE)
+
+
+def is_fingerprinted(query_string):
+    """URL versionnée par Dash (?m=<mtime> des assets, ?v= des bundles)"""
+    return any(part.startswith(('m=', 'v=')) for part in query_string.split('&'))
+
+
+class _Asset:
+    """Fichier statique chargé en mémoire avec ses variantes compressées"""
+
+    __slots__ = ('mtime', 'body', 'etag', 'mimetype', 'content_type', 'encoded')
+
+    def __init__(self, full_path, mtime):
+        with open(full_path, 'rb') as f:
+            self.body = f.read()
+        self.mtime = mtime
+        self.etag = '"' + hashlib.blake2b(self.body, digest_size=12).hexdigest() + '"'
+        self.mimetype = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+        is_text = self.mimetype.startswith('text/') or self.mimetype.endswith('javascript')
+        self.content_type = self.mimetype + ('; charset=utf-8' if is_text else '')
+        self.encoded = {}
+
+    def content(self, encoding):
+        """Corps à envoyer pour un encodage (compressé une seule fois)"""
+        if (encoding is None
+                or self.mimetype not in COMPRESSIBLE_MIMETYPES
+                or len(self.body) < MIN_SIZE):
+            return self.body, None
+        if encoding not in self.encoded:
+            self.encoded[encoding] = compress(self.body, encoding)
+        return self.encoded[encoding], encoding
+
+
+class AssetsMiddleware:
+    """
+    Middleware WSGI servant /assets/ sans passer par Flask
+
+    Les fichiers sont gardés en mémoire (rechargés si leur mtime change) avec
+    un ETag et leurs versions gzip/brotli. Les URLs versionnées par Dash
+    (?m=<mtime>) sont mises en cache un an par le navigateur, les autres
+    sont revalidées par ETag. Les requêtes non gérées passent à l'application.
+    """
+
+    def __init__(self, app, assets_folder, url_prefix='/assets/', headers=SECURITY_HEADERS):
+        self.app = app
+        self.assets_folder = os.path.realpath(assets_folder)
+        self.url_prefix = url_prefix
+        self.headers = list(headers.items())
+        self._assets = {}
+
+    def _load(self, relative_path):
+        full_path = os.path.realpath(os.path.join(self.assets_folder, relative_path))
+        if not full_path.startswith(self.assets_folder + os.sep):
+            return None
+        try:
+            mtime = os.stat(full_path).st_mtime_ns
+        except OSError:
+            return None
+
+        asset = self._assets.get(full_path)
+        if asset is None or asset.mtime != mtime:
+            try:
+                asset = _Asset(full_path, mtime)
+            except OSError:
+                return None
+            self._assets[full_path] = asset
+        return asset
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        method = environ.get('REQUEST_METHOD', 'GET')
+        if not path.startswith(self.url_prefix) or method not in ('GET', 'HEAD'):
+            return self.app(environ, start_response)
+
+        asset = self._load(path[len(self.url_prefix):])
+        if asset is None:
+            return self.app(environ, start_response)
+
+        cache_control = IMMUTABLE_CACHE if is_fingerprinted(environ.get('QUERY_STRING', '')) \
+            else REVALIDATE_CACHE
+        headers = [
+            ('ETag', asset.etag),
+            ('Cache-Control', cache_control),
+            ('Vary', 'Accept-Encoding'),
+        ] + self.headers
+
+        if asset.etag in environ.get('HTTP_IF_NONE_MATCH', ''):
+            start_response('304 Not Modified', headers)
+            return [b'']
+
+        body, encoding = asset.content(choose_encoding(environ.get('HTTP_ACCEPT_ENCODING', '')))
+        headers.append(('Content-Type', asset.content_type))
+        headers.append(('Content-Length', str(len(body))))
+        if encoding:
+            headers.append(('Content-Encoding', encoding))
+
+        start_response('200 OK', headers)
+        return [b''] if method == 'HEAD' else [body]
+
+
+def setup_request_routing(app, assets_folder, url_prefix='/assets/'):
+    """
+    Active le routage rapide sur l'application Flask
+
+    Args:
+        app: Instance Flask/Dash server
+        assets_folder: Dossier des assets Dash (app.config.assets_folder)
+        url_prefix: Préfixe d'URL des assets
+    """
+    app.wsgi_app = AssetsMiddleware(app.wsgi_app, assets_folder, url_prefix)
+
+    @app.after_request
+    def add_security_headers(response):
+        """Ajoute les en-têtes de sécurité pré-calculés"""
+        response.headers.update(SECURITY_HEADERS)
+        return response
+
+    print("✅ Routage rapide activé")
+    print(f"   - {url_prefix} servi depuis la mémoire (cache navigateur 1 an si versionné)")
@@ -0,0 +1,17 @@
+"""
+Store d'agrégats temporels partagé par les pages (data/clean/rollups)
+Chargé une fois par processus ; les pages interrogent le niveau adapté
+(semaine, mois...) au lieu de ré-agréger les tables quotidiennes.
+None si scripts/data_prep/build_rollups.py n'a pas encore été exécuté.
+"""
+
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+from src.kpis.rollups import RollupStore
+
+ROLLUP_DIR = PROJECT_ROOT / 'data' / 'clean' / 'rollups'
+
+store = RollupStore.load(ROLLUP_DIR)
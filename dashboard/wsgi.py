@@ -0,0 +1,20 @@
+"""
+Point d'entrée WSGI de production
+Importe l'application Dash (pages et DataFrames de data/clean compris) puis
+gèle le ramasse-miettes : les objets chargés ne sont plus parcourus par les
+collections des workers, dont les pages mémoire restent ainsi partagées avec
+le maître (copy-on-write) au lieu d'être recopiées.
+
+Usage:
+    gunicorn -c gunicorn_conf.py wsgi:application
+"""
+
+import gc
+
+from app import app, server
+
+application = server
+
+# Objets du chargement déplacés dans la génération permanente
+gc.collect()
+gc.freeze()
@@ -16,4 +16,5 @@ __all__ = [
     "create_full_dashboard",
     "create_monitoring_dashboard",
     "create_prometheus_dashboard",
+    "provisioning",
 ]
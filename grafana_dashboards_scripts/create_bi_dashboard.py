@@ -358,20 +358,22 @@ dashboard = {
     "message": "Business Intelligence Dashboard"
 }
 
-response = requests.post(
-    'http://localhost:3000/api/dashboards/db',
-    json=dashboard,
-    auth=('admin', 'admin123')
-)
+# Envoi seulement en exécution directe : provisioning.py importe la définition
+if __name__ == '__main__':
+    response = requests.post(
+        'http://localhost:3000/api/dashboards/db',
+        json=dashboard,
+        auth=('admin', 'admin123')
+    )
 
-print("Status:", response.status_code)
-print("Response:", json.dumps(response.json(), indent=2))
+    print("Status:", response.status_code)
+    print("Response:", json.dumps(response.json(), indent=2))
 
-if response.status_code == 200:
-    print("\n=== Dashboard BI cree avec succes! ===")
-    print("URL: http://localhost:3000/d/ecommerce-bi")
-    print("\nContenu:")
-    print("- KPIs strategiques (Revenue/user, Revenue/session, Efficacite)")
-    print("- Variantes gagnantes avec recommandations")
-    print("- Performance conversion et revenue par variante")
-    print("- Recommandations strategiques actionnables")
+    if response.status_code == 200:
+        print("\n=== Dashboard BI cree avec succes! ===")
+        print("URL: http://localhost:3000/d/ecommerce-bi")
+        print("\nContenu:")
+        print("- KPIs strategiques (Revenue/user, Revenue/session, Efficacite)")
+        print("- Variantes gagnantes avec recommandations")
+        print("- Performance conversion et revenue par variante")
+        print("- Recommandations strategiques actionnables")
@@ -482,22 +482,24 @@ dashboards.append({
     "uid": "ecommerce-forecast"
 })
 
-# Create all dashboards
-for dashboard_config in dashboards:
-    response = requests.post(
-        f'{GRAFANA_URL}/api/dashboards/db',
-        json={"dashboard": dashboard_config["dashboard"], "overwrite": True},
-        auth=(GRAFANA_USER, GRAFANA_PASSWORD)
-    )
+# Envoi seulement en exécution directe : provisioning.py importe la définition
+if __name__ == '__main__':
+    # Create all dashboards
+    for dashboard_config in dashboards:
+        response = requests.post(
+            f'{GRAFANA_URL}/api/dashboards/db',
+            json={"dashboard": dashboard_config["dashboard"], "overwrite": True},
+            auth=(GRAFANA_USER, GRAFANA_PASSWORD)
+        )
     
-    title = dashboard_config["dashboard"]["title"]
-    uid = dashboard_config["uid"]
+        title = dashboard_config["dashboard"]["title"]
+        uid = dashboard_config["uid"]
     
-    if response.status_code == 200:
-        print(f"✓ {title}")
-        print(f"  URL: http://localhost:3000/d/{uid}")
-    else:
-        print(f"✗ {title}: Error {response.status_code}")
+        if response.status_code == 200:
+            print(f"✓ {title}")
+            print(f"  URL: http://localhost:3000/d/{uid}")
+        else:
+            print(f"✗ {title}: Error {response.status_code}")
 
-print("\n=== 3 derniers dashboards crees ===")
-print("\n🎉 TOTAL: 6 nouveaux dashboards + 2 existants = 8 dashboards operationnels!")
+    print("\n=== 3 derniers dashboards crees ===")
+    print("\n🎉 TOTAL: 6 nouveaux dashboards + 2 existants = 8 dashboards operationnels!")
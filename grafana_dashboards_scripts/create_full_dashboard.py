@@ -339,22 +339,24 @@ dashboard = {
     "message": "Complete A/B test dashboard with Prometheus"
 }
 
-response = requests.post(
-    'http://localhost:3000/api/dashboards/db',
-    json=dashboard,
-    auth=('admin', 'admin123')
-)
+# Envoi seulement en exécution directe : provisioning.py importe la définition
+if __name__ == '__main__':
+    response = requests.post(
+        'http://localhost:3000/api/dashboards/db',
+        json=dashboard,
+        auth=('admin', 'admin123')
+    )
 
-print("Status:", response.status_code)
-print("Response:", json.dumps(response.json(), indent=2))
+    print("Status:", response.status_code)
+    print("Response:", json.dumps(response.json(), indent=2))
 
-if response.status_code == 200:
-    print("\n=== Dashboard cree avec succes! ===")
-    print("URL: http://localhost:3000/d/ecommerce-full")
-    print("\nLe dashboard contient:")
-    print("- 6 KPIs principaux (Users, Revenue, Conversion Rate, AOV, Orders, Sessions)")
-    print("- Visualisations des visiteurs par variante")
-    print("- Taux de conversion par variante")
-    print("- Revenue par variante")
-    print("- Conversions par variante")
-    print("- Tableau detaille avec toutes les metriques A/B test")
+    if response.status_code == 200:
+        print("\n=== Dashboard cree avec succes! ===")
+        print("URL: http://localhost:3000/d/ecommerce-full")
+        print("\nLe dashboard contient:")
+        print("- 6 KPIs principaux (Users, Revenue, Conversion Rate, AOV, Orders, Sessions)")
+        print("- Visualisations des visiteurs par variante")
+        print("- Taux de conversion par variante")
+        print("- Revenue par variante")
+        print("- Conversions par variante")
+        print("- Tableau detaille avec toutes les metriques A/B test")
@@ -380,26 +380,28 @@ dashboard = {
     "overwrite": True
 }
 
-# Upload to Grafana
-url = f'{GRAFANA_URL}/api/dashboards/db'
-auth = (GRAFANA_USER, GRAFANA_PASSWORD)
+# Envoi seulement en exécution directe : provisioning.py importe la définition
+if __name__ == '__main__':
+    # Upload to Grafana
+    url = f'{GRAFANA_URL}/api/dashboards/db'
+    auth = (GRAFANA_USER, GRAFANA_PASSWORD)
 
-response = requests.post(url, json=dashboard, auth=auth)
+    response = requests.post(url, json=dashboard, auth=auth)
 
-if response.status_code == 200:
-    result = response.json()
-    print(f"✅ Dashboard 'E-Commerce Monitoring Dashboard' créé avec succès!")
-    print(f"   URL: http://localhost:3000/d/{result['uid']}")
-    print(f"   Version: {result['version']}")
-    print(f"\n📊 Panels créés:")
-    print(f"   1. Sessions (stat)")
-    print(f"   2. Conversion Rate (stat)")
-    print(f"   3. Total Revenue (stat)")
-    print(f"   4. Errors (stat)")
-    print(f"   5. Sessions Trend (timeseries)")
-    print(f"   6. Revenue Trend (timeseries)")
-    print(f"   7. Conversion Rate Trend (timeseries)")
-    print(f"   8. Errors Over Time (timeseries)")
-else:
-    print(f"❌ Erreur: {response.status_code}")
-    print(response.text)
+    if response.status_code == 200:
+        result = response.json()
+        print(f"✅ Dashboard 'E-Commerce Monitoring Dashboard' créé avec succès!")
+        print(f"   URL: http://localhost:3000/d/{result['uid']}")
+        print(f"   Version: {result['version']}")
+        print(f"\n📊 Panels créés:")
+        print(f"   1. Sessions (stat)")
+        print(f"   2. Conversion Rate (stat)")
+        print(f"   3. Total Revenue (stat)")
+        print(f"   4. Errors (stat)")
+        print(f"   5. Sessions Trend (timeseries)")
+        print(f"   6. Revenue Trend (timeseries)")
+        print(f"   7. Conversion Rate Trend (timeseries)")
+        print(f"   8. Errors Over Time (timeseries)")
+    else:
+        print(f"❌ Erreur: {response.status_code}")
+        print(response.text)
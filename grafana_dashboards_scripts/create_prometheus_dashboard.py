@@ -169,15 +169,17 @@ dashboard = {
     "message": "Prometheus-based dashboard"
 }
 
-response = requests.post(
-    'http://localhost:3000/api/dashboards/db',
-    json=dashboard,
-    auth=('admin', 'admin123')
-)
+# Envoi seulement en exécution directe : provisioning.py importe la définition
+if __name__ == '__main__':
+    response = requests.post(
+        'http://localhost:3000/api/dashboards/db',
+        json=dashboard,
+        auth=('admin', 'admin123')
+    )
 
-print("Status:", response.status_code)
-print("Response:", json.dumps(response.json(), indent=2))
+    print("Status:", response.status_code)
+    print("Response:", json.dumps(response.json(), indent=2))
 
-if response.status_code == 200:
-    print("\nDashboard created successfully!")
-    print("URL: http://localhost:3000/d/ecommerce-prometheus")
+    if response.status_code == 200:
+        print("\nDashboard created successfully!")
+        print("URL: http://localhost:3000/d/ecommerce-prometheus")
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+Provisioning des dashboards Grafana en une passe
+
+Les définitions des scripts create_*.py sont chargées en processus (leur
+envoi n'a lieu qu'en exécution directe), puis comparées à la version en
+place dans Grafana : empreinte SHA-256 du JSON normalisé de chaque côté,
+hors id et version que Grafana réattribue à chaque sauvegarde. Seuls les
+dashboards absents ou modifiés sont envoyés. Lectures et envois passent
+par une seule session HTTP (connexions réutilisées) et sont faits en
+parallèle, un dashboard par tâche.
+
+Usage:
+    python grafana_dashboards_scripts/provisioning.py [--jobs 8] [--dry-run] [--force]
+
+Variables d'environnement:
+    GRAFANA_URL      - URL de Grafana (défaut: http://localhost:3000)
+    GRAFANA_USER     - Utilisateur Grafana (défaut: admin)
+    GRAFANA_PASSWORD - Mot de passe Grafana (défaut: admin123)
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+# Scripts de définition, dans l'ordre d'affichage
+DASHBOARD_SCRIPTS = [
+    ("create_dashboards_1_3.py", "Dashboards 1-3 (Funnel, Segmentation, Products)"),
+    ("create_dashboards_4_6.py", "Dashboards 4-6 (Cohorts, Real-Time, Predictive)"),
+    ("create_bi_dashboard.py", "Business Intelligence Dashboard"),
+    ("create_full_dashboard.py", "E-Commerce A/B Test Analytics Dashboard"),
+    ("create_monitoring_dashboard.py", "Monitoring Dashboard"),
+    ("create_prometheus_dashboard.py", "Prometheus Dashboard"),
+]
+
+# Clés réattribuées par Grafana à chaque sauvegarde, hors empreinte
+VOLATILE_KEYS = ('id', 'version')
+
+DEFAULT_JOBS = 8
+
+
+def load_module(path):
+    """Import d'un script de définition par son chemin"""
+    path = Path(path)
+    spec = importlib.util.spec_from_file_location(f'grafana_dashboards_scripts.{path.stem}', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def module_payloads(module):
+    """Payloads d'un script : liste `dashboards` ou payload unique `dashboard`"""
+    payloads = getattr(module, 'dashboards', None)
+    return payloads if payloads is not None else [module.dashboard]
+
+
+def load_dashboards(scripts=None, directory=SCRIPTS_DIR):
+    """
+    Charge toutes les définitions de dashboards
+
+    Args:
+        scripts (list, optional): noms de fichiers (tous ceux de DASHBOARD_SCRIPTS par défaut)
+        directory (Path): dossier des scripts
+
+    Returns:
+        list: un dict par dashboard (script, model, message)
+
+    Raises:
+        ValueError: dashboard sans uid ou uid en double
+    """
+    scripts = scripts or [name for name, _ in DASHBOARD_SCRIPTS]
+    entries = []
+    seen = {}
+    for name in scripts:
+        for payload in module_payloads(load_module(Path(directory) / name)):
+            model = payload['dashboard']
+            uid = model.get('uid')
+            if not uid:
+                raise ValueError(f"Dashboard sans uid dans {name}: {model.get('title')}")
+            if uid in seen:
+                raise ValueError(f"uid {uid} défini dans {seen[uid]} et {name}")
+            seen[uid] = name
+            entries.append({
+                'script': name,
+                'model': model,
+                'message': payload.get('message', f'Provisioned from {name}'),
+            })
+    return entries
+
+
+def content_hash(model):
+    """Empreinte du modèle JSON, indépendante de l'ordre des clés, id et version exclus"""
+    normalized = {key: value for key, value in model.items() if key not in VOLATILE_KEYS}
+    encoded = json.dumps(normalized, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class GrafanaClient:
+    """API dashboards de Grafana sur une session HTTP partagée entre les threads"""
+
+    def __init__(self, url, user, password, timeout=10, pool_size=DEFAULT_JOBS):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.auth = (user, password)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get_dashboard(self, uid):
+        """Modèle en place (None si le dashboard n'existe pas)"""
+        response = self.session.get(f'{self.url}/api/dashboards/uid/{uid}', timeout=self.timeout)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()['dashboard']
+
+    def save_dashboard(self, model, message=''):
+        """Création ou remplacement (overwrite) d'un dashboard"""
+        response = self.session.post(
+            f'{self.url}/api/dashboards/db',
+            json={'dashboard': model, 'overwrite': True, 'message': message},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def provision_dashboard(client, entry, force=False, dry_run=False):
+    """
+    Envoie un dashboard si son empreinte diffère de celle en place
+
+    Returns:
+        dict: uid, title, script, status (created, updated, unchanged,
+        planned ou failed) et error
+    """
+    model = entry['model']
+    result = {'uid': model['uid'], 'title': model.get('title', model['uid']),
+              'script': entry['script'], 'status': None, 'error': None}
+    try:
+        current = client.get_dashboard(model['uid'])
+        if current is not None and not force and content_hash(current) == content_hash(model):
+            result['status'] = 'unchanged'
+        elif dry_run:
+            result['status'] = 'planned'
+        else:
+            client.save_dashboard(model, entry['message'])
+            result['status'] = 'created' if current is None else 'updated'
+    except (requests.RequestException, ValueError) as e:
+        result['status'] = 'failed'
+        result['error'] = str(e)
+    return result
+
+
+def provision(client, entries, jobs=DEFAULT_JOBS, force=False, dry_run=False):
+    """
+    Provisioning concurrent des dashboards
+
+    Returns:
+        list: résultats de provision_dashboard, dans l'ordre de entries
+    """
+    if not entries:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(entries)))) as pool:
+        return list(pool.map(lambda entry: provision_dashboard(client, entry, force, dry_run), entries))
+
+
+def client_from_env(pool_size=DEFAULT_JOBS):
+    """Client configuré par GRAFANA_URL, GRAFANA_USER et GRAFANA_PASSWORD"""
+    return GrafanaClient(
+        os.getenv('GRAFANA_URL', 'http://localhost:3000'),
+        os.getenv('GRAFANA_USER', 'admin'),
+        os.getenv('GRAFANA_PASSWORD', 'admin123'),
+        pool_size=pool_size,
+    )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Provisioning des dashboards Grafana")
+    parser.add_argument('--jobs', '-j', type=int, default=DEFAULT_JOBS,
+                        help="Requêtes concurrentes vers Grafana")
+    parser.add_argument('--force', action='store_true',
+                        help="Envoie tous les dashboards, même inchangés")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Affiche les dashboards à envoyer sans rien modifier")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    entries = load_dashboards()
+    with client_from_env(pool_size=args.jobs) as client:
+        print(f"Grafana: {client.url} ({len(entries)} dashboards)")
+        results = provision(client, entries, jobs=args.jobs, force=args.force, dry_run=args.dry_run)
+
+    for result in results:
+        line = f"  {result['status']:<9} {result['uid']:<24} {result['title']}"
+        print(line + (f" -> {result['error']}" if result['error'] else ''))
+    failed = sum(result['status'] == 'failed' for result in results)
+    uploaded = sum(result['status'] in ('created', 'updated') for result in results)
+    print(f"{uploaded} envoyés, {len(results) - uploaded - failed} sans envoi, {failed} en échec")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
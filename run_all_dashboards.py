@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-Script pour exécuter tous les scripts de création de dashboards dans l'ordre.
+Script pour créer ou mettre à jour tous les dashboards Grafana.
+
+Les définitions de grafana_dashboards_scripts/ sont chargées en processus ;
+seuls les dashboards absents ou modifiés dans Grafana sont envoyés, en
+parallèle sur une session HTTP partagée (voir grafana_dashboards_scripts/provisioning.py).
 
 Usage:
-    python run_all_dashboards.py
+    python run_all_dashboards.py [--jobs 8] [--dry-run] [--force]
 
 Variables d'environnement:
     GRAFANA_URL      - URL de Grafana (défaut: http://localhost:3000)
@@ -15,8 +19,10 @@ Variables d'environnement:
 import os
 import sys
 import time
-import subprocess
-from pathlib import Path
+
+from grafana_dashboards_scripts.provisioning import (
+    DASHBOARD_SCRIPTS, client_from_env, load_dashboards, parse_args, provision,
+)
 
 # Couleurs pour l'affichage
 GREEN = '\033[92m'
@@ -26,6 +32,13 @@ BLUE = '\033[94m'
 BOLD = '\033[1m'
 RESET = '\033[0m'
 
+STATUS_LABELS = {
+    'created': 'Créé',
+    'updated': 'Mis à jour',
+    'unchanged': 'Inchangé',
+    'planned': 'À envoyer',
+}
+
 def print_header(message):
     print(f"\n{BOLD}{BLUE}{'=' * 70}{RESET}")
     print(f"{BOLD}{BLUE}{message}{RESET}")
@@ -40,39 +53,8 @@ def print_error(message):
 def print_info(message):
     print(f"{BLUE}→{RESET} {message}")
 
-def run_script(script_path, description):
-    """Exécute un script Python et retourne True si succès"""
-    print_info(f"Exécution: {description}")
-    print(f"  Script: {script_path.name}")
-    
-    try:
-        result = subprocess.run(
-            [sys.executable, str(script_path)],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        
-        if result.returncode == 0:
-            print_success(f"Succès: {description}")
-            if "created successfully" in result.stdout or "créé avec succès" in result.stdout:
-                print(f"  {result.stdout.strip()}")
-            return True
-        else:
-            print_error(f"Échec: {description}")
-            if result.stderr:
-                print(f"  Erreur: {result.stderr.strip()}")
-            return False
-            
-    except subprocess.TimeoutExpired:
-        print_error(f"Timeout: {description} (>30s)")
-        return False
-    except Exception as e:
-        print_error(f"Exception: {description}")
-        print(f"  {str(e)}")
-        return False
-
 def main():
+    args = parse_args()
     print_header("🚀 Création Automatique de Tous les Dashboards Grafana")
     
     # Configuration
@@ -84,69 +66,52 @@ def main():
     print(f"  Utilisateur: {grafana_user}")
     print()
     
-    # Répertoire des scripts
-    project_root = Path(__file__).parent.absolute()
-    dashboards_dir = project_root / "grafana_dashboards_scripts"
-    
-    if not dashboards_dir.exists():
-        print_error(f"Le dossier {dashboards_dir} n'existe pas!")
+    # Chargement des définitions (sans envoi)
+    try:
+        entries = load_dashboards()
+    except (OSError, ValueError) as e:
+        print_error(f"Chargement des définitions impossible: {e}")
         return 1
+    print_info(f"{len(entries)} dashboards définis dans {len(DASHBOARD_SCRIPTS)} scripts")
     
-    # Liste des scripts à exécuter dans l'ordre
-    scripts_to_run = [
-        ("create_dashboards_1_3.py", "Dashboards 1-3 (Funnel, Segmentation, Products)"),
-        ("create_dashboards_4_6.py", "Dashboards 4-6 (Cohorts, Real-Time, Predictive)"),
-        ("create_bi_dashboard.py", "Business Intelligence Dashboard"),
-        ("create_full_dashboard.py", "E-Commerce A/B Test Analytics Dashboard"),
-        ("create_monitoring_dashboard.py", "Monitoring Dashboard"),
-        ("create_prometheus_dashboard.py", "Prometheus Dashboard"),
-    ]
-    
-    # Statistiques
-    total = len(scripts_to_run)
-    success_count = 0
-    failed_scripts = []
+    start = time.perf_counter()
+    with client_from_env(pool_size=args.jobs) as client:
+        results = provision(client, entries, jobs=args.jobs, force=args.force, dry_run=args.dry_run)
+    elapsed = time.perf_counter() - start
     
-    # Exécution des scripts
-    for i, (script_name, description) in enumerate(scripts_to_run, 1):
-        print(f"\n{BOLD}[{i}/{total}]{RESET} {description}")
-        print("-" * 70)
-        
-        script_path = dashboards_dir / script_name
-        
-        if not script_path.exists():
-            print_error(f"Script introuvable: {script_name}")
-            failed_scripts.append((script_name, "Fichier introuvable"))
-            continue
-        
-        if run_script(script_path, description):
-            success_count += 1
-            time.sleep(2)  # Pause entre les scripts
+    for result in results:
+        if result['status'] == 'failed':
+            print_error(f"Échec: {result['title']} ({result['uid']})")
+            print(f"  Erreur: {result['error']}")
         else:
-            failed_scripts.append((script_name, "Erreur d'exécution"))
+            print_success(f"{STATUS_LABELS[result['status']]}: {result['title']}")
+            print(f"  URL: {grafana_url}/d/{result['uid']}")
     
     # Résumé final
     print_header("📊 Résumé de l'Exécution")
     
-    print(f"Total: {total} scripts")
-    print_success(f"Succès: {success_count}/{total}")
+    total = len(results)
+    failed = [result for result in results if result['status'] == 'failed']
+    uploaded = sum(result['status'] in ('created', 'updated') for result in results)
+    print(f"Total: {total} dashboards ({elapsed:.1f}s)")
+    print_success(f"Envoyés: {uploaded}/{total}, sans changement: {total - uploaded - len(failed)}/{total}")
     
-    if failed_scripts:
-        print_error(f"Échecs: {len(failed_scripts)}/{total}")
-        print("\n" + YELLOW + "Scripts en échec:" + RESET)
-        for script_name, reason in failed_scripts:
-            print(f"  • {script_name}: {reason}")
+    if failed:
+        print_error(f"Échecs: {len(failed)}/{total}")
+        print("\n" + YELLOW + "Dashboards en échec:" + RESET)
+        for result in failed:
+            print(f"  • {result['uid']} ({result['script']}): {result['error']}")
     
     print(f"\n{BLUE}🌐 Accédez à Grafana:{RESET} {grafana_url}")
     print(f"   Utilisateur: {grafana_user}")
     print()
     
     # Code de retour
-    if success_count == total:
-        print_success("✨ Tous les dashboards ont été créés avec succès!")
+    if not failed:
+        print_success("✨ Tous les dashboards sont à jour!")
         return 0
-    elif success_count > 0:
-        print(f"{YELLOW}⚠{RESET}  Certains dashboards ont échoué mais d'autres ont été créés.")
+    elif len(failed) < total:
+        print(f"{YELLOW}⚠{RESET}  Certains dashboards ont échoué mais d'autres sont à jour.")
         return 1
     else:
         print_error("Aucun dashboard n'a pu être créé. Vérifiez la configuration.")
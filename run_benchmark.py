@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Benchmark de charge pour l'application E-Commerce A/B Test Dashboard
+Se connecte une fois, puis rejoue des sessions utilisateur réalistes en
+parallèle : navigation vers une page (HTML + callback de routage Dash) puis
+callbacks déclenchés au chargement de la page, reconstruits à partir de
+/_dash-dependencies et de la mise en page renvoyée pour chaque page.
+
+Toutes les sessions partent de la même IP : l'instance mesurée doit être
+lancée avec RATE_LIMIT_ENABLED=false, sinon la limite générale (200 req/min
+par IP) renvoie des 429 et le benchmark mesure le rate limiter.
+
+Utilisation :
+    RATE_LIMIT_ENABLED=false python dashboard/app.py   # instance locale
+    python run_benchmark.py --users 10 --duration 60 --output benchmarks/results.json
+    python run_tests.py --benchmark --users 10 --tag "4 workers"
+"""
+
+import argparse
+import json
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urljoin
+
+import requests
+
+from run_tests import BASE_URL, TEST_USER, Colors, print_error, print_header, print_info, print_success
+
+# Pages parcourues par défaut (pages protégées du dashboard)
+DEFAULT_PAGES = [
+    "/dashboard", "/traffic", "/behavior", "/conversions", "/products",
+    "/cohorts", "/funnel", "/ab-testing/simulations", "/ab-testing/results",
+]
+
+CALLBACK_URL = "/_dash-update-component"
+PAGES_CONTENT = "_pages_content.children"
+LOGIN_OUTPUT = "login-redirect.pathname"
+
+
+def percentile(sorted_values, q):
+    """Percentile q (0-100) par interpolation linéaire d'une liste triée"""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def parse_outputs(output):
+    """'..a.children...b.data..' -> [('a', 'children'), ('b', 'data')]"""
+    if output.startswith('..') and output.endswith('..'):
+        parts = output[2:-2].split('...')
+    else:
+        parts = [output]
+    return [tuple(part.rsplit('.', 1)) for part in parts]
+
+
+def collect_props(component, props):
+    """Valeurs initiales des propriétés de chaque composant ayant un id"""
+    if isinstance(component, list):
+        for child in component:
+            collect_props(child, props)
+    elif isinstance(component, dict):
+        if 'props' in component and 'type' in component:
+            component_props = component['props']
+            if isinstance(component_props.get('id'), str):
+                props[component_props['id']] = component_props
+            for value in component_props.values():
+                collect_props(value, props)
+        else:
+            for value in component.values():
+                collect_props(value, props)
+    return props
+
+
+def callback_body(dependency, values, changed=None):
+    """Corps JSON d'un appel /_dash-update-component"""
+    def resolve(spec):
+        value = values.get(spec['id'], {}).get(spec['property'])
+        return {'id': spec['id'], 'property': spec['property'], 'value': value}
+
+    outputs = [{'id': id_, 'property': prop} for id_, prop in parse_outputs(dependency['output'])]
+    inputs = [resolve(spec) for spec in dependency['inputs']]
+    return {
+        'output': dependency['output'],
+        'outputs': outputs if len(outputs) > 1 else outputs[0],
+        'inputs': inputs,
+        'state': [resolve(spec) for spec in dependency.get('state', [])],
+        'changedPropIds': changed or [f"{spec['id']}.{spec['property']}" for spec in dependency['inputs']],
+    }
+
+
+def is_replayable(dependency):
+    """Callback serveur à identifiants simples (pas de pattern-matching)"""
+    if dependency.get('clientside_function'):
+        return False
+    specs = dependency['inputs'] + dependency.get('state', [])
+    return all(isinstance(spec['id'], str) and not spec['id'].startswith('{') for spec in specs) \
+        and not dependency['output'].lstrip('.').startswith('{')
+
+
+class LatencyRecorder:
+    """Latences (secondes) et erreurs par libellé, partagées entre threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = {}
+
+    def add(self, group, label, latency, ok):
+        with self._lock:
+            self._samples.setdefault((group, label), []).append((latency, ok))
+
+    def summary(self, duration):
+        report = {}
+        with self._lock:
+            items = {key: list(samples) for key, samples in self._samples.items()}
+        for (group, label), samples in sorted(items.items()):
+            latencies = sorted(latency for latency, _ in samples)
+            errors = sum(1 for _, ok in samples if not ok)
+            report.setdefault(group, {})[label] = {
+                'requests': len(samples),
+                'errors': errors,
+                'error_rate': round(errors / len(samples), 4),
+                'throughput_rps': round(len(samples) / duration, 2),
+                'mean_ms': round(sum(latencies) / len(latencies) * 1000, 2),
+                'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+                'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+                'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+                'max_ms': round(latencies[-1] * 1000, 2),
+            }
+        return report
+
+
+class DashBenchmark:
+    """Rejoue des sessions utilisateur contre une instance du dashboard"""
+
+    def __init__(self, base_url=BASE_URL, timeout=30):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.dependencies = []
+        self.plans = {}
+
+    def _post_callback(self, session, body):
+        return session.post(urljoin(self.base_url, CALLBACK_URL), json=body, timeout=self.timeout)
+
+    def _find(self, output_part):
+        for dependency in self.dependencies:
+            if output_part in dependency['output']:
+                return dependency
+        return None
+
+    def login(self, username, password):
+        """Connexion via le callback de la page /login (une seule fois)"""
+        self.session.get(urljoin(self.base_url, "/login"), timeout=self.timeout)
+        self.dependencies = self.session.get(
+            urljoin(self.base_url, "/_dash-dependencies"), timeout=self.timeout).json()
+
+        dependency = self._find(LOGIN_OUTPUT)
+        if dependency is None:
+            raise RuntimeError("Callback de connexion introuvable dans /_dash-dependencies")
+        values = {
+            'login-button': {'n_clicks': 1},
+            'username-input': {'value': username},
+            'password-input': {'value': password},
+            'remember-me': {'value': False},
+        }
+        response = self._post_callback(self.session, callback_body(dependency, values, ['login-button.n_clicks']))
+        response.raise_for_status()
+        check = self.session.get(urljoin(self.base_url, DEFAULT_PAGES[0]),
+                                 timeout=self.timeout, allow_redirects=False)
+        return check.status_code == 200
+
+    def plan_page(self, path):
+        """Callbacks déclenchés au chargement d'une page, avec leurs corps JSON"""
+        navigation = self._find(PAGES_CONTENT)
+        if navigation is None:
+            raise RuntimeError("Callback de routage des pages introuvable (use_pages désactivé ?)")
+
+        location = {'_pages_location': {'pathname': path, 'search': '', 'hash': ''}}
+        navigation_body = callback_body(navigation, location)
+        response = self._post_callback(self.session, navigation_body)
+        response.raise_for_status()
+        content = response.json().get('response', {}).get('_pages_content', {}).get('children')
+
+        page_props = collect_props(content, {})
+        values = dict(location)
+        values.update(page_props)
+
+        callbacks = []
+        for dependency in self.dependencies:
+            if dependency is navigation or dependency.get('prevent_initial_call') or not is_replayable(dependency):
+                continue
+            ids = [spec['id'] for spec in dependency['inputs']]
+            if ids and all(id_ in values for id_ in ids) and any(id_ in page_props for id_ in ids):
+                callbacks.append((dependency['output'], callback_body(dependency, values)))
+
+        self.plans[path] = {'navigation': navigation_body, 'callbacks': callbacks}
+        return self.plans[path]
+
+    def _worker_session(self):
+        session = requests.Session()
+        session.cookies.update(self.session.cookies)
+        return session
+
+    def _timed(self, recorder, group, label, send):
+        start = time.perf_counter()
+        try:
+            response = send()
+            ok = response.status_code < 400 or response.status_code == 204
+        except requests.RequestException:
+            ok = False
+        recorder.add(group, label, time.perf_counter() - start, ok)
+        return ok
+
+    def run_session(self, recorder, deadline, think_time=0.0, seed=None):
+        """Une session utilisateur : navigation de page en page jusqu'à l'échéance"""
+        rng = random.Random(seed)
+        session = self._worker_session()
+        paths = list(self.plans)
+        while time.perf_counter() < deadline:
+            path = rng.choice(paths)
+            plan = self.plans[path]
+            page_start = time.perf_counter()
+            ok = self._timed(recorder, 'requests', f"GET {path}",
+                             lambda: session.get(urljoin(self.base_url, path), timeout=self.timeout))
+            ok &= self._timed(recorder, 'callbacks', f"{path} {PAGES_CONTENT}",
+                              lambda: self._post_callback(session, plan['navigation']))
+            for output, body in plan['callbacks']:
+                ok &= self._timed(recorder, 'callbacks', f"{path} {output}",
+                                  lambda body=body: self._post_callback(session, body))
+            recorder.add('pages', path, time.perf_counter() - page_start, ok)
+            if think_time:
+                time.sleep(rng.uniform(0, 2 * think_time))
+
+    def run(self, users=5, duration=30.0, think_time=0.0):
+        """Lance `users` sessions en parallèle pendant `duration` secondes"""
+        recorder = LatencyRecorder()
+        start = time.perf_counter()
+        deadline = start + duration
+        with ThreadPoolExecutor(max_workers=users) as executor:
+            futures = [executor.submit(self.run_session, recorder, deadline, think_time, seed)
+                       for seed in range(users)]
+            for future in futures:
+                future.result()
+        elapsed = time.perf_counter() - start
+
+        report = recorder.summary(elapsed)
+        totals = [stats for group in ('requests', 'callbacks') for stats in report.get(group, {}).values()]
+        requests_count = sum(stats['requests'] for stats in totals)
+        errors = sum(stats['errors'] for stats in totals)
+        report['totals'] = {
+            'requests': requests_count,
+            'errors': errors,
+            'error_rate': round(errors / requests_count, 4) if requests_count else None,
+            'throughput_rps': round(requests_count / elapsed, 2),
+            'duration_s': round(elapsed, 2),
+        }
+        return report
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def print_report(report):
+    """Tableau des latences par page et par callback"""
+    for group in ('pages', 'callbacks'):
+        print_header(f"Latences par {'page' if group == 'pages' else 'callback'}")
+        print(f"{'':60} {'req':>6} {'err%':>6} {'p50':>8} {'p95':>8} {'p99':>8}")
+        for label, stats in report.get(group, {}).items():
+            color = Colors.RED if stats['error_rate'] else Colors.GREEN
+            print(f"{label[:60]:60} {stats['requests']:>6} "
+                  f"{color}{stats['error_rate'] * 100:>5.1f}%{Colors.END} "
+                  f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f}")
+
+    totals = report['totals']
+    print(f"\n{Colors.BOLD}{totals['requests']} requêtes en {totals['duration_s']}s : "
+          f"{totals['throughput_rps']} req/s, {totals['errors']} erreurs{Colors.END}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de charge du dashboard")
+    parser.add_argument("--url", default=BASE_URL, help="URL du dashboard")
+    parser.add_argument("--users", type=int, default=5, help="Sessions simultanées")
+    parser.add_argument("--duration", type=float, default=30.0, help="Durée en secondes")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Pause moyenne entre pages (s)")
+    parser.add_argument("--pages", nargs="+", default=DEFAULT_PAGES, help="Pages à parcourir")
+    parser.add_argument("--username", default=TEST_USER["username"])
+    parser.add_argument("--password", default=TEST_USER["password"])
+    parser.add_argument("--tag", default=None, help="Libellé du run (version, nb de workers...)")
+    parser.add_argument("--output", default=None, help="Fichier JSON de résultats")
+    args = parser.parse_args(argv)
+
+    benchmark = DashBenchmark(args.url)
+    print_header("Préparation du benchmark")
+    try:
+        if not benchmark.login(args.username, args.password):
+            print_error("Connexion refusée")
+            return 1
+        print_success(f"Connecté en tant que {args.username}")
+        for path in args.pages:
+            plan = benchmark.plan_page(path)
+            print_info(f"{path}: {len(plan['callbacks'])} callbacks au chargement")
+    except (requests.RequestException, RuntimeError, ValueError) as e:
+        print_error(f"Préparation impossible : {e}")
+        return 1
+
+    print_header(f"Charge: {args.users} sessions pendant {args.duration:.0f}s")
+    report = benchmark.run(args.users, args.duration, args.think_time)
+    report['config'] = {
+        'url': args.url,
+        'users': args.users,
+        'duration_s': args.duration,
+        'think_time_s': args.think_time,
+        'pages': args.pages,
+        'tag': args.tag,
+        'git_revision': git_revision(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+    }
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print_success(f"Résultats écrits dans {args.output}")
+
+    return 0 if not report['totals']['errors'] else 1
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print(f"\n{Colors.YELLOW}Benchmark interrompu par l'utilisateur{Colors.END}")
+        sys.exit(1)
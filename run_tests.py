@@ -2,6 +2,7 @@
 """
 Script de test pour l'application E-Commerce A/B Test Dashboard
 Utilisation : python run_tests.py
+              python run_tests.py --benchmark [options de run_benchmark.py]
 """
 
 import requests
@@ -264,6 +265,10 @@ def run_all_tests():
         return 1
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--benchmark":
+        from run_benchmark import main as run_benchmark
+        sys.exit(run_benchmark(sys.argv[2:]))
+
     try:
         exit_code = run_all_tests()
         sys.exit(exit_code)
@@ -113,7 +113,7 @@ def main():
     start_time = datetime.now()
     
     # Chemins
-    project_root = Path(__file__).parent.parent
+    project_root = Path(__file__).parent.parent.parent
     data_dir = project_root / 'data' / 'clean'
     output_dir = data_dir
     
@@ -9,10 +9,11 @@ Date: 2025-12-09
 Issue: #15 - Générer ab_test_simulation.csv
 """
 
+import argparse
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime
 import json
 
 def print_separator(title=""):
@@ -24,172 +25,249 @@ def print_separator(title=""):
     else:
         print(f"{'='*80}\n")
 
-def generate_ab_test_daily_simulation(baseline_data, scenarios, simulation_results, days=30):
+# Panier moyen utilisé pour le revenue simulé (€)
+AOV = 255.36
+
+def _pct(numerator, denominator):
+    """Taux en % élément par élément, 0 si le dénominateur est nul"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, numerator / denominator * 100, 0.0)
+
+def _lift(variant, control):
+    """Lift relatif en % élément par élément, 0 si le contrôle est nul"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(control > 0, (variant - control) / control * 100, 0.0)
+
+def generate_ab_test_daily_simulation(baseline_data, scenarios, simulation_results, days=30,
+                                      seed=None, start_date=None):
     """
     Génère une simulation jour par jour pour chaque scénario A/B
     
+    Calcul vectorisé sur la grille scénarios × jours : tout le bruit est tiré
+    d'un coup par un Generator initialisé avec seed, puis taux, lifts,
+    z-scores et p-values sont calculés en colonnes.
+    
     Args:
         baseline_data: DataFrame avec les données baseline quotidiennes
         scenarios: Liste des scénarios de test
         simulation_results: Résultats des simulations Monte Carlo
         days: Nombre de jours à simuler (défaut 30)
+        seed: Graine du générateur aléatoire (même graine = même simulation)
+        start_date: Premier jour simulé (défaut: aujourd'hui)
     
     Returns:
         DataFrame avec simulation quotidienne détaillée
     """
-    all_simulations = []
+    from scipy import stats as sp_stats
+    
+    # Scénarios ayant un résultat de simulation
+    simulated_ids = {r['scenario_id'] for r in simulation_results}
+    scenarios = [s for s in scenarios if s['id'] in simulated_ids]
+    n_scenarios = len(scenarios)
     
     # Date de début de simulation (aujourd'hui)
-    start_date = datetime.now()
+    start_date = pd.Timestamp(start_date if start_date is not None else datetime.now())
     
     # Métriques baseline moyennes
     baseline_users = baseline_data['unique_users'].mean()
     baseline_views = baseline_data['view'].mean()
     baseline_carts = baseline_data['addtocart'].mean()
     baseline_purchases = baseline_data['transaction'].mean()
+    cart_to_purchase = baseline_purchases / baseline_carts
+    
+    # Paramètres des scénarios en colonnes (scénarios × 1) et jours (1 × jours)
+    def scenario_column(key):
+        return np.array([s[key] for s in scenarios]).reshape(-1, 1)
+    
+    baseline_rate = scenario_column('baseline').astype(float)
+    variant_rate = scenario_column('variant').astype(float)
+    sample_size = scenario_column('sample_size_per_group').astype(float)
+    test_duration = scenario_column('test_duration_days')
+    day = np.arange(days).reshape(1, -1)
+    
+    rng = np.random.default_rng(seed)
+    # Variation journalière réaliste (-10% à +15%)
+    daily_variance = rng.uniform(0.9, 1.15, size=(n_scenarios, days))
+    # Bruit sur le lift attendu (±5% de variance)
+    lift_noise = rng.normal(1.0, 0.05, size=(n_scenarios, days))
+    
+    # Groupe Contrôle (Baseline), 50% du trafic
+    control_users = (baseline_users * daily_variance * 0.5).astype(np.int64)
+    control_views = (baseline_views * daily_variance * 0.5).astype(np.int64)
+    control_carts = (control_views * baseline_rate).astype(np.int64)
+    control_purchases = (control_carts * cart_to_purchase).astype(np.int64)
+    
+    # Groupe Variant (Optimisé), même trafic, lift attendu bruité
+    variant_users = control_users.copy()
+    variant_views = control_views.copy()
+    variant_carts = (variant_views * variant_rate * lift_noise).astype(np.int64)
+    variant_purchases = (variant_carts * cart_to_purchase).astype(np.int64)
+    
+    control_view_to_cart = _pct(control_carts, control_views)
+    control_cart_to_purchase = _pct(control_purchases, control_carts)
+    control_view_to_purchase = _pct(control_purchases, control_views)
+    variant_view_to_cart = _pct(variant_carts, variant_views)
+    variant_cart_to_purchase = _pct(variant_purchases, variant_carts)
+    variant_view_to_purchase = _pct(variant_purchases, variant_views)
+    
+    # Calcul des lifts
+    lift_view_to_cart = _lift(variant_view_to_cart, control_view_to_cart)
+    lift_cart_to_purchase = _lift(variant_cart_to_purchase, control_cart_to_purchase)
+    lift_view_to_purchase = _lift(variant_view_to_purchase, control_view_to_purchase)
+    
+    control_revenue = control_purchases * AOV
+    variant_revenue = variant_purchases * AOV
+    revenue_lift = variant_revenue - control_revenue
+    revenue_lift_pct = _lift(variant_revenue, control_revenue)
+    
+    # Test z sur le taux view→cart (proportions poolées), p-value bilatérale
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pooled_rate = (control_carts + variant_carts) / (control_views + variant_views)
+        pooled_se = np.sqrt(pooled_rate * (1 - pooled_rate) * (1 / control_views + 1 / variant_views))
+        z_score = np.where(pooled_se > 0,
+                           (variant_view_to_cart / 100 - control_view_to_cart / 100) / pooled_se, 0.0)
+    p_value = 2 * sp_stats.norm.sf(np.abs(z_score))
+    is_significant = p_value < 0.05
+    
+    # Confiance (basé sur la taille d'échantillon cumulée)
+    cumulative_sample = control_users * (day + 1)
+    confidence = np.minimum(95, 50 + cumulative_sample / sample_size * 45)
+    
+    # Statut du test
+    test_status = np.select(
+        [day < test_duration, is_significant & (lift_view_to_cart > 0), is_significant],
+        ['running', 'winner_variant', 'winner_control'],
+        default='inconclusive'
+    )
     
-    # Pour chaque scénario
-    for scenario in scenarios:
-        scenario_id = scenario['id']
-        scenario_name = scenario['name']
+    # Une ligne par (scénario, jour), scénario par scénario
+    def per_scenario(key):
+        return np.repeat([s[key] for s in scenarios], days)
+    
+    day_number = np.tile(np.arange(1, days + 1), n_scenarios)
+    dates = (start_date + pd.to_timedelta(np.arange(days), unit='D')).strftime('%Y-%m-%d')
+    
+    return pd.DataFrame({
+        # Métadonnées
+        'date': np.tile(np.asarray(dates), n_scenarios),
+        'day_number': day_number,
+        'scenario_id': per_scenario('id'),
+        'scenario_name': per_scenario('name'),
+        'priority': per_scenario('priority'),
+        'target_metric': per_scenario('target_metric'),
+        'test_status': test_status.ravel(),
+        
+        # Groupe Contrôle
+        'control_users': control_users.ravel(),
+        'control_views': control_views.ravel(),
+        'control_carts': control_carts.ravel(),
+        'control_purchases': control_purchases.ravel(),
+        'control_revenue': control_revenue.ravel().round(2),
+        'control_view_to_cart_pct': control_view_to_cart.ravel().round(2),
+        'control_cart_to_purchase_pct': control_cart_to_purchase.ravel().round(2),
+        'control_view_to_purchase_pct': control_view_to_purchase.ravel().round(2),
+        
+        # Groupe Variant
+        'variant_users': variant_users.ravel(),
+        'variant_views': variant_views.ravel(),
+        'variant_carts': variant_carts.ravel(),
+        'variant_purchases': variant_purchases.ravel(),
+        'variant_revenue': variant_revenue.ravel().round(2),
+        'variant_view_to_cart_pct': variant_view_to_cart.ravel().round(2),
+        'variant_cart_to_purchase_pct': variant_cart_to_purchase.ravel().round(2),
+        'variant_view_to_purchase_pct': variant_view_to_purchase.ravel().round(2),
         
-        # Récupérer les résultats de simulation
-        sim_result = next((r for r in simulation_results if r['scenario_id'] == scenario_id), None)
-        if not sim_result:
-            continue
+        # Lifts
+        'lift_view_to_cart_pct': lift_view_to_cart.ravel().round(2),
+        'lift_cart_to_purchase_pct': lift_cart_to_purchase.ravel().round(2),
+        'lift_view_to_purchase_pct': lift_view_to_purchase.ravel().round(2),
+        'revenue_lift': revenue_lift.ravel().round(2),
+        'revenue_lift_pct': revenue_lift_pct.ravel().round(2),
         
-        # Générer les données jour par jour
-        for day in range(days):
-            current_date = start_date + timedelta(days=day)
-            
-            # Variation journalière réaliste (-10% à +15%)
-            daily_variance = np.random.uniform(0.9, 1.15)
-            
-            # Groupe Contrôle (Baseline)
-            control_users = int(baseline_users * daily_variance * 0.5)  # 50% split
-            control_views = int(baseline_views * daily_variance * 0.5)
-            control_carts = int(control_views * scenario['baseline'])
-            control_purchases = int(control_carts * (baseline_purchases / baseline_carts))
-            
-            control_view_to_cart = (control_carts / control_views * 100) if control_views > 0 else 0
-            control_cart_to_purchase = (control_purchases / control_carts * 100) if control_carts > 0 else 0
-            control_view_to_purchase = (control_purchases / control_views * 100) if control_views > 0 else 0
-            
-            # Groupe Variant (Optimisé)
-            variant_users = int(baseline_users * daily_variance * 0.5)  # 50% split
-            variant_views = int(baseline_views * daily_variance * 0.5)
-            
-            # Appliquer le lift attendu avec un peu de bruit
-            lift_noise = np.random.normal(1.0, 0.05)  # ±5% de variance
-            effective_variant_rate = scenario['variant'] * lift_noise
-            
-            variant_carts = int(variant_views * effective_variant_rate)
-            variant_purchases = int(variant_carts * (baseline_purchases / baseline_carts))
-            
-            variant_view_to_cart = (variant_carts / variant_views * 100) if variant_views > 0 else 0
-            variant_cart_to_purchase = (variant_purchases / variant_carts * 100) if variant_carts > 0 else 0
-            variant_view_to_purchase = (variant_purchases / variant_views * 100) if variant_views > 0 else 0
-            
-            # Calcul des lifts
-            lift_view_to_cart = ((variant_view_to_cart - control_view_to_cart) / control_view_to_cart * 100) if control_view_to_cart > 0 else 0
-            lift_cart_to_purchase = ((variant_cart_to_purchase - control_cart_to_purchase) / control_cart_to_purchase * 100) if control_cart_to_purchase > 0 else 0
-            lift_view_to_purchase = ((variant_view_to_purchase - control_view_to_purchase) / control_view_to_purchase * 100) if control_view_to_purchase > 0 else 0
-            
-            # Calcul du revenue (AOV moyen = 255.36€)
-            aov = 255.36
-            control_revenue = control_purchases * aov
-            variant_revenue = variant_purchases * aov
-            revenue_lift = variant_revenue - control_revenue
-            revenue_lift_pct = (revenue_lift / control_revenue * 100) if control_revenue > 0 else 0
-            
-            # Test statistique simplifié (Chi-square approximation)
-            # Calcul du p-value basé sur la différence observée
-            pooled_rate = (control_carts + variant_carts) / (control_views + variant_views)
-            pooled_se = np.sqrt(pooled_rate * (1 - pooled_rate) * (1/control_views + 1/variant_views))
-            z_score = (variant_view_to_cart/100 - control_view_to_cart/100) / pooled_se if pooled_se > 0 else 0
-            
-            # P-value approximation (two-tailed)
-            from scipy import stats as sp_stats
-            p_value = 2 * (1 - sp_stats.norm.cdf(abs(z_score)))
-            is_significant = p_value < 0.05
-            
-            # Confiance (basé sur la taille d'échantillon cumulée)
-            cumulative_sample = control_users * (day + 1)
-            confidence = min(95, 50 + (cumulative_sample / scenario['sample_size_per_group'] * 45))
-            
-            # Statut du test
-            if day < scenario['test_duration_days']:
-                test_status = 'running'
-            elif is_significant:
-                test_status = 'winner_variant' if lift_view_to_cart > 0 else 'winner_control'
-            else:
-                test_status = 'inconclusive'
-            
-            # Enregistrement
-            simulation_row = {
-                # Métadonnées
-                'date': current_date.strftime('%Y-%m-%d'),
-                'day_number': day + 1,
-                'scenario_id': scenario_id,
-                'scenario_name': scenario_name,
-                'priority': scenario['priority'],
-                'target_metric': scenario['target_metric'],
-                'test_status': test_status,
-                
-                # Groupe Contrôle
-                'control_users': control_users,
-                'control_views': control_views,
-                'control_carts': control_carts,
-                'control_purchases': control_purchases,
-                'control_revenue': round(control_revenue, 2),
-                'control_view_to_cart_pct': round(control_view_to_cart, 2),
-                'control_cart_to_purchase_pct': round(control_cart_to_purchase, 2),
-                'control_view_to_purchase_pct': round(control_view_to_purchase, 2),
-                
-                # Groupe Variant
-                'variant_users': variant_users,
-                'variant_views': variant_views,
-                'variant_carts': variant_carts,
-                'variant_purchases': variant_purchases,
-                'variant_revenue': round(variant_revenue, 2),
-                'variant_view_to_cart_pct': round(variant_view_to_cart, 2),
-                'variant_cart_to_purchase_pct': round(variant_cart_to_purchase, 2),
-                'variant_view_to_purchase_pct': round(variant_view_to_purchase, 2),
-                
-                # Lifts
-                'lift_view_to_cart_pct': round(lift_view_to_cart, 2),
-                'lift_cart_to_purchase_pct': round(lift_cart_to_purchase, 2),
-                'lift_view_to_purchase_pct': round(lift_view_to_purchase, 2),
-                'revenue_lift': round(revenue_lift, 2),
-                'revenue_lift_pct': round(revenue_lift_pct, 2),
-                
-                # Statistiques
-                'p_value': round(p_value, 4),
-                'is_significant': is_significant,
-                'confidence_level': round(confidence, 1),
-                'z_score': round(z_score, 2),
-                'sample_size_control': control_users,
-                'sample_size_variant': variant_users,
-                'sample_size_total': control_users + variant_users,
-                
-                # Métriques cumulées
-                'cumulative_revenue_lift': round(revenue_lift * (day + 1), 2),
-                'days_running': day + 1,
-                
-                # Informations scénario
-                'expected_lift_pct': round(scenario['expected_lift'] * 100, 2),
-                'implementation_cost': scenario['implementation_cost'],
-                'implementation_weeks': scenario['implementation_weeks']
-            }
-            
-            all_simulations.append(simulation_row)
-    
-    return pd.DataFrame(all_simulations)
+        # Statistiques
+        'p_value': p_value.ravel().round(4),
+        'is_significant': is_significant.ravel(),
+        'confidence_level': confidence.ravel().round(1),
+        'z_score': z_score.ravel().round(2),
+        'sample_size_control': control_users.ravel(),
+        'sample_size_variant': variant_users.ravel(),
+        'sample_size_total': (control_users + variant_users).ravel(),
+        
+        # Métriques cumulées
+        'cumulative_revenue_lift': (revenue_lift * (day + 1)).ravel().round(2),
+        'days_running': day_number,
+        
+        # Informations scénario
+        'expected_lift_pct': (per_scenario('expected_lift') * 100).round(2),
+        'implementation_cost': per_scenario('implementation_cost'),
+        'implementation_weeks': per_scenario('implementation_weeks')
+    })
+
+def summarize_by_scenario(simulation_df, days):
+    """
+    Résumé par scénario de la simulation quotidienne
 
-def main():
+    Les totaux et le ROI portent sur la période simulée (period_days jours),
+    l'annualisation sur 365 / days périodes.
+
+    Returns:
+        pd.DataFrame: une ligne par scénario (ab_test_summary_by_scenario.csv)
+    """
+    summary = simulation_df.groupby(['scenario_id', 'scenario_name', 'priority']).agg({
+        'lift_view_to_cart_pct': 'mean',
+        'lift_cart_to_purchase_pct': 'mean',
+        'lift_view_to_purchase_pct': 'mean',
+        'revenue_lift': 'sum',
+        'control_purchases': 'sum',
+        'variant_purchases': 'sum',
+        'is_significant': 'sum',
+        'confidence_level': 'max',
+        'implementation_cost': 'first',
+        'expected_lift_pct': 'first'
+    }).reset_index()
+    
+    summary.columns = [
+        'scenario_id', 'scenario_name', 'priority',
+        'avg_lift_view_to_cart_pct', 'avg_lift_cart_to_purchase_pct', 
+        'avg_lift_view_to_purchase_pct', 'total_revenue_lift_period',
+        'total_control_purchases', 'total_variant_purchases',
+        'days_significant', 'max_confidence_level',
+        'implementation_cost', 'expected_lift_pct'
+    ]
+    
+    # Calcul du ROI sur la période simulée (period_days jours)
+    summary['roi_period_pct'] = (
+        (summary['total_revenue_lift_period'] - summary['implementation_cost']) 
+        / summary['implementation_cost'] * 100
+    ).round(2)
+    
+    # Annualisé (365 / days périodes par an : 12.17 pour 30 jours)
+    periods_per_year = round(365 / days, 2)
+    summary['annual_revenue_lift'] = (summary['total_revenue_lift_period'] * periods_per_year).round(2)
+    summary['annual_roi_pct'] = (
+        (summary['annual_revenue_lift'] - summary['implementation_cost'])
+        / summary['implementation_cost'] * 100
+    ).round(2)
+    summary['period_days'] = days
+    
+    return summary
+
+def main(argv=None):
     """Génération du fichier ab_test_simulation.csv"""
+    parser = argparse.ArgumentParser(description='Simulation A/B quotidienne par scénario')
+    parser.add_argument('--days', type=int, default=30,
+                        help='Nombre de jours simulés (défaut: 30)')
+    parser.add_argument('--seed', type=int,
+                        help='Graine du générateur (rejoue une simulation précédente)')
+    args = parser.parse_args(argv)
+    
+    # Graine affichée pour pouvoir reproduire le run
+    seed = args.seed if args.seed is not None else int(np.random.SeedSequence().entropy % 2**63)
+    days = args.days
+    
     print_separator("GÉNÉRATION AB_TEST_SIMULATION.CSV - ISSUE #15")
-    print(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    print(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Graine: {seed} (--seed {seed} pour reproduire)\n")
     
     start_time = datetime.now()
     
@@ -220,33 +298,33 @@ def main():
     
     print_separator("GÉNÉRATION SIMULATION QUOTIDIENNE")
     
-    # Générer 30 jours de simulation pour chaque scénario
-    print("Génération de 30 jours de simulation pour 8 scénarios...")
-    print("(240 lignes de données détaillées)\n")
+    # Générer la simulation jour par jour pour chaque scénario
+    print(f"Génération de {days} jours de simulation pour {len(scenarios)} scénarios...")
+    print(f"({len(scenarios) * days} lignes de données détaillées)\n")
     
     simulation_df = generate_ab_test_daily_simulation(
         baseline_data=funnel_daily,
         scenarios=scenarios,
         simulation_results=simulation_results,
-        days=30
+        days=days,
+        seed=seed
     )
     
     print(f"✅ Simulation générée: {len(simulation_df)} lignes")
-    print(f"   • 8 scénarios × 30 jours")
+    print(f"   • {simulation_df['scenario_id'].nunique()} scénarios × {days} jours")
     print(f"   • Contrôle vs Variant quotidien")
     print(f"   • Lifts et significativité statistique")
     
     print_separator("STATISTIQUES DE LA SIMULATION")
     
     # Statistiques par scénario
-    print("\nRésumé par scénario (30 jours):\n")
+    print(f"\nRésumé par scénario ({days} jours):\n")
     
-    for scenario_id in simulation_df['scenario_id'].unique():
-        scenario_data = simulation_df[simulation_df['scenario_id'] == scenario_id]
+    for scenario_id, scenario_data in simulation_df.groupby('scenario_id', sort=False):
         scenario_name = scenario_data['scenario_name'].iloc[0]
         
-        # Métriques finales (jour 30)
-        final_day = scenario_data[scenario_data['day_number'] == 30].iloc[0]
+        # Métriques finales (dernier jour)
+        final_day = scenario_data.iloc[-1]
         
         # Moyennes sur la période
         avg_lift = scenario_data['lift_view_to_cart_pct'].mean()
@@ -259,8 +337,8 @@ def main():
         print(f"{scenario_id} - {scenario_name}:")
         print(f"   Lift moyen: {avg_lift:+.1f}%")
         print(f"   Revenue lift/jour: €{avg_revenue_lift:,.0f}")
-        print(f"   Revenue lift cumulé (30j): €{total_revenue_lift:,.0f}")
-        print(f"   Jours significatifs: {significant_days}/30")
+        print(f"   Revenue lift cumulé ({days}j): €{total_revenue_lift:,.0f}")
+        print(f"   Jours significatifs: {significant_days}/{days}")
         print(f"   Statut final: {final_day['test_status']}")
         print()
     
@@ -278,40 +356,7 @@ def main():
     # Export résumé par scénario
     print("\n2. Export de ab_test_summary_by_scenario.csv...")
     
-    summary_by_scenario = simulation_df.groupby(['scenario_id', 'scenario_name', 'priority']).agg({
-        'lift_view_to_cart_pct': 'mean',
-        'lift_cart_to_purchase_pct': 'mean',
-        'lift_view_to_purchase_pct': 'mean',
-        'revenue_lift': 'sum',
-        'control_purchases': 'sum',
-        'variant_purchases': 'sum',
-        'is_significant': 'sum',
-        'confidence_level': 'max',
-        'implementation_cost': 'first',
-        'expected_lift_pct': 'first'
-    }).reset_index()
-    
-    summary_by_scenario.columns = [
-        'scenario_id', 'scenario_name', 'priority',
-        'avg_lift_view_to_cart_pct', 'avg_lift_cart_to_purchase_pct', 
-        'avg_lift_view_to_purchase_pct', 'total_revenue_lift_30d',
-        'total_control_purchases', 'total_variant_purchases',
-        'days_significant', 'max_confidence_level',
-        'implementation_cost', 'expected_lift_pct'
-    ]
-    
-    # Calcul du ROI sur 30 jours
-    summary_by_scenario['roi_30d_pct'] = (
-        (summary_by_scenario['total_revenue_lift_30d'] - summary_by_scenario['implementation_cost']) 
-        / summary_by_scenario['implementation_cost'] * 100
-    ).round(2)
-    
-    # Annualisé
-    summary_by_scenario['annual_revenue_lift'] = (summary_by_scenario['total_revenue_lift_30d'] * 12.17).round(2)
-    summary_by_scenario['annual_roi_pct'] = (
-        (summary_by_scenario['annual_revenue_lift'] - summary_by_scenario['implementation_cost'])
-        / summary_by_scenario['implementation_cost'] * 100
-    ).round(2)
+    summary_by_scenario = summarize_by_scenario(simulation_df, days)
     
     output_file = output_dir / 'ab_test_summary_by_scenario.csv'
     summary_by_scenario.to_csv(output_file, index=False)
@@ -12,14 +12,29 @@ de tests A/B testing, incluant:
 - Distribution des p-values
 - ROI et impact business
 
+Les agrégats par scénario sont calculés une fois, chaque figure ne reçoit
+que les colonnes qu'elle trace. Les figures sont rendues en parallèle
+(backend Agg, pool de processus) ; l'empreinte de leurs données et de leur
+code de tracé est écrite dans les métadonnées du PNG, et une figure dont
+l'empreinte n'a pas changé n'est pas redessinée (--force pour tout refaire).
+
 Auteur: Data Science Team
 Date: 2025-12-09
 """
 
+import argparse
+import hashlib
+import inspect
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import seaborn as sns
+from PIL import Image
 from pathlib import Path
 import json
 from datetime import datetime
@@ -30,6 +45,118 @@ warnings.filterwarnings('ignore')
 plt.style.use('seaborn-v0_8-darkgrid')
 sns.set_palette("husl")
 
+DPI = 300
+
+# Clé PNG (tEXt) de l'empreinte des données et du code d'une figure
+DIGEST_KEY = 'ab-input-digest'
+
+LIFT_METRICS = ['view_to_cart', 'cart_to_purchase', 'view_to_purchase']
+RATE_METRICS = ['view_to_cart_pct', 'cart_to_purchase_pct', 'view_to_purchase_pct']
+FUNNEL_COUNTS = ['views', 'carts', 'purchases']
+
+
+def prepare_aggregates(df: pd.DataFrame) -> dict:
+    """
+    Agrégats partagés par les figures, calculés une seule fois
+
+    Returns:
+        dict: daily (lignes triées par scénario, dans l'ordre d'apparition,
+        puis par jour) et scenarios (une ligne par scénario : sommes des
+        volumes, moyennes des taux et des lifts, jours significatifs)
+    """
+    order = {scenario_id: rank for rank, scenario_id in enumerate(df['scenario_id'].unique())}
+    rank = df['scenario_id'].map(order).to_numpy()
+    daily = df.iloc[np.lexsort((df['day_number'].to_numpy(), rank))].reset_index(drop=True)
+
+    agg = {'scenario_name': 'first', 'is_significant': 'sum'}
+    for group in ('control', 'variant'):
+        agg.update({f'{group}_{count}': 'sum' for count in FUNNEL_COUNTS})
+        agg[f'{group}_revenue'] = 'sum'
+        agg.update({f'{group}_{rate}': 'mean' for rate in RATE_METRICS})
+    agg.update({f'lift_{metric}_pct': 'mean' for metric in LIFT_METRICS})
+    scenarios = daily.groupby('scenario_id', sort=False).agg(agg)
+    scenarios = scenarios.rename(columns={'is_significant': 'days_significant'}).reset_index()
+    return {'daily': daily, 'scenarios': scenarios}
+
+
+def figure_tasks(aggregates: dict, summary_by_scenario: pd.DataFrame, conversion_tests: pd.DataFrame) -> list:
+    """
+    Figures à produire : (fichier, méthode de ABTestVisualizer, arguments)
+    Chaque figure ne reçoit que les colonnes qu'elle utilise, son empreinte
+    ne change donc qu'avec ses propres données.
+    """
+    daily = aggregates['daily']
+    scenarios = aggregates['scenarios']
+    per_day = ['scenario_id', 'scenario_name', 'day_number']
+    top5 = daily['scenario_id'].unique()[:5]
+
+    tasks = [
+        (f'daily_lift_trends_{metric}.png', 'plot_daily_lift_trends',
+         {'df': daily[per_day + [f'lift_{metric}_pct', 'is_significant']], 'metric': metric})
+        for metric in LIFT_METRICS
+    ]
+    tasks += [
+        ('control_vs_variant_comparison.png', 'plot_control_vs_variant_comparison',
+         {'summary': scenarios[['scenario_id', 'scenario_name']
+                               + [f'{group}_{rate}' for rate in RATE_METRICS for group in ('control', 'variant')]
+                               + ['control_revenue', 'variant_revenue']]}),
+        ('funnel_analysis.png', 'plot_funnel_analysis',
+         {'summary': scenarios[['scenario_id', 'scenario_name']
+                               + [f'{group}_{count}' for group in ('control', 'variant') for count in FUNNEL_COUNTS]]}),
+        ('significance_heatmap.png', 'plot_significance_heatmap',
+         {'df': daily[['scenario_id', 'day_number', 'is_significant']]}),
+        ('pvalue_distribution.png', 'plot_pvalue_distribution',
+         {'df': daily[per_day + ['p_value']]}),
+        ('cumulative_revenue_lift.png', 'plot_cumulative_revenue_lift',
+         {'df': daily[per_day + ['cumulative_revenue_lift']]}),
+        ('roi_comparison.png', 'plot_roi_comparison',
+         {'df': summary_by_scenario[['scenario_id', 'roi_period_pct', 'annual_roi_pct', 'implementation_cost', 'period_days']]}),
+        ('conversion_test_results.png', 'plot_conversion_test_results',
+         {'df': conversion_tests[['scenario_id', 'lift_pct', 'ci_95_lower', 'ci_95_upper', 'decision',
+                                  'p_value_ztest', 'prob_b_beats_a', 'statistical_power']]}),
+        ('summary_dashboard.png', 'generate_summary_dashboard',
+         {'df': daily.loc[daily['scenario_id'].isin(top5), ['scenario_id', 'day_number', 'cumulative_revenue_lift']],
+          'scenarios': scenarios[['scenario_id', 'days_significant']
+                                 + [f'lift_{metric}_pct' for metric in LIFT_METRICS]],
+          'summary_df': conversion_tests[['scenario_id', 'scenario_name', 'decision', 'lift_pct',
+                                          'prob_b_beats_a', 'confidence']]}),
+    ]
+    return tasks
+
+
+def figure_digest(method: str, kwargs: dict) -> str:
+    """Empreinte des arguments d'une figure, du code de sa méthode et du style"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(inspect.getsource(getattr(ABTestVisualizer, method)).encode())
+    digest.update(inspect.getsource(ABTestVisualizer.__init__).encode())
+    digest.update(f'{matplotlib.__version__}|{sns.__version__}|{DPI}'.encode())
+    for key in sorted(kwargs):
+        value = kwargs[key]
+        digest.update(key.encode())
+        if isinstance(value, pd.DataFrame):
+            digest.update('|'.join(map(str, value.columns)).encode())
+            digest.update(pd.util.hash_pandas_object(value, index=False).to_numpy().tobytes())
+        else:
+            digest.update(repr(value).encode())
+    return digest.hexdigest()
+
+
+def stored_digest(path: Path):
+    """Empreinte enregistrée dans un PNG existant (None si absent ou illisible)"""
+    try:
+        # info : blocs texte lus avant les données de l'image, sans la décoder
+        with Image.open(path) as image:
+            return image.info.get(DIGEST_KEY)
+    except OSError:
+        return None
+
+
+def render_figure(output_dir: str, filename: str, method: str, kwargs: dict, digest: str) -> str:
+    """Rendu d'une figure (exécuté dans un processus du pool)"""
+    viz = ABTestVisualizer(Path(output_dir))
+    fig = getattr(viz, method)(**kwargs)
+    return viz.save(fig, filename, digest)
+
 
 class ABTestVisualizer:
     """Classe pour visualiser les résultats de tests A/B"""
@@ -53,24 +180,30 @@ class ABTestVisualizer:
             'positive': '#27ae60',      # Vert foncé
             'negative': '#c0392b'       # Rouge foncé
         }
+
+    def save(self, fig, filename: str, digest: str = None) -> str:
+        """Sauvegarde PNG avec l'empreinte de ses entrées, puis fermeture de la figure"""
+        output_path = self.output_dir / filename
+        metadata = {DIGEST_KEY: digest} if digest else None
+        fig.savefig(output_path, dpi=DPI, bbox_inches='tight', metadata=metadata)
+        plt.close(fig)
+        print(f"✓ Graphique sauvegardé: {output_path}")
+        return filename
     
     def plot_daily_lift_trends(self, df: pd.DataFrame, metric: str = 'view_to_cart'):
         """
         Graphique des tendances de lift quotidien par scénario
         
         Args:
-            df: DataFrame avec simulation quotidienne
+            df: Lignes quotidiennes triées par scénario et par jour
             metric: Métrique à visualiser
         """
         fig, axes = plt.subplots(2, 4, figsize=(20, 10))
         fig.suptitle(f'Évolution Quotidienne du Lift - {metric.replace("_", " ").title()}', 
                      fontsize=16, fontweight='bold')
         
-        scenarios = df['scenario_id'].unique()
-        
-        for idx, scenario_id in enumerate(scenarios):
+        for idx, (scenario_id, scenario_data) in enumerate(df.groupby('scenario_id', sort=False)):
             ax = axes[idx // 4, idx % 4]
-            scenario_data = df[df['scenario_id'] == scenario_id].sort_values('day_number')
             
             # Nom du scénario
             scenario_name = scenario_data['scenario_name'].iloc[0]
@@ -105,21 +238,19 @@ class ABTestVisualizer:
             ax.legend(fontsize=8)
         
         plt.tight_layout()
-        output_path = self.output_dir / f'daily_lift_trends_{metric}.png'
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        print(f"✓ Graphique sauvegardé: {output_path}")
-        plt.close()
+        return fig
     
-    def plot_control_vs_variant_comparison(self, df: pd.DataFrame):
+    def plot_control_vs_variant_comparison(self, summary: pd.DataFrame):
         """
         Comparaison contrôle vs variant pour toutes les métriques
         
         Args:
-            df: DataFrame avec données agrégées par scénario
+            summary: Agrégats par scénario (moyennes des taux, revenus cumulés)
         """
         fig, axes = plt.subplots(2, 2, figsize=(16, 12))
         fig.suptitle('Comparaison Contrôle vs Variant - Toutes Métriques', 
                      fontsize=16, fontweight='bold')
+        summary = summary.sort_values('scenario_id').reset_index(drop=True)
         
         metrics = [
             ('view_to_cart_pct', 'View → Cart (%)'),
@@ -131,21 +262,8 @@ class ABTestVisualizer:
         for idx, (metric, label) in enumerate(metrics):
             ax = axes[idx // 2, idx % 2]
             
-            # Agréger par scénario
-            if 'revenue' in metric:
-                control_col = 'control_revenue'
-                variant_col = 'variant_revenue'
-                agg_func = 'sum'
-            else:
-                control_col = f'control_{metric}'
-                variant_col = f'variant_{metric}'
-                agg_func = 'mean'
-            
-            summary = df.groupby('scenario_id').agg({
-                control_col: agg_func,
-                variant_col: agg_func,
-                'scenario_name': 'first'
-            }).reset_index()
+            control_col = f'control_{metric}'
+            variant_col = f'variant_{metric}'
             
             # Position des barres
             x = np.arange(len(summary))
@@ -174,46 +292,31 @@ class ABTestVisualizer:
             ax.grid(True, alpha=0.3, axis='y')
         
         plt.tight_layout()
-        output_path = self.output_dir / 'control_vs_variant_comparison.png'
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        print(f"✓ Graphique sauvegardé: {output_path}")
-        plt.close()
+        return fig
     
-    def plot_funnel_analysis(self, df: pd.DataFrame):
+    def plot_funnel_analysis(self, summary: pd.DataFrame):
         """
         Analyse funnel de conversion pour chaque scénario
         
         Args:
-            df: DataFrame avec données de simulation
+            summary: Agrégats par scénario (volumes cumulés sur tous les jours)
         """
         fig, axes = plt.subplots(2, 4, figsize=(20, 10))
         fig.suptitle('Funnel de Conversion - Contrôle vs Variant', 
                      fontsize=16, fontweight='bold')
         
-        scenarios = df['scenario_id'].unique()
-        
-        for idx, scenario_id in enumerate(scenarios):
+        for idx, row in enumerate(summary.itertuples(index=False)):
             ax = axes[idx // 4, idx % 4]
-            scenario_data = df[df['scenario_id'] == scenario_id]
-            scenario_name = scenario_data['scenario_name'].iloc[0]
-            
-            # Agréger sur tous les jours
-            control_views = scenario_data['control_views'].sum()
-            control_carts = scenario_data['control_carts'].sum()
-            control_purchases = scenario_data['control_purchases'].sum()
+            scenario_id, scenario_name = row.scenario_id, row.scenario_name
             
-            variant_views = scenario_data['variant_views'].sum()
-            variant_carts = scenario_data['variant_carts'].sum()
-            variant_purchases = scenario_data['variant_purchases'].sum()
-            
-            # Données funnel
+            # Données funnel (sommes sur tous les jours)
             stages = ['Views', 'Carts', 'Purchases']
-            control_values = [control_views, control_carts, control_purchases]
-            variant_values = [variant_views, variant_carts, variant_purchases]
+            control_values = [getattr(row, f'control_{count}') for count in FUNNEL_COUNTS]
+            variant_values = [getattr(row, f'variant_{count}') for count in FUNNEL_COUNTS]
             
             # Normaliser à 100% pour visualisation
-            control_pct = [100, (control_carts/control_views)*100, (control_purchases/control_views)*100]
-            variant_pct = [100, (variant_carts/variant_views)*100, (variant_purchases/variant_views)*100]
+            control_pct = [100] + [(value/control_values[0])*100 for value in control_values[1:]]
+            variant_pct = [100] + [(value/variant_values[0])*100 for value in variant_values[1:]]
             
             x = np.arange(len(stages))
             width = 0.35
@@ -239,17 +342,14 @@ class ABTestVisualizer:
             ax.grid(True, alpha=0.3, axis='y')
         
         plt.tight_layout()
-        output_path = self.output_dir / 'funnel_analysis.png'
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        print(f"✓ Graphique sauvegardé: {output_path}")
-        plt.close()
+        return fig
     
     def plot_significance_heatmap(self, df: pd.DataFrame):
         """
         Heatmap de significativité par scénario et jour
         
         Args:
-            df: DataFrame avec simulation quotidienne
+            df: Lignes quotidiennes triées par scénario et par jour
         """
         # Pivot: scénarios en lignes, jours en colonnes
         pivot = df.pivot_table(
@@ -272,27 +372,21 @@ class ABTestVisualizer:
         ax.set_ylabel('Scénario')
         
         plt.tight_layout()
-        output_path = self.output_dir / 'significance_heatmap.png'
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        print(f"✓ Graphique sauvegardé: {output_path}")
-        plt.close()
+        return fig
     
     def plot_pvalue_distribution(self, df: pd.DataFrame):
         """
         Distribution des p-values pour tous les scénarios
         
         Args:
-            df: DataFrame avec simulation quotidienne
+            df: Lignes quotidiennes triées par scénario et par jour
         """
         fig, axes = plt.subplots(2, 4, figsize=(20, 10))
         fig.suptitle('Distribution des P-values au Fil du Temps', 
                      fontsize=16, fontweight='bold')
         
-        scenarios = df['scenario_id'].unique()
-        
-        for idx, scenario_id in enumerate(scenarios):
+        for idx, (scenario_id, scenario_data) in enumerate(df.groupby('scenario_id', sort=False)):
             ax = axes[idx // 4, idx % 4]
-            scenario_data = df[df['scenario_id'] == scenario_id].sort_values('day_number')
             scenario_name = scenario_data['scenario_name'].iloc[0]
             
             # P-values
@@ -321,24 +415,18 @@ class ABTestVisualizer:
             ax.grid(True, alpha=0.3)
         
         plt.tight_layout()
-        output_path = self.output_dir / 'pvalue_distribution.png'
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        print(f"✓ Graphique sauvegardé: {output_path}")
-        plt.close()
+        return fig
     
     def plot_cumulative_revenue_lift(self, df: pd.DataFrame):
         """
         Revenue lift cumulé au fil du temps
         
         Args:
-            df: DataFrame avec simulation quotidienne
+            df: Lignes quotidiennes triées par scénario et par jour
         """
         fig, ax = plt.subplots(figsize=(14, 8))
         
-        scenarios = df['scenario_id'].unique()
-        
-        for scenario_id in scenarios:
-            scenario_data = df[df['scenario_id'] == scenario_id].sort_values('day_number')
+        for scenario_id, scenario_data in df.groupby('scenario_id', sort=False):
             scenario_name = scenario_data['scenario_name'].iloc[0]
             
             ax.plot(scenario_data['day_number'], 
@@ -353,36 +441,32 @@ class ABTestVisualizer:
         ax.grid(True, alpha=0.3)
         
         plt.tight_layout()
-        output_path = self.output_dir / 'cumulative_revenue_lift.png'
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        print(f"✓ Graphique sauvegardé: {output_path}")
-        plt.close()
+        return fig
     
-    def plot_roi_comparison(self, summary_csv: Path):
+    def plot_roi_comparison(self, df: pd.DataFrame):
         """
         Comparaison des ROI par scénario
         
         Args:
-            summary_csv: Fichier CSV avec résultats agrégés
+            df: Résultats agrégés par scénario (ab_test_summary_by_scenario.csv)
         """
-        df = pd.read_csv(summary_csv)
-        
         scenarios = df['scenario_id'].values
-        roi_30d = df['roi_30d_pct'].values
+        roi_period = df['roi_period_pct'].values
+        period_days = int(df['period_days'].iloc[0])
         roi_annual = df['annual_roi_pct'].values
         costs = df['implementation_cost'].values
         
         fig, axes = plt.subplots(1, 2, figsize=(16, 6))
         
-        # ROI 30 jours
+        # ROI sur la période simulée
         ax1 = axes[0]
-        bars1 = ax1.barh(scenarios, roi_30d, color=self.colors['positive'], alpha=0.7)
-        ax1.set_xlabel('ROI 30 jours (%)')
-        ax1.set_title('ROI à 30 jours par Scénario', fontweight='bold')
+        bars1 = ax1.barh(scenarios, roi_period, color=self.colors['positive'], alpha=0.7)
+        ax1.set_xlabel(f'ROI {period_days} jours (%)')
+        ax1.set_title(f'ROI à {period_days} jours par Scénario', fontweight='bold')
         ax1.grid(True, alpha=0.3, axis='x')
         
         # Annotations
-        for i, (bar, roi, cost) in enumerate(zip(bars1, roi_30d, costs)):
+        for i, (bar, roi, cost) in enumerate(zip(bars1, roi_period, costs)):
             ax1.text(roi + 50, i, f'{roi:,.0f}%\n(€{cost:,.0f})', 
                     va='center', fontsize=9)
         
@@ -398,20 +482,15 @@ class ABTestVisualizer:
             ax2.text(roi + 1000, i, f'{roi:,.0f}%', va='center', fontsize=9)
         
         plt.tight_layout()
-        output_path = self.output_dir / 'roi_comparison.png'
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        print(f"✓ Graphique sauvegardé: {output_path}")
-        plt.close()
+        return fig
     
-    def plot_conversion_test_results(self, summary_csv: Path):
+    def plot_conversion_test_results(self, df: pd.DataFrame):
         """
         Résultats des tests statistiques de conversion (Issue #16)
         
         Args:
-            summary_csv: Fichier CSV avec résultats des tests
+            df: Résultats des tests (ab_test_conversion_tests_summary.csv)
         """
-        df = pd.read_csv(summary_csv)
-        
         fig, axes = plt.subplots(2, 2, figsize=(16, 12))
         fig.suptitle('Résultats Tests Statistiques (Issue #16)', 
                      fontsize=16, fontweight='bold')
@@ -490,21 +569,17 @@ class ABTestVisualizer:
         ax4.grid(True, alpha=0.3, axis='x')
         
         plt.tight_layout()
-        output_path = self.output_dir / 'conversion_test_results.png'
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        print(f"✓ Graphique sauvegardé: {output_path}")
-        plt.close()
+        return fig
     
-    def generate_summary_dashboard(self, df: pd.DataFrame, summary_csv: Path):
+    def generate_summary_dashboard(self, df: pd.DataFrame, scenarios: pd.DataFrame, summary_df: pd.DataFrame):
         """
         Dashboard récapitulatif avec métriques clés
         
         Args:
-            df: DataFrame avec simulation quotidienne
-            summary_csv: Fichier CSV avec résultats tests
+            df: Lignes quotidiennes des 5 premiers scénarios, triées par jour
+            scenarios: Agrégats par scénario (jours significatifs, lifts moyens)
+            summary_df: Résultats des tests (ab_test_conversion_tests_summary.csv)
         """
-        summary_df = pd.read_csv(summary_csv)
-        
         fig = plt.figure(figsize=(20, 12))
         gs = fig.add_gridspec(3, 3, hspace=0.3, wspace=0.3)
         
@@ -558,8 +633,7 @@ Split: 50% / 50%
         
         # 4. Revenue lift cumulé
         ax4 = fig.add_subplot(gs[1, :])
-        for scenario_id in df['scenario_id'].unique()[:5]:  # Top 5
-            scenario_data = df[df['scenario_id'] == scenario_id].sort_values('day_number')
+        for scenario_id, scenario_data in df.groupby('scenario_id', sort=False):  # Top 5
             ax4.plot(scenario_data['day_number'], 
                     scenario_data['cumulative_revenue_lift'] / 1000,
                     marker='o', linewidth=2, label=scenario_id)
@@ -571,7 +645,7 @@ Split: 50% / 50%
         
         # 5. Significativité par scénario
         ax5 = fig.add_subplot(gs[2, 0])
-        sig_counts = df.groupby('scenario_id')['is_significant'].sum()
+        sig_counts = scenarios.set_index('scenario_id')['days_significant'].sort_index()
         colors_sig = [self.colors['significant'] if count >= 25 
                      else self.colors['not_significant'] 
                      for count in sig_counts.values]
@@ -586,9 +660,9 @@ Split: 50% / 50%
         # 6. Moyenne des lifts par métrique
         ax6 = fig.add_subplot(gs[2, 1])
         metrics_avg = {
-            'View→Cart': df.groupby('scenario_id')['lift_view_to_cart_pct'].mean().mean(),
-            'Cart→Purchase': df.groupby('scenario_id')['lift_cart_to_purchase_pct'].mean().mean(),
-            'View→Purchase': df.groupby('scenario_id')['lift_view_to_purchase_pct'].mean().mean()
+            'View→Cart': scenarios['lift_view_to_cart_pct'].mean(),
+            'Cart→Purchase': scenarios['lift_cart_to_purchase_pct'].mean(),
+            'View→Purchase': scenarios['lift_view_to_purchase_pct'].mean()
         }
         ax6.bar(metrics_avg.keys(), metrics_avg.values(), 
                color=[self.colors['control'], self.colors['variant'], self.colors['positive']], 
@@ -607,13 +681,18 @@ Split: 50% / 50%
         ax7.set_title('Niveau de Confiance des Verdicts', fontweight='bold')
         ax7.grid(True, alpha=0.3, axis='y')
         
-        plt.savefig(self.output_dir / 'summary_dashboard.png', dpi=300, bbox_inches='tight')
-        print(f"✓ Dashboard sauvegardé: {self.output_dir / 'summary_dashboard.png'}")
-        plt.close()
+        return fig
 
 
 def main():
     """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Visualisation des résultats A/B")
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1,
+                        help="Nombre de processus de rendu")
+    parser.add_argument('--force', action='store_true',
+                        help="Redessine toutes les figures, même inchangées")
+    args = parser.parse_args()
+
     print("="*80)
     print("Issue #18 - Visualisation des Résultats A/B")
     print("="*80)
@@ -622,67 +701,45 @@ def main():
     project_root = Path(__file__).parent.parent.parent
     data_dir = project_root / 'data' / 'clean'
     output_dir = project_root / 'visualizations'
+    output_dir.mkdir(parents=True, exist_ok=True)
     
     # Charger les données
     print("\nChargement des données...")
     simulation_df = pd.read_csv(data_dir / 'ab_test_simulation.csv')
-    summary_json = data_dir / 'ab_test_simulation_summary.json'
-    conversion_tests_csv = data_dir / 'ab_test_conversion_tests_summary.csv'
+    summary_by_scenario = pd.read_csv(data_dir / 'ab_test_summary_by_scenario.csv')
+    conversion_tests = pd.read_csv(data_dir / 'ab_test_conversion_tests_summary.csv')
     
     print(f"✓ {len(simulation_df)} lignes chargées (simulation)")
     print(f"✓ {len(simulation_df['scenario_id'].unique())} scénarios")
     
-    # Initialiser visualiseur
-    viz = ABTestVisualizer(output_dir)
+    aggregates = prepare_aggregates(simulation_df)
+    tasks = figure_tasks(aggregates, summary_by_scenario, conversion_tests)
     
     print("\n" + "="*80)
     print("GÉNÉRATION DES VISUALISATIONS")
-    print("="*80)
-    
-    # 1. Tendances de lift quotidien
-    print("\n1. Graphiques de tendance lift quotidien...")
-    viz.plot_daily_lift_trends(simulation_df, metric='view_to_cart')
-    viz.plot_daily_lift_trends(simulation_df, metric='cart_to_purchase')
-    viz.plot_daily_lift_trends(simulation_df, metric='view_to_purchase')
-    
-    # 2. Comparaison contrôle vs variant
-    print("\n2. Comparaison contrôle vs variant...")
-    viz.plot_control_vs_variant_comparison(simulation_df)
-    
-    # 3. Analyse funnel
-    print("\n3. Analyse funnel de conversion...")
-    viz.plot_funnel_analysis(simulation_df)
-    
-    # 4. Heatmap significativité
-    print("\n4. Heatmap de significativité...")
-    viz.plot_significance_heatmap(simulation_df)
-    
-    # 5. Distribution p-values
-    print("\n5. Distribution des p-values...")
-    viz.plot_pvalue_distribution(simulation_df)
-    
-    # 6. Revenue lift cumulé
-    print("\n6. Revenue lift cumulé...")
-    viz.plot_cumulative_revenue_lift(simulation_df)
-    
-    # 7. Comparaison ROI
-    print("\n7. Comparaison des ROI...")
-    summary_by_scenario_csv = data_dir / 'ab_test_summary_by_scenario.csv'
-    viz.plot_roi_comparison(summary_by_scenario_csv)
+    print("="*80 + "\n")
     
-    # 8. Résultats tests statistiques
-    print("\n8. Résultats tests statistiques...")
-    viz.plot_conversion_test_results(conversion_tests_csv)
+    # Figures dont l'empreinte des entrées a changé
+    pending = []
+    for filename, method, kwargs in tasks:
+        digest = figure_digest(method, kwargs)
+        if not args.force and stored_digest(output_dir / filename) == digest:
+            print(f"= Inchangé: {filename}")
+            continue
+        pending.append((str(output_dir), filename, method, kwargs, digest))
     
-    # 9. Dashboard récapitulatif
-    print("\n9. Dashboard récapitulatif...")
-    viz.generate_summary_dashboard(simulation_df, conversion_tests_csv)
+    jobs = max(1, min(args.jobs, len(pending)))
+    if jobs == 1:
+        rendered = [render_figure(*task) for task in pending]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            rendered = list(pool.map(render_figure, *zip(*pending)))
     
     print("\n" + "="*80)
     print("VISUALISATIONS TERMINÉES")
     print("="*80)
     print(f"\nRépertoire de sortie: {output_dir}")
-    print(f"Total graphiques générés: 14")
+    print(f"Graphiques générés: {len(rendered)} / {len(tasks)} ({len(tasks) - len(rendered)} inchangés)")
     print("\nFichiers créés:")
     for file in sorted(output_dir.glob('*.png')):
         print(f"  - {file.name}")
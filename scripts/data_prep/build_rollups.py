@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Construction du store d'agrégats temporels (data/clean/rollups/)
+Métriques additives par heure (événements par type, commandes, revenus)
+depuis data_clean.csv et transactions.csv, utilisateurs et sessions uniques
+quotidiens depuis daily_metrics.csv ; niveaux jour, semaine et mois
+matérialisés à partir des heures (voir src/kpis/rollups.py).
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.kpis.rollups import LEVELS, RollupStore
+from src.preprocessing import schema
+
+MS_PER_HOUR = 3_600_000
+CHUNK_SIZE = 500_000
+
+# Type d'événement -> colonne du store
+EVENT_COLUMNS = {'view': 'views', 'addtocart': 'add_to_carts', 'transaction': 'transactions'}
+
+# Colonnes de daily_metrics.csv disponibles seulement par jour
+DAILY_COLUMNS = ['unique_users', 'unique_sessions']
+
+
+def print_separator(title=""):
+    """Affiche un séparateur visuel"""
+    if title:
+        print(f"\n{'='*80}")
+        print(f"  {title}")
+        print(f"{'='*80}\n")
+    else:
+        print(f"{'='*80}\n")
+
+
+def hourly_events(events_file):
+    """Nombre d'événements par heure et par type, lecture par chunks"""
+    partials = []
+    for i, chunk in enumerate(schema.read_csv(events_file, usecols=['timestamp', 'event_type'],
+                                              chunksize=CHUNK_SIZE), start=1):
+        hour = chunk['timestamp'].to_numpy(dtype=np.int64) // MS_PER_HOUR
+        partials.append(chunk.groupby([hour, chunk['event_type'].astype(str)]).size())
+        print(f"  Chunk {i}: {len(chunk):,} evenements")
+
+    counts = pd.concat(partials).groupby(level=[0, 1]).sum().unstack(fill_value=0)
+    counts = counts.reindex(columns=list(EVENT_COLUMNS), fill_value=0).rename(columns=EVENT_COLUMNS)
+    counts.insert(0, 'total_events', counts.sum(axis=1))
+    counts.index = pd.to_datetime(counts.index * MS_PER_HOUR, unit='ms')
+    return counts.rename_axis('period').reset_index()
+
+
+def hourly_revenue(transactions):
+    """Commandes et revenus par heure de transaction_date"""
+    hours = pd.to_datetime(transactions['transaction_date']).dt.floor('h')
+    revenue = transactions.groupby(hours)['amount'].agg(orders='size', revenue='sum')
+    return revenue.rename_axis('period').reset_index()
+
+
+def main():
+    """Construction des niveaux hour/day/week/month"""
+    print_separator("CONSTRUCTION DU STORE D'AGREGATS TEMPORELS")
+    print(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+
+    start_time = datetime.now()
+
+    data_dir = PROJECT_ROOT / 'data' / 'clean'
+    output_dir = data_dir / 'rollups'
+
+    print_separator("CHARGEMENT DES DONNEES")
+
+    print("Evenements par heure (data_clean.csv)...")
+    hourly = hourly_events(data_dir / 'data_clean.csv')
+    print(f"[OK] {len(hourly):,} heures")
+
+    print("\nCommandes et revenus par heure (transactions.csv)...")
+    transactions = pd.read_csv(data_dir / 'transactions.csv', usecols=['transaction_date', 'amount'])
+    revenue = hourly_revenue(transactions)
+    # Heures sans événement ou sans commande : 0
+    hourly = hourly.merge(revenue, on='period', how='outer').sort_values('period').fillna(0)
+    hourly = hourly.astype({col: np.int64 for col in ['total_events', *EVENT_COLUMNS.values(), 'orders']})
+    print(f"[OK] {len(transactions):,} transactions")
+
+    print("\nUtilisateurs et sessions uniques par jour (daily_metrics.csv)...")
+    daily = pd.read_csv(data_dir / 'daily_metrics.csv', usecols=['date', *DAILY_COLUMNS])
+    daily = daily.rename(columns={'date': 'period'})
+    daily['period'] = pd.to_datetime(daily['period'])
+    print(f"[OK] {len(daily)} jours")
+
+    print_separator("MATERIALISATION DES NIVEAUX")
+    store = RollupStore.build(hourly, daily)
+    for level in LEVELS:
+        print(f"  {level:<6} {len(store.levels[level]):>6,} periodes")
+
+    store.save(output_dir)
+    print(f"\n[OK] {output_dir}")
+
+    elapsed = (datetime.now() - start_time).total_seconds()
+    print_separator(f"TERMINE EN {elapsed:.1f} SECONDES")
+
+
+if __name__ == "__main__":
+    main()
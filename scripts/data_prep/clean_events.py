@@ -13,6 +13,11 @@ from pathlib import Path
 from datetime import datetime
 import sys
 
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.preprocessing import cleaner, schema
+
 def print_separator(title=""):
     """Affiche un séparateur visuel"""
     if title:
@@ -28,10 +33,11 @@ def load_events_file(filepath):
     print(f"Fichier: {filepath}")
     
     try:
-        df = pd.read_csv(filepath)
+        # Types compacts dès la lecture (valeurs invalides conservées pour le nettoyage)
+        df = schema.read_csv(filepath, raw=True)
         print(f"[OK] {len(df):,} lignes chargees")
         print(f"Colonnes: {', '.join(df.columns.tolist())}")
-        print(f"Memoire: {df.memory_usage(deep=True).sum() / 1024**2:.2f} MB")
+        print(f"Memoire: {schema.memory_mb(df):.2f} MB")
         return df
     except Exception as e:
         print(f"[ERREUR] Impossible de charger le fichier: {e}")
@@ -104,123 +110,44 @@ def analyze_before_cleaning(df):
         'missing': missing.sum()
     }
 
-def clean_duplicates(df):
-    """Supprime les doublons"""
-    print_separator("NETTOYAGE DES DOUBLONS")
-    
-    initial_count = len(df)
-    
-    # Supprimer les doublons exacts (toutes colonnes identiques)
-    df_cleaned = df.drop_duplicates()
-    duplicates_removed = initial_count - len(df_cleaned)
-    
-    print(f"Lignes avant: {initial_count:,}")
-    print(f"Doublons supprimes: {duplicates_removed:,}")
-    print(f"Lignes apres: {len(df_cleaned):,}")
-    print(f"Taux de doublons: {(duplicates_removed/initial_count)*100:.4f}%")
-    
-    return df_cleaned, duplicates_removed
-
-def clean_invalid_data(df):
-    """Supprime les données invalides"""
-    print_separator("NETTOYAGE DES DONNEES INVALIDES")
-    
-    initial_count = len(df)
-    issues = []
-    
-    # Supprimer les timestamps invalides
-    if 'timestamp' in df.columns:
-        invalid_ts = df['timestamp'] <= 0
-        if invalid_ts.sum() > 0:
-            df = df[~invalid_ts]
-            issues.append(f"Timestamps invalides: {invalid_ts.sum():,}")
-    
-    # Supprimer les IDs négatifs
-    if 'visitorid' in df.columns:
-        invalid_vid = df['visitorid'] < 0
-        if invalid_vid.sum() > 0:
-            df = df[~invalid_vid]
-            issues.append(f"visitorid invalides: {invalid_vid.sum():,}")
-    
-    if 'itemid' in df.columns:
-        invalid_iid = df['itemid'] < 0
-        if invalid_iid.sum() > 0:
-            df = df[~invalid_iid]
-            issues.append(f"itemid invalides: {invalid_iid.sum():,}")
-    
-    # Supprimer les types d'événements invalides
-    if 'event' in df.columns:
-        valid_events = ['view', 'addtocart', 'transaction']
-        invalid_events = ~df['event'].isin(valid_events)
-        if invalid_events.sum() > 0:
-            df = df[~invalid_events]
-            issues.append(f"Types d'evenements invalides: {invalid_events.sum():,}")
+def print_cleaning_report(report):
+    """Affiche le rapport du noyau de nettoyage (compteurs par règle)"""
+    total_rows = report['total_rows']
+    invalid_removed = sum(report['invalid'].values())
     
-    # Supprimer les lignes avec valeurs manquantes critiques
-    critical_cols = ['timestamp', 'visitorid', 'event', 'itemid']
-    existing_critical = [col for col in critical_cols if col in df.columns]
-    missing_critical = df[existing_critical].isnull().any(axis=1)
-    if missing_critical.sum() > 0:
-        df = df[~missing_critical]
-        issues.append(f"Lignes avec valeurs manquantes critiques: {missing_critical.sum():,}")
-    
-    rows_removed = initial_count - len(df)
-    
-    if rows_removed > 0:
-        print(f"Lignes avant: {initial_count:,}")
+    print(f"Lignes avant: {total_rows:,}")
+    if invalid_removed > 0:
         print(f"Problemes detectes:")
-        for issue in issues:
-            print(f"  - {issue}")
-        print(f"Lignes supprimees: {rows_removed:,}")
-        print(f"Lignes apres: {len(df):,}")
+        for rule, count in report['invalid'].items():
+            if count > 0:
+                print(f"  - {cleaner.RULE_LABELS[rule]}: {count:,}")
+        print(f"Lignes invalides supprimees: {invalid_removed:,}")
     else:
         print("[OK] Aucune donnee invalide detectee")
     
-    return df, rows_removed
+    print(f"Doublons supprimes: {report['duplicates']:,}")
+    if total_rows:
+        print(f"Taux de doublons: {(report['duplicates']/total_rows)*100:.4f}%")
+    print(f"Lignes apres (triees par timestamp): {report['rows']:,}")
 
-def validate_transactions(df):
-    """Valide la cohérence des transactions"""
-    print_separator("VALIDATION DES TRANSACTIONS")
-    
-    if 'event' not in df.columns or 'transactionid' not in df.columns:
-        print("[WARNING] Colonnes event ou transactionid manquantes")
-        return df
-    
-    # Les transactions doivent avoir un transactionid
-    transactions = df[df['event'] == 'transaction']
-    missing_txid = transactions['transactionid'].isnull().sum()
+def clean_events_data(df):
+    """
+    Nettoie les événements en une passe : règles de validité combinées en un
+    masque, puis dédoublonnage et tri par timestamp sur un seul tri
+    (voir src/preprocessing/cleaner.py)
+    """
+    print_separator("NETTOYAGE DES DONNEES")
     
-    print(f"Transactions totales: {len(transactions):,}")
-    print(f"Transactions sans transactionid: {missing_txid:,}")
-    
-    if missing_txid > 0:
-        print(f"[WARNING] {missing_txid} transactions sans ID seront supprimees")
-        # Supprimer les transactions sans ID
-        mask = (df['event'] == 'transaction') & (df['transactionid'].isnull())
-        df = df[~mask]
+    df_cleaned, report = cleaner.clean_frame(df)
+    print_cleaning_report(report)
     
     # Les non-transactions ne devraient pas avoir de transactionid
-    non_transactions = df[df['event'] != 'transaction']
-    unexpected_txid = non_transactions['transactionid'].notna().sum()
-    
-    if unexpected_txid > 0:
-        print(f"[INFO] {unexpected_txid:,} evenements non-transaction ont un transactionid (OK si conversion)")
+    if 'transactionid' in df_cleaned.columns:
+        unexpected_txid = (df_cleaned['transactionid'].notna() & (df_cleaned['event'] != 'transaction')).sum()
+        if unexpected_txid > 0:
+            print(f"[INFO] {unexpected_txid:,} evenements non-transaction ont un transactionid (OK si conversion)")
     
-    return df
-
-def sort_by_timestamp(df):
-    """Trie les données par timestamp"""
-    print_separator("TRI DES DONNEES")
-    
-    if 'timestamp' not in df.columns:
-        print("[WARNING] Colonne timestamp manquante, tri ignore")
-        return df
-    
-    print("Tri par timestamp (ordre chronologique)...")
-    df = df.sort_values('timestamp').reset_index(drop=True)
-    print(f"[OK] {len(df):,} lignes triees")
-    
-    return df
+    return df_cleaned, report
 
 def analyze_after_cleaning(df, stats_before):
     """Analyse l'état des données après nettoyage"""
@@ -266,7 +193,7 @@ def save_cleaned_data(df, output_path):
     
     try:
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        df.to_csv(output_path, index=False)
+        schema.write_csv(df, output_path)
         
         # Vérifier le fichier sauvegardé
         file_size = output_path.stat().st_size / 1024**2  # MB
@@ -325,13 +252,31 @@ def generate_cleaning_report(stats_before, duplicates_removed, invalid_removed,
     
     print(f"[OK] Rapport genere: {report_path}")
 
+def main_chunked(input_file, output_file, chunksize=1_000_000):
+    """Nettoyage par chunks, partitionné par jour (voir cleaner.clean_csv)"""
+    print_separator("NETTOYAGE PAR CHUNKS")
+    print(f"Fichier: {input_file}")
+    print(f"Taille des chunks: {chunksize:,} lignes")
+    
+    # Partitions temporaires à côté du fichier de sortie
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    report = cleaner.clean_csv(input_file, output_file, chunksize=chunksize,
+                               work_dir=output_file.parent)
+    print_cleaning_report(report)
+    
+    file_size = output_file.stat().st_size / 1024**2  # MB
+    print(f"\n[OK] Fichier sauvegarde: {output_file}")
+    print(f"Taille: {file_size:.2f} MB")
+    
+    print_separator("[TERMINE] NETTOYAGE TERMINE AVEC SUCCES")
+
 def main():
     """Fonction principale"""
     print_separator("NETTOYAGE DU FICHIER events.csv")
     print(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
     
     # Chemins
-    project_root = Path(__file__).parent.parent
+    project_root = PROJECT_ROOT
     input_file = project_root / 'data' / 'raw' / 'events.csv'
     output_file = project_root / 'data' / 'clean' / 'events_cleaned.csv'
     
@@ -341,23 +286,22 @@ def main():
         print("Executez d'abord: python scripts/download_dataset.py")
         sys.exit(1)
     
+    # Mode --chunked : nettoyage par chunks à mémoire bornée (events plus
+    # volumineux que la mémoire), sans les analyses sur le fichier complet
+    if '--chunked' in sys.argv[1:]:
+        main_chunked(input_file, output_file)
+        return
+    
     # Étape 1: Charger les données
     df = load_events_file(input_file)
     
     # Étape 2: Analyser avant nettoyage
     stats_before = analyze_before_cleaning(df)
     
-    # Étape 3: Nettoyer les doublons
-    df_cleaned, duplicates_removed = clean_duplicates(df)
-    
-    # Étape 4: Nettoyer les données invalides
-    df_cleaned, invalid_removed = clean_invalid_data(df_cleaned)
-    
-    # Étape 5: Valider les transactions
-    df_cleaned = validate_transactions(df_cleaned)
-    
-    # Étape 6: Trier par timestamp
-    df_cleaned = sort_by_timestamp(df_cleaned)
+    # Étapes 3 à 6: Règles de validité, doublons, transactions sans ID et tri
+    # (types compacts définitifs : catégories fixes, entiers 32 bits)
+    df_cleaned, report = clean_events_data(df)
+    print(f"Memoire apres nettoyage: {schema.memory_mb(df_cleaned):.2f} MB")
     
     # Étape 7: Analyser après nettoyage
     analyze_after_cleaning(df_cleaned, stats_before)
@@ -366,7 +310,8 @@ def main():
     save_cleaned_data(df_cleaned, output_file)
     
     # Étape 9: Générer le rapport
-    generate_cleaning_report(stats_before, duplicates_removed, invalid_removed, df_cleaned, output_file)
+    generate_cleaning_report(stats_before, report['duplicates'], sum(report['invalid'].values()),
+                             df_cleaned, output_file)
     
     print_separator("[TERMINE] NETTOYAGE TERMINE AVEC SUCCES")
     print("Prochaines etapes:")
@@ -434,7 +434,7 @@ def main():
     print(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
     
     # Chemins
-    project_root = Path(__file__).parent.parent
+    project_root = Path(__file__).resolve().parents[2]
     data_dir = project_root / 'data'
     output_dir = data_dir / 'clean'
     
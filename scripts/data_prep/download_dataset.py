@@ -18,7 +18,7 @@ from pathlib import Path
 import subprocess
 
 # Chemins
-PROJECT_ROOT = Path(__file__).parent.parent
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
 DATA_RAW_DIR = PROJECT_ROOT / "data" / "raw"
 KAGGLE_DATASET = "retailrocket/ecommerce-dataset"
 
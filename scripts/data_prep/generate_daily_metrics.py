@@ -12,7 +12,32 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 from datetime import datetime
+import argparse
 import json
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.preprocessing import schema
+from src.kpis import daily
+
+# Moyennes mobiles 7 jours: colonne produite -> colonne source
+MA7_COLUMNS = {
+    'ma7_revenue': 'daily_revenue',
+    'ma7_users': 'unique_users',
+    'ma7_conversion': 'view_to_purchase_rate',
+}
+
+COLUMN_ORDER = [
+    'date', 'day_of_week', 'week_number', 'month', 'is_weekend',
+    'unique_users', 'unique_sessions', 'unique_products', 'total_events',
+    'views', 'add_to_carts', 'transactions',
+    'view_to_cart_rate', 'view_to_purchase_rate', 'cart_to_purchase_rate',
+    'daily_revenue', 'avg_order_value', 'min_order', 'max_order',
+    'events_per_user', 'sessions_per_user', 'revenue_per_user',
+    'ma7_revenue', 'ma7_users', 'ma7_conversion'
+]
 
 def print_separator(title=""):
     if title:
@@ -22,38 +47,19 @@ def print_separator(title=""):
     else:
         print(f"{'='*80}\n")
 
-def main():
-    """Génération de daily_metrics.csv avec métriques enrichies"""
-    print_separator("GENERATION DE DAILY_METRICS.CSV - Issue #7")
-    print(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-    
-    start_time = datetime.now()
-    
-    # Chemins
-    project_root = Path(__file__).parent.parent
-    data_dir = project_root / 'data' / 'clean'
-    
-    print_separator("CHARGEMENT DES DONNEES")
-    
-    # Charger data_clean.csv par chunks
-    print("Chargement de data_clean.csv par chunks...")
-    chunk_size = 500000
-    chunks = []
-    
-    for chunk in pd.read_csv(data_dir / 'data_clean.csv', chunksize=chunk_size):
-        chunks.append(chunk)
-        print(f"  Chunk chargé: {len(chunk):,} lignes")
-    
-    data_clean = pd.concat(chunks, ignore_index=True)
-    print(f"\n[OK] {len(data_clean):,} lignes totales chargées")
-    
-    # Charger transactions pour les montants
-    print("\nChargement de transactions.csv...")
-    trans_df = pd.read_csv(data_dir / 'transactions.csv')
-    print(f"[OK] {len(trans_df):,} transactions chargées")
-    
-    print_separator("CALCUL DES METRIQUES QUOTIDIENNES")
-    
+def aggregate_days(data_clean, trans_df):
+    """
+    Métriques de chaque jour présent dans data_clean, hors moyennes mobiles
+    (chaque ligne ne dépend que des événements et transactions de son jour)
+
+    Args:
+        data_clean: Événements nettoyés (date, user_id, session_id, product_id,
+            timestamp, event_type, segment)
+        trans_df: Transactions (date, amount)
+
+    Returns:
+        DataFrame: Une ligne par jour, triée par date
+    """
     print("Calcul des métriques par jour...")
     
     # Grouper par date
@@ -68,7 +74,7 @@ def main():
     
     # Métriques par type d'événement
     print("  - Événements par type...")
-    event_counts = data_clean.groupby(['date', 'event_type']).size().unstack(fill_value=0)
+    event_counts = data_clean.groupby(['date', 'event_type'], observed=True).size().unstack(fill_value=0)
     daily_metrics = daily_metrics.merge(event_counts, left_on='date', right_index=True, how='left')
     
     # Renommer les colonnes d'événements
@@ -81,7 +87,7 @@ def main():
     
     # Métriques par segment
     print("  - Utilisateurs par segment...")
-    segment_counts = data_clean.groupby(['date', 'segment'])['user_id'].nunique().unstack(fill_value=0)
+    segment_counts = data_clean.groupby(['date', 'segment'], observed=True)['user_id'].nunique().unstack(fill_value=0)
     segment_counts.columns = [f'users_{col.lower()}' for col in segment_counts.columns]
     daily_metrics = daily_metrics.merge(segment_counts, left_on='date', right_index=True, how='left')
     
@@ -101,7 +107,9 @@ def main():
     revenue_cols = ['daily_revenue', 'avg_order_value', 'min_order', 'max_order']
     for col in revenue_cols:
         if col in daily_metrics.columns:
-            daily_metrics[col] = daily_metrics[col].fillna(0)
+            # Montants au centime : un jour relu depuis daily_metrics.csv et
+            # un jour recalculé s'écrivent à l'identique (pas de bruit flottant)
+            daily_metrics[col] = daily_metrics[col].fillna(0).round(2)
     
     # Calculer les taux de conversion
     print("  - Taux de conversion...")
@@ -133,37 +141,114 @@ def main():
     # Convertir date en string pour le CSV
     daily_metrics['date'] = daily_metrics['date'].dt.strftime('%Y-%m-%d')
     
-    # Calculer les moyennes mobiles (7 jours)
-    print("  - Moyennes mobiles (7 jours)...")
-    daily_metrics = daily_metrics.sort_values('date')
-    daily_metrics['ma7_revenue'] = daily_metrics['daily_revenue'].rolling(window=7, min_periods=1).mean().round(2)
-    daily_metrics['ma7_users'] = daily_metrics['unique_users'].rolling(window=7, min_periods=1).mean().round(2)
-    daily_metrics['ma7_conversion'] = daily_metrics['view_to_purchase_rate'].rolling(window=7, min_periods=1).mean().round(2)
-    
-    # Trier les colonnes pour une meilleure lisibilité
-    col_order = [
-        'date', 'day_of_week', 'week_number', 'month', 'is_weekend',
-        'unique_users', 'unique_sessions', 'unique_products', 'total_events',
-        'views', 'add_to_carts', 'transactions',
-        'view_to_cart_rate', 'view_to_purchase_rate', 'cart_to_purchase_rate',
-        'daily_revenue', 'avg_order_value', 'min_order', 'max_order',
-        'events_per_user', 'sessions_per_user', 'revenue_per_user',
-        'ma7_revenue', 'ma7_users', 'ma7_conversion'
-    ]
-    
+    return daily_metrics.sort_values('date').reset_index(drop=True)
+
+def order_columns(daily_metrics):
+    """Colonnes dans l'ordre du CSV, segments (users_*) en fin"""
     # Ajouter les colonnes de segments
     segment_cols = [col for col in daily_metrics.columns if col.startswith('users_')]
-    col_order.extend(segment_cols)
+    col_order = COLUMN_ORDER + segment_cols
     
     # Sélectionner seulement les colonnes qui existent
     existing_cols = [col for col in col_order if col in daily_metrics.columns]
-    daily_metrics = daily_metrics[existing_cols]
+    return daily_metrics[existing_cols]
+
+def compute_daily_metrics(data_clean, trans_df):
+    """
+    Calcule les métriques quotidiennes sur tout l'historique
+
+    Returns:
+        DataFrame: Une ligne par jour
+    """
+    daily_metrics = aggregate_days(data_clean, trans_df)
+    
+    # Calculer les moyennes mobiles (7 jours)
+    print("  - Moyennes mobiles (7 jours)...")
+    daily.refresh_rolling(daily_metrics, MA7_COLUMNS)
+    
+    return order_columns(daily_metrics)
+
+def update_daily_metrics(stored, data_clean, trans_df):
+    """
+    Mise à jour incrémentale: les jours présents dans data_clean remplacent
+    ceux de stored (ou s'y ajoutent), les moyennes mobiles ne sont
+    recalculées qu'à partir du premier jour modifié
+
+    Args:
+        stored: daily_metrics.csv existant
+        data_clean: Événements des jours à (re)calculer, jours complets
+        trans_df: Transactions de ces mêmes jours
+
+    Returns:
+        tuple: (DataFrame complet, nombre de jours recalculés)
+    """
+    fresh = aggregate_days(data_clean, trans_df)
+    daily_metrics, start = daily.upsert_days(stored, fresh)
+    
+    # Type d'événement ou segment absent des nouveaux jours = 0 (comme unstack(fill_value=0))
+    count_cols = [col for col in daily_metrics.columns
+                  if col.startswith('users_') or col in ('views', 'add_to_carts', 'transactions')]
+    daily_metrics[count_cols] = daily_metrics[count_cols].fillna(0).astype(np.int64)
+    
+    print(f"  - Moyennes mobiles (7 jours) à partir de la ligne {start}...")
+    daily.refresh_rolling(daily_metrics, MA7_COLUMNS, start)
+    
+    return order_columns(daily_metrics), len(fresh)
+
+def main():
+    """Génération de daily_metrics.csv avec métriques enrichies"""
+    parser = argparse.ArgumentParser(description='Métriques quotidiennes (daily_metrics.csv)')
+    parser.add_argument('--incremental', action='store_true',
+                        help="Ne recalcule que les jours à partir du dernier jour déjà stocké")
+    parser.add_argument('--events', type=Path,
+                        help="Événements à ingérer (défaut: data_clean.csv) ; en mode incrémental, "
+                             "un fichier de nouveaux jours complets suffit")
+    args = parser.parse_args()
+    
+    print_separator("GENERATION DE DAILY_METRICS.CSV - Issue #7")
+    print(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    
+    start_time = datetime.now()
+    
+    # Chemins
+    project_root = PROJECT_ROOT
+    data_dir = project_root / 'data' / 'clean'
+    output_file = data_dir / 'daily_metrics.csv'
+    events_file = args.events or data_dir / 'data_clean.csv'
+    
+    # Le dernier jour stocké est recalculé: il pouvait être incomplet
+    cutoff = daily.last_day(output_file) if args.incremental else None
+    if args.incremental and cutoff is None:
+        print("[INFO] daily_metrics.csv absent, calcul complet")
+    
+    print_separator("CHARGEMENT DES DONNEES")
+    
+    # Charger les événements par chunks (jours >= cutoff en mode incrémental)
+    print(f"Chargement de {events_file.name} par chunks" + (f" (jours >= {cutoff})..." if cutoff else "..."))
+    data_clean = daily.read_csv_since(events_file, cutoff, reader=schema.read_csv)
+    print(f"[OK] {len(data_clean):,} lignes chargées")
+    
+    # Charger transactions pour les montants
+    print("\nChargement de transactions.csv...")
+    trans_df = daily.rows_since(pd.read_csv(data_dir / 'transactions.csv'), cutoff)
+    print(f"[OK] {len(trans_df):,} transactions chargées")
+    
+    print_separator("CALCUL DES METRIQUES QUOTIDIENNES")
+    
+    if cutoff is None:
+        daily_metrics = compute_daily_metrics(data_clean, trans_df)
+    elif len(data_clean) == 0:
+        print("[INFO] Aucun nouveau jour, daily_metrics.csv inchangé")
+        return
+    else:
+        stored = daily.read_table(output_file)
+        daily_metrics, n_days = update_daily_metrics(stored, data_clean, trans_df)
+        print(f"\n[OK] {n_days} jour(s) recalculé(s) à partir du {cutoff}")
     
     print(f"\n[RESULTAT] {len(daily_metrics)} jours x {len(daily_metrics.columns)} colonnes")
     
     # Sauvegarder
     print_separator("SAUVEGARDE")
-    output_file = data_dir / 'daily_metrics.csv'
     daily_metrics.to_csv(output_file, index=False)
     file_size = output_file.stat().st_size / 1024
     
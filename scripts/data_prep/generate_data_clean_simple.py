@@ -12,6 +12,12 @@ import pandas as pd
 from pathlib import Path
 from datetime import datetime
 import json
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.preprocessing import schema
 
 print(f"\n{'='*80}")
 print(f"  GENERATION DE DATA_CLEAN.CSV - Issue #6")
@@ -21,7 +27,7 @@ print(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
 start_time = datetime.now()
 
 # Chemins
-project_root = Path(__file__).parent.parent
+project_root = PROJECT_ROOT
 data_dir = project_root / 'data' / 'clean'
 
 print("Lecture de events_enriched.csv par chunks...")
@@ -32,7 +38,8 @@ chunk_size = 500000
 chunks = []
 i = 0
 
-for chunk in pd.read_csv(data_dir / 'events_enriched.csv', chunksize=chunk_size):
+# Types compacts (catégories fixes : la concaténation garde les codes)
+for chunk in schema.read_csv(data_dir / 'events_enriched.csv', chunksize=chunk_size):
     i += 1
     print(f"  Chunk {i}: {len(chunk):,} lignes")
     
@@ -69,11 +76,12 @@ print(f"Tri par timestamp...")
 data_clean = data_clean.sort_values('timestamp').reset_index(drop=True)
 
 print(f"\n[RESULTAT] {len(data_clean):,} lignes x {len(data_clean.columns)} colonnes")
+print(f"Memoire: {schema.memory_mb(data_clean):.2f} MB")
 
 # Sauvegarder
 print(f"\nSauvegarde...")
 output_file = data_dir / 'data_clean.csv'
-data_clean.to_csv(output_file, index=False)
+schema.write_csv(data_clean, output_file)
 file_size = output_file.stat().st_size / (1024 ** 2)
 
 print(f"[OK] {output_file}")
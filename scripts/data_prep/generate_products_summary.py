@@ -13,6 +13,13 @@ import numpy as np
 from pathlib import Path
 from datetime import datetime
 import json
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.kpis import products as product_analytics
+from src.preprocessing import schema
 
 def print_separator(title=""):
     if title:
@@ -22,62 +29,54 @@ def print_separator(title=""):
     else:
         print(f"{'='*80}\n")
 
-def main():
-    """Génération de products_summary.csv"""
-    print_separator("GENERATION DE PRODUCTS_SUMMARY.CSV - Issue #8")
-    print(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-    
-    start_time = datetime.now()
-    
-    # Chemins
-    project_root = Path(__file__).parent.parent
-    data_dir = project_root / 'data' / 'clean'
-    
-    print_separator("CHARGEMENT DES DONNEES")
-    
-    # Charger data_clean.csv par chunks pour extraire les métriques produits
-    print("Chargement de data_clean.csv par chunks...")
-    chunk_size = 500000
-    all_products = []
-    
-    for i, chunk in enumerate(pd.read_csv(data_dir / 'data_clean.csv', chunksize=chunk_size), 1):
-        print(f"  Chunk {i}: {len(chunk):,} lignes")
-        
-        # Métriques par produit dans ce chunk
-        product_metrics = chunk.groupby('product_id').agg({
-            'user_id': 'nunique',
-            'session_id': 'nunique',
-            'timestamp': 'count',
-            'event_type': lambda x: (x == 'view').sum(),
-        }).reset_index()
-        
-        product_metrics.columns = ['product_id', 'unique_users', 'unique_sessions', 'total_events', 'views']
-        
-        # Compter addtocart et transactions
-        addtocart_counts = chunk[chunk['event_type'] == 'addtocart'].groupby('product_id').size()
-        transaction_counts = chunk[chunk['event_type'] == 'transaction'].groupby('product_id').size()
-        
-        product_metrics = product_metrics.merge(
-            addtocart_counts.rename('add_to_carts'),
-            left_on='product_id',
-            right_index=True,
-            how='left'
-        )
-        
-        product_metrics = product_metrics.merge(
-            transaction_counts.rename('purchases'),
-            left_on='product_id',
-            right_index=True,
-            how='left'
-        )
-        
-        product_metrics['add_to_carts'] = product_metrics['add_to_carts'].fillna(0).astype(int)
-        product_metrics['purchases'] = product_metrics['purchases'].fillna(0).astype(int)
-        
-        all_products.append(product_metrics)
-    
+def compute_chunk_metrics(chunk):
+    """Métriques par produit pour un chunk de data_clean.csv"""
+    # Métriques par produit dans ce chunk
+    product_metrics = chunk.groupby('product_id').agg({
+        'user_id': 'nunique',
+        'session_id': 'nunique',
+        'timestamp': 'count',
+        'event_type': lambda x: (x == 'view').sum(),
+    }).reset_index()
+
+    product_metrics.columns = ['product_id', 'unique_users', 'unique_sessions', 'total_events', 'views']
+
+    # Compter addtocart et transactions
+    addtocart_counts = chunk[chunk['event_type'] == 'addtocart'].groupby('product_id').size()
+    transaction_counts = chunk[chunk['event_type'] == 'transaction'].groupby('product_id').size()
+
+    product_metrics = product_metrics.merge(
+        addtocart_counts.rename('add_to_carts'),
+        left_on='product_id',
+        right_index=True,
+        how='left'
+    )
+
+    product_metrics = product_metrics.merge(
+        transaction_counts.rename('purchases'),
+        left_on='product_id',
+        right_index=True,
+        how='left'
+    )
+
+    product_metrics['add_to_carts'] = product_metrics['add_to_carts'].fillna(0).astype(int)
+    product_metrics['purchases'] = product_metrics['purchases'].fillna(0).astype(int)
+
+    return product_metrics
+
+def build_products_summary(chunk_metrics, trans_df):
+    """
+    Agrège les métriques des chunks et calcule revenus, taux et catégories
+
+    Args:
+        chunk_metrics: Liste de DataFrames renvoyés par compute_chunk_metrics
+        trans_df: Transactions (product_id, amount)
+
+    Returns:
+        DataFrame: Une ligne par produit, triée par revenu décroissant
+    """
     print("\nAgrégation des métriques par produit...")
-    products_summary = pd.concat(all_products, ignore_index=True)
+    products_summary = pd.concat(chunk_metrics, ignore_index=True)
     
     # Agréger tous les chunks
     products_summary = products_summary.groupby('product_id').agg({
@@ -91,11 +90,6 @@ def main():
     
     print(f"[OK] {len(products_summary):,} produits uniques")
     
-    # Charger transactions pour les revenus
-    print("\nChargement de transactions.csv pour les revenus...")
-    trans_df = pd.read_csv(data_dir / 'transactions.csv')
-    print(f"[OK] {len(trans_df):,} transactions")
-    
     # Calculer revenus par produit
     revenue_metrics = trans_df.groupby('product_id')['amount'].agg([
         ('total_revenue', 'sum'),
@@ -150,25 +144,8 @@ def main():
     # Catégorisation des produits
     print("Catégorisation des produits par performance...")
     
-    # Top performers (par revenu)
-    revenue_threshold_high = products_summary['total_revenue'].quantile(0.75)
-    revenue_threshold_low = products_summary['total_revenue'].quantile(0.25)
-    
-    def categorize_product(row):
-        if row['total_revenue'] >= revenue_threshold_high and row['view_to_purchase_rate'] >= 1.0:
-            return 'Top Performer'
-        elif row['total_revenue'] >= revenue_threshold_high:
-            return 'High Revenue'
-        elif row['view_to_purchase_rate'] >= 2.0:
-            return 'High Conversion'
-        elif row['views'] >= 100:
-            return 'Popular'
-        elif row['total_revenue'] > 0:
-            return 'Low Performer'
-        else:
-            return 'No Sales'
-    
-    products_summary['category'] = products_summary.apply(categorize_product, axis=1)
+    # Règles vectorisées (seuil haut = 3e quartile du revenu)
+    products_summary['category'] = product_analytics.categorize_products(products_summary)
     
     # Trier par revenu décroissant
     products_summary = products_summary.sort_values('total_revenue', ascending=False).reset_index(drop=True)
@@ -187,6 +164,38 @@ def main():
     ]
     
     products_summary = products_summary[col_order]
+
+    return products_summary
+
+def main():
+    """Génération de products_summary.csv"""
+    print_separator("GENERATION DE PRODUCTS_SUMMARY.CSV - Issue #8")
+    print(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    
+    start_time = datetime.now()
+    
+    # Chemins
+    project_root = PROJECT_ROOT
+    data_dir = project_root / 'data' / 'clean'
+    
+    print_separator("CHARGEMENT DES DONNEES")
+    
+    # Charger data_clean.csv par chunks pour extraire les métriques produits
+    print("Chargement de data_clean.csv par chunks...")
+    chunk_size = 500000
+    all_products = []
+    
+    for i, chunk in enumerate(schema.read_csv(data_dir / 'data_clean.csv', chunksize=chunk_size), 1):
+        print(f"  Chunk {i}: {len(chunk):,} lignes")
+        
+        all_products.append(compute_chunk_metrics(chunk))
+    
+    # Charger transactions pour les revenus
+    print("\nChargement de transactions.csv pour les revenus...")
+    trans_df = pd.read_csv(data_dir / 'transactions.csv')
+    print(f"[OK] {len(trans_df):,} transactions")
+    
+    products_summary = build_products_summary(all_products, trans_df)
     
     print(f"\n[RESULTAT] {len(products_summary):,} produits x {len(products_summary.columns)} colonnes")
     
@@ -12,6 +12,12 @@ import numpy as np
 import os
 from pathlib import Path
 from datetime import datetime
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.kpis.category_tree import CategoryTree
 
 def print_separator(title=""):
     """Affiche un séparateur visuel"""
@@ -209,26 +215,24 @@ def inspect_category_tree_file(filepath):
         print("[STRUCTURE HIERARCHIQUE]:")
         print(f"   Catégories uniques: {df['categoryid'].nunique():,}")
         
-        # Catégories racines (sans parent)
-        root_categories = df[df['parentid'].isna()]
-        print(f"   Catégories racines: {len(root_categories)}")
+        # Index de l'arbre (profondeur, racine, sous-arbres) construit en une fois
+        tree = CategoryTree.from_frame(df.drop_duplicates('categoryid'))
+        is_root = tree.parent < 0
+        print(f"   Catégories racines: {int(df['parentid'].isna().sum())}")
+        implicit_roots = len(tree) - df['categoryid'].nunique()
+        if implicit_roots > 0:
+            print(f"   Parents absents de la table (racines implicites): {implicit_roots}")
         
         # Profondeur de l'arbre
-        def get_depth(row, df):
-            depth = 0
-            parent = row['parentid']
-            while pd.notna(parent):
-                depth += 1
-                parent_row = df[df['categoryid'] == parent]
-                if len(parent_row) == 0:
-                    break
-                parent = parent_row.iloc[0]['parentid']
-            return depth
+        depth = tree.depth[tree.positions(df['categoryid'])]
+        print(f"   Profondeur maximale: {depth.max()}")
+        print(f"   Profondeur moyenne: {depth.mean():.2f}")
+        print(f"   Catégories feuilles: {int((tree.size == 1).sum()):,}")
         
-        if len(df) < 10000:  # Seulement si le dataset n'est pas trop grand
-            df['depth'] = df.apply(lambda row: get_depth(row, df), axis=1)
-            print(f"   Profondeur maximale: {df['depth'].max()}")
-            print(f"   Profondeur moyenne: {df['depth'].mean():.2f}")
+        subtree_size = pd.Series(tree.size[is_root], index=tree.ids[is_root]).sort_values(ascending=False)
+        print("   Plus grands arbres (racine: catégories):")
+        for root_id, size in subtree_size.head(5).items():
+            print(f"     {root_id}: {size:,}")
         print()
 
 def inspect_clean_files(data_dir):
@@ -267,7 +271,7 @@ def main():
     print()
     
     # Répertoires
-    project_root = Path(__file__).parent.parent
+    project_root = PROJECT_ROOT
     data_dir = project_root / 'data'
     raw_dir = data_dir / 'raw'
     
@@ -13,7 +13,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Chemins
-PROJECT_ROOT = Path(__file__).parent.parent
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
 DATA_CLEAN_DIR = PROJECT_ROOT / "data" / "clean"
 
 # Configuration de la base de données
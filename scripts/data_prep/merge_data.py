@@ -14,6 +14,13 @@ from datetime import datetime
 import json
 import sys
 
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.preprocessing import schema
+from src.preprocessing.lookup import KeyLookup
+from src.kpis.journeys import build_journeys, journey_labels, path_statistics
+
 def print_separator(title=""):
     """Affiche un séparateur visuel"""
     if title:
@@ -23,8 +30,8 @@ def print_separator(title=""):
     else:
         print(f"{'='*80}\n")
 
-def load_cleaned_data(data_dir):
-    """Charge tous les fichiers nettoyés"""
+def load_cleaned_data(data_dir, skip=()):
+    """Charge tous les fichiers nettoyés (sauf ceux listés dans skip)"""
     print_separator("CHARGEMENT DES DONNEES NETTOYEES")
     
     files_to_load = {
@@ -39,22 +46,47 @@ def load_cleaned_data(data_dir):
     
     for name, filename in files_to_load.items():
         filepath = data_dir / filename
-        if not filepath.exists():
+        if name in skip:
+            data[name] = None
+        elif not filepath.exists():
             print(f"[WARNING] Fichier non trouve: {filepath}")
             print(f"  Certaines fonctionnalites seront limitees")
             data[name] = None
         else:
             # Pour products, charger seulement les 3 premières colonnes pour économiser la mémoire
             if name == 'products':
-                df = pd.read_csv(filepath, usecols=['product_id', 'view_count', 'purchase_count'])
+                df = schema.read_csv(filepath, usecols=['product_id', 'view_count', 'purchase_count'])
             else:
-                df = pd.read_csv(filepath)
+                df = schema.read_csv(filepath)
             data[name] = df
             print(f"[OK] {filename}: {len(df):,} lignes")
     
     return data
 
-def enrich_events(events_df, users_df, products_df):
+def build_lookups(users_df, products_df):
+    """Construit une fois les index users → segment et products → statistiques"""
+    lookups = {}
+    if users_df is not None:
+        user_columns = [c for c in ['segment', 'total_events'] if c in users_df.columns]
+        lookups['users'] = KeyLookup(users_df['user_id'], users_df[user_columns])
+    if products_df is not None:
+        lookups['products'] = KeyLookup(
+            products_df['product_id'], products_df[['view_count', 'purchase_count']]
+        )
+    return lookups
+
+def add_time_columns(events_df):
+    """Ajoute datetime, date, hour et day_of_week (en place) à partir du timestamp"""
+    events_df['datetime'] = pd.to_datetime(events_df['timestamp'], unit='ms')
+    # Jour tronqué (datetime64) plutôt que des objets date Python : même texte en CSV
+    events_df['date'] = events_df['datetime'].dt.floor('D')
+    events_df['hour'] = events_df['datetime'].dt.hour.astype('int8')
+    events_df['day_of_week'] = pd.Categorical.from_codes(
+        events_df['datetime'].dt.dayofweek.to_numpy(), dtype=schema.WEEKDAY
+    )
+    return events_df
+
+def enrich_events(events_df, users_df, products_df, lookups=None):
     """Enrichit les événements avec les données utilisateurs et produits"""
     print_separator("ENRICHISSEMENT DES EVENEMENTS")
     
@@ -62,44 +94,63 @@ def enrich_events(events_df, users_df, products_df):
         print("[ERROR] Donnees events manquantes")
         return None
     
-    events_enriched = events_df.copy()
+    if lookups is None:
+        lookups = build_lookups(users_df, products_df)
+    
+    # Copie superficielle : les colonnes ajoutées ne modifient pas events_df,
+    # les colonnes existantes ne sont pas recopiées
+    events_enriched = events_df.copy(deep=False)
     
     # Enrichir avec les utilisateurs
-    if users_df is not None:
-        print("Fusion avec users (segment utilisateur)...")
-        events_enriched = events_enriched.merge(
-            users_df[['user_id', 'segment']],
-            left_on='visitorid',
-            right_on='user_id',
-            how='left'
-        )
-        events_enriched.drop('user_id', axis=1, inplace=True)
+    if 'users' in lookups:
+        print("Correspondance avec users (segment utilisateur)...")
+        lookups['users'].attach(events_enriched, 'visitorid', ['segment'])
         print(f"  [OK] Colonne 'segment' ajoutee")
     
     # Enrichir avec les produits
-    if products_df is not None:
-        print("Fusion avec products (statistiques produits)...")
-        events_enriched = events_enriched.merge(
-            products_df[['product_id', 'view_count', 'purchase_count']],
-            left_on='itemid',
-            right_on='product_id',
-            how='left'
-        )
-        events_enriched.drop('product_id', axis=1, inplace=True)
+    if 'products' in lookups:
+        print("Correspondance avec products (statistiques produits)...")
+        lookups['products'].attach(events_enriched, 'itemid', ['view_count', 'purchase_count'])
         print(f"  [OK] Colonnes produits ajoutees")
     
     # Convertir timestamp en datetime
     print("Conversion du timestamp...")
-    events_enriched['datetime'] = pd.to_datetime(events_enriched['timestamp'], unit='ms')
-    events_enriched['date'] = events_enriched['datetime'].dt.date
-    events_enriched['hour'] = events_enriched['datetime'].dt.hour
-    events_enriched['day_of_week'] = events_enriched['datetime'].dt.day_name()
+    add_time_columns(events_enriched)
     print(f"  [OK] Colonnes temporelles ajoutees")
     
     print(f"\n[RESULTAT] Events enrichis: {len(events_enriched):,} lignes x {len(events_enriched.columns)} colonnes")
     
     return events_enriched
 
+def enrich_events_file(input_path, output_path, lookups, chunksize=1_000_000):
+    """
+    Enrichit events_cleaned.csv par chunks, sans le charger en mémoire
+
+    Les index users/products sont partagés par tous les chunks ; chaque
+    chunk enrichi est ajouté au fichier de sortie.
+
+    Returns:
+        int: Nombre d'événements écrits
+    """
+    print_separator("ENRICHISSEMENT DES EVENEMENTS PAR CHUNKS")
+    
+    total_rows = 0
+    for i, chunk in enumerate(schema.read_csv(input_path, chunksize=chunksize), 1):
+        if 'users' in lookups:
+            lookups['users'].attach(chunk, 'visitorid', ['segment'])
+        if 'products' in lookups:
+            lookups['products'].attach(chunk, 'itemid', ['view_count', 'purchase_count'])
+        add_time_columns(chunk)
+        
+        chunk = schema.to_compact(chunk)
+        chunk.to_csv(output_path, mode='w' if i == 1 else 'a', header=i == 1, index=False)
+        total_rows += len(chunk)
+        print(f"  Chunk {i}: {len(chunk):,} lignes")
+    
+    print(f"\n[RESULTAT] Events enrichis: {total_rows:,} lignes -> {output_path}")
+    
+    return total_rows
+
 def enrich_sessions(sessions_df, users_df):
     """Enrichit les sessions avec les données utilisateurs"""
     print_separator("ENRICHISSEMENT DES SESSIONS")
@@ -125,7 +176,7 @@ def enrich_sessions(sessions_df, users_df):
     
     return sessions_enriched
 
-def enrich_transactions(transactions_df, users_df, products_df):
+def enrich_transactions(transactions_df, users_df, products_df, lookups=None):
     """Enrichit les transactions avec les données utilisateurs et produits"""
     print_separator("ENRICHISSEMENT DES TRANSACTIONS")
     
@@ -133,26 +184,21 @@ def enrich_transactions(transactions_df, users_df, products_df):
         print("[ERROR] Donnees transactions manquantes")
         return None
     
-    transactions_enriched = transactions_df.copy()
+    if lookups is None:
+        lookups = build_lookups(users_df, products_df)
+    
+    transactions_enriched = transactions_df.copy(deep=False)
     
     # Enrichir avec les utilisateurs
-    if users_df is not None:
-        print("Fusion avec users (segment utilisateur)...")
-        transactions_enriched = transactions_enriched.merge(
-            users_df[['user_id', 'segment', 'total_events']],
-            on='user_id',
-            how='left'
-        )
+    if 'users' in lookups:
+        print("Correspondance avec users (segment utilisateur)...")
+        lookups['users'].attach(transactions_enriched, 'user_id')
         print(f"  [OK] Segment utilisateur ajoute")
     
     # Enrichir avec les produits
-    if products_df is not None:
-        print("Fusion avec products (statistiques produits)...")
-        transactions_enriched = transactions_enriched.merge(
-            products_df[['product_id', 'view_count', 'purchase_count']],
-            on='product_id',
-            how='left'
-        )
+    if 'products' in lookups:
+        print("Correspondance avec products (statistiques produits)...")
+        lookups['products'].attach(transactions_enriched, 'product_id')
         print(f"  [OK] Statistiques produits ajoutees")
     
     print(f"\n[RESULTAT] Transactions enrichies: {len(transactions_enriched):,} lignes x {len(transactions_enriched.columns)} colonnes")
@@ -180,7 +226,7 @@ def create_daily_funnel(events_enriched):
     })
     
     # Compter par type d'événement
-    event_counts = events_enriched.groupby(['date', 'event']).size().unstack(fill_value=0)
+    event_counts = events_enriched.groupby(['date', 'event'], observed=True).size().unstack(fill_value=0)
     
     # Fusionner
     daily_funnel = daily_stats.join(event_counts)
@@ -216,7 +262,7 @@ def create_hourly_analysis(events_enriched):
     })
     
     # Compter par type d'événement
-    event_counts = events_enriched.groupby(['hour', 'event']).size().unstack(fill_value=0)
+    event_counts = events_enriched.groupby(['hour', 'event'], observed=True).size().unstack(fill_value=0)
     hourly_analysis = hourly_stats.join(event_counts)
     
     # Taux de conversion horaire
@@ -237,7 +283,7 @@ def create_segment_performance(transactions_enriched):
     
     print("Calcul des KPIs par segment...")
     
-    segment_stats = transactions_enriched.groupby('segment').agg({
+    segment_stats = transactions_enriched.groupby('segment', observed=True).agg({
         'user_id': 'nunique',
         'amount': ['sum', 'mean', 'count']
     }).round(2)
@@ -261,17 +307,17 @@ def create_user_journey(events_enriched):
     
     print("Calcul des sequences d'evenements...")
     
-    # Trier par utilisateur et timestamp
-    events_sorted = events_enriched.sort_values(['visitorid', 'timestamp'])
+    # Premières 10 étapes de chaque visiteur, encodées en codes d'événements
+    journeys, steps = build_journeys(events_enriched)
     
-    # Analyser les séquences
-    user_journey = events_sorted.groupby('visitorid').agg({
-        'event': lambda x: ' -> '.join(x.head(10)),  # Premières 10 étapes
-        'timestamp': ['min', 'max', 'count'],
-        'segment': 'first'
-    })
-    
-    user_journey.columns = ['journey', 'first_event_time', 'last_event_time', 'total_events', 'segment']
+    user_journey = pd.DataFrame({
+        'journey': journey_labels(steps),
+        'first_event_time': journeys['first_event_time'].to_numpy(),
+        'last_event_time': journeys['last_event_time'].to_numpy(),
+        'total_events': journeys['total_events'].to_numpy(),
+    }, index=journeys.index)
+    if 'segment' in events_enriched.columns:
+        user_journey['segment'] = events_enriched['segment'].iloc[journeys['first_row']].to_numpy()
     
     # Calculer la durée du parcours (en heures)
     user_journey['first_event_time'] = pd.to_datetime(user_journey['first_event_time'], unit='ms')
@@ -284,6 +330,21 @@ def create_user_journey(events_enriched):
     
     return user_journey
 
+def create_journey_paths(user_journey, top_n=100):
+    """Chemins les plus fréquents (page Funnel)"""
+    print_separator("CREATION: CHEMINS DE PARCOURS")
+    
+    if user_journey is None or 'journey' not in user_journey.columns:
+        print("[ERROR] Donnees insuffisantes")
+        return None
+    
+    journey_paths = path_statistics(user_journey['journey'].array, top_n=top_n)
+    
+    print(f"[OK] {len(journey_paths)} chemins les plus frequents "
+          f"({journey_paths['share'].sum():.1f}% des visiteurs)")
+    
+    return journey_paths
+
 def create_product_performance(events_enriched, transactions_enriched):
     """Performance détaillée des produits"""
     print_separator("CREATION: PERFORMANCE PRODUITS")
@@ -304,7 +365,7 @@ def create_product_performance(events_enriched, transactions_enriched):
     })
     
     # Compter par type d'événement
-    event_counts = events_enriched.groupby(['itemid', 'event']).size().unstack(fill_value=0)
+    event_counts = events_enriched.groupby(['itemid', 'event'], observed=True).size().unstack(fill_value=0)
     product_performance = product_events.join(event_counts)
     
     # Ajouter les revenus si transactions disponibles
@@ -344,7 +405,7 @@ def save_merged_data(output_dir, **dataframes):
     for name, df in dataframes.items():
         if df is not None and len(df) > 0:
             filepath = output_dir / f"{name}.csv"
-            df.to_csv(filepath, index=True if df.index.name else False)
+            schema.write_csv(df, filepath, index=True if df.index.name else False)
             file_size = filepath.stat().st_size / 1024**2
             print(f"[OK] {name}.csv: {len(df):,} lignes, {file_size:.2f} MB")
             saved_files.append(name)
@@ -384,7 +445,7 @@ def generate_statistics(data, enriched_data, output_dir):
     
     # Stats des tables d'analyse
     for name in ['daily_funnel', 'hourly_analysis', 'segment_performance', 
-                 'user_journey', 'product_performance']:
+                 'user_journey', 'journey_paths', 'product_performance']:
         if name in enriched_data and enriched_data[name] is not None:
             df = enriched_data[name]
             stats['analysis_tables'][name] = {
@@ -439,6 +500,36 @@ def generate_statistics(data, enriched_data, output_dir):
     
     return stats
 
+def main_chunked(data_dir, output_dir, start_time):
+    """Enrichissement par chunks des events et des transactions"""
+    data = load_cleaned_data(data_dir, skip=('events',))
+    events_path = data_dir / 'events_cleaned.csv'
+    if not events_path.exists():
+        print("\n[ERROR] Impossible de continuer sans events_cleaned.csv")
+        sys.exit(1)
+    
+    lookups = build_lookups(data['users'], data['products'])
+    output_dir.mkdir(parents=True, exist_ok=True)
+    enrich_events_file(events_path, output_dir / 'events_enriched.csv', lookups)
+    
+    enriched_data = {
+        'sessions_enriched': enrich_sessions(data['sessions'], data['users']),
+        'transactions_enriched': enrich_transactions(
+            data['transactions'], data['users'], data['products'], lookups
+        ),
+    }
+    enriched_data['segment_performance'] = create_segment_performance(
+        enriched_data['transactions_enriched']
+    )
+    saved_files = save_merged_data(output_dir, **enriched_data)
+    
+    elapsed = (datetime.now() - start_time).total_seconds()
+    print_separator("FUSION TERMINEE AVEC SUCCES")
+    print(f"Temps d'execution: {elapsed:.1f} secondes")
+    print(f"Fichiers generes: {len(saved_files) + 1}")
+    print(f"\nFichiers disponibles dans: {output_dir}")
+    print()
+
 def main():
     """Fonction principale"""
     print_separator("FUSION DES DONNEES - Issue #5")
@@ -447,10 +538,16 @@ def main():
     start_time = datetime.now()
     
     # Chemins
-    project_root = Path(__file__).parent.parent
+    project_root = PROJECT_ROOT
     data_dir = project_root / 'data' / 'clean'
     output_dir = data_dir
     
+    # Mode --chunked : events_enriched.csv produit par chunks (events plus
+    # volumineux que la mémoire), sans les tables d'analyse calculées sur events
+    if '--chunked' in sys.argv[1:]:
+        main_chunked(data_dir, output_dir, start_time)
+        return
+    
     # Étape 1: Charger les données
     data = load_cleaned_data(data_dir)
     
@@ -459,11 +556,12 @@ def main():
         print("\n[ERROR] Impossible de continuer sans events_cleaned.csv")
         sys.exit(1)
     
-    # Étape 2: Enrichir les données
+    # Étape 2: Enrichir les données (index users/products construits une fois)
     enriched_data = {}
+    lookups = build_lookups(data['users'], data['products'])
     
     enriched_data['events_enriched'] = enrich_events(
-        data['events'], data['users'], data['products']
+        data['events'], data['users'], data['products'], lookups
     )
     
     enriched_data['sessions_enriched'] = enrich_sessions(
@@ -471,7 +569,7 @@ def main():
     )
     
     enriched_data['transactions_enriched'] = enrich_transactions(
-        data['transactions'], data['users'], data['products']
+        data['transactions'], data['users'], data['products'], lookups
     )
     
     # Étape 3: Créer les tables d'analyse
@@ -485,6 +583,8 @@ def main():
     
     enriched_data['user_journey'] = create_user_journey(enriched_data['events_enriched'])
     
+    enriched_data['journey_paths'] = create_journey_paths(enriched_data['user_journey'])
+    
     enriched_data['product_performance'] = create_product_performance(
         enriched_data['events_enriched'],
         enriched_data['transactions_enriched']
@@ -509,7 +609,7 @@ def main():
             print(f"  - {name}.csv")
     print("\nTables d'analyse:")
     for name in ['daily_funnel', 'hourly_analysis', 'segment_performance', 
-                 'user_journey', 'product_performance']:
+                 'user_journey', 'journey_paths', 'product_performance']:
         if name in saved_files:
             print(f"  - {name}.csv")
     print(f"\nStatistiques: merge_statistics.json")
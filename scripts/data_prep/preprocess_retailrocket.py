@@ -10,7 +10,7 @@ import numpy as np
 from datetime import datetime
 
 # Chemins
-PROJECT_ROOT = Path(__file__).parent.parent
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
 DATA_RAW_DIR = PROJECT_ROOT / "data" / "raw"
 DATA_CLEAN_DIR = PROJECT_ROOT / "data" / "clean"
 
@@ -5,6 +5,7 @@ Automatically imports CSV data from data/clean/ into PostgreSQL database
 Imports: Daily Metrics, Products, Traffic, A/B Tests, Funnel data
 """
 
+import argparse
 import os
 import sys
 import pandas as pd
@@ -44,6 +45,20 @@ def get_db_connection():
         sys.exit(1)
 
 
+def filter_since(df, since):
+    """Lignes dont la date est >= since (toutes si since est None)"""
+    if since is None:
+        return df
+    return df[pd.to_datetime(df['date']).dt.date >= since]
+
+
+def last_imported_date(conn):
+    """Dernier jour présent dans daily_metrics (None si la table est vide)"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT MAX(date) FROM daily_metrics")
+    return cursor.fetchone()[0]
+
+
 def import_ab_test_simulations(conn):
     """Import A/B test simulation data"""
     try:
@@ -240,7 +255,7 @@ def import_user_behavior(conn):
         raise
 
 
-def import_daily_metrics(conn):
+def import_daily_metrics(conn, since=None):
     """Import daily metrics from CSV"""
     try:
         logger.info("📈 Importing daily metrics from CSV...")
@@ -251,7 +266,7 @@ def import_daily_metrics(conn):
             logger.warning("⚠️  daily_metrics.csv not found, skipping...")
             return
         
-        df = pd.read_csv(csv_file)
+        df = filter_since(pd.read_csv(csv_file), since)
         df['date'] = pd.to_datetime(df['date']).dt.date
         
         cursor = conn.cursor()
@@ -349,7 +364,7 @@ def import_products_summary(conn):
         raise
 
 
-def import_traffic_sources(conn):
+def import_traffic_sources(conn, since=None):
     """Import traffic data from CSV"""
     try:
         logger.info("🚦 Importing traffic data...")
@@ -360,7 +375,7 @@ def import_traffic_sources(conn):
             logger.warning("⚠️  traffic_daily.csv not found, skipping...")
             return
         
-        df = pd.read_csv(csv_file)
+        df = filter_since(pd.read_csv(csv_file), since)
         df['date'] = pd.to_datetime(df['date']).dt.date
         
         cursor = conn.cursor()
@@ -398,7 +413,7 @@ def import_traffic_sources(conn):
         raise
 
 
-def import_funnel_stages(conn):
+def import_funnel_stages(conn, since=None):
     """Import funnel stages from CSV"""
     try:
         logger.info("🔄 Importing funnel data...")
@@ -409,7 +424,7 @@ def import_funnel_stages(conn):
             logger.warning("⚠️  daily_funnel.csv not found, skipping...")
             return
         
-        df = pd.read_csv(csv_file)
+        df = filter_since(pd.read_csv(csv_file), since)
         df['date'] = pd.to_datetime(df['date']).dt.date
         
         cursor = conn.cursor()
@@ -495,6 +510,13 @@ def verify_import(conn):
 
 def main():
     """Main import process"""
+    parser = argparse.ArgumentParser(description='Import KPI CSVs into PostgreSQL')
+    parser.add_argument('--since', type=lambda value: datetime.strptime(value, '%Y-%m-%d').date(),
+                        help='Only upsert daily rows from this date (YYYY-MM-DD)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only upsert daily rows from the last date already in daily_metrics')
+    args = parser.parse_args()
+    
     logger.info("="*80)
     logger.info("🚀 Starting Automated KPI Data Import to PostgreSQL")
     logger.info("="*80)
@@ -503,11 +525,18 @@ def main():
     
     try:
         # Import all KPI data
+        # The last imported day is upserted again: it may have been partial
+        since = args.since
+        if args.incremental and since is None:
+            since = last_imported_date(conn)
+        if since is not None:
+            logger.info(f"\n📅 Incremental import of daily rows from {since}")
+        
         logger.info("\n📊 Importing KPI datasets...")
-        import_daily_metrics(conn)
+        import_daily_metrics(conn, since)
         import_products_summary(conn)
-        import_traffic_sources(conn)
-        import_funnel_stages(conn)
+        import_traffic_sources(conn, since)
+        import_funnel_stages(conn, since)
         import_ab_test_simulations(conn)
         
         # Verify
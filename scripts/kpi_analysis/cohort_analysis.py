@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Script d'analyse de cohortes et rétention
+Affecte chaque utilisateur à sa semaine de première visite (data_clean.csv)
+et génère cohort_retention.csv, la matrice de rétention réelle utilisée
+par la page Cohortes et la table cohort_analysis de l'exporter.
+
+Auteur: E-commerce Dashboard Team
+Date: 2026-10-19
+"""
+
+import sys
+import json
+import pandas as pd
+from pathlib import Path
+from datetime import datetime
+
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.kpis.cohorts import user_week_activity, build_retention_matrix, retention_pivot, to_epoch_ms
+
+CHUNK_SIZE = 1_000_000
+
+
+def print_separator(title=""):
+    """Affiche un séparateur formaté"""
+    if title:
+        print(f"\n{'='*80}")
+        print(f"  {title}")
+        print(f"{'='*80}\n")
+    else:
+        print(f"{'='*80}\n")
+
+
+def load_activity(events_file):
+    """Lit data_clean.csv par chunks et ne garde que les couples (utilisateur, semaine)"""
+    partials = []
+    for i, chunk in enumerate(pd.read_csv(events_file, usecols=['user_id', 'timestamp'],
+                                          chunksize=CHUNK_SIZE), start=1):
+        partials.append(user_week_activity(chunk))
+        print(f"  Chunk {i}: {len(chunk):,} evenements")
+
+    activity = user_week_activity(pd.concat(partials, ignore_index=True))
+    print(f"[OK] {len(activity):,} couples (utilisateur, semaine)")
+    return activity
+
+
+def load_transactions(transactions_file):
+    """
+    Lit transactions.csv ; transaction_date (date texte, ex: 2015-05-28
+    18:39:31.745) est convertie en ms epoch, l'unité attendue par le moteur
+    de cohortes
+    """
+    transactions = pd.read_csv(transactions_file, usecols=['user_id', 'transaction_date', 'amount'])
+    transactions['transaction_date'] = to_epoch_ms(transactions['transaction_date'])
+    return transactions
+
+
+def main():
+    """Analyse de cohortes: semaine de première visite et rétention hebdomadaire"""
+    print_separator("ANALYSE DE COHORTES & RETENTION")
+    print(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+
+    start_time = datetime.now()
+
+    data_dir = project_root / 'data' / 'clean'
+    events_file = data_dir / 'data_clean.csv'
+    transactions_file = data_dir / 'transactions.csv'
+
+    if not events_file.exists():
+        print(f"[ERREUR] Fichier non trouve: {events_file}")
+        print("Executez d'abord: python scripts/data_prep/generate_data_clean_simple.py")
+        sys.exit(1)
+
+    print_separator("CHARGEMENT DES DONNEES")
+    activity = load_activity(events_file)
+
+    transactions = None
+    if transactions_file.exists():
+        transactions = load_transactions(transactions_file)
+        print(f"[OK] {len(transactions):,} transactions chargees")
+    else:
+        print("[INFO] transactions.csv non trouve, revenu des cohortes a 0")
+
+    print_separator("CALCUL DE LA MATRICE DE RETENTION")
+    cohort_table = build_retention_matrix(activity, transactions)
+
+    output_file = data_dir / 'cohort_retention.csv'
+    cohort_table.to_csv(output_file, index=False)
+    print(f"[OK] {output_file}")
+    print(f"     {cohort_table['cohort_week'].nunique()} cohortes, {len(cohort_table)} lignes")
+
+    pivot = retention_pivot(cohort_table)
+    summary = {
+        'timestamp': datetime.now().isoformat(),
+        'total_users': int(cohort_table.loc[cohort_table['week_number'] == 0, 'cohort_size'].sum()),
+        'total_cohorts': int(len(pivot)),
+        'max_week_number': int(cohort_table['week_number'].max()),
+        'avg_retention_by_week': {
+            int(week): float(rate) for week, rate in pivot.mean().round(2).items()
+        }
+    }
+    with open(data_dir / 'cohort_analysis_summary.json', 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    print(f"[OK] cohort_analysis_summary.json")
+
+    print_separator("RESUME FINAL")
+    execution_time = (datetime.now() - start_time).total_seconds()
+    print(f"   • Utilisateurs: {summary['total_users']:,}")
+    print(f"   • Cohortes: {summary['total_cohorts']}")
+    if 1 in summary['avg_retention_by_week']:
+        print(f"   • Rétention semaine 1: {summary['avg_retention_by_week'][1]:.2f}%")
+    print(f"\n⏱️  Temps d'exécution: {execution_time:.2f}s")
+    print(f"\n{'='*80}\n")
+
+
+if __name__ == "__main__":
+    main()
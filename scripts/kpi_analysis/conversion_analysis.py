@@ -31,7 +31,7 @@ def main():
     start_time = datetime.now()
     
     # Chemins
-    project_root = Path(__file__).parent.parent
+    project_root = Path(__file__).resolve().parents[2]
     data_dir = project_root / 'data' / 'clean'
     output_dir = data_dir
     
@@ -13,6 +13,13 @@ import numpy as np
 from pathlib import Path
 from datetime import datetime
 import json
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.kpis import products as product_analytics
+from src.kpis.category_tree import CategoryTree, item_categories
 
 def print_separator(title=""):
     """Affiche un séparateur formaté"""
@@ -23,6 +30,33 @@ def print_separator(title=""):
     else:
         print(f"{'='*80}\n")
 
+def load_item_categories(filepath, chunksize=1_000_000):
+    """Catégorie la plus récente de chaque produit (lignes 'categoryid' de item_properties)"""
+    chunks = [
+        chunk[chunk['property'] == 'categoryid']
+        for chunk in pd.read_csv(filepath, usecols=['timestamp', 'itemid', 'property', 'value'],
+                                 chunksize=chunksize)
+    ]
+    return item_categories(pd.concat(chunks, ignore_index=True))
+
+def category_tree_performance(products, tree, categories):
+    """
+    Performance cumulée par sous-arbre de l'arbre des catégories
+    (revenue, vues, achats et produits de la catégorie et de ses descendants)
+    """
+    product_categories = categories.reindex(products['product_id']).to_numpy()
+    
+    tree_perf = tree.frame().drop(columns=['subtree_start', 'subtree_end'])
+    tree_perf['num_products'] = tree.subtree_totals(product_categories, np.ones(len(products))).to_numpy()
+    for col in ['total_revenue', 'views', 'purchases']:
+        tree_perf[col] = tree.subtree_totals(product_categories, products[col].fillna(0)).to_numpy()
+    
+    tree_perf['revenue_share'] = (tree_perf['total_revenue'] / 
+                                  max(products['total_revenue'].sum(), 1) * 100).round(2)
+    tree_perf['conversion_rate'] = (tree_perf['purchases'] / 
+                                    tree_perf['views'].where(tree_perf['views'] > 0) * 100).round(2)
+    return tree_perf.sort_values(['depth', 'total_revenue'], ascending=[True, False], ignore_index=True)
+
 def main():
     """Analyse détaillée des catégories et produits: performance, distribution, insights"""
     print_separator("ANALYSE CATEGORIES & PRODUITS - ISSUE #12")
@@ -31,7 +65,7 @@ def main():
     start_time = datetime.now()
     
     # Chemins
-    project_root = Path(__file__).parent.parent
+    project_root = PROJECT_ROOT
     data_dir = project_root / 'data' / 'clean'
     output_dir = data_dir
     
@@ -183,26 +217,16 @@ def main():
         'std_price': float(products['avg_price'].std())
     }
     
-    # Segmentation par tranche de prix
-    products['price_range'] = pd.cut(products['avg_price'], 
-                                      bins=[0, 50, 100, 150, 200, 300, 500],
-                                      labels=['0-50€', '50-100€', '100-150€', '150-200€', 
-                                              '200-300€', '300-500€'])
-    
-    price_segments = products.groupby('price_range', observed=True).agg({
-        'product_id': 'count',
-        'total_revenue': 'sum',
-        'purchases': 'sum',
-        'view_to_purchase_rate': 'mean'
-    }).round(2)
+    # Segmentation par tranche de prix (tranches de PRICE_BINS)
+    price_seg_df = product_analytics.price_segment_table(products)
     
     print(f"   Prix moyen: €{price_analysis['avg_price']:.2f}")
     print(f"   Prix médian: €{price_analysis['median_price']:.2f}")
     print(f"   Range: €{price_analysis['min_price']:.2f} - €{price_analysis['max_price']:.2f}")
     print("\n   Distribution par tranche de prix:")
-    for idx in price_segments.index:
-        print(f"     {idx}: {int(price_segments.loc[idx, 'product_id']):,} produits, "
-              f"€{price_segments.loc[idx, 'total_revenue']:,.0f} revenue")
+    for _, row in price_seg_df.iterrows():
+        print(f"     {row['price_range']}: {int(row['num_products']):,} produits, "
+              f"€{row['total_revenue']:,.0f} revenue")
     
     # 5. TOP 20 PRODUITS
     print("\n5. Identification des top produits...")
@@ -221,14 +245,13 @@ def main():
     # 6. ANALYSE DE LA LONGUE TRAINE
     print("\n6. Analyse de la longue traîne...")
     
-    products_sorted = products.sort_values('total_revenue', ascending=False).reset_index(drop=True)
-    products_sorted['cumulative_revenue'] = products_sorted['total_revenue'].cumsum()
-    products_sorted['cumulative_revenue_pct'] = (products_sorted['cumulative_revenue'] / 
-                                                   products_sorted['total_revenue'].sum() * 100)
+    # Jalons Pareto en une passe (tri, somme cumulée, searchsorted)
+    pareto_df = product_analytics.pareto_table(products)
+    products_by_milestone = pareto_df.set_index('revenue_milestone_pct')['num_products']
     
     # Trouver combien de produits font 80% du revenue (règle de Pareto)
-    products_for_80pct = (products_sorted['cumulative_revenue_pct'] <= 80).sum()
-    products_for_50pct = (products_sorted['cumulative_revenue_pct'] <= 50).sum()
+    products_for_80pct = products_by_milestone[80]
+    products_for_50pct = products_by_milestone[50]
     
     long_tail = {
         'products_for_50pct_revenue': int(products_for_50pct),
@@ -246,6 +269,25 @@ def main():
     print(f"   {long_tail['remaining_products']:,} produits restants "
           f"({100-long_tail['products_for_80pct_pct']:.2f}%) génèrent 20% du revenue")
     
+    # 7. ARBRE DES CATEGORIES (optionnel : category_tree.csv et item_properties nettoyées)
+    tree_file = data_dir.parent / 'raw' / 'category_tree.csv'
+    properties_file = data_dir / 'item_properties_cleaned.csv'
+    tree_perf = None
+    if tree_file.exists() and properties_file.exists():
+        print("\n7. Agrégation par arbre de catégories...")
+        tree = CategoryTree.from_frame(pd.read_csv(tree_file))
+        categories = load_item_categories(properties_file)
+        tree_perf = category_tree_performance(products, tree, categories)
+        
+        roots = tree_perf[tree_perf['depth'] == 0]
+        print(f"   {len(tree):,} catégories, profondeur max {tree.max_depth}, {len(roots)} racines")
+        print(f"   Produits rattachés: {int(roots['num_products'].sum()):,}/{len(products):,}")
+        for _, row in roots.head(5).iterrows():
+            print(f"   • Racine {row['categoryid']}: €{row['total_revenue']:,.0f} "
+                  f"({row['revenue_share']:.1f}%) | {int(row['num_products']):,} produits")
+    else:
+        print("\n7. Arbre des catégories non disponible (category_tree.csv / item_properties_cleaned.csv)")
+    
     print_separator("GENERATION DES FICHIERS")
     
     # Préparer le summary global
@@ -281,6 +323,14 @@ def main():
     print(f"[OK] {output_cat}")
     print(f"     {len(category_perf)} catégories, {len(category_perf.columns)} colonnes")
     
+    # Créer category_tree_performance.csv
+    if tree_perf is not None:
+        print("\nGénération de category_tree_performance.csv...")
+        output_tree = output_dir / 'category_tree_performance.csv'
+        tree_perf.round(2).to_csv(output_tree, index=False)
+        print(f"[OK] {output_tree}")
+        print(f"     {len(tree_perf)} catégories, {len(tree_perf.columns)} colonnes")
+    
     # Créer product_segments.csv
     print("\nGénération de product_segments.csv...")
     
@@ -330,14 +380,6 @@ def main():
     # Créer price_segment_analysis.csv
     print("\nGénération de price_segment_analysis.csv...")
     
-    price_seg_df = price_segments.reset_index()
-    price_seg_df.columns = ['price_range', 'num_products', 'total_revenue', 
-                             'total_purchases', 'avg_conversion']
-    price_seg_df['revenue_per_product'] = (price_seg_df['total_revenue'] / 
-                                            price_seg_df['num_products']).round(2)
-    price_seg_df['revenue_share'] = (price_seg_df['total_revenue'] / 
-                                      price_seg_df['total_revenue'].sum() * 100).round(2)
-    
     output_price = output_dir / 'price_segment_analysis.csv'
     price_seg_df.to_csv(output_price, index=False)
     print(f"[OK] {output_price}")
@@ -346,28 +388,6 @@ def main():
     # Créer pareto_analysis.csv
     print("\nGénération de pareto_analysis.csv...")
     
-    pareto_milestones = [10, 20, 30, 40, 50, 60, 70, 80, 90, 95, 99, 100]
-    pareto_data = []
-    
-    for milestone in pareto_milestones:
-        if milestone == 100:
-            num_products = len(products_sorted)
-        else:
-            num_products = (products_sorted['cumulative_revenue_pct'] <= milestone).sum()
-        
-        revenue = products_sorted.iloc[:num_products]['total_revenue'].sum()
-        purchases = products_sorted.iloc[:num_products]['purchases'].sum()
-        
-        pareto_data.append({
-            'revenue_milestone_pct': milestone,
-            'num_products': num_products,
-            'products_pct': round(num_products / len(products) * 100, 2),
-            'cumulative_revenue': round(revenue, 2),
-            'cumulative_purchases': int(purchases)
-        })
-    
-    pareto_df = pd.DataFrame(pareto_data)
-    
     output_pareto = output_dir / 'pareto_analysis.csv'
     pareto_df.to_csv(output_pareto, index=False)
     print(f"[OK] {output_pareto}")
@@ -413,6 +433,8 @@ def main():
     print(f"\n📁 Fichiers générés:")
     print(f"   • product_category_summary.json")
     print(f"   • category_performance.csv ({len(category_perf)} lignes)")
+    if tree_perf is not None:
+        print(f"   • category_tree_performance.csv ({len(tree_perf)} lignes)")
     print(f"   • product_segments.csv ({len(segment_stats)} lignes)")
     print(f"   • top_products_comprehensive.csv ({len(top_products)} lignes)")
     print(f"   • price_segment_analysis.csv ({len(price_seg_df)} lignes)")
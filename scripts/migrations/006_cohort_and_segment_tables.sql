@@ -0,0 +1,94 @@
+-- ============================================================
+-- Migration 006: Cohort and User Segment Tables
+-- Created: 2026-10-19
+-- Description: Persist cohort_analysis and user_segments (queried by
+--              tools/ecommerce_exporter.py) with the state needed to
+--              maintain them incrementally (update_cohorts_segments.py)
+-- ============================================================
+
+-- Placeholder versions created by create_dashboard_tables.sql only hold
+-- synthetic rows (cohort_week 'YYYY-WW', user_id = product rank): replace them
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'cohort_analysis' AND column_name = 'cohort_week'
+          AND data_type <> 'date'
+    ) THEN
+        DROP TABLE cohort_analysis;
+    END IF;
+
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'user_segments' AND column_name = 'user_id'
+          AND data_type = 'integer'
+    ) THEN
+        DROP TABLE user_segments;
+    END IF;
+END $$;
+
+-- ============================================================
+-- INCREMENTAL STATE
+-- ============================================================
+
+-- Days already folded into the tables below (makes re-runs idempotent)
+CREATE TABLE IF NOT EXISTS cohort_import_log (
+    day DATE PRIMARY KEY,
+    events INTEGER NOT NULL DEFAULT 0,
+    imported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- First-seen week (Monday) of each user
+CREATE TABLE IF NOT EXISTS user_cohorts (
+    user_id BIGINT PRIMARY KEY,
+    cohort_week DATE NOT NULL
+);
+
+-- One row per (user, active week) with the revenue of that week
+CREATE TABLE IF NOT EXISTS user_activity_weeks (
+    user_id BIGINT NOT NULL,
+    activity_week DATE NOT NULL,
+    revenue DECIMAL(12,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, activity_week)
+);
+
+-- ============================================================
+-- TABLES SERVED TO THE EXPORTER AND DASHBOARDS
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS cohort_analysis (
+    cohort_week DATE NOT NULL,
+    week_number INTEGER NOT NULL,
+    cohort_size INTEGER NOT NULL DEFAULT 0,
+    retained_users INTEGER NOT NULL DEFAULT 0,
+    retention_rate DECIMAL(6,2) NOT NULL DEFAULT 0,
+    revenue DECIMAL(12,2) NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (cohort_week, week_number)
+);
+
+CREATE TABLE IF NOT EXISTS user_segments (
+    user_id BIGINT PRIMARY KEY,
+    user_segment VARCHAR(20) NOT NULL,
+    total_events INTEGER NOT NULL DEFAULT 0,
+    total_views INTEGER NOT NULL DEFAULT 0,
+    total_orders INTEGER NOT NULL DEFAULT 0,
+    total_spent DECIMAL(12,2) NOT NULL DEFAULT 0,
+    conversion_rate DECIMAL(6,2) NOT NULL DEFAULT 0,
+    first_seen DATE,
+    last_seen DATE,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- ============================================================
+-- INDEXES
+-- ============================================================
+
+CREATE INDEX IF NOT EXISTS idx_user_cohorts_week ON user_cohorts(cohort_week);
+CREATE INDEX IF NOT EXISTS idx_cohort_analysis_week_number ON cohort_analysis(week_number);
+CREATE INDEX IF NOT EXISTS idx_user_segments_segment ON user_segments(user_segment);
+
+-- Record this migration
+INSERT INTO schema_migrations (version, description)
+VALUES ('006', 'Added cohort_analysis and user_segments with incremental state tables')
+ON CONFLICT (version) DO NOTHING;
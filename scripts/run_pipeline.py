@@ -0,0 +1,80 @@
+"""
+Exécution incrémentale du pipeline de données
+Relance uniquement les étapes dont le script ou les entrées ont changé
+depuis leur dernier succès, les branches indépendantes en parallèle.
+
+Usage:
+    python scripts/run_pipeline.py                  # tout ce qui est périmé
+    python scripts/run_pipeline.py --dry-run        # ce qui serait relancé
+    python scripts/run_pipeline.py --only funnel_analysis --jobs 4
+    python scripts/run_pipeline.py --force          # tout relancer
+"""
+
+import argparse
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.pipeline.dag import BLOCKED, FAILED, Pipeline
+from src.pipeline.steps import PIPELINE_STEPS
+
+
+def print_separator(title=""):
+    """Affiche un séparateur visuel"""
+    print(f"\n{'='*80}")
+    if title:
+        print(f"  {title}")
+        print(f"{'='*80}")
+
+
+def list_steps(pipeline):
+    """Affiche les étapes dans l'ordre d'exécution avec leurs dépendances"""
+    print_separator("ETAPES DU PIPELINE")
+    for name in pipeline.order:
+        deps = ', '.join(pipeline.dependencies[name]) or '-'
+        print(f"  {name:<35} <- {deps}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pipeline de données incrémental')
+    parser.add_argument('--jobs', '-j', type=int,
+                        help='Étapes exécutées en parallèle (défaut: nombre de CPU)')
+    parser.add_argument('--only', nargs='+', metavar='STEP',
+                        help='Étapes à mettre à jour (et leur amont)')
+    parser.add_argument('--force', action='store_true',
+                        help='Relance les étapes même à jour')
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Affiche les étapes à relancer sans les exécuter")
+    parser.add_argument('--list', action='store_true',
+                        help='Liste les étapes et leurs dépendances')
+    args = parser.parse_args()
+
+    pipeline = Pipeline(PIPELINE_STEPS, PROJECT_ROOT)
+    if args.list:
+        list_steps(pipeline)
+        return 0
+
+    unknown = [name for name in args.only or [] if name not in pipeline.steps]
+    if unknown:
+        print(f"[ERREUR] Étapes inconnues: {', '.join(unknown)} (voir --list)")
+        return 2
+
+    print_separator("PIPELINE DE DONNEES")
+    start = time.perf_counter()
+    statuses = pipeline.run(targets=args.only, jobs=args.jobs, force=args.force, dry_run=args.dry_run)
+
+    counts = Counter(statuses.values())
+    print_separator("RESUME")
+    print(f"  Durée: {time.perf_counter() - start:.1f}s")
+    for status, count in sorted(counts.items()):
+        print(f"  {status:<10} {count}")
+    print(f"  Journaux: {pipeline.log_dir}")
+    return 1 if counts[FAILED] or counts[BLOCKED] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
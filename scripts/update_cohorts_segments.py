@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Incremental Cohort & User Segment Maintenance
+Folds newly imported event days from data/clean/data_clean.csv into the
+cohort_analysis and user_segments tables (migration 006). Only the cohorts
+and users touched by the new days are recomputed; days already folded in
+are recorded in cohort_import_log and skipped on the next run.
+"""
+
+import os
+import sys
+import argparse
+import logging
+import numpy as np
+import pandas as pd
+import psycopg2
+from psycopg2.extras import execute_values
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.kpis.cohorts import week_index, week_start, weekly_revenue
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Database connection parameters
+DB_CONFIG = {
+    'host': os.getenv('DB_HOST', 'localhost'),
+    'port': os.getenv('DB_PORT', '5432'),
+    'database': os.getenv('DB_NAME', 'ecommerce_db'),
+    'user': os.getenv('DB_USER', 'dashuser'),
+    'password': os.getenv('DB_PASSWORD', 'dashpass')
+}
+
+DATA_DIR = PROJECT_ROOT / 'data' / 'clean'
+CHUNK_SIZE = 1_000_000
+PAGE_SIZE = 10_000
+
+# Same thresholds as preprocess_retailrocket.create_users_table (total events)
+SEGMENT_CASE = """
+    CASE
+        WHEN total_events > 100 THEN 'Premium'
+        WHEN total_events > 20 THEN 'Regular'
+        WHEN total_events > 5 THEN 'Occasional'
+        ELSE 'New'
+    END
+"""
+
+
+def get_db_connection():
+    """Create database connection"""
+    try:
+        conn = psycopg2.connect(**DB_CONFIG)
+        logger.info("✅ Database connection established")
+        return conn
+    except Exception as e:
+        logger.error(f"❌ Database connection failed: {e}")
+        sys.exit(1)
+
+
+def get_imported_days(conn):
+    """Days already folded into cohort_analysis / user_segments"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT day FROM cohort_import_log")
+    days = {row[0].isoformat() for row in cursor.fetchall()}
+    cursor.close()
+    return days
+
+
+def aggregate_events(events):
+    """
+    Reduce raw events to the per-(user, week) and per-user deltas pushed to PostgreSQL.
+
+    Returns:
+        tuple: (activity, users, days) DataFrames
+    """
+    weeks = week_index(events['timestamp'].to_numpy())
+    is_view = (events['event_type'] == 'view').to_numpy()
+    is_order = (events['event_type'] == 'transaction').to_numpy()
+
+    frame = pd.DataFrame({
+        'user_id': events['user_id'].to_numpy(),
+        'week': weeks,
+        'timestamp': events['timestamp'].to_numpy(),
+        'views': is_view.astype(np.int32),
+        'orders': is_order.astype(np.int32),
+    })
+
+    activity = frame[['user_id', 'week']].drop_duplicates(ignore_index=True)
+    users = frame.groupby('user_id').agg(
+        events=('week', 'size'),
+        views=('views', 'sum'),
+        orders=('orders', 'sum'),
+        first_ts=('timestamp', 'min'),
+        last_ts=('timestamp', 'max'),
+    ).reset_index()
+    days = events.groupby('date').size().rename('events').reset_index()
+
+    return activity, users, days
+
+
+def combine_partials(partials):
+    """Merge chunk-level aggregates into a single set of deltas"""
+    activity = pd.concat([p[0] for p in partials], ignore_index=True).drop_duplicates(ignore_index=True)
+    users = pd.concat([p[1] for p in partials], ignore_index=True).groupby('user_id').agg(
+        events=('events', 'sum'),
+        views=('views', 'sum'),
+        orders=('orders', 'sum'),
+        first_ts=('first_ts', 'min'),
+        last_ts=('last_ts', 'max'),
+    ).reset_index()
+    days = pd.concat([p[2] for p in partials], ignore_index=True).groupby('date')['events'].sum().reset_index()
+    return activity, users, days
+
+
+def load_new_events(imported_days, since=None):
+    """Read data_clean.csv in chunks, keeping only days not yet imported"""
+    events_file = DATA_DIR / 'data_clean.csv'
+    if not events_file.exists():
+        logger.error(f"❌ {events_file} not found")
+        sys.exit(1)
+
+    partials = []
+    for chunk in pd.read_csv(events_file, usecols=['user_id', 'timestamp', 'date', 'event_type'],
+                             chunksize=CHUNK_SIZE):
+        chunk['date'] = chunk['date'].astype(str)
+        keep = ~chunk['date'].isin(imported_days)
+        if since:
+            keep &= chunk['date'] >= since
+        chunk = chunk[keep]
+        if len(chunk):
+            partials.append(aggregate_events(chunk))
+
+    if not partials:
+        return None
+    return combine_partials(partials)
+
+
+def load_new_revenue(new_days):
+    """Revenue per (user, week) and per user from transactions.csv for the new days"""
+    transactions_file = DATA_DIR / 'transactions.csv'
+    if not transactions_file.exists():
+        logger.warning("⚠️  transactions.csv not found, revenue left unchanged")
+        return None
+
+    # transaction_date is text (2015-05-28 18:39:31.745), parsed to ms by weekly_revenue
+    tx = pd.read_csv(transactions_file, usecols=['user_id', 'transaction_date', 'amount'])
+    return weekly_revenue(tx, new_days)
+
+
+def attach_revenue(activity, revenue):
+    """Add the revenue column to (user, week) pairs, including weeks only seen in transactions"""
+    if revenue is None or len(revenue) == 0:
+        return activity.assign(revenue=0.0)
+    activity = activity.merge(revenue, on=['user_id', 'week'], how='outer')
+    activity['revenue'] = activity['revenue'].fillna(0.0)
+    return activity
+
+
+def stage_touched_users(cursor, activity):
+    """Load touched user ids into a temp table used to scope every recomputation"""
+    cursor.execute("""
+        CREATE TEMP TABLE tmp_touched_users (user_id BIGINT PRIMARY KEY) ON COMMIT DROP
+    """)
+    execute_values(cursor, "INSERT INTO tmp_touched_users (user_id) VALUES %s",
+                   [(int(u),) for u in activity['user_id'].unique()], page_size=PAGE_SIZE)
+
+
+def touched_cohorts(cursor):
+    """Cohort weeks currently assigned to touched users"""
+    cursor.execute("""
+        SELECT DISTINCT c.cohort_week
+        FROM user_cohorts c
+        JOIN tmp_touched_users t USING (user_id)
+    """)
+    return {row[0] for row in cursor.fetchall()}
+
+
+def upsert_activity(cursor, activity):
+    """Insert new (user, week) pairs and add their revenue"""
+    weeks = week_start(activity['week'])
+    records = [
+        (int(u), w.date(), round(float(r), 2))
+        for u, w, r in zip(activity['user_id'], weeks, activity['revenue'])
+    ]
+    execute_values(cursor, """
+        INSERT INTO user_activity_weeks (user_id, activity_week, revenue)
+        VALUES %s
+        ON CONFLICT (user_id, activity_week) DO UPDATE
+        SET revenue = user_activity_weeks.revenue + EXCLUDED.revenue
+    """, records, page_size=PAGE_SIZE)
+
+    cohorts = activity.groupby('user_id')['week'].min()
+    records = [
+        (int(u), w.date())
+        for u, w in zip(cohorts.index, week_start(cohorts.to_numpy()))
+    ]
+    execute_values(cursor, """
+        INSERT INTO user_cohorts (user_id, cohort_week)
+        VALUES %s
+        ON CONFLICT (user_id) DO UPDATE
+        SET cohort_week = LEAST(user_cohorts.cohort_week, EXCLUDED.cohort_week)
+    """, records, page_size=PAGE_SIZE)
+
+
+def refresh_cohort_analysis(cursor, cohort_weeks):
+    """Recompute cohort_analysis rows for the given cohorts only"""
+    cohort_weeks = sorted(cohort_weeks)
+    cursor.execute("DELETE FROM cohort_analysis WHERE cohort_week = ANY(%s::date[])", (cohort_weeks,))
+    cursor.execute("""
+        WITH counts AS (
+            SELECT
+                c.cohort_week,
+                (a.activity_week - c.cohort_week) / 7 AS week_number,
+                COUNT(*) AS retained_users,
+                SUM(a.revenue) AS revenue
+            FROM user_cohorts c
+            JOIN user_activity_weeks a USING (user_id)
+            WHERE c.cohort_week = ANY(%s::date[])
+            GROUP BY 1, 2
+        ),
+        sized AS (
+            SELECT
+                counts.*,
+                MAX(CASE WHEN week_number = 0 THEN retained_users END)
+                    OVER (PARTITION BY cohort_week) AS cohort_size
+            FROM counts
+        )
+        INSERT INTO cohort_analysis
+            (cohort_week, week_number, cohort_size, retained_users, retention_rate, revenue)
+        SELECT
+            cohort_week,
+            week_number,
+            COALESCE(cohort_size, 0),
+            retained_users,
+            ROUND(retained_users * 100.0 / NULLIF(cohort_size, 0), 2),
+            revenue
+        FROM sized
+    """, (cohort_weeks,))
+    return cursor.rowcount
+
+
+def upsert_user_segments(cursor, users, revenue):
+    """Add new-day counters to user_segments and re-derive segment / conversion rate"""
+    spent = revenue.groupby('user_id')['revenue'].sum() if revenue is not None else pd.Series(dtype=float)
+    users = users.assign(spent=spent.reindex(users['user_id']).fillna(0.0).to_numpy())
+    first_seen = pd.to_datetime(users['first_ts'], unit='ms').dt.date
+    last_seen = pd.to_datetime(users['last_ts'], unit='ms').dt.date
+
+    records = [
+        (int(u), 'New', int(e), int(v), int(o), round(float(s), 2), f, l)
+        for u, e, v, o, s, f, l in zip(
+            users['user_id'], users['events'], users['views'], users['orders'],
+            users['spent'], first_seen, last_seen
+        )
+    ]
+    execute_values(cursor, """
+        INSERT INTO user_segments
+            (user_id, user_segment, total_events, total_views, total_orders,
+             total_spent, first_seen, last_seen)
+        VALUES %s
+        ON CONFLICT (user_id) DO UPDATE
+        SET total_events = user_segments.total_events + EXCLUDED.total_events,
+            total_views = user_segments.total_views + EXCLUDED.total_views,
+            total_orders = user_segments.total_orders + EXCLUDED.total_orders,
+            total_spent = user_segments.total_spent + EXCLUDED.total_spent,
+            first_seen = LEAST(user_segments.first_seen, EXCLUDED.first_seen),
+            last_seen = GREATEST(user_segments.last_seen, EXCLUDED.last_seen)
+    """, records, page_size=PAGE_SIZE)
+
+    cursor.execute(f"""
+        UPDATE user_segments s
+        SET user_segment = {SEGMENT_CASE},
+            conversion_rate = COALESCE(LEAST(ROUND(total_orders * 100.0 / NULLIF(total_views, 0), 2), 100), 0),
+            updated_at = CURRENT_TIMESTAMP
+        FROM tmp_touched_users t
+        WHERE s.user_id = t.user_id
+    """)
+
+
+def record_days(cursor, days):
+    """Mark the new days as folded in"""
+    execute_values(cursor, """
+        INSERT INTO cohort_import_log (day, events)
+        VALUES %s
+        ON CONFLICT (day) DO NOTHING
+    """, [(d, int(n)) for d, n in zip(days['date'], days['events'])])
+
+
+def main():
+    """Fold new event days into cohort_analysis and user_segments"""
+    parser = argparse.ArgumentParser(description='Incremental cohort and user segment maintenance')
+    parser.add_argument('--since', metavar='YYYY-MM-DD',
+                        help='Ignore event days before this date')
+    args = parser.parse_args()
+
+    logger.info("=" * 80)
+    logger.info("🔄 Incremental cohort & user segment update")
+    logger.info("=" * 80)
+
+    conn = get_db_connection()
+
+    try:
+        imported_days = get_imported_days(conn)
+        logger.info(f"📅 {len(imported_days)} day(s) already imported")
+
+        deltas = load_new_events(imported_days, since=args.since)
+        if deltas is None:
+            logger.info("✨ No new event days, tables are up to date")
+            return
+
+        activity, users, days = deltas
+        revenue = load_new_revenue(set(days['date']))
+        logger.info(f"📦 {len(days)} new day(s): {len(users):,} users, {len(activity):,} user-weeks")
+
+        activity = attach_revenue(activity, revenue)
+
+        cursor = conn.cursor()
+        stage_touched_users(cursor, activity)
+
+        cohorts = touched_cohorts(cursor)
+        upsert_activity(cursor, activity)
+        cohorts |= touched_cohorts(cursor)
+
+        rows = refresh_cohort_analysis(cursor, cohorts)
+        logger.info(f"✅ cohort_analysis: {len(cohorts)} cohort(s) refreshed ({rows} rows)")
+
+        upsert_user_segments(cursor, users, revenue)
+        logger.info(f"✅ user_segments: {len(users):,} user(s) updated")
+
+        record_days(cursor, days)
+        conn.commit()
+        cursor.close()
+        logger.info("✅ Incremental update committed")
+
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"❌ Incremental update failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        conn.close()
+        logger.info("🔒 Database connection closed")
+
+
+if __name__ == "__main__":
+    main()
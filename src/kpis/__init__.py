@@ -2,4 +2,4 @@
 Module de calcul des KPIs
 """
 
-__all__ = ['metrics', 'aggregations']
+__all__ = ['metrics', 'aggregations', 'cohorts', 'journeys', 'category_tree', 'products']
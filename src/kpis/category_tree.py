@@ -0,0 +1,207 @@
+"""
+Index de l'arbre des catégories (category_tree.csv)
+Construit une fois sous forme vectorisée : tableau des parents, profondeur
+et racine par sauts de pointeurs (log2(profondeur) passes), matrice des
+ancêtres et numérotation préfixe (tour d'Euler) donnant à chaque catégorie
+l'intervalle de son sous-arbre. Les agrégations par niveau ou par
+sous-arbre se font ensuite en O(n) avec bincount et sommes cumulées.
+"""
+
+import numpy as np
+import pandas as pd
+
+PATH_SEPARATOR = ' > '
+
+
+class CategoryTree:
+    """
+    Arbre des catégories indexé par position (ids triés).
+
+    Un parent absent de la table devient une racine implicite, de sorte
+    que ses enfants sont de profondeur 1.
+
+    Attributs (tableaux alignés sur ids):
+        ids: categoryid triés
+        parent: position du parent, -1 pour une racine
+        depth: profondeur (0 pour une racine)
+        root: position de la racine
+        ancestors: matrice n × (max_depth + 1), colonne d = ancêtre de
+            profondeur d (-1 au-delà de la profondeur du nœud)
+        start, end: sous-arbre = nœuds de rang préfixe dans [start, end)
+    """
+
+    def __init__(self, categoryids, parentids):
+        categoryids = np.asarray(categoryids, dtype=np.int64)
+        parentids = pd.array(parentids, dtype='Int64')
+        has_parent = ~parentids.isna()
+        parentids = parentids.to_numpy(dtype=np.int64, na_value=-1)
+
+        if len(np.unique(categoryids)) != len(categoryids):
+            raise ValueError("categoryid en double dans l'arbre des catégories")
+
+        self.ids = np.union1d(categoryids, parentids[has_parent])
+        n_nodes = len(self.ids)
+        self.parent = np.full(n_nodes, -1, dtype=np.int64)
+        self.parent[np.searchsorted(self.ids, categoryids[has_parent])] = (
+            np.searchsorted(self.ids, parentids[has_parent]))
+
+        self.depth, self.root = self._jump_to_roots()
+        self.ancestors = self._ancestor_matrix()
+
+        # Ordre préfixe = ordre lexicographique des chemins depuis la racine
+        # (-1 en fin de chemin : un parent précède ses descendants)
+        self.order = np.lexsort(self.ancestors.T[::-1])
+        self.start = np.empty(n_nodes, dtype=np.int64)
+        self.start[self.order] = np.arange(n_nodes)
+        self.size = np.bincount(self.ancestors[self.ancestors >= 0], minlength=n_nodes)
+        self.end = self.start + self.size
+
+    @classmethod
+    def from_frame(cls, df):
+        """Arbre depuis un DataFrame category_tree (categoryid, parentid)"""
+        return cls(df['categoryid'], df['parentid'])
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def max_depth(self):
+        return self.ancestors.shape[1] - 1
+
+    def _jump_to_roots(self):
+        """Profondeur et racine par sauts de pointeurs (doublement)"""
+        n_nodes = len(self.parent)
+        has_parent = self.parent >= 0
+        jump = np.where(has_parent, self.parent, np.arange(n_nodes))
+        depth = has_parent.astype(np.int64)
+
+        for _ in range(max(n_nodes, 1).bit_length() + 1):
+            if (self.parent[jump] < 0).all():
+                return depth, jump
+            depth = depth + depth[jump]
+            jump = jump[jump]
+        raise ValueError("Cycle dans l'arbre des catégories")
+
+    def _ancestor_matrix(self):
+        n_nodes = len(self.parent)
+        max_depth = int(self.depth.max()) if n_nodes else 0
+        ancestors = np.full((n_nodes, max_depth + 1), -1, dtype=np.int64)
+
+        # Remontée simultanée de tous les nœuds, un niveau par passe
+        rows = np.arange(n_nodes)
+        node = rows
+        while len(rows):
+            ancestors[rows, self.depth[node]] = node
+            keep = self.parent[node] >= 0
+            rows, node = rows[keep], self.parent[node[keep]]
+        return ancestors
+
+    def positions(self, categoryids):
+        """Positions des catégories (-1 pour une catégorie inconnue ou manquante)"""
+        query = pd.array(categoryids, dtype='Int64')
+        known = ~query.isna()
+        query = query.to_numpy(dtype=np.int64, na_value=-1)
+
+        positions = np.searchsorted(self.ids, query).clip(max=max(len(self.ids) - 1, 0))
+        found = known & (len(self.ids) > 0)
+        found[found] = self.ids[positions[found]] == query[found]
+        return np.where(found, positions, -1)
+
+    def ancestor_at(self, positions, level):
+        """
+        Ancêtre de profondeur `level` de chaque position ; une catégorie
+        moins profonde que `level` est son propre représentant (-1 conservé)
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        level = min(level, self.max_depth)
+        result = np.full(len(positions), -1, dtype=np.int64)
+        known = positions >= 0
+        result[known] = self.ancestors[positions[known], level]
+        shallow = known & (result < 0)
+        result[shallow] = positions[shallow]
+        return result
+
+    def subtree(self, categoryid):
+        """categoryid du sous-arbre (catégorie comprise), en ordre préfixe"""
+        position = self.positions([categoryid])[0]
+        if position < 0:
+            raise KeyError(categoryid)
+        return self.ids[self.order[self.start[position]:self.end[position]]]
+
+    def paths(self):
+        """Chemin 'racine > ... > catégorie' de chaque nœud"""
+        labels = self.ids.astype(str).astype(object)
+        paths = labels[self.ancestors[:, 0]]
+        for level in range(1, self.max_depth + 1):
+            column = self.ancestors[:, level]
+            deeper = column >= 0
+            paths[deeper] = paths[deeper] + PATH_SEPARATOR + labels[column[deeper]]
+        return paths
+
+    def frame(self):
+        """
+        Index complet, une ligne par catégorie.
+
+        Returns:
+            pd.DataFrame: categoryid, parentid, depth, root, path,
+            subtree_start, subtree_end, subtree_size
+        """
+        parent_ids = pd.array(np.where(self.parent >= 0, self.ids[self.parent], 0), dtype='Int64')
+        parent_ids[self.parent < 0] = pd.NA
+        return pd.DataFrame({
+            'categoryid': self.ids,
+            'parentid': parent_ids,
+            'depth': self.depth,
+            'root': self.ids[self.root],
+            'path': self.paths(),
+            'subtree_start': self.start,
+            'subtree_end': self.end,
+            'subtree_size': self.size,
+        })
+
+    def rollup(self, categoryids, values, level=0):
+        """
+        Somme des valeurs par catégorie de profondeur `level` (0 = racines).
+        Les catégories inconnues sont ignorées.
+
+        Returns:
+            pd.Series: indexée par categoryid de l'ancêtre, triée par id
+        """
+        targets = self.ancestor_at(self.positions(categoryids), level)
+        known = targets >= 0
+        totals = np.bincount(targets[known], weights=np.asarray(values, dtype=np.float64)[known],
+                             minlength=len(self.ids))
+        selected = np.flatnonzero(self.ancestor_at(np.arange(len(self.ids)), level) == np.arange(len(self.ids)))
+        return pd.Series(totals[selected], index=pd.Index(self.ids[selected], name='categoryid'))
+
+    def subtree_totals(self, categoryids, values):
+        """
+        Somme des valeurs de chaque sous-arbre (catégorie et descendants),
+        par sommes cumulées sur l'ordre préfixe
+
+        Returns:
+            pd.Series: indexée par categoryid (tous les nœuds)
+        """
+        positions = self.positions(categoryids)
+        known = positions >= 0
+        own = np.bincount(self.start[positions[known]],
+                          weights=np.asarray(values, dtype=np.float64)[known],
+                          minlength=len(self.ids))
+        cumulative = np.concatenate([[0.0], np.cumsum(own)])
+        return pd.Series(cumulative[self.end] - cumulative[self.start],
+                         index=pd.Index(self.ids, name='categoryid'))
+
+
+def item_categories(item_properties):
+    """
+    Catégorie la plus récente de chaque produit (propriété 'categoryid'
+    de item_properties)
+
+    Returns:
+        pd.Series: categoryid (Int64) indexé par itemid
+    """
+    rows = item_properties[item_properties['property'] == 'categoryid']
+    rows = rows.sort_values('timestamp', kind='stable').drop_duplicates('itemid', keep='last')
+    categories = pd.to_numeric(rows['value'], errors='coerce').astype('Int64')
+    return pd.Series(categories.array, index=pd.Index(rows['itemid'].to_numpy(), name='itemid'),
+                     name='categoryid')
@@ -0,0 +1,154 @@
+"""
+Moteur d'analyse de cohortes
+Affecte chaque utilisateur à sa semaine de première visite et calcule une
+matrice de rétention cohorte × semaine écoulée entièrement vectorisée.
+"""
+
+import numpy as np
+import pandas as pd
+
+MS_PER_DAY = 86_400_000
+
+# Le 1970-01-01 est un jeudi : +3 jours aligne les semaines sur le lundi,
+# comme dt.to_period('W').start_time
+WEEK_OFFSET_DAYS = 3
+
+COHORT_COLUMNS = [
+    'cohort_week', 'week_number', 'cohort_size',
+    'retained_users', 'retention_rate', 'revenue'
+]
+
+
+def to_epoch_ms(dates):
+    """
+    Timestamps en ms epoch, à partir de ms ou de dates texte
+    (transactions.csv : 2015-05-28 18:39:31.745)
+    """
+    dates = pd.Series(dates)
+    if pd.api.types.is_numeric_dtype(dates):
+        return dates.to_numpy(dtype=np.int64)
+    return ((pd.to_datetime(dates) - pd.Timestamp(0)) // pd.Timedelta(milliseconds=1)).to_numpy(dtype=np.int64)
+
+
+def week_index(timestamps_ms):
+    """Numéro de semaine (lundi → dimanche) depuis l'epoch pour des timestamps en ms"""
+    days = np.asarray(timestamps_ms, dtype=np.int64) // MS_PER_DAY
+    return (days + WEEK_OFFSET_DAYS) // 7
+
+
+def week_start(week_idx):
+    """Date du lundi correspondant à un numéro de semaine"""
+    days = np.asarray(week_idx, dtype=np.int64) * 7 - WEEK_OFFSET_DAYS
+    return pd.to_datetime(days, unit='D')
+
+
+def user_week_activity(events, user_col='user_id', ts_col='timestamp'):
+    """
+    Réduit des événements aux couples (utilisateur, semaine) uniques.
+
+    Utilisable par chunks : concaténer les résultats partiels puis rappeler
+    la fonction sur la concaténation pour dédoublonner.
+    """
+    if 'week' in events.columns:
+        weeks = events['week'].to_numpy(dtype=np.int64)
+    else:
+        weeks = week_index(events[ts_col].to_numpy())
+
+    activity = pd.DataFrame({
+        'user_id': events[user_col].to_numpy(),
+        'week': weeks
+    })
+    return activity.drop_duplicates(ignore_index=True)
+
+
+def assign_cohorts(activity):
+    """Semaine de première visite (cohorte) de chaque utilisateur"""
+    return activity.groupby('user_id', sort=False)['week'].min().rename('cohort')
+
+
+def build_retention_matrix(activity, transactions=None,
+                           tx_user_col='user_id', tx_ts_col='transaction_date',
+                           amount_col='amount'):
+    """
+    Construit la table de rétention cohorte × semaine écoulée.
+
+    Args:
+        activity (pd.DataFrame): couples (user_id, week) issus de user_week_activity
+        transactions (pd.DataFrame, optional): transactions avec montant pour le revenu
+
+    Returns:
+        pd.DataFrame: une ligne par (cohort_week, week_number) avec
+        cohort_size, retained_users, retention_rate (%) et revenue
+    """
+    if activity is None or len(activity) == 0:
+        return pd.DataFrame(columns=COHORT_COLUMNS)
+
+    cohorts = assign_cohorts(activity)
+    cohort = cohorts.reindex(activity['user_id']).to_numpy()
+    offset = activity['week'].to_numpy() - cohort
+
+    counts = (
+        pd.DataFrame({'cohort': cohort, 'week_number': offset})
+        .groupby(['cohort', 'week_number'])
+        .size()
+        .rename('retained_users')
+        .reset_index()
+    )
+
+    sizes = counts.loc[counts['week_number'] == 0].set_index('cohort')['retained_users']
+    counts['cohort_size'] = sizes.reindex(counts['cohort']).to_numpy()
+    counts['retention_rate'] = (counts['retained_users'] / counts['cohort_size'] * 100).round(2)
+
+    counts['revenue'] = 0.0
+    if transactions is not None and len(transactions) > 0:
+        tx_cohort = cohorts.reindex(transactions[tx_user_col]).to_numpy()
+        known = ~np.isnan(tx_cohort)
+        tx_offset = week_index(to_epoch_ms(transactions[tx_ts_col])[known]) - tx_cohort[known]
+        revenue = (
+            pd.DataFrame({
+                'cohort': tx_cohort[known].astype(np.int64),
+                'week_number': tx_offset.astype(np.int64),
+                'revenue': transactions[amount_col].to_numpy(dtype=float)[known]
+            })
+            .groupby(['cohort', 'week_number'])['revenue']
+            .sum()
+        )
+        key = pd.MultiIndex.from_arrays([counts['cohort'], counts['week_number']])
+        counts['revenue'] = revenue.reindex(key).fillna(0).round(2).to_numpy()
+
+    counts['cohort_week'] = week_start(counts['cohort'])
+    return counts[COHORT_COLUMNS].sort_values(['cohort_week', 'week_number'], ignore_index=True)
+
+
+def weekly_revenue(transactions, days=None, user_col='user_id', ts_col='transaction_date',
+                   amount_col='amount'):
+    """
+    Revenu par (utilisateur, semaine)
+
+    Args:
+        transactions (pd.DataFrame): transactions, dates en ms ou en texte
+        days (iterable, optional): jours (AAAA-MM-JJ) retenus, tous par défaut
+
+    Returns:
+        pd.DataFrame: user_id, week, revenue
+    """
+    ts = to_epoch_ms(transactions[ts_col])
+    keep = np.ones(len(ts), dtype=bool)
+    if days is not None:
+        tx_days = pd.to_datetime(ts // MS_PER_DAY, unit='D').strftime('%Y-%m-%d')
+        keep = np.asarray(tx_days.isin(list(days)))
+    return (
+        pd.DataFrame({
+            'user_id': transactions[user_col].to_numpy()[keep],
+            'week': week_index(ts[keep]),
+            'revenue': transactions[amount_col].to_numpy(dtype=float)[keep]
+        })
+        .groupby(['user_id', 'week'])['revenue']
+        .sum()
+        .reset_index()
+    )
+
+
+def retention_pivot(cohort_table, values='retention_rate'):
+    """Matrice cohorte (lignes) × semaine écoulée (colonnes)"""
+    return cohort_table.pivot(index='cohort_week', columns='week_number', values=values)
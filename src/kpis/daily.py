@@ -0,0 +1,103 @@
+"""
+Agrégats quotidiens incrémentaux
+Les tables à une ligne par jour (daily_metrics) sont mises à jour par jour : les jours recalculés
+remplacent les lignes stockées de même date, les autres sont conservés tels
+quels. Les moyennes mobiles ne sont recalculées qu'à partir du premier jour
+modifié, avec les window - 1 lignes précédentes comme contexte, ce qui donne
+exactement les valeurs d'un recalcul complet.
+"""
+
+import pandas as pd
+
+ROLLING_WINDOW = 7
+
+
+def day_strings(dates):
+    """Dates en texte ISO (AAAA-MM-JJ), qu'elles soient en datetime ou déjà en texte"""
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        return dates.dt.strftime('%Y-%m-%d')
+    return dates.astype(str)
+
+
+def last_day(path, date_col='date'):
+    """Dernière date d'une table quotidienne (None si le fichier n'existe pas ou est vide)"""
+    try:
+        dates = pd.read_csv(path, usecols=[date_col])[date_col]
+    except FileNotFoundError:
+        return None
+    return str(dates.max()) if len(dates) else None
+
+
+def rows_since(df, cutoff, date_col='date'):
+    """Lignes dont la date (texte ISO) est >= cutoff ; tout si cutoff est None"""
+    if cutoff is None:
+        return df
+    return df[day_strings(df[date_col]) >= cutoff]
+
+
+def read_csv_since(path, cutoff, date_col='date', chunksize=500_000, reader=pd.read_csv):
+    """
+    Lecture par chunks d'un CSV en ne gardant que les jours >= cutoff
+
+    Args:
+        reader: fonction de lecture (ex: schema.read_csv pour les types compacts)
+    """
+    chunks = [rows_since(chunk, cutoff, date_col) for chunk in reader(path, chunksize=chunksize)]
+    return pd.concat(chunks, ignore_index=True)
+
+
+def upsert_days(stored, fresh, date_col='date'):
+    """
+    Remplace les jours recalculés et ajoute les nouveaux
+
+    Args:
+        stored (pd.DataFrame): table existante (peut être None)
+        fresh (pd.DataFrame): jours recalculés
+
+    Returns:
+        tuple: (table triée par date, position du premier jour recalculé)
+    """
+    if stored is None or len(stored) == 0:
+        merged = fresh.sort_values(date_col, kind='stable').reset_index(drop=True)
+        return merged, 0
+
+    fresh = fresh.assign(**{date_col: day_strings(fresh[date_col])})
+    stored = stored.assign(**{date_col: day_strings(stored[date_col])})
+    fresh_dates = fresh[date_col]
+    kept = stored[~stored[date_col].isin(fresh_dates)]
+    merged = pd.concat([kept, fresh], ignore_index=True)
+    merged = merged.sort_values(date_col, kind='stable').reset_index(drop=True)
+    start = int(merged[date_col].searchsorted(fresh_dates.min())) if len(fresh) else len(merged)
+    return merged, start
+
+
+def refresh_rolling(df, columns, start=0, window=ROLLING_WINDOW, decimals=2):
+    """
+    Moyennes mobiles (min_periods=1) recalculées à partir de la ligne start
+
+    Args:
+        df (pd.DataFrame): table triée par date (modifiée sur place)
+        columns (dict): colonne de sortie -> colonne source
+        start (int): position du premier jour modifié
+
+    Returns:
+        pd.DataFrame: df
+    """
+    if start >= len(df):
+        return df
+
+    context = max(start - window + 1, 0)
+    for output, source in columns.items():
+        rolling = df[source].iloc[context:].rolling(window=window, min_periods=1).mean().round(decimals)
+        if output not in df.columns:
+            df[output] = float('nan')
+        df.loc[df.index[start:], output] = rolling.iloc[start - context:].to_numpy()
+    return df
+
+
+def read_table(path):
+    """Table quotidienne stockée, flottants relus à l'identique (None si absente)"""
+    try:
+        return pd.read_csv(path, float_precision='round_trip')
+    except FileNotFoundError:
+        return None
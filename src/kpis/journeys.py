@@ -0,0 +1,131 @@
+"""
+Moteur de parcours utilisateur
+Encode les types d'événements en petits entiers, extrait les K premières
+étapes de chaque visiteur sans fonction Python par groupe et compte les
+chemins en une passe sur des clés entières (2 bits par étape).
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.preprocessing.schema import EVENT_TYPE, EVENT_TYPES
+
+MAX_STEPS = 10
+STEP_SEPARATOR = ' -> '
+
+# Bits par étape : codes d'événements + 1 (0 = étape vide)
+STEP_BITS = int(np.ceil(np.log2(len(EVENT_TYPES) + 1)))
+
+PATH_COLUMNS = [
+    'path', 'length', 'num_users', 'share',
+    'has_addtocart', 'has_transaction'
+]
+
+
+def encode_events(events):
+    """Codes int8 des types d'événements (-1 pour un type inconnu)"""
+    if isinstance(events.dtype, pd.CategoricalDtype):
+        if not events.cat.categories.equals(EVENT_TYPE.categories):
+            events = events.cat.set_categories(EVENT_TYPE.categories)
+    else:
+        events = events.astype(EVENT_TYPE)
+    return events.cat.codes.to_numpy(dtype=np.int8)
+
+
+def build_journeys(events, user_col='visitorid', ts_col='timestamp', event_col='event',
+                   max_steps=MAX_STEPS):
+    """
+    Parcours de chaque visiteur, ordonnés par timestamp.
+
+    Args:
+        events (pd.DataFrame): événements (visiteur, timestamp ms, type)
+        max_steps (int): nombre d'étapes conservées par parcours
+
+    Returns:
+        tuple: (journeys, steps) — journeys indexé par visiteur avec
+        first_event_time, last_event_time (ms), total_events et first_row
+        (position de la première ligne dans events) ; steps matrice int8
+        visiteurs × max_steps des codes d'événements, -1 après la fin du parcours
+    """
+    users = events[user_col].to_numpy()
+    timestamps = events[ts_col].to_numpy(dtype=np.int64)
+    codes = encode_events(events[event_col])
+
+    # Tri stable visiteur puis timestamp, sans trier le DataFrame complet
+    order = np.lexsort((timestamps, users))
+    users = users[order]
+    timestamps = timestamps[order]
+    codes = codes[order]
+
+    n_rows = len(order)
+    is_first = np.ones(n_rows, dtype=bool)
+    is_first[1:] = users[1:] != users[:-1]
+    starts = np.flatnonzero(is_first)
+    group = np.cumsum(is_first) - 1
+
+    # Équivalent de groupby().cumcount() sur des données triées
+    position = np.arange(n_rows) - starts[group]
+    kept = position < max_steps
+    steps = np.full((len(starts), max_steps), -1, dtype=np.int8)
+    steps[group[kept], position[kept]] = codes[kept]
+
+    total_events = np.diff(np.append(starts, n_rows))
+    journeys = pd.DataFrame({
+        'first_event_time': timestamps[starts],
+        'last_event_time': timestamps[starts + total_events - 1],
+        'total_events': total_events,
+        'first_row': order[starts],
+    }, index=pd.Index(users[starts], name=user_col))
+    return journeys, steps
+
+
+def path_keys(steps):
+    """Clé entière unique par chemin (STEP_BITS bits par étape)"""
+    shifts = np.arange(steps.shape[1], dtype=np.int64) * STEP_BITS
+    return ((steps.astype(np.int64) + 1) << shifts).sum(axis=1)
+
+
+def journey_labels(steps):
+    """
+    Libellés 'view -> addtocart -> ...' de chaque parcours.
+
+    Returns:
+        pd.Categorical: un libellé par visiteur, catégories = chemins distincts
+    """
+    keys, inverse = np.unique(path_keys(steps), return_inverse=True)
+    first = np.zeros(len(keys), dtype=np.int64)
+    first[inverse[::-1]] = np.arange(len(inverse))[::-1]
+
+    labels = [
+        STEP_SEPARATOR.join(EVENT_TYPES[code] for code in steps[row] if code >= 0)
+        for row in first
+    ]
+    return pd.Categorical.from_codes(inverse.reshape(-1), categories=labels)
+
+
+def path_statistics(labels, top_n=None):
+    """
+    Fréquence des chemins.
+
+    Args:
+        labels (pd.Categorical): libellés issus de journey_labels
+        top_n (int, optional): nombre de chemins les plus fréquents conservés
+
+    Returns:
+        pd.DataFrame: path, length (étapes), num_users, share (%),
+        has_addtocart, has_transaction, par fréquence décroissante
+    """
+    counts = np.bincount(labels.codes, minlength=len(labels.categories))
+    paths = pd.Series(labels.categories, dtype=object)
+    stats = pd.DataFrame({
+        'path': paths,
+        'length': paths.str.count(STEP_SEPARATOR) + 1,
+        'num_users': counts,
+        'share': (counts / max(counts.sum(), 1) * 100).round(2),
+        'has_addtocart': paths.str.contains('addtocart', regex=False),
+        'has_transaction': paths.str.contains('transaction', regex=False),
+    })
+    stats = stats.sort_values(['num_users', 'path'], ascending=[False, True], ignore_index=True)
+    if top_n is not None:
+        stats = stats.head(top_n)
+    return stats[PATH_COLUMNS]
@@ -0,0 +1,147 @@
+"""
+Analyses produits (products_summary)
+Catégorisation par règles avec np.select, tables Pareto et tranches de prix
+à partir d'un seul tri et d'une seule somme cumulée (searchsorted pour les
+jalons). Fonctions pures sur des colonnes : le script batch
+(generate_products_summary, product_category_analysis) et la page Produits
+du dashboard les appellent avec leurs propres seuils.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Catégories dans l'ordre de priorité des règles
+PRODUCT_CATEGORIES = [
+    'Top Performer', 'High Revenue', 'High Conversion',
+    'Popular', 'Low Performer', 'No Sales',
+]
+
+PARETO_MILESTONES = [10, 20, 30, 40, 50, 60, 70, 80, 90, 95, 99, 100]
+
+PRICE_BINS = [0, 50, 100, 150, 200, 300, 500]
+PRICE_LABELS = ['0-50€', '50-100€', '100-150€', '150-200€', '200-300€', '300-500€']
+
+
+def categorize_products(products, revenue_quantile=0.75, top_conversion=1.0,
+                        high_conversion=2.0, popular_views=100):
+    """
+    Catégorie de performance de chaque produit.
+
+    Args:
+        products (pd.DataFrame): total_revenue, view_to_purchase_rate (%), views
+        revenue_quantile (float): quantile de revenue au-delà duquel un
+            produit est « High Revenue »
+        top_conversion (float): conversion (%) minimale d'un Top Performer
+        high_conversion (float): conversion (%) minimale d'un High Conversion
+        popular_views (int): vues minimales d'un produit Popular
+
+    Returns:
+        np.ndarray: libellés (object), première règle satisfaite
+    """
+    revenue = products['total_revenue'].to_numpy(dtype=np.float64)
+    conversion = products['view_to_purchase_rate'].to_numpy(dtype=np.float64)
+    views = products['views'].to_numpy(dtype=np.float64)
+
+    high_revenue = revenue >= np.nanquantile(revenue, revenue_quantile) if len(revenue) else revenue > 0
+    conditions = [
+        high_revenue & (conversion >= top_conversion),
+        high_revenue,
+        conversion >= high_conversion,
+        views >= popular_views,
+        revenue > 0,
+    ]
+    return np.select(conditions, PRODUCT_CATEGORIES[:-1], default=PRODUCT_CATEGORIES[-1]).astype(object)
+
+
+def pareto_curve(revenue):
+    """
+    Part cumulée du revenue (%) des produits triés par revenue décroissant.
+
+    Returns:
+        tuple: (ordre de tri, revenue cumulé, part cumulée en %)
+    """
+    revenue = np.nan_to_num(np.asarray(revenue, dtype=np.float64))
+    order = np.argsort(-revenue, kind='stable')
+    cumulative = np.cumsum(revenue[order])
+    total = cumulative[-1] if len(cumulative) else 0.0
+    share = cumulative / total * 100 if total > 0 else np.zeros(len(cumulative))
+    return order, cumulative, share
+
+
+def products_for_share(share, milestones):
+    """Nombre de produits dont la part cumulée reste <= chaque jalon (%)"""
+    return np.searchsorted(share, milestones, side='right')
+
+
+def pareto_table(products, milestones=PARETO_MILESTONES):
+    """
+    Produits nécessaires pour atteindre chaque jalon de revenue.
+
+    Le jalon 100 compte tout le catalogue (les arrondis de la somme
+    cumulée peuvent dépasser 100 %).
+
+    Returns:
+        pd.DataFrame: revenue_milestone_pct, num_products, products_pct,
+        cumulative_revenue, cumulative_purchases
+    """
+    order, cumulative, share = pareto_curve(products['total_revenue'])
+    purchases = np.cumsum(products['purchases'].to_numpy(dtype=np.float64)[order])
+
+    milestones = np.asarray(milestones)
+    counts = np.where(milestones >= 100, len(order), products_for_share(share, milestones))
+
+    # Sommes cumulées précédées de 0 : la valeur pour n produits est à l'indice n
+    cumulative = np.concatenate([[0.0], cumulative])
+    purchases = np.concatenate([[0.0], purchases])
+    return pd.DataFrame({
+        'revenue_milestone_pct': milestones,
+        'num_products': counts,
+        'products_pct': np.round(counts / max(len(order), 1) * 100, 2),
+        'cumulative_revenue': np.round(cumulative[counts], 2),
+        'cumulative_purchases': purchases[counts].astype(np.int64),
+    })
+
+
+def price_segment_codes(prices, bins=PRICE_BINS):
+    """Tranche de chaque prix, intervalles (b[i], b[i+1]] comme pd.cut (-1 hors tranches)"""
+    prices = np.asarray(prices, dtype=np.float64)
+    codes = np.searchsorted(bins, prices, side='left') - 1
+    return np.where((codes >= 0) & (codes < len(bins) - 1) & ~np.isnan(prices), codes, -1)
+
+
+def price_segment_table(products, bins=PRICE_BINS, labels=PRICE_LABELS):
+    """
+    Performance par tranche de prix (avg_price), tranches vides omises.
+
+    Returns:
+        pd.DataFrame: price_range, num_products, total_revenue,
+        total_purchases, avg_conversion, revenue_per_product, revenue_share
+    """
+    codes = price_segment_codes(products['avg_price'], bins)
+    inside = codes >= 0
+    codes = codes[inside]
+    n_segments = len(labels)
+
+    def total(col):
+        sums = np.bincount(codes, weights=np.nan_to_num(products[col].to_numpy(dtype=np.float64)[inside]),
+                           minlength=n_segments)
+        # Sommes entières conservées entières (comme groupby().sum())
+        return sums.astype(np.int64) if pd.api.types.is_integer_dtype(products[col]) else sums.round(2)
+
+    counts = np.bincount(codes, minlength=n_segments)
+    conversion = products['view_to_purchase_rate'].to_numpy(dtype=np.float64)[inside]
+    rated = ~np.isnan(conversion)
+    conversion_sum = np.bincount(codes[rated], weights=conversion[rated], minlength=n_segments)
+    conversion_count = np.bincount(codes[rated], minlength=n_segments)
+
+    table = pd.DataFrame({
+        'price_range': labels,
+        'num_products': counts,
+        'total_revenue': total('total_revenue'),
+        'total_purchases': total('purchases'),
+        'avg_conversion': (conversion_sum / np.where(conversion_count > 0, conversion_count, np.nan)).round(2),
+    })[counts > 0].reset_index(drop=True)
+
+    table['revenue_per_product'] = (table['total_revenue'] / table['num_products']).round(2)
+    table['revenue_share'] = (table['total_revenue'] / table['total_revenue'].sum() * 100).round(2)
+    return table
@@ -0,0 +1,190 @@
+"""
+Agrégats temporels multi-résolution (heure, jour, semaine, mois)
+Les métriques additives sont stockées à l'heure ; les niveaux jour, semaine
+(lundi) et mois sont matérialisés une fois à partir du niveau jour, lui-même
+issu des heures, par sommes de blocs contigus (np.add.reduceat sur des
+périodes triées). Chaque niveau garde ses sommes cumulées : un total sur un
+intervalle coûte deux recherches dichotomiques, une série coûte la taille
+de sa sortie. Les métriques seulement disponibles par jour (utilisateurs et
+sessions uniques quotidiens, additionnés au-delà du jour comme dans
+traffic_weekly / funnel_weekly) commencent au niveau jour.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Du plus fin au plus grossier
+LEVELS = ['hour', 'day', 'week', 'month']
+
+# Taux recalculés sur les sommes de chaque période de la sortie
+RATES = {
+    'view_to_cart_pct': ('add_to_carts', 'views'),
+    'cart_to_purchase_pct': ('transactions', 'add_to_carts'),
+    'view_to_purchase_pct': ('transactions', 'views'),
+}
+
+
+def period_start(periods, level):
+    """Début de la période (heure, jour, lundi ou 1er du mois) de chaque date"""
+    values = pd.DatetimeIndex(periods).as_unit('ns').to_numpy()
+    if level == 'hour':
+        starts = values.astype('datetime64[h]')
+    elif level == 'day':
+        starts = values.astype('datetime64[D]')
+    elif level == 'week':
+        # 1970-01-01 est un jeudi : on recale sur le lundi précédent
+        days = values.astype('datetime64[D]').astype(np.int64)
+        starts = ((days + 3) // 7 * 7 - 3).astype('datetime64[D]')
+    elif level == 'month':
+        starts = values.astype('datetime64[M]')
+    else:
+        raise ValueError(f"Niveau inconnu: {level}")
+    return starts.astype('datetime64[ns]')
+
+
+def roll_up(frame, level):
+    """
+    Somme des lignes d'un niveau (triées par period) par période du niveau
+    supérieur, en une passe
+    """
+    keys = period_start(frame['period'], level)
+    if len(keys) == 0:
+        return frame.iloc[:0].copy()
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    rolled = {'period': keys[starts]}
+    for col in frame.columns.drop('period'):
+        rolled[col] = np.add.reduceat(frame[col].to_numpy(), starts)
+    return pd.DataFrame(rolled)
+
+
+def add_rates(frame):
+    """Taux de conversion (%) de chaque période, à partir des sommes"""
+    for rate, (numerator, denominator) in RATES.items():
+        if numerator in frame.columns and denominator in frame.columns:
+            den = frame[denominator].to_numpy(dtype=np.float64)
+            num = frame[numerator].to_numpy(dtype=np.float64)
+            frame[rate] = np.round(np.divide(num * 100, den, out=np.zeros_like(num), where=den > 0), 2)
+    return frame
+
+
+class RollupStore:
+    """
+    Niveaux hour/day/week/month d'un même jeu de métriques additives.
+
+    Usage:
+        store = RollupStore.build(hourly, daily_only)
+        store.save(data_dir / 'rollups')
+        store = RollupStore.load(data_dir / 'rollups')
+        weekly = store.query('2015-06-01', '2015-09-01', level='week')
+        totals = store.totals('2015-06-01', '2015-06-15')
+    """
+
+    def __init__(self, levels):
+        self.levels = {}
+        self._cumulative = {}
+        for level in LEVELS:
+            frame = levels[level].sort_values('period', kind='stable').reset_index(drop=True)
+            frame['period'] = pd.to_datetime(frame['period']).astype('datetime64[ns]')
+            self.levels[level] = frame
+            values = frame.drop(columns='period').to_numpy(dtype=np.float64)
+            self._cumulative[level] = np.vstack([np.zeros((1, values.shape[1])), np.cumsum(values, axis=0)])
+
+    @classmethod
+    def build(cls, hourly, daily=None):
+        """
+        Args:
+            hourly (pd.DataFrame): period (début d'heure) et métriques additives
+            daily (pd.DataFrame, optional): period (jour) et métriques
+                disponibles seulement par jour
+
+        Returns:
+            RollupStore
+        """
+        hourly = hourly.assign(period=period_start(hourly['period'], 'hour'))
+        hourly = hourly.groupby('period', sort=True).sum().reset_index()
+        day = roll_up(hourly, 'day')
+        if daily is not None and len(daily):
+            daily = daily.assign(period=period_start(daily['period'], 'day'))
+            day = day.merge(daily, on='period', how='outer').sort_values('period').reset_index(drop=True)
+            # Jours présents d'un seul côté : 0, types entiers conservés
+            for source in (hourly, daily):
+                for col in source.columns.drop('period'):
+                    day[col] = day[col].fillna(0).astype(source[col].dtype)
+        return cls({
+            'hour': hourly,
+            'day': day,
+            'week': roll_up(day, 'week'),
+            'month': roll_up(day, 'month'),
+        })
+
+    def save(self, directory):
+        """Un CSV par niveau (rollup_<niveau>.csv)"""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for level, frame in self.levels.items():
+            frame.to_csv(directory / f'rollup_{level}.csv', index=False)
+
+    @classmethod
+    def load(cls, directory):
+        """Store sauvegardé par save(), None s'il n'existe pas"""
+        directory = Path(directory)
+        if not all((directory / f'rollup_{level}.csv').exists() for level in LEVELS):
+            return None
+        return cls({level: pd.read_csv(directory / f'rollup_{level}.csv', parse_dates=['period'])
+                    for level in LEVELS})
+
+    def metrics(self, level):
+        return list(self.levels[level].columns.drop('period'))
+
+    def level_for(self, start=None, end=None):
+        """
+        Niveau le plus grossier dont les périodes tombent exactement sur
+        les bornes [start, end) (une borne absente est toujours alignée)
+        """
+        bounds = [pd.Timestamp(bound) for bound in (start, end) if bound is not None]
+        for level in reversed(LEVELS):
+            if all(period_start([bound], level)[0] == bound.to_datetime64() for bound in bounds):
+                return level
+        return 'hour'
+
+    def _slice(self, level, start, end):
+        periods = self.levels[level]['period'].to_numpy()
+        first = 0 if start is None else np.searchsorted(periods, pd.Timestamp(start).to_datetime64(), 'left')
+        last = len(periods) if end is None else np.searchsorted(periods, pd.Timestamp(end).to_datetime64(), 'left')
+        return int(first), int(max(first, last))
+
+    def query(self, start=None, end=None, level=None, metrics=None, rates=True):
+        """
+        Périodes d'un niveau dont le début est dans [start, end)
+
+        Args:
+            level (str, optional): niveau imposé ; par défaut level_for(start, end)
+            metrics (list, optional): colonnes retenues (toutes par défaut)
+            rates (bool): ajoute les taux de conversion par période
+
+        Returns:
+            pd.DataFrame: period et métriques
+        """
+        level = level or self.level_for(start, end)
+        first, last = self._slice(level, start, end)
+        frame = self.levels[level].iloc[first:last]
+        if metrics is not None:
+            frame = frame[['period', *metrics]]
+        frame = frame.reset_index(drop=True)
+        return add_rates(frame) if rates else frame
+
+    def totals(self, start=None, end=None, level=None):
+        """
+        Sommes des métriques sur [start, end) par sommes cumulées
+
+        Returns:
+            dict: métrique -> total (avec les taux recalculés)
+        """
+        level = level or self.level_for(start, end)
+        first, last = self._slice(level, start, end)
+        cumulative = self._cumulative[level]
+        sums = cumulative[last] - cumulative[first]
+        totals = pd.DataFrame([sums], columns=self.metrics(level))
+        return {key: float(value) for key, value in add_rates(totals).iloc[0].items()}
@@ -0,0 +1,5 @@
+"""
+Module d'orchestration du pipeline de données
+"""
+
+__all__ = ['dag', 'steps']
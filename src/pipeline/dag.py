@@ -0,0 +1,300 @@
+"""
+Orchestrateur du pipeline de données
+Chaque étape déclare son script, ses entrées et ses sorties ; les
+dépendances en découlent (une étape dépend de celles qui produisent ses
+entrées). Une étape n'est relancée que si l'empreinte de contenu de son
+script, de ses arguments ou d'une de ses entrées a changé depuis son
+dernier succès (ou si une sortie a disparu ou été modifiée). Une étape
+relancée qui réécrit des sorties identiques ne relance donc pas l'aval.
+Les étapes prêtes et indépendantes s'exécutent en parallèle, chacune dans
+son propre processus.
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+STATE_VERSION = 1
+
+# Statuts d'exécution d'une étape
+RAN = 'ran'
+SKIPPED = 'skipped'
+FAILED = 'failed'
+BLOCKED = 'blocked'
+PLANNED = 'planned'
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """Empreinte blake2b (128 bits) du contenu d'un fichier"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DigestCache:
+    """
+    Empreintes de contenu mémorisées par (taille, mtime) : un fichier
+    inchangé depuis le dernier run n'est pas relu
+    """
+
+    def __init__(self, root, entries=None):
+        self.root = Path(root)
+        self.entries = entries if entries is not None else {}
+
+    def digest(self, relpath):
+        """Empreinte du fichier (chemin relatif à la racine), None s'il n'existe pas"""
+        path = self.root / relpath
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            self.entries.pop(relpath, None)
+            return None
+
+        signature = [stat.st_size, stat.st_mtime_ns]
+        cached = self.entries.get(relpath)
+        if cached is not None and cached[:2] == signature:
+            return cached[2]
+        digest = file_digest(path)
+        self.entries[relpath] = signature + [digest]
+        return digest
+
+
+class Step:
+    """
+    Étape du pipeline : un script Python exécuté depuis la racine du projet.
+
+    Args:
+        name (str): identifiant unique
+        script (str): chemin du script (relatif à la racine)
+        inputs (list): fichiers lus, obligatoires
+        outputs (list): fichiers écrits
+        optional_inputs (list): fichiers lus s'ils existent
+        optional_outputs (list): fichiers écrits seulement si les entrées
+            optionnelles correspondantes existent
+        args (list): arguments de ligne de commande
+    """
+
+    def __init__(self, name, script, inputs=(), outputs=(), optional_inputs=(), optional_outputs=(), args=()):
+        self.name = name
+        self.script = script
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.optional_inputs = list(optional_inputs)
+        self.optional_outputs = list(optional_outputs)
+        self.args = [str(arg) for arg in args]
+
+    def __repr__(self):
+        return f"Step({self.name!r})"
+
+    @property
+    def command(self):
+        return [sys.executable, self.script, *self.args]
+
+
+class Pipeline:
+    """
+    Graphe d'étapes avec exécution incrémentale.
+
+    L'état (empreintes des fichiers et signature du dernier succès de chaque
+    étape) est conservé dans un fichier JSON ; les journaux de chaque étape
+    dans log_dir.
+
+    Usage:
+        pipeline = Pipeline(PIPELINE_STEPS, root)
+        statuses = pipeline.run(jobs=4)
+    """
+
+    def __init__(self, steps, root, state_path=None, log_dir=None, log=print):
+        self.root = Path(root)
+        self.steps = {}
+        for step in steps:
+            if step.name in self.steps:
+                raise ValueError(f"Étape en double: {step.name}")
+            self.steps[step.name] = step
+
+        self.producers = {}
+        for step in steps:
+            for output in step.outputs + step.optional_outputs:
+                if output in self.producers:
+                    raise ValueError(f"{output} produit par {self.producers[output]} et {step.name}")
+                self.producers[output] = step.name
+
+        self.dependencies = {
+            step.name: sorted({self.producers[path] for path in step.inputs + step.optional_inputs
+                               if path in self.producers} - {step.name})
+            for step in steps
+        }
+        self.order = self._topological_order()
+
+        self.state_path = Path(state_path) if state_path else self.root / 'data' / '.pipeline_state.json'
+        self.log_dir = Path(log_dir) if log_dir else self.state_path.parent / '.pipeline_logs'
+        self.log = log
+        self.state = self._load_state()
+        self.digests = DigestCache(self.root, self.state['files'])
+
+    def _topological_order(self):
+        """Ordre de déclaration conservé autant que possible (Kahn)"""
+        remaining = {name: set(deps) for name, deps in self.dependencies.items()}
+        order = []
+        while remaining:
+            ready = [name for name in self.steps if name in remaining and not remaining[name]]
+            if not ready:
+                raise ValueError(f"Cycle entre les étapes: {', '.join(sorted(remaining))}")
+            for name in ready:
+                order.append(name)
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return order
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('version') == STATE_VERSION:
+                return state
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+        return {'version': STATE_VERSION, 'files': {}, 'steps': {}}
+
+    def _save_state(self):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.state_path)
+
+    def upstream(self, names):
+        """Étapes demandées et toutes celles dont elles dépendent"""
+        selected = set()
+        stack = list(names)
+        while stack:
+            name = stack.pop()
+            if name not in self.steps:
+                raise KeyError(f"Étape inconnue: {name}")
+            if name not in selected:
+                selected.add(name)
+                stack.extend(self.dependencies[name])
+        return selected
+
+    def signature(self, step):
+        """Empreintes du script, des arguments et des entrées de l'étape"""
+        return {
+            'script': self.digests.digest(step.script),
+            'args': step.args,
+            'inputs': {path: self.digests.digest(path) for path in step.inputs + step.optional_inputs},
+        }
+
+    def is_fresh(self, step, signature):
+        """Dernier succès obtenu avec la même signature, sorties intactes"""
+        record = self.state['steps'].get(step.name)
+        if record is None or record['signature'] != signature:
+            return False
+        return all(self.digests.digest(path) == digest for path, digest in record['outputs'].items())
+
+    def _execute(self, step):
+        """Exécute le script (thread de travail) ; renvoie (code retour, durée, journal)"""
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        log_path = self.log_dir / f'{step.name}.log'
+        env = dict(os.environ, PYTHONUNBUFFERED='1', MPLBACKEND='Agg')
+        start = time.perf_counter()
+        with open(log_path, 'w', encoding='utf-8') as log_file:
+            returncode = subprocess.run(step.command, cwd=self.root, stdout=log_file,
+                                        stderr=subprocess.STDOUT, env=env).returncode
+        return returncode, time.perf_counter() - start, log_path
+
+    def run(self, targets=None, jobs=None, force=False, dry_run=False):
+        """
+        Exécute les étapes périmées dans l'ordre des dépendances.
+
+        Args:
+            targets (list, optional): étapes à mettre à jour (et leur amont) ;
+                toutes par défaut
+            jobs (int, optional): étapes exécutées en parallèle (défaut: nb de CPU)
+            force (bool): relance les étapes même à jour
+            dry_run (bool): n'exécute rien, indique ce qui serait relancé
+
+        Returns:
+            dict: étape -> statut (ran, skipped, failed, blocked, planned)
+        """
+        selected = self.upstream(targets) if targets else set(self.steps)
+        pending = [name for name in self.order if name in selected]
+        statuses = {}
+        jobs = jobs or os.cpu_count() or 1
+
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            running = {}
+            while pending or running:
+                self._schedule(pending, statuses, running, pool, force, dry_run)
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step, signature = running.pop(future)
+                    statuses[step.name] = self._finish(step, signature, *future.result())
+        return statuses
+
+    def _schedule(self, pending, statuses, running, pool, force, dry_run):
+        """Décide du sort des étapes dont l'amont est terminé"""
+        active = {step.name for step, _ in running.values()}
+        for name in list(pending):
+            deps = [dep for dep in self.dependencies[name] if dep in statuses or dep in active or dep in pending]
+            if any(dep not in statuses for dep in deps):
+                continue
+            pending.remove(name)
+            step = self.steps[name]
+
+            if any(statuses[dep] in (FAILED, BLOCKED) for dep in deps):
+                statuses[name] = BLOCKED
+                self.log(f"[BLOQUE] {name}: étape amont en échec")
+                continue
+
+            if dry_run:
+                upstream_changed = any(statuses[dep] == PLANNED for dep in deps)
+                stale = force or upstream_changed or not self.is_fresh(step, self.signature(step))
+                statuses[name] = PLANNED if stale else SKIPPED
+                self.log(f"[{'A RELANCER' if stale else 'A JOUR'}] {name}")
+                continue
+
+            missing = [path for path in step.inputs if not (self.root / path).exists()]
+            if missing:
+                statuses[name] = FAILED
+                self.log(f"[ERREUR] {name}: entrées manquantes: {', '.join(missing)}")
+                continue
+
+            signature = self.signature(step)
+            if not force and self.is_fresh(step, signature):
+                statuses[name] = SKIPPED
+                self.log(f"[SKIP] {name}: entrées inchangées")
+                continue
+
+            self.log(f"[RUN] {name}")
+            running[pool.submit(self._execute, step)] = (step, signature)
+            active.add(name)
+
+    def _finish(self, step, signature, returncode, duration, log_path):
+        """Enregistre le résultat d'une étape (thread principal)"""
+        missing = [path for path in step.outputs if not (self.root / path).exists()]
+        if returncode != 0 or missing:
+            reason = f"code {returncode}" if returncode != 0 else f"sorties manquantes: {', '.join(missing)}"
+            self.log(f"[ERREUR] {step.name} ({duration:.1f}s): {reason}, voir {log_path}")
+            self.state['steps'].pop(step.name, None)
+            self._save_state()
+            return FAILED
+
+        self.state['steps'][step.name] = {
+            'signature': signature,
+            'outputs': {path: self.digests.digest(path) for path in step.outputs + step.optional_outputs},
+            'duration': round(duration, 2),
+            'finished_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+        self._save_state()
+        self.log(f"[OK] {step.name} ({duration:.1f}s)")
+        return RAN
@@ -0,0 +1,122 @@
+"""
+Déclaration des étapes du pipeline (scripts de scripts/)
+Entrées et sorties en chemins relatifs à la racine du projet ; les
+dépendances entre étapes en sont déduites. Les cinq analyses de
+scripts/kpi_analysis ne dépendent que des fichiers de data/clean et
+s'exécutent en parallèle.
+"""
+
+from src.pipeline.dag import Step
+
+RAW = 'data/raw'
+CLEAN = 'data/clean'
+
+
+def raw(*names):
+    return [f'{RAW}/{name}' for name in names]
+
+
+def clean(*names):
+    return [f'{CLEAN}/{name}' for name in names]
+
+
+ITEM_PROPERTIES = raw('item_properties_part1.csv', 'item_properties_part2.csv')
+
+PIPELINE_STEPS = [
+    # Préparation des données
+    Step('preprocess_retailrocket', 'scripts/data_prep/preprocess_retailrocket.py',
+         inputs=raw('events.csv'),
+         optional_inputs=ITEM_PROPERTIES,
+         outputs=clean('users.csv', 'products.csv', 'sessions.csv', 'transactions.csv')),
+    Step('clean_events', 'scripts/data_prep/clean_events.py',
+         inputs=raw('events.csv'),
+         outputs=clean('events_cleaned.csv', 'CLEANING_REPORT.txt')),
+    Step('clean_item_properties', 'scripts/data_prep/clean_item_properties.py',
+         inputs=ITEM_PROPERTIES,
+         outputs=clean('item_properties_cleaned.csv', 'product_properties_summary.csv',
+                       'ITEM_PROPERTIES_CLEANING_REPORT.txt')),
+    Step('merge_data', 'scripts/data_prep/merge_data.py',
+         inputs=clean('users.csv', 'products.csv', 'sessions.csv', 'transactions.csv',
+                      'events_cleaned.csv'),
+         outputs=clean('events_enriched.csv', 'sessions_enriched.csv', 'transactions_enriched.csv',
+                       'daily_funnel.csv', 'hourly_analysis.csv', 'segment_performance.csv',
+                       'user_journey.csv', 'journey_paths.csv', 'product_performance.csv',
+                       'merge_statistics.json')),
+    Step('generate_data_clean', 'scripts/data_prep/generate_data_clean_simple.py',
+         inputs=clean('events_enriched.csv'),
+         outputs=clean('data_clean.csv', 'data_clean_summary.json')),
+    Step('generate_daily_metrics', 'scripts/data_prep/generate_daily_metrics.py',
+         inputs=clean('data_clean.csv', 'transactions.csv'),
+         outputs=clean('daily_metrics.csv', 'daily_metrics_summary.json')),
+    Step('generate_products_summary', 'scripts/data_prep/generate_products_summary.py',
+         inputs=clean('data_clean.csv', 'transactions.csv'),
+         outputs=clean('products_summary.csv', 'products_summary_stats.json')),
+
+    # Analyses KPI (indépendantes entre elles)
+    Step('traffic_analysis', 'scripts/kpi_analysis/traffic_analysis.py',
+         inputs=clean('daily_metrics.csv'),
+         optional_inputs=clean('hourly_analysis.csv'),
+         outputs=clean('traffic_analysis_summary.json', 'traffic_daily.csv', 'traffic_weekly.csv',
+                       'traffic_by_weekday.csv')),
+    Step('user_behavior_analysis', 'scripts/kpi_analysis/user_behavior_analysis.py',
+         inputs=clean('daily_metrics.csv', 'segment_performance.csv'),
+         optional_inputs=clean('daily_funnel.csv'),
+         outputs=clean('user_behavior_summary.json', 'behavior_daily.csv',
+                       'segment_behavior_comparison.csv', 'conversion_funnel_analysis.csv',
+                       'behavior_evolution.csv')),
+    Step('conversion_analysis', 'scripts/kpi_analysis/conversion_analysis.py',
+         inputs=clean('daily_metrics.csv', 'daily_funnel.csv', 'segment_performance.csv',
+                      'products_summary.csv'),
+         outputs=clean('conversion_analysis_summary.json', 'conversion_daily.csv',
+                       'conversion_by_segment.csv', 'conversion_by_weekday.csv',
+                       'conversion_evolution.csv', 'top_converting_products.csv')),
+    Step('funnel_analysis', 'scripts/kpi_analysis/funnel_analysis.py',
+         inputs=clean('daily_funnel.csv', 'daily_metrics.csv', 'segment_performance.csv',
+                      'products_summary.csv'),
+         outputs=clean('funnel_analysis_summary.json', 'funnel_daily_detailed.csv',
+                       'funnel_by_weekday.csv', 'funnel_weekly.csv', 'funnel_monthly.csv',
+                       'funnel_by_segment.csv', 'funnel_blocked_products.csv',
+                       'funnel_high_friction_days.csv', 'funnel_top_performers.csv')),
+    Step('product_category_analysis', 'scripts/kpi_analysis/product_category_analysis.py',
+         inputs=clean('products_summary.csv', 'daily_metrics.csv'),
+         optional_inputs=raw('category_tree.csv') + clean('item_properties_cleaned.csv'),
+         outputs=clean('product_category_summary.json', 'category_performance.csv',
+                       'product_segments.csv', 'top_products_comprehensive.csv',
+                       'price_segment_analysis.csv', 'pareto_analysis.csv',
+                       'underperforming_products.csv'),
+         optional_outputs=clean('category_tree_performance.csv')),
+    Step('cohort_analysis', 'scripts/kpi_analysis/cohort_analysis.py',
+         inputs=clean('data_clean.csv'),
+         optional_inputs=clean('transactions.csv'),
+         outputs=clean('cohort_retention.csv', 'cohort_analysis_summary.json')),
+
+    # Agrégats heure/jour/semaine/mois lus par le dashboard et l'exporter
+    Step('build_rollups', 'scripts/data_prep/build_rollups.py',
+         inputs=clean('data_clean.csv', 'transactions.csv', 'daily_metrics.csv'),
+         outputs=clean(*(f'rollups/rollup_{level}.csv' for level in ('hour', 'day', 'week', 'month')))),
+
+    # A/B testing
+    Step('ab_test_simulation', 'scripts/ab_testing/ab_test_simulation.py',
+         inputs=clean('funnel_analysis_summary.json', 'conversion_analysis_summary.json',
+                      'daily_metrics.csv'),
+         outputs=clean('ab_test_simulation_summary.json', 'ab_test_scenarios.csv',
+                       'ab_test_simulation_results.csv', 'ab_test_business_impact.csv',
+                       'ab_test_roadmap.csv')),
+    # Graine fixe : mêmes entrées => même simulation, l'aval reste à jour
+    Step('generate_ab_test_simulation_csv', 'scripts/ab_testing/generate_ab_test_simulation_csv.py',
+         inputs=clean('ab_test_simulation_summary.json', 'funnel_daily_detailed.csv'),
+         outputs=clean('ab_test_simulation.csv', 'ab_test_summary_by_scenario.csv',
+                       'ab_test_daily_aggregate.csv'),
+         args=['--seed', 42]),
+    Step('test_ab_conversions', 'scripts/ab_testing/test_ab_conversions.py',
+         inputs=clean('ab_test_simulation.csv'),
+         outputs=clean('ab_test_conversion_tests.json', 'ab_test_conversion_tests_summary.csv')),
+    Step('visualize_ab_results', 'scripts/ab_testing/visualize_ab_results.py',
+         inputs=clean('ab_test_simulation.csv', 'ab_test_conversion_tests_summary.csv',
+                      'ab_test_summary_by_scenario.csv'),
+         outputs=[f'visualizations/{name}.png' for name in (
+             'daily_lift_trends_view_to_cart', 'daily_lift_trends_cart_to_purchase',
+             'daily_lift_trends_view_to_purchase', 'control_vs_variant_comparison', 'funnel_analysis', 'significance_heatmap',
+             'pvalue_distribution', 'cumulative_revenue_lift', 'roi_comparison',
+             'conversion_test_results', 'summary_dashboard')]),
+]
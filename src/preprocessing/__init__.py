@@ -2,4 +2,4 @@
 Module de préprocessing des données
 """
 
-__all__ = ['cleaner', 'validator']
+__all__ = ['cleaner', 'validator', 'schema']
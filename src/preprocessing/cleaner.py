@@ -0,0 +1,245 @@
+"""
+Noyau de nettoyage des événements RetailRocket
+Toutes les règles de validité sont évaluées en une passe sur les colonnes
+brutes et combinées en un seul masque (avec un compteur par règle) ; le
+dédoublonnage et le tri chronologique partagent ensuite un unique tri sur
+le timestamp, départagé par une clé compactée des autres colonnes. clean_csv applique le même noyau par chunks, en
+partitionnant par jour dans des fichiers temporaires : un doublon exact a
+le même timestamp, donc la même partition, et la mémoire reste bornée par
+la taille d'une journée.
+"""
+
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.preprocessing import schema
+
+CRITICAL_COLUMNS = ['timestamp', 'visitorid', 'event', 'itemid']
+EVENT_COLUMNS = ['timestamp', 'visitorid', 'event', 'itemid', 'transactionid']
+
+# Règles dans l'ordre d'attribution : une ligne invalide est comptée une
+# fois, pour la première règle qu'elle enfreint
+RULE_LABELS = {
+    'timestamp': "Timestamps invalides",
+    'visitorid': "visitorid invalides",
+    'itemid': "itemid invalides",
+    'event': "Types d'evenements invalides",
+    'missing': "Lignes avec valeurs manquantes critiques",
+    'transaction_id': "Transactions sans transactionid",
+}
+
+MS_PER_DAY = 86_400_000
+
+
+def _values(series, fill):
+    """Valeurs numpy d'une colonne entière éventuellement nullable"""
+    return series.fillna(fill).to_numpy(dtype=np.int64) if series.hasnans else series.to_numpy(dtype=np.int64)
+
+
+def rule_masks(df):
+    """
+    Masque des lignes invalides pour chaque règle, évaluées indépendamment
+
+    Returns:
+        dict: règle -> tableau booléen (True = ligne invalide)
+    """
+    n_rows = len(df)
+    masks = {}
+    if 'timestamp' in df.columns:
+        masks['timestamp'] = _values(df['timestamp'], 1) <= 0
+    if 'visitorid' in df.columns:
+        masks['visitorid'] = _values(df['visitorid'], 0) < 0
+    if 'itemid' in df.columns:
+        masks['itemid'] = _values(df['itemid'], 0) < 0
+    if 'event' in df.columns:
+        masks['event'] = ~df['event'].isin(schema.EVENT_TYPES).to_numpy()
+
+    existing_critical = [col for col in CRITICAL_COLUMNS if col in df.columns]
+    masks['missing'] = (df[existing_critical].isna().to_numpy().any(axis=1)
+                        if existing_critical else np.zeros(n_rows, dtype=bool))
+
+    if 'event' in df.columns and 'transactionid' in df.columns:
+        masks['transaction_id'] = ((df['event'] == 'transaction').to_numpy(dtype=bool)
+                                   & df['transactionid'].isna().to_numpy())
+    return masks
+
+
+def validity_mask(df):
+    """
+    Masque combiné des lignes valides et nombre de lignes écartées par règle
+
+    Returns:
+        tuple: (tableau booléen des lignes conservées, dict règle -> lignes écartées)
+    """
+    rejected = np.zeros(len(df), dtype=bool)
+    counts = {}
+    for rule, mask in rule_masks(df).items():
+        counts[rule] = int(np.count_nonzero(mask & ~rejected))
+        rejected |= mask
+    return ~rejected, counts
+
+
+def _secondary_keys(df):
+    """
+    Toutes les colonnes hors timestamp en clés de tri : une seule clé int64
+    compactée si les largeurs en bits le permettent, sinon une clé par colonne
+
+    Les colonnes hors schéma RetailRocket sont codées par factorisation, de
+    sorte que deux lignes ne sont doublons que si toutes leurs colonnes sont
+    égales, comme avec drop_duplicates().
+    """
+    columns = [
+        df['visitorid'].to_numpy(dtype=np.int64),
+        df['itemid'].to_numpy(dtype=np.int64),
+        df['event'].astype(schema.EVENT_TYPE).cat.codes.to_numpy(dtype=np.int64),
+    ]
+    if 'transactionid' in df.columns:
+        # 0 = pas de transactionid (deux valeurs manquantes sont égales, comme drop_duplicates)
+        columns.append(_values(df['transactionid'], -1) + 1)
+    for column in df.columns.difference(EVENT_COLUMNS, sort=False):
+        # 0 = valeur manquante, les autres codes suivent l'ordre d'apparition
+        codes, _ = pd.factorize(df[column])
+        columns.append(codes.astype(np.int64) + 1)
+
+    widths = [int(col.max()).bit_length() if len(col) else 0 for col in columns]
+    if sum(widths) > 63:
+        return columns[::-1]
+
+    packed = np.zeros(len(df), dtype=np.int64)
+    for col, width in zip(columns, widths):
+        packed = (packed << width) | col
+    return [packed]
+
+
+def dedupe_sort(df):
+    """
+    Supprime les doublons exacts (toutes colonnes égales) et trie par
+    timestamp avec un seul tri complet (timestamp), les égalités étant
+    départagées par la clé compactée
+
+    Attend des lignes valides (identifiants positifs, types connus).
+
+    Returns:
+        tuple: (DataFrame trié sans doublons, nombre de doublons supprimés)
+    """
+    if len(df) == 0:
+        return df.reset_index(drop=True), 0
+
+    timestamps = df['timestamp'].to_numpy(dtype=np.int64)
+    keys = _secondary_keys(df)
+    order = np.argsort(timestamps)
+
+    # Timestamps égaux (rares, doublons compris) : seuls ces blocs sont
+    # re-triés sur la clé secondaire pour rendre les doublons adjacents
+    equal = timestamps[order[1:]] == timestamps[order[:-1]]
+    tied = np.zeros(len(order), dtype=bool)
+    tied[1:] |= equal
+    tied[:-1] |= equal
+    if tied.any():
+        positions = np.flatnonzero(tied)
+        rows = order[positions]
+        order[positions] = rows[np.lexsort((*(key[rows] for key in keys), timestamps[rows]))]
+
+    # Après tri, un doublon suit immédiatement la ligne identique
+    duplicate = np.zeros(len(order), dtype=bool)
+    duplicate[1:] = timestamps[order[1:]] == timestamps[order[:-1]]
+    for key in keys:
+        duplicate[1:] &= key[order[1:]] == key[order[:-1]]
+
+    result = df.take(order[~duplicate]).reset_index(drop=True)
+    return result, int(np.count_nonzero(duplicate))
+
+
+def clean_frame(df):
+    """
+    Nettoie un DataFrame d'événements bruts (lecture schema.read_csv(raw=True))
+
+    Les règles de validité portent sur chaque ligne : filtrer avant de
+    dédoublonner conserve exactement les lignes de l'ancien enchaînement
+    drop_duplicates() puis filtres. Seule la répartition des lignes écartées
+    change : une ligne invalide dupliquée compte pour chacune de ses copies
+    dans invalid, duplicates ne compte que les doublons de lignes valides.
+
+    Returns:
+        tuple: (DataFrame propre trié aux types compacts, rapport) où le
+        rapport contient total_rows, invalid (dict règle -> lignes),
+        duplicates et rows
+    """
+    keep, invalid = validity_mask(df)
+    cleaned = schema.to_compact(df[keep])
+    cleaned, duplicates = dedupe_sort(cleaned)
+    report = {
+        'total_rows': len(df),
+        'invalid': invalid,
+        'duplicates': duplicates,
+        'rows': len(cleaned),
+    }
+    return cleaned, report
+
+
+def clean_csv(input_path, output_path, chunksize=1_000_000, partition_ms=MS_PER_DAY, work_dir=None):
+    """
+    Nettoie un events.csv plus volumineux que la mémoire
+
+    1re passe : règles de validité par chunk, lignes valides réparties par
+    jour dans des fichiers temporaires. 2e passe : dédoublonnage et tri de
+    chaque jour, écrits dans l'ordre chronologique.
+
+    Args:
+        input_path: events.csv brut
+        output_path: Fichier nettoyé (écrasé)
+        chunksize: Lignes lues par chunk
+        partition_ms: Largeur des partitions temporelles (défaut: un jour)
+        work_dir: Répertoire des fichiers temporaires (défaut: celui du système)
+
+    Returns:
+        dict: Rapport (mêmes clés que clean_frame)
+    """
+    invalid = Counter()
+    total_rows = duplicates = rows = 0
+
+    with tempfile.TemporaryDirectory(dir=work_dir) as tmp:
+        tmp = Path(tmp)
+        partitions = {}
+        reader = schema.read_csv(input_path, raw=True, chunksize=chunksize)
+        for chunk_no, chunk in enumerate(reader):
+            total_rows += len(chunk)
+            keep, counts = validity_mask(chunk)
+            invalid.update(counts)
+            valid = schema.to_compact(chunk[keep])
+
+            # Fichiers binaires (types conservés, pas d'analyse CSV en 2e passe)
+            partition = valid['timestamp'].to_numpy(dtype=np.int64) // partition_ms
+            order = np.argsort(partition, kind='stable')
+            bounds = np.flatnonzero(np.diff(partition[order])) + 1
+            for rows_idx in np.split(order, bounds):
+                if len(rows_idx) == 0:
+                    continue
+                key = int(partition[rows_idx[0]])
+                path = tmp / f'{key}_{chunk_no}.pkl'
+                valid.take(rows_idx).to_pickle(path)
+                partitions.setdefault(key, []).append(path)
+
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        for i, key in enumerate(sorted(partitions)):
+            day = pd.concat([pd.read_pickle(path) for path in partitions[key]], ignore_index=True)
+            day, removed = dedupe_sort(day)
+            day.to_csv(output_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+            duplicates += removed
+            rows += len(day)
+            for path in partitions[key]:
+                path.unlink()
+
+    if not partitions:
+        pd.DataFrame(columns=pd.read_csv(input_path, nrows=0).columns).to_csv(output_path, index=False)
+
+    return {
+        'total_rows': total_rows,
+        'invalid': dict(invalid),
+        'duplicates': duplicates,
+        'rows': rows,
+    }
@@ -0,0 +1,87 @@
+"""
+Tables de correspondance clé → attributs pour l'enrichissement
+Remplace les jointures DataFrame.merge (users → segment, products →
+statistiques) par une indexation positionnelle : l'index est construit une
+fois, puis chaque table (ou chaque chunk) reçoit ses colonnes par `take`,
+sans recopier les colonnes existantes.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Index dense (tableau indexé par la clé) tant que la plus grande clé reste
+# de l'ordre du nombre de clés ; au-delà, recherche dichotomique sur les clés triées
+DENSE_MAX_RATIO = 4
+DENSE_MIN_SIZE = 1_000_000
+
+
+class KeyLookup:
+    """
+    Correspondance clé entière → lignes d'une table de référence
+
+    Équivaut à un merge(how='left') sur une table à clés uniques : les clés
+    absentes donnent des valeurs manquantes. En cas de doublons, la première
+    ligne est retenue.
+
+    Args:
+        keys: Clés entières (user_id, product_id...)
+        values: DataFrame des attributs, aligné sur keys
+    """
+
+    def __init__(self, keys, values):
+        keys = np.asarray(keys, dtype=np.int64)
+        keys, first = np.unique(keys, return_index=True)
+        self.keys = keys
+        values = values.iloc[first].reset_index(drop=True)
+        # Entiers nullables : une clé absente ne convertit pas la colonne en float
+        self.values = values.astype({
+            column: f"{'UInt' if dtype.kind == 'u' else 'Int'}{dtype.itemsize * 8}"
+            for column, dtype in values.dtypes.items()
+            if isinstance(dtype, np.dtype) and dtype.kind in 'iu'
+        })
+
+        self._dense = None
+        if len(keys) and keys[0] >= 0 and keys[-1] < max(DENSE_MAX_RATIO * len(keys), DENSE_MIN_SIZE):
+            self._dense = np.full(keys[-1] + 1, -1, dtype=np.int64)
+            self._dense[keys] = np.arange(len(keys))
+
+    def positions(self, query):
+        """Position de chaque clé dans la table (-1 si absente)"""
+        query = pd.Series(query)
+        missing = query.isna().to_numpy()
+        query = query.fillna(-1).to_numpy(dtype=np.int64)
+
+        if self._dense is not None:
+            found = (query >= 0) & (query < len(self._dense))
+            positions = np.full(len(query), -1, dtype=np.int64)
+            positions[found] = self._dense[query[found]]
+        else:
+            positions = np.searchsorted(self.keys, query)
+            positions[positions == len(self.keys)] = 0
+            if len(self.keys):
+                positions[self.keys[positions] != query] = -1
+            else:
+                positions[:] = -1
+        positions[missing] = -1
+        return positions
+
+    def take(self, column, positions):
+        """Valeurs d'une colonne aux positions données (manquantes pour -1)"""
+        return self.values[column].array.take(positions, allow_fill=True)
+
+    def attach(self, df, key_column, columns=None):
+        """
+        Ajoute en place les colonnes de la table au DataFrame df
+
+        Args:
+            df: DataFrame à enrichir (modifié)
+            key_column: Colonne de df contenant les clés
+            columns: Colonnes à ajouter (toutes par défaut)
+
+        Returns:
+            DataFrame: df
+        """
+        positions = self.positions(df[key_column])
+        for column in columns or self.values.columns:
+            df[column] = self.take(column, positions)
+        return df
@@ -0,0 +1,122 @@
+"""
+Schéma compact des événements RetailRocket
+Types partagés par toutes les étapes de préparation (events.csv →
+events_cleaned.csv → events_enriched.csv → data_clean.csv) : types
+d'événements, segments et jours de la semaine en catégories, identifiants
+en entiers 32 bits, timestamps en int64 (epoch ms). Un événement occupe
+ainsi une vingtaine d'octets en mémoire au lieu de plus d'une centaine avec
+des chaînes Python.
+"""
+
+import numpy as np
+import pandas as pd
+
+EVENT_TYPES = ['view', 'addtocart', 'transaction']
+SEGMENTS = ['New', 'Occasional', 'Regular', 'Premium']
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+EVENT_TYPE = pd.CategoricalDtype(EVENT_TYPES)
+SEGMENT = pd.CategoricalDtype(SEGMENTS)
+WEEKDAY = pd.CategoricalDtype(WEEKDAYS, ordered=True)
+
+# Types cibles par colonne (les colonnes absentes du schéma ne sont pas modifiées)
+COLUMN_TYPES = {
+    # events.csv / events_cleaned.csv
+    'timestamp': 'int64',
+    'visitorid': 'int32',
+    'itemid': 'int32',
+    'event': EVENT_TYPE,
+    'transactionid': 'Int32',
+    # enrichissements (merge_data.py)
+    'segment': SEGMENT,
+    'view_count': 'Int32',
+    'purchase_count': 'Int32',
+    'hour': 'int8',
+    'day_of_week': WEEKDAY,
+    # data_clean.csv (generate_data_clean_simple.py)
+    'user_id': 'int32',
+    'product_id': 'int32',
+    'event_type': EVENT_TYPE,
+    'transaction_id': 'Int32',
+    'product_views': 'Int32',
+    'product_purchases': 'Int32',
+}
+
+# Types de lecture : entiers nullables et catégories ouvertes, pour que les
+# valeurs manquantes ou inconnues d'un fichier brut restent visibles au nettoyage
+READ_TYPES = {
+    column: 'category' if isinstance(dtype, pd.CategoricalDtype) else dtype.capitalize()
+    for column, dtype in COLUMN_TYPES.items()
+}
+
+
+def _narrow_int(series, dtype):
+    """Entier compact si les valeurs le permettent (sinon int64), nullable si valeurs manquantes"""
+    dtype = dtype.lower()
+    info = np.iinfo(dtype)
+    if len(series) and (series.min() < info.min or series.max() > info.max):
+        dtype = 'int64'
+    return series.astype(dtype.capitalize() if series.isna().any() else dtype)
+
+
+def to_compact(df):
+    """
+    Convertit les colonnes connues d'un DataFrame vers le schéma compact
+
+    Les valeurs hors catégories (types d'événements inconnus...) deviennent
+    manquantes : à appeler sur des données déjà nettoyées.
+
+    Returns:
+        DataFrame: Nouveau DataFrame aux types compacts
+    """
+    converted = {}
+    for column in df.columns.intersection(list(COLUMN_TYPES)):
+        dtype = COLUMN_TYPES[column]
+        series = df[column]
+        if isinstance(dtype, pd.CategoricalDtype):
+            if not isinstance(series.dtype, pd.CategoricalDtype):
+                series = series.astype('category')
+            # L'égalité de CategoricalDtype non ordonnés ignore l'ordre des
+            # catégories : comparer les catégories pour fixer aussi les codes
+            if not series.cat.categories.equals(dtype.categories) or series.cat.ordered != dtype.ordered:
+                series = series.cat.set_categories(dtype.categories, ordered=dtype.ordered)
+            converted[column] = series
+        elif pd.api.types.is_numeric_dtype(series) and series.dtype != dtype:
+            converted[column] = _narrow_int(series, dtype)
+    return df.assign(**converted) if converted else df
+
+
+def read_csv(path, raw=False, **kwargs):
+    """
+    Lit un CSV du pipeline avec les types compacts
+
+    Args:
+        path: Fichier CSV
+        raw: Fichier brut non nettoyé (types de lecture seulement, sans
+            écarter les valeurs invalides)
+        **kwargs: Arguments de pd.read_csv (usecols, chunksize...)
+
+    Returns:
+        DataFrame, ou itérateur de DataFrames si chunksize est donné
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = kwargs.get('usecols')
+    columns = [c for c in header if usecols is None or c in usecols]
+    dtypes = {c: READ_TYPES[c] for c in columns if c in READ_TYPES}
+    reader = pd.read_csv(path, dtype=dtypes, **kwargs)
+
+    if raw:
+        return reader
+    if kwargs.get('chunksize'):
+        return (to_compact(chunk) for chunk in reader)
+    return to_compact(reader)
+
+
+def write_csv(df, path, index=False):
+    """Écrit un CSV du pipeline (mêmes valeurs texte, entiers sans '.0')"""
+    to_compact(df).to_csv(path, index=index)
+
+
+def memory_mb(df):
+    """Mémoire occupée par un DataFrame (Mo)"""
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
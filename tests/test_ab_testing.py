@@ -5,6 +5,11 @@ import sys
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent.parent / 'scripts' / 'ab_testing'))
+
+import pandas as pd
+
+from generate_ab_test_simulation_csv import generate_ab_test_daily_simulation, summarize_by_scenario
 
 
 def test_placeholder():
@@ -12,6 +17,50 @@ def test_placeholder():
     assert True
 
 
+def _scenario(scenario_id, baseline=0.02, variant=0.03):
+    return {
+        'id': scenario_id, 'name': f'Scénario {scenario_id}', 'priority': 'HIGH',
+        'target_metric': 'view_to_cart', 'baseline': baseline, 'variant': variant,
+        'expected_lift': variant / baseline - 1, 'sample_size_per_group': 50_000,
+        'test_duration_days': 14, 'implementation_cost': 5000, 'implementation_weeks': 2,
+    }
+
+
+BASELINE = pd.DataFrame({
+    'unique_users': [10_000, 12_000], 'view': [20_000, 22_000],
+    'addtocart': [500, 560], 'transaction': [160, 180],
+})
+
+
+def test_daily_simulation_grid():
+    """Une ligne par (scénario, jour) ; scénarios sans résultat ignorés"""
+    scenarios = [_scenario('A1'), _scenario('A2'), _scenario('A3')]
+    results = [{'scenario_id': 'A1'}, {'scenario_id': 'A3'}]
+    df = generate_ab_test_daily_simulation(BASELINE, scenarios, results, days=20,
+                                           seed=7, start_date='2026-01-01')
+
+    assert len(df) == 40
+    assert df['scenario_id'].tolist() == ['A1'] * 20 + ['A3'] * 20
+    assert df['date'].iloc[[0, 19]].tolist() == ['2026-01-01', '2026-01-20']
+    assert (df.loc[df['day_number'] <= 14, 'test_status'] == 'running').all()
+    assert set(df.loc[df['day_number'] > 14, 'test_status']) <= {
+        'winner_variant', 'winner_control', 'inconclusive'}
+    assert df['p_value'].between(0, 1).all()
+    assert df.loc[df['is_significant'], 'p_value'].max() <= 0.05
+
+
+def test_daily_simulation_reproducible_from_seed():
+    """Même graine = même simulation"""
+    scenarios = [_scenario('A1')]
+    results = [{'scenario_id': 'A1'}]
+    first = generate_ab_test_daily_simulation(BASELINE, scenarios, results, seed=42, start_date='2026-01-01')
+    again = generate_ab_test_daily_simulation(BASELINE, scenarios, results, seed=42, start_date='2026-01-01')
+    other = generate_ab_test_daily_simulation(BASELINE, scenarios, results, seed=43, start_date='2026-01-01')
+
+    pd.testing.assert_frame_equal(first, again)
+    assert not first['variant_carts'].equals(other['variant_carts'])
+
+
 # Tests à venir pour les A/B tests
 # def test_statistical_significance():
 #     pass
@@ -21,3 +70,73 @@ def test_placeholder():
 #
 # def test_chi_square_test():
 #     pass
+
+
+def _simulation_rows():
+    rows = []
+    for scenario_id in ['S2', 'S1']:
+        for day in [2, 1, 3]:
+            rows.append({
+                'scenario_id': scenario_id, 'scenario_name': f'Scénario {scenario_id}', 'day_number': day,
+                'control_views': 100 * day, 'control_carts': 10 * day, 'control_purchases': day,
+                'variant_views': 100 * day, 'variant_carts': 12 * day, 'variant_purchases': 2 * day,
+                'control_revenue': 50.0 * day, 'variant_revenue': 80.0 * day,
+                'p_value': 0.01 * day, 'is_significant': day < 3, 'cumulative_revenue_lift': 30.0 * day,
+                **{f'{group}_{rate}_pct': float(day) for group in ('control', 'variant')
+                   for rate in ('view_to_cart', 'cart_to_purchase', 'view_to_purchase')},
+                **{f'lift_{rate}_pct': float(day) for rate in ('view_to_cart', 'cart_to_purchase', 'view_to_purchase')},
+            })
+    return pd.DataFrame(rows)
+
+
+def test_summary_by_scenario_follows_simulated_period():
+    """Totaux et ROI sur la période simulée, annualisation sur 365 / days"""
+    simulation = pd.DataFrame({
+        'scenario_id': ['S1'] * 2, 'scenario_name': ['a'] * 2, 'priority': ['HIGH'] * 2,
+        'lift_view_to_cart_pct': [1.0, 3.0], 'lift_cart_to_purchase_pct': [0.0, 0.0],
+        'lift_view_to_purchase_pct': [1.0, 1.0], 'revenue_lift': [1500.0, 1500.0],
+        'control_purchases': [10, 10], 'variant_purchases': [12, 12], 'is_significant': [True, False],
+        'confidence_level': [95.0, 90.0], 'implementation_cost': [1000, 1000], 'expected_lift_pct': [5.0, 5.0],
+    })
+
+    summary = summarize_by_scenario(simulation, days=365).iloc[0]
+    assert summary['period_days'] == 365
+    assert summary['total_revenue_lift_period'] == 3000.0
+    assert summary['roi_period_pct'] == 200.0
+    assert summary['annual_revenue_lift'] == 3000.0
+    assert summarize_by_scenario(simulation, days=30).iloc[0]['annual_revenue_lift'] == 3000.0 * 12.17
+
+
+def test_visualization_aggregates_and_figure_digests():
+    """Agrégats partagés par scénario, empreinte modifiée seulement pour les figures touchées"""
+    pytest.importorskip('seaborn')
+    import visualize_ab_results as viz
+
+    df = _simulation_rows()
+    aggregates = viz.prepare_aggregates(df)
+    assert aggregates['daily']['scenario_id'].tolist() == ['S2'] * 3 + ['S1'] * 3
+    assert aggregates['daily']['day_number'].tolist() == [1, 2, 3] * 2
+    scenarios = aggregates['scenarios'].set_index('scenario_id')
+    assert scenarios.loc['S1', 'control_views'] == 600
+    assert scenarios.loc['S1', 'days_significant'] == 2
+    assert scenarios.loc['S1', 'lift_view_to_cart_pct'] == 2.0
+
+    tests = pd.DataFrame({'scenario_id': ['S1', 'S2'], 'scenario_name': ['a', 'b'], 'lift_pct': [1.0, 2.0],
+                          'ci_95_lower': [0.5, 1.0], 'ci_95_upper': [1.5, 3.0], 'decision': ['WINNER_VARIANT'] * 2,
+                          'p_value_ztest': [0.01, 0.02], 'prob_b_beats_a': [0.99, 0.98],
+                          'statistical_power': [0.9, 0.8], 'confidence': ['HIGH'] * 2})
+    roi = pd.DataFrame({'scenario_id': ['S1', 'S2'], 'roi_period_pct': [10.0, 20.0],
+                        'annual_roi_pct': [100.0, 200.0], 'implementation_cost': [1000, 2000],
+                        'period_days': [30, 30]})
+
+    def digests(frame):
+        tasks = viz.figure_tasks(viz.prepare_aggregates(frame), roi, tests)
+        return {filename: viz.figure_digest(method, kwargs) for filename, method, kwargs in tasks}
+
+    before = digests(df)
+    assert len(before) == 11 and before == digests(df.sort_values('day_number', ascending=False, kind='stable'))
+
+    changed = df.copy()
+    changed.loc[0, 'p_value'] = 0.5
+    after = digests(changed)
+    assert [name for name in before if before[name] != after[name]] == ['pvalue_distribution.png']
@@ -0,0 +1,80 @@
+# Tests pour le stockage des utilisateurs du dashboard
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / 'dashboard'))
+
+from auth import UserStore
+
+DEFAULT_USERS = {
+    'admin': {'id': '1', 'username': 'admin', 'password': 'x', 'role': 'admin',
+              'force_password_change': True},
+    'user': {'id': '2', 'username': 'user', 'password': 'y', 'role': 'user'},
+}
+
+
+def test_missing_file_is_created_with_defaults(tmp_path):
+    """Sans fichier, les utilisateurs par défaut sont écrits"""
+    path = tmp_path / 'users.json'
+    store = UserStore(str(path), DEFAULT_USERS)
+
+    assert json.loads(path.read_text()) == DEFAULT_USERS
+    assert store.get_user_by_id('2').username == 'user'
+    assert store.get_user_by_id('3') is None
+    assert store.get_user_by_username('admin').force_password_change
+
+
+def test_lookups_reuse_user_objects(tmp_path):
+    """Le user_loader ne reconstruit pas l'utilisateur à chaque requête"""
+    store = UserStore(str(tmp_path / 'users.json'), DEFAULT_USERS)
+    assert store.get_user_by_id('1') is store.get_user_by_id('1')
+
+
+def test_update_is_written_behind_atomically(tmp_path):
+    """Les changements sont visibles tout de suite et persistés au flush"""
+    path = tmp_path / 'users.json'
+    store = UserStore(str(path), DEFAULT_USERS)
+
+    assert store.update('admin', password='new', force_password_change=False)
+    assert not store.get_user_by_username('admin').force_password_change
+    assert store.flush()
+
+    saved = json.loads(path.read_text())
+    assert saved['admin']['password'] == 'new'
+    assert not list(tmp_path.glob('*.tmp'))
+    assert not store.update('ghost', password='x')
+
+
+def test_changes_are_seen_by_other_workers(tmp_path):
+    """Un autre worker recharge le fichier modifié et fusionne ses ajouts"""
+    path = str(tmp_path / 'users.json')
+    worker_a = UserStore(path, DEFAULT_USERS)
+    worker_b = UserStore(path, DEFAULT_USERS)
+
+    worker_a.update('user', role='admin')
+    worker_a.flush()
+    worker_b.refresh(force=True)
+    assert worker_b.get_user_by_id('2').role == 'admin'
+
+    assert worker_b.add({'username': 'carol', 'password': 'z'})
+    worker_b.flush()
+    worker_a.refresh(force=True)
+    assert worker_a.get_user_by_id('3').username == 'carol'
+    assert worker_a.get('user')['role'] == 'admin'
+
+
+def test_workers_adding_users_get_distinct_ids(tmp_path):
+    """Deux workers qui ajoutent sans s'être resynchronisés n'attribuent pas le même id"""
+    path = str(tmp_path / 'users.json')
+    worker_a = UserStore(path, DEFAULT_USERS, poll_interval=3600)
+    worker_b = UserStore(path, DEFAULT_USERS, poll_interval=3600)
+
+    assert worker_a.add({'username': 'carol', 'password': 'z'})
+    assert worker_b.add({'username': 'dave', 'password': 'w'})
+    assert not worker_b.add({'username': 'carol', 'password': 'x'})
+
+    saved = json.loads(Path(path).read_text())
+    assert saved['carol']['id'] == '3'
+    assert saved['dave']['id'] == '4'
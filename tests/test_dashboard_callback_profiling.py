@@ -0,0 +1,81 @@
+# Tests pour le profilage des callbacks Dash
+
+import json
+import sys
+from pathlib import Path
+
+import pandas as pd
+from dash import Dash, Input, Output, dcc, html
+
+sys.path.append(str(Path(__file__).parent.parent / 'dashboard'))
+
+from callback_profiling import CallbackProfiler, setup_callback_profiling
+
+
+def make_app():
+    """Application Dash minimale avec un callback utilisant pandas"""
+    app = Dash(__name__)
+    app.layout = html.Div([dcc.Input(id='n', value=3), dcc.Graph(id='graph')])
+
+    @app.callback(Output('graph', 'figure'), Input('n', 'value'))
+    def update(n):
+        df = pd.DataFrame({'x': range(200), 'y': range(200)}).rolling(int(n)).mean()
+        return {'data': [{'x': df['x'].tolist(), 'y': df['y'].tolist()}]}
+
+    return app
+
+
+def call_update(client, n=3):
+    return client.post('/_dash-update-component', json={
+        'output': 'graph.figure',
+        'outputs': {'id': 'graph', 'property': 'figure'},
+        'inputs': [{'id': 'n', 'property': 'value', 'value': n}],
+        'changedPropIds': ['n.value'],
+    })
+
+
+def test_wrap_records_timings_and_size():
+    """Le wrapper mesure temps réel, CPU et taille de réponse"""
+    profiler = CallbackProfiler(sample_rate=1.0, use_prometheus=False)
+    wrapped = profiler.wrap('graph.figure', lambda value: json.dumps({'value': value}))
+
+    assert wrapped(42) == '{"value": 42}'
+    assert profiler.wrap('graph.figure', wrapped) is wrapped
+
+    [row] = profiler.stats.report()
+    assert row['callback'] == 'graph.figure'
+    assert row['calls'] == 1
+    assert row['response_avg_bytes'] == len('{"value": 42}')
+    assert row['profiled_calls'] == 1
+
+
+def test_debug_profile_endpoint():
+    """Rapport des chemins chauds puis capture cProfile d'une page"""
+    app = make_app()
+    profiler = setup_callback_profiling(app, enabled=True, metrics_port=None)
+    profiler.sample_rate = 0.0
+    client = app.server.test_client()
+
+    assert call_update(client).status_code == 200
+    report = client.get('/debug/profile').get_json()
+    [row] = report['callbacks']
+    assert row['callback'] == 'graph.figure'
+    assert row['serialization_avg_ms'] > 0
+
+    page = __name__
+    assert client.get(f'/debug/profile?page={page}').status_code == 404
+    assert client.get(f'/debug/profile?page={page}&calls=2').get_json()['remaining_calls'] == 2
+    for n in (2, 4, 5):
+        call_update(client, n)
+
+    summary = client.get(f'/debug/profile?page={page}').get_json()
+    assert summary['profiled_calls'] == 2
+    assert summary['remaining_calls'] == 0
+    assert 'pandas' in summary['by_package']
+    assert summary['top_functions']
+
+
+def test_disabled_by_default():
+    """Sans CALLBACK_PROFILING, rien n'est instrumenté"""
+    app = make_app()
+    assert setup_callback_profiling(app, enabled=False) is None
@@ -0,0 +1,50 @@
+# Tests pour la compression des réponses du dashboard
+
+import gzip
+import sys
+from pathlib import Path
+
+from flask import Flask, jsonify
+
+sys.path.append(str(Path(__file__).parent.parent / 'dashboard'))
+
+from compression import choose_encoding, setup_compression
+
+
+def make_app():
+    """Application Flask minimale avec compression"""
+    app = Flask(__name__)
+    setup_compression(app, min_size=100)
+
+    @app.route('/_dash-update-component', methods=['POST'])
+    def update():
+        return jsonify({'response': {'graph': {'figure': {'data': [{'y': list(range(500))}]}}}})
+
+    @app.route('/small')
+    def small():
+        return jsonify({'ok': True})
+
+    return app
+
+
+def test_choose_encoding():
+    """Respecte Accept-Encoding et les q=0"""
+    assert choose_encoding('gzip, deflate') == 'gzip'
+    assert choose_encoding('gzip;q=0, deflate') is None
+    assert choose_encoding('') is None
+
+
+def test_callback_response_is_gzipped():
+    """Les réponses de callbacks volumineuses sont compressées, pas les petites"""
+    client = make_app().test_client()
+
+    response = client.post('/_dash-update-component', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert b'"graph"' in gzip.decompress(response.data)
+
+    plain = client.post('/_dash-update-component')
+    assert 'Content-Encoding' not in plain.headers
+
+    small = client.get('/small', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in small.headers
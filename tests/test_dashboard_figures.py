@@ -0,0 +1,83 @@
+# Tests pour les helpers de figures du dashboard
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent / 'dashboard'))
+
+import plotly.io as pio
+from dash import Patch
+
+from figures import (
+    TEMPLATE, lttb_indices, minmax_indices, patch_series, patch_zoom,
+    time_series, visible_range
+)
+
+
+def test_visible_range_parsing():
+    """relayoutData: plage explicite, liste, ou autorange"""
+    assert visible_range({'xaxis.range[0]': 1, 'xaxis.range[1]': 5}) == (1, 5)
+    assert visible_range({'xaxis.range': [2, 3]}) == (2, 3)
+    assert visible_range({'xaxis.autorange': True}) is None
+    assert visible_range(None) is None
+
+
+def test_lttb_keeps_endpoints_and_peak():
+    """LTTB conserve les extrémités et le pic de la série"""
+    y = np.zeros(10_000)
+    y[4321] = 100.0
+    idx = lttb_indices(np.arange(len(y)), y, 100)
+
+    assert len(idx) == 100
+    assert idx[0] == 0 and idx[-1] == len(y) - 1
+    assert 4321 in idx
+    assert np.all(np.diff(idx) > 0)
+
+
+def test_minmax_keeps_extremes():
+    """Min-max conserve le minimum et le maximum globaux"""
+    y = np.sin(np.linspace(0, 20, 5_000))
+    idx = minmax_indices(y, 200)
+    assert y.argmax() in idx and y.argmin() in idx
+
+
+def test_time_series_switches_to_webgl_and_zooms():
+    """Scattergl au-delà du seuil, résolution fine sur la plage zoomée"""
+    x = pd.date_range('2015-05-03', periods=50_000, freq='min')
+    y = np.random.default_rng(0).random(len(x))
+
+    full = time_series(x, y, max_points=500)
+    assert full.type == 'scattergl'
+    assert len(full.x) == 500
+
+    zoomed = time_series(x, y, x_range=('2015-05-04 00:00', '2015-05-04 02:00'), max_points=500)
+    assert zoomed.type == 'scatter'
+    assert len(zoomed.x) == 123
+
+    stacked = time_series(x, y, max_points=500, stackgroup='one')
+    assert stacked.type == 'scatter'
+
+
+def test_shared_template_is_slimmer_than_plotly_dark():
+    """Le template partagé garde le layout sombre sans les traces inutilisées"""
+    template = pio.templates[TEMPLATE]
+    assert template.layout.paper_bgcolor == pio.templates['plotly_dark'].layout.paper_bgcolor
+    assert template.data.bar and not template.data.surface
+    assert len(template.to_plotly_json()['data']) < len(pio.templates['plotly_dark'].to_plotly_json()['data'])
+
+
+def test_patch_series_only_sends_data():
+    """Le Patch ne contient que x, y, le type de trace et le zoom"""
+    x = np.arange(5_000)
+    patched = patch_zoom(patch_series(Patch(), 1, x, x * 2.0, max_points=200), None, revision='s1')
+
+    operations = {tuple(op['location']): op['params']['value']
+                  for op in patched.to_plotly_json()['operations']}
+    assert len(operations[('data', 1, 'x')]) == 200
+    assert operations[('data', 1, 'type')] == 'scattergl'
+    assert operations[('layout', 'uirevision')] == 's1'
+    assert operations[('layout', 'xaxis', 'autorange')] is True
+    assert not any(location[:2] == ('layout', 'template') for location in operations)
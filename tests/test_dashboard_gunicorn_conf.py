@@ -0,0 +1,49 @@
+# Tests pour la configuration gunicorn et la réinitialisation après fork
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent / 'dashboard'))
+
+import gunicorn_conf
+from ddos_protection import SharedMemoryBackend
+
+
+def test_worker_count_from_limits():
+    """2 × CPU + 1, plafonné par la mémoire après le chargement partagé"""
+    assert gunicorn_conf.worker_count(1) == 3
+    assert gunicorn_conf.worker_count(0.25) == 3
+    assert gunicorn_conf.worker_count(4, memory_mb=1024) == 4
+    assert gunicorn_conf.worker_count(4, memory_mb=256) == 1
+
+
+def test_limits_from_downward_api(monkeypatch):
+    """Limites k8s exposées par la Downward API (millicores, Mo)"""
+    monkeypatch.setenv('CPU_LIMIT_MILLICORES', '1500')
+    monkeypatch.setenv('MEMORY_LIMIT_MB', '1024')
+    assert gunicorn_conf.cpu_limit() == 1.5
+    assert gunicorn_conf.memory_limit_mb() == 1024
+
+
+def test_resolve_worker_class(monkeypatch):
+    """gevent absent : repli sur gthread ; classe inconnue refusée"""
+    monkeypatch.setitem(sys.modules, 'gevent', None)
+    assert gunicorn_conf.resolve_worker_class('gevent') == 'gthread'
+    assert gunicorn_conf.resolve_worker_class('GTHREAD') == 'gthread'
+    with pytest.raises(ValueError):
+        gunicorn_conf.resolve_worker_class('eventlet')
+
+
+def test_shared_backend_reinit_after_fork(tmp_path):
+    """Le fichier d'état est rouvert, l'état partagé est conservé"""
+    backend = SharedMemoryBackend(str(tmp_path / 'state'), slots=16)
+    now = time.monotonic()
+    backend.update('k', lambda state: ((1, 1, 0, 0.0, now), True), now=now)
+
+    backend.reinit_after_fork()
+
+    assert backend.get('k', now) == (1, 1, 0, 0.0, now)
+    assert backend.update('k', lambda state: (state, state[1]), now=now) == 1
@@ -0,0 +1,126 @@
+# Tests pour le pipeline de journalisation asynchrone
+
+import logging
+import sys
+import threading
+from pathlib import Path
+
+from flask import Flask, jsonify
+
+sys.path.append(str(Path(__file__).parent.parent / 'dashboard'))
+
+import log_pipeline
+from log_pipeline import AsyncLogPipeline, DatabaseLogHandler, setup_async_logging
+
+
+class MemorySink:
+    """Sink en mémoire : enregistre chaque lot écrit"""
+
+    def __init__(self, block=None):
+        self.batches = []
+        self.block = block
+
+    def __call__(self, table, rows):
+        if self.block is not None:
+            self.block.wait()
+        self.batches.append((table, list(rows)))
+
+    def rows(self, table):
+        return [row for t, rows in self.batches if t == table for row in rows]
+
+
+def test_rows_are_written_in_batches():
+    """Les lignes sont regroupées par table et par lots de batch_size au plus"""
+    sink = MemorySink()
+    pipeline = AsyncLogPipeline(sink, batch_size=4, flush_interval=0.05)
+    for i in range(10):
+        pipeline.submit('query_performance', {'query_name': f'q{i}'})
+    pipeline.close()
+
+    assert len(sink.rows('query_performance')) == 10
+    assert all(len(rows) <= 4 for _, rows in sink.batches)
+    assert pipeline.stats()['written'] == 10
+
+
+def test_full_queue_drops_without_blocking():
+    """File pleine : submit abandonne immédiatement au lieu d'attendre"""
+    block = threading.Event()
+    sink = MemorySink(block)
+    pipeline = AsyncLogPipeline(sink, queue_size=5, batch_size=1, flush_interval=0.05)
+    accepted = [pipeline.submit('dashboard_logs', {'message': str(i)}) for i in range(20)]
+    block.set()
+    pipeline.close()
+
+    assert not all(accepted)
+    assert pipeline.stats()['dropped'] == accepted.count(False)
+    assert len(sink.rows('dashboard_logs')) == accepted.count(True)
+
+
+def test_sink_errors_are_counted():
+    """Une erreur d'écriture ne tue pas le thread d'écriture"""
+    def failing_sink(table, rows):
+        raise RuntimeError('database down')
+
+    pipeline = AsyncLogPipeline(failing_sink, flush_interval=0.05)
+    pipeline.submit('dashboard_logs', {'message': 'a'})
+    pipeline.close()
+    pipeline.submit('dashboard_logs', {'message': 'b'})
+    pipeline.flush()
+
+    assert pipeline.stats()['failed'] == 2
+
+
+def test_timings_keep_errors_and_slow_queries(monkeypatch):
+    """Échantillonnage à 0 % : seules les erreurs et requêtes lentes sont gardées"""
+    sink = MemorySink()
+    monkeypatch.setattr(log_pipeline, 'pipeline', AsyncLogPipeline(sink, flush_interval=0.05))
+    monkeypatch.setattr(log_pipeline, 'TIMING_SAMPLE_RATE', 0.0)
+
+    log_pipeline.record_query('fast', 3.2, rows_returned=10)
+    log_pipeline.record_query('slow', log_pipeline.SLOW_THRESHOLD_MS + 1.0, rows_returned=10)
+    log_pipeline.record_query('broken', 1.0, error='syntax error')
+    log_pipeline.pipeline.close()
+
+    names = [row['query_name'] for row in sink.rows('query_performance')]
+    assert names == ['slow', 'broken']
+
+
+def test_log_handler_samples_info_only(monkeypatch):
+    """Les WARNING sont toujours écrits, les INFO selon le taux d'échantillonnage"""
+    sink = MemorySink()
+    monkeypatch.setattr(log_pipeline, 'pipeline', AsyncLogPipeline(sink, flush_interval=0.05))
+
+    test_logger = logging.getLogger('test_log_pipeline')
+    test_logger.propagate = False
+    handler = DatabaseLogHandler(sample_rate=0.0)
+    test_logger.addHandler(handler)
+    try:
+        test_logger.info('ignored')
+        test_logger.warning('kept %s', 'warning')
+    finally:
+        test_logger.removeHandler(handler)
+    log_pipeline.pipeline.close()
+
+    rows = sink.rows('dashboard_logs')
+    assert [(row['log_level'], row['message']) for row in rows] == [('WARNING', 'kept warning')]
+    assert rows[0]['function_name'] == 'test_log_handler_samples_info_only'
+
+
+def test_callback_timings_are_recorded(monkeypatch):
+    """Chaque appel de callback Dash produit une ligne callback:<output>"""
+    monkeypatch.setattr(log_pipeline, 'pipeline', None)
+    sink = MemorySink()
+    app = Flask(__name__)
+    setup_async_logging(app, sink=sink, root_logger=logging.getLogger('test_log_pipeline_app'))
+
+    @app.route('/_dash-update-component', methods=['POST'])
+    def update():
+        return jsonify({'response': {}})
+
+    response = app.test_client().post('/_dash-update-component', json={'output': 'graph.figure'})
+    assert response.status_code == 200
+    log_pipeline.pipeline.close()
+
+    rows = sink.rows('query_performance')
+    assert [row['query_name'] for row in rows] == ['callback:graph.figure']
+    assert rows[0]['execution_time_ms'] >= 0
@@ -0,0 +1,78 @@
+# Tests pour l'index du catalogue produits du dashboard
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent / 'dashboard'))
+
+from product_index import ProductIndex
+
+
+def make_products(n=500, seed=0):
+    """Catalogue synthétique au format products_summary.csv"""
+    rng = np.random.default_rng(seed)
+    revenue = np.where(rng.random(n) < 0.2, rng.random(n) * 1000, 0.0)
+    df = pd.DataFrame({
+        'product_id': rng.permutation(n) * 7 + 1000,
+        'category': rng.choice(['No Sales', 'Popular', 'Top Performer'], n),
+        'unique_users': rng.integers(0, 100, n),
+        'views': rng.integers(0, 300, n),
+        'add_to_carts': rng.integers(0, 10, n),
+        'purchases': rng.integers(0, 3, n),
+        'view_to_purchase_rate': rng.random(n) * 5,
+        'total_revenue': revenue,
+        'avg_price': np.where(revenue > 0, revenue / 2, np.nan),
+    })
+    df = df.sort_values('total_revenue', ascending=False, ignore_index=True)
+    df['rank'] = df.index + 1
+    return df
+
+
+def test_pages_match_full_sort():
+    """Chaque page correspond au tri complet du catalogue"""
+    df = make_products()
+    index = ProductIndex(df)
+
+    rows, total = index.page(sort_by='views', descending=False, page=3, page_size=20)
+    expected = df.sort_values('views', kind='stable')['views'].iloc[60:80]
+    assert total == len(df)
+    assert list(rows['views']) == list(expected)
+
+    rows, _ = index.page(sort_by='views', descending=True, page=0, page_size=20)
+    assert list(rows['views']) == sorted(df['views'], reverse=True)[:20]
+
+
+def test_missing_values_stay_last_in_both_directions():
+    """Les AOV manquants (produits sans vente) restent en fin de tri"""
+    df = make_products()
+    index = ProductIndex(df)
+    n_priced = int(df['avg_price'].notna().sum())
+
+    first, _ = index.page(sort_by='avg_price', descending=True, page=0, page_size=10)
+    assert first['avg_price'].iloc[0] == df['avg_price'].max()
+
+    rows, _ = index.page(sort_by='avg_price', descending=True, page=0, page_size=len(df))
+    assert rows['avg_price'].iloc[:n_priced].notna().all()
+    assert rows['avg_price'].iloc[n_priced:].isna().all()
+
+
+def test_category_and_search_filters():
+    """Filtre par catégorie et recherche par préfixe d'identifiant"""
+    df = make_products()
+    index = ProductIndex(df)
+
+    rows, total = index.page(category='Popular', page_size=1000)
+    assert total == (df['category'] == 'Popular').sum()
+    assert (rows['category'] == 'Popular').all()
+    assert rows['total_revenue'].is_monotonic_decreasing
+
+    prefix = str(df['product_id'].iloc[0])[:2]
+    rows, total = index.page(search=prefix, category='Popular', page_size=1000)
+    expected = df[df['product_id'].astype(str).str.startswith(prefix) & (df['category'] == 'Popular')]
+    assert total == len(expected)
+    assert set(rows['product_id']) == set(expected['product_id'])
+
+    assert index.page(category='Unknown')[1] == 0
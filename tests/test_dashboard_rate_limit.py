@@ -0,0 +1,128 @@
+# Tests pour le rate limiter du dashboard
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / 'dashboard'))
+
+from ddos_protection import MemoryBackend, RateLimiter, SharedMemoryBackend
+
+
+class FakeClock:
+    """Horloge monotone contrôlée par le test"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_limit_then_block():
+    """Au-delà de la limite, l'IP est bloquée pendant BLOCK_SECONDS"""
+    clock = FakeClock()
+    limiter = RateLimiter(MemoryBackend(), clock=clock)
+
+    assert not any(limiter.is_rate_limited('1.1.1.1', max_requests=5) for _ in range(5))
+    assert limiter.is_rate_limited('1.1.1.1', max_requests=5)
+    assert not limiter.is_rate_limited('2.2.2.2', max_requests=5)
+
+    clock.now += 120
+    assert limiter.is_rate_limited('1.1.1.1', max_requests=5)
+    assert limiter.get_stats('1.1.1.1')['is_blocked']
+
+    clock.now += 300
+    assert not limiter.is_rate_limited('1.1.1.1', max_requests=5)
+
+
+def test_sliding_window_weights_previous_window():
+    """La fenêtre précédente compte au prorata de son recouvrement"""
+    clock = FakeClock(now=600.0)
+    limiter = RateLimiter(MemoryBackend(), clock=clock)
+
+    for _ in range(10):
+        assert not limiter.is_rate_limited('ip', max_requests=10)
+
+    # 25% de la nouvelle fenêtre écoulée : 10 * 0.75 = 7.5 requêtes estimées
+    clock.now = 675.0
+    assert limiter.get_stats('ip')['requests_last_minute'] == 8
+    assert not any(limiter.is_rate_limited('ip', max_requests=10) for _ in range(3))
+    assert limiter.is_rate_limited('ip', max_requests=10)
+
+
+def test_scopes_are_counted_separately():
+    """Les limites sensibles et générales ont leurs propres compteurs"""
+    limiter = RateLimiter(MemoryBackend(), clock=FakeClock())
+    for _ in range(3):
+        limiter.is_rate_limited('ip', max_requests=3, scope='sensitive')
+    assert limiter.is_rate_limited('ip', max_requests=3, scope='sensitive')
+    assert not limiter.is_rate_limited('ip', max_requests=3)
+
+
+def test_idle_keys_are_evicted():
+    """Les IPs inactives au-delà du TTL sont retirées"""
+    clock = FakeClock()
+    backend = MemoryBackend(ttl_seconds=60)
+    limiter = RateLimiter(backend, clock=clock)
+
+    for i in range(100):
+        limiter.is_rate_limited(f'10.0.0.{i}')
+    clock.now += 61
+    limiter.is_rate_limited('10.0.1.1')
+    assert len(backend) == 1
+
+
+def test_shared_backend_enforces_one_limit_across_workers(tmp_path):
+    """Deux workers sur le même fichier partagent le même compteur"""
+    clock = FakeClock(now=0.0)
+    path = str(tmp_path / 'ratelimit')
+    worker_a = RateLimiter(SharedMemoryBackend(path, slots=64), clock=clock)
+    worker_b = RateLimiter(SharedMemoryBackend(path, slots=64), clock=clock)
+
+    for i in range(10):
+        limiter = worker_a if i % 2 else worker_b
+        assert not limiter.is_rate_limited('ip', max_requests=10)
+    assert worker_a.is_rate_limited('ip', max_requests=10)
+    assert worker_b.is_rate_limited('ip', max_requests=10)
+
+
+def test_shared_backend_reuses_slots_when_full(tmp_path):
+    """Table pleine : les slots les plus anciens sont réutilisés"""
+    clock = FakeClock(now=0.0)
+    backend = SharedMemoryBackend(str(tmp_path / 'ratelimit'), slots=8)
+    limiter = RateLimiter(backend, clock=clock)
+
+    for i in range(50):
+        clock.now += 1
+        assert not limiter.is_rate_limited(f'ip-{i}', max_requests=1)
+    assert limiter.is_rate_limited('ip-49', max_requests=1)
+
+
+def test_shared_backend_stats_follow_limiter_clock(tmp_path):
+    """get_stats lit l'état partagé avec l'horloge du RateLimiter"""
+    clock = FakeClock(now=5.0)
+    limiter = RateLimiter(SharedMemoryBackend(str(tmp_path / 'ratelimit'), slots=8), clock=clock)
+
+    for _ in range(3):
+        limiter.is_rate_limited('ip', max_requests=2)
+
+    stats = limiter.get_stats('ip')
+    assert stats['requests_last_minute'] == 2
+    assert stats['is_blocked']
+
+
+def test_rate_limit_opt_out_for_benchmark(monkeypatch):
+    """RATE_LIMIT_ENABLED=false : aucun hook installé (instance de benchmark)"""
+    from flask import Flask
+    import ddos_protection
+
+    monkeypatch.setattr(ddos_protection, 'rate_limiter', RateLimiter(MemoryBackend(), clock=FakeClock()))
+    enabled, disabled = Flask('enabled'), Flask('disabled')
+    ddos_protection.setup_ddos_protection(enabled)
+    monkeypatch.setenv('RATE_LIMIT_ENABLED', 'false')
+    ddos_protection.setup_ddos_protection(disabled)
+
+    for app in (enabled, disabled):
+        app.add_url_rule('/traffic', 'traffic', lambda: 'ok')
+    assert [enabled.test_client().get('/traffic').status_code for _ in range(201)][-1] == 429
+    assert all(disabled.test_client().get('/traffic').status_code == 200 for _ in range(250))
@@ -0,0 +1,81 @@
+# Tests pour le routage rapide des requêtes du dashboard
+
+import gzip
+import sys
+from pathlib import Path
+
+from flask import Flask
+
+sys.path.append(str(Path(__file__).parent.parent / 'dashboard'))
+
+from request_routing import (
+    DASH_BOOT, DASH_CALLBACK, LANDING, LOGIN, PAGE, STATIC, IMMUTABLE_CACHE,
+    PrefixTrie, classify, setup_request_routing
+)
+
+
+def test_classify_paths():
+    """Plus long préfixe, entrée exacte pour '/' et classe par défaut"""
+    assert classify('/assets/styles.css') is STATIC
+    assert classify('/_dash-component-suites/dash/dcc/bundle.js') is STATIC
+    assert classify('/_dash-layout') is DASH_BOOT
+    assert classify('/_dash-update-component') is DASH_CALLBACK
+    assert classify('/') is LANDING
+    assert classify('/login') is LOGIN
+    assert classify('/traffic') is PAGE
+    assert classify('/_favicon.ico') is PAGE
+    assert classify('/_reload-hash') is PAGE
+    assert not classify('/traffic').public
+    assert classify('/').public
+
+
+def test_prefix_trie_exact_entries():
+    """Une entrée exacte ne s'applique pas aux chemins plus longs"""
+    trie = PrefixTrie([('/', 'root', True), ('/a', 'a', False)])
+    assert trie.match('/', 'default') == 'root'
+    assert trie.match('/b', 'default') == 'default'
+    assert trie.match('/abc', 'default') == 'a'
+
+
+def make_app(tmp_path):
+    """Application Flask minimale avec un dossier d'assets"""
+    assets = tmp_path / 'assets'
+    assets.mkdir()
+    (assets / 'styles.css').write_text('body { color: white; }\n' * 100)
+    (tmp_path / 'secret.txt').write_text('secret')
+
+    app = Flask(__name__)
+    setup_request_routing(app, str(assets))
+    calls = []
+
+    @app.before_request
+    def hook():
+        calls.append(1)
+
+    @app.route('/page')
+    def page():
+        return 'ok'
+
+    return app, calls
+
+
+def test_assets_bypass_flask_with_cache_headers(tmp_path):
+    """Les assets sont servis sans hooks Flask, compressés et versionnés"""
+    app, calls = make_app(tmp_path)
+    client = app.test_client()
+
+    response = client.get('/assets/styles.css?m=123', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == IMMUTABLE_CACHE
+    assert response.headers['X-Content-Type-Options'] == 'nosniff'
+    assert gzip.decompress(response.data).startswith(b'body')
+    assert calls == []
+
+    revalidate = client.get('/assets/styles.css', headers={'If-None-Match': response.headers['ETag']})
+    assert revalidate.status_code == 304
+
+    assert client.get('/assets/../secret.txt').status_code == 404
+
+    page = client.get('/page')
+    assert page.headers['X-Frame-Options'] == 'SAMEORIGIN'
+    assert calls
@@ -0,0 +1,135 @@
+# Tests du provisioning des dashboards Grafana (serveur Grafana local simulé)
+
+import base64
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from grafana_dashboards_scripts import provisioning
+
+AUTH = 'Basic ' + base64.b64encode(b'admin:secret').decode()
+
+
+class StubGrafana(ThreadingHTTPServer):
+    """API dashboards minimale : id et version attribués à chaque sauvegarde"""
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.dashboards = {}
+        self.requests = []
+        self.failing = set()
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+    def posts(self):
+        return [path for method, path in self.requests if method == 'POST']
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append(('GET', self.path))
+        if self.headers.get('Authorization') != AUTH:
+            return self._reply(401, {'message': 'Unauthorized'})
+        uid = self.path.rsplit('/', 1)[-1]
+        if uid in server.failing:
+            return self._reply(500, {'message': 'Internal error'})
+        if uid not in server.dashboards:
+            return self._reply(404, {'message': 'Dashboard not found'})
+        return self._reply(200, {'dashboard': server.dashboards[uid], 'meta': {}})
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        model = dict(body['dashboard'])
+        with server.lock:
+            server.requests.append(('POST', self.path))
+            previous = server.dashboards.get(model['uid'], {})
+            model['id'] = previous.get('id', len(server.dashboards) + 1)
+            model['version'] = previous.get('version', 0) + 1
+            server.dashboards[model['uid']] = model
+        self._reply(200, {'uid': model['uid'], 'version': model['version'], 'status': 'success'})
+
+
+@pytest.fixture
+def grafana():
+    server = StubGrafana()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_load_dashboards_in_process():
+    """Toutes les définitions chargées sans envoi, uid uniques"""
+    entries = provisioning.load_dashboards()
+    uids = [entry['model']['uid'] for entry in entries]
+    assert len(entries) == 10
+    assert len(set(uids)) == len(uids)
+    assert {'ecommerce-funnel', 'ecommerce-bi', 'ecommerce-prometheus'} <= set(uids)
+
+
+def test_content_hash_ignores_key_order_and_grafana_fields():
+    model = {'uid': 'a', 'title': 'A', 'panels': [{'id': 1, 'type': 'stat'}], 'version': 0}
+    stored = {'version': 7, 'id': 42, 'panels': [{'type': 'stat', 'id': 1}], 'title': 'A', 'uid': 'a'}
+    assert provisioning.content_hash(model) == provisioning.content_hash(stored)
+    assert provisioning.content_hash(model) != provisioning.content_hash({**model, 'title': 'B'})
+
+
+def test_provision_uploads_only_changed_dashboards(grafana):
+    entries = provisioning.load_dashboards()
+    with provisioning.GrafanaClient(grafana.url, 'admin', 'secret') as client:
+        first = provisioning.provision(client, entries, jobs=4)
+        assert [result['status'] for result in first] == ['created'] * len(entries)
+        assert len(grafana.posts()) == len(entries)
+
+        # Redéploiement à l'identique : lectures seulement
+        second = provisioning.provision(client, entries, jobs=4)
+        assert {result['status'] for result in second} == {'unchanged'}
+        assert len(grafana.posts()) == len(entries)
+
+        # Un dashboard modifié
+        changed = [dict(entry) for entry in entries]
+        changed[2] = {**changed[2], 'model': {**changed[2]['model'], 'refresh': '5m'}}
+        planned = provisioning.provision(client, changed, dry_run=True)
+        assert [result['status'] for result in planned].count('planned') == 1
+        third = provisioning.provision(client, changed, jobs=4)
+        assert [result['status'] for result in third].count('updated') == 1
+        assert third[2]['status'] == 'updated'
+        assert grafana.dashboards[changed[2]['model']['uid']]['version'] == 2
+        assert len(grafana.posts()) == len(entries) + 1
+
+
+def test_provision_reports_failures(grafana):
+    entries = provisioning.load_dashboards(['create_full_dashboard.py', 'create_bi_dashboard.py'])
+    grafana.failing.add('ecommerce-bi')
+    with provisioning.GrafanaClient(grafana.url, 'admin', 'secret') as client:
+        results = provisioning.provision(client, entries)
+    assert [result['status'] for result in results] == ['created', 'failed']
+    assert '500' in results[1]['error']
+
+    with provisioning.GrafanaClient(grafana.url, 'admin', 'wrong') as client:
+        results = provisioning.provision(client, entries[:1])
+    assert results[0]['status'] == 'failed'
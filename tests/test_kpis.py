@@ -4,15 +4,143 @@ import pytest
 import sys
 from pathlib import Path
 
+import pandas as pd
+
 # Ajouter le répertoire parent au path
 sys.path.append(str(Path(__file__).parent.parent))
 
+from src.kpis.cohorts import (
+    user_week_activity, build_retention_matrix, retention_pivot, week_index, week_start,
+    to_epoch_ms, weekly_revenue
+)
+from src.kpis import daily
+from src.kpis import products as product_analytics
+from src.kpis.category_tree import CategoryTree
+from src.kpis.rollups import RollupStore
+from src.kpis.journeys import build_journeys, journey_labels, path_statistics
+
+DAY_MS = 86_400_000
+# Lundi 2015-05-04 00:00 UTC
+MONDAY_MS = int(pd.Timestamp('2015-05-04').value // 1_000_000)
+
 
 def test_placeholder():
     """Test placeholder - à implémenter"""
     assert True
 
 
+def _events(rows):
+    """Construit des événements (user_id, timestamp) à partir de (user, jour)"""
+    return pd.DataFrame({
+        'user_id': [u for u, _ in rows],
+        'timestamp': [MONDAY_MS + d * DAY_MS for _, d in rows]
+    })
+
+
+def test_week_index_aligned_on_monday():
+    """Les semaines commencent le lundi, comme to_period('W')"""
+    sunday = MONDAY_MS + 6 * DAY_MS
+    next_monday = MONDAY_MS + 7 * DAY_MS
+    assert week_index([MONDAY_MS])[0] == week_index([sunday])[0]
+    assert week_index([next_monday])[0] == week_index([MONDAY_MS])[0] + 1
+    assert week_start(week_index([sunday]))[0] == pd.Timestamp('2015-05-04')
+
+
+def test_retention_matrix_tracks_real_users():
+    """La rétention suit les utilisateurs de la cohorte, pas les totaux hebdomadaires"""
+    events = _events([
+        (1, 0), (1, 1), (1, 8),   # cohorte S0, revient en S1
+        (2, 2), (2, 15),          # cohorte S0, revient en S2
+        (3, 9), (3, 10),          # cohorte S1, ne revient pas
+        (4, 9), (4, 16),          # cohorte S1, revient en S1+1
+    ])
+    table = build_retention_matrix(user_week_activity(events))
+    pivot = retention_pivot(table)
+
+    assert list(pivot.index) == [pd.Timestamp('2015-05-04'), pd.Timestamp('2015-05-11')]
+    assert pivot.loc['2015-05-04', 0] == 100.0
+    assert pivot.loc['2015-05-04', 1] == 50.0
+    assert pivot.loc['2015-05-04', 2] == 50.0
+    assert pivot.loc['2015-05-11', 1] == 50.0
+    assert table.loc[table['week_number'] == 0, 'cohort_size'].tolist() == [2, 2]
+
+
+def test_retention_matrix_chunked_activity_is_deduplicated():
+    """Les couples (utilisateur, semaine) partiels se recombinent sans double compte"""
+    events = _events([(1, 0), (1, 1), (1, 8), (2, 0)])
+    partials = [user_week_activity(events.iloc[:2]), user_week_activity(events.iloc[2:])]
+    activity = user_week_activity(pd.concat(partials, ignore_index=True))
+
+    assert len(activity) == 3
+    table = build_retention_matrix(activity)
+    assert table['retained_users'].tolist() == [2, 1]
+
+
+def test_retention_matrix_cohort_revenue():
+    """Le revenu est rattaché à la cohorte et à la semaine de la transaction"""
+    events = _events([(1, 0), (1, 7), (2, 7)])
+    transactions = pd.DataFrame({
+        'user_id': [1, 1, 2, 99],
+        'transaction_date': ['2015-05-04 09:00:00.000', '2015-05-11 18:39:31.745',
+                             '2015-05-12 00:00:00.000', '2015-05-04 12:00:00.000'],
+        'amount': [10.0, 20.0, 5.0, 1000.0]
+    })
+    table = build_retention_matrix(user_week_activity(events), transactions)
+    revenue = table.set_index(['cohort_week', 'week_number'])['revenue']
+
+    assert revenue[(pd.Timestamp('2015-05-04'), 0)] == 10.0
+    assert revenue[(pd.Timestamp('2015-05-04'), 1)] == 20.0
+    assert revenue[(pd.Timestamp('2015-05-11'), 0)] == 5.0
+
+
+def test_weekly_revenue_text_dates_and_new_days():
+    """Dates texte de transactions.csv, filtre sur les jours nouvellement importés"""
+    transactions = pd.DataFrame({
+        'user_id': [1, 1, 1, 2],
+        'transaction_date': ['2015-05-04 23:59:59.999', '2015-05-05 00:00:00.000',
+                             '2015-05-11 08:00:00.500', '2015-05-10 12:00:00.000'],
+        'amount': [10.0, 20.0, 5.0, 7.5],
+    })
+    assert to_epoch_ms(transactions['transaction_date'])[1] == MONDAY_MS + DAY_MS
+    assert to_epoch_ms([MONDAY_MS])[0] == MONDAY_MS
+
+    revenue = weekly_revenue(transactions, ['2015-05-05', '2015-05-10', '2015-05-11'])
+    week = week_index([MONDAY_MS])[0]
+    assert revenue.values.tolist() == [[1, week, 20.0], [1, week + 1, 5.0], [2, week, 7.5]]
+    assert weekly_revenue(transactions)['revenue'].sum() == 42.5
+
+
+def test_cohort_analysis_text_transaction_dates(tmp_path):
+    """transactions.csv (dates texte du pipeline) traverse cohort_analysis jusqu'au revenu"""
+    sys.path.append(str(Path(__file__).parent.parent / 'scripts' / 'kpi_analysis'))
+    import cohort_analysis
+
+    transactions_file = tmp_path / 'transactions.csv'
+    pd.DataFrame({
+        'transaction_id': [1, 2, 3],
+        'user_id': [1, 1, 2],
+        'transaction_date': ['2015-05-04 10:15:00.125', '2015-05-11 18:39:31.745', '2015-05-12 00:00:00.000'],
+        'amount': [10.0, 20.0, 5.0],
+    }).to_csv(transactions_file, index=False)
+
+    transactions = cohort_analysis.load_transactions(transactions_file)
+    assert transactions['transaction_date'].tolist()[0] == MONDAY_MS + 36_900_125
+
+    events = _events([(1, 0), (1, 7), (2, 7)])
+    table = build_retention_matrix(user_week_activity(events), transactions)
+    revenue = table.set_index(['cohort_week', 'week_number'])['revenue']
+    assert revenue[(pd.Timestamp('2015-05-04'), 0)] == 10.0
+    assert revenue[(pd.Timestamp('2015-05-04'), 1)] == 20.0
+    assert revenue[(pd.Timestamp('2015-05-11'), 0)] == 5.0
+
+
+def test_retention_matrix_empty():
+    """Aucune activité: table vide avec les colonnes attendues"""
+    table = build_retention_matrix(pd.DataFrame(columns=['user_id', 'week']))
+    assert table.empty
+    assert 'retention_rate' in table.columns
+
+
 # Tests à venir pour les KPIs
 # def test_conversion_rate():
 #     pass
@@ -22,3 +150,228 @@ def test_placeholder():
 #
 # def test_customer_lifetime_value():
 #     pass
+
+
+def _journey_events():
+    """Trois visiteurs, événements volontairement désordonnés"""
+    return pd.DataFrame({
+        'visitorid': [2, 1, 2, 3, 1, 2, 3],
+        'timestamp': [30, 20, 10, 5, 10, 20, 6],
+        'event': ['transaction', 'addtocart', 'view', 'view', 'view', 'addtocart', 'view'],
+    })
+
+
+def test_build_journeys_first_steps():
+    """Étapes ordonnées par timestamp, tronquées à max_steps"""
+    journeys, steps = build_journeys(_journey_events(), max_steps=2)
+    labels = journey_labels(steps)
+
+    assert journeys.index.tolist() == [1, 2, 3]
+    assert journeys['total_events'].tolist() == [2, 3, 2]
+    assert journeys['first_event_time'].tolist() == [10, 10, 5]
+    assert journeys['last_event_time'].tolist() == [20, 30, 6]
+    assert list(labels) == ['view -> addtocart', 'view -> addtocart', 'view -> view']
+
+
+def test_path_statistics_counts():
+    """Fréquence des chemins par ordre décroissant"""
+    events = _journey_events()
+    events['event'] = events['event'].astype('category')  # catégories alphabétiques
+    _, steps = build_journeys(events)
+    stats = path_statistics(journey_labels(steps))
+
+    assert stats['path'].tolist() == ['view -> addtocart', 'view -> addtocart -> transaction', 'view -> view']
+    assert stats['num_users'].tolist() == [1, 1, 1]
+    assert stats['has_transaction'].tolist() == [False, True, False]
+    assert stats['length'].tolist() == [2, 3, 2]
+
+
+def _category_tree():
+    """1 > (2 > 4, 3) ; 5 rattachée à un parent absent (99)"""
+    return CategoryTree.from_frame(pd.DataFrame({
+        'categoryid': [4, 1, 3, 2, 5, 6],
+        'parentid': [2, None, 1, 1, 99, 5],
+    }))
+
+
+def test_category_tree_index():
+    """Profondeur, racine, chemin et intervalles de sous-arbres"""
+    tree = _category_tree()
+    index = tree.frame().set_index('categoryid')
+
+    assert index['depth'].to_dict() == {1: 0, 2: 1, 3: 1, 4: 2, 5: 1, 6: 2, 99: 0}
+    assert index.loc[4, 'root'] == 1
+    assert index.loc[6, 'path'] == '99 > 5 > 6'
+    assert index.loc[1, 'subtree_size'] == 4
+    assert tree.subtree(1).tolist() == [1, 2, 4, 3]
+
+    with pytest.raises(ValueError):
+        CategoryTree([1, 2], [2, 1])
+
+
+def test_category_tree_rollups():
+    """Agrégation par niveau et par sous-arbre, catégories inconnues ignorées"""
+    tree = _category_tree()
+    categories = [4, 3, 6, 2, 7, None]
+    revenue = [10.0, 1.0, 5.0, 2.0, 100.0, 3.0]
+
+    assert tree.rollup(categories, revenue, level=0).to_dict() == {1: 13.0, 99: 5.0}
+    assert tree.rollup(categories, revenue, level=1).to_dict() == {1: 0.0, 2: 12.0, 3: 1.0, 5: 5.0, 99: 0.0}
+    assert tree.subtree_totals(categories, revenue).to_dict() == {
+        1: 13.0, 2: 12.0, 3: 1.0, 4: 10.0, 5: 5.0, 6: 5.0, 99: 5.0,
+    }
+
+
+def _products():
+    return pd.DataFrame({
+        'product_id': [1, 2, 3, 4, 5, 6],
+        'total_revenue': [500.0, 300.0, 0.0, 0.0, 20.0, 180.0],
+        'view_to_purchase_rate': [1.5, 0.5, 3.0, 0.0, 0.1, 0.2],
+        'views': [200, 50, 10, 150, 5, 40],
+        'purchases': [5, 3, 0, 0, 1, 2],
+        'avg_price': [100.0, 100.0, None, 50.0, 20.0, 90.0],
+    })
+
+
+def test_categorize_products_rules():
+    """Première règle satisfaite ; le seuil de revenue est ajustable"""
+    products = _products()
+    assert list(product_analytics.categorize_products(products)) == [
+        'Top Performer', 'High Revenue', 'High Conversion', 'Popular', 'Low Performer', 'Low Performer',
+    ]
+    assert product_analytics.categorize_products(products, revenue_quantile=0.5)[5] == 'High Revenue'
+
+
+def test_pareto_and_price_segment_tables():
+    """Jalons Pareto par searchsorted, tranches (b[i], b[i+1]] comme pd.cut"""
+    pareto = product_analytics.pareto_table(_products(), milestones=[50, 80, 100])
+    assert pareto['num_products'].tolist() == [1, 2, 6]
+    assert pareto['cumulative_revenue'].tolist() == [500.0, 800.0, 1000.0]
+    assert pareto['cumulative_purchases'].tolist() == [5, 8, 11]
+
+    segments = product_analytics.price_segment_table(_products())
+    assert segments['price_range'].tolist() == ['0-50€', '50-100€']
+    assert segments['num_products'].tolist() == [2, 3]
+    assert segments['total_purchases'].tolist() == [1, 10]
+    assert segments['revenue_share'].sum() == 100.0
+
+
+def test_upsert_days_matches_full_rolling():
+    """Jours remplacés et ajoutés, moyennes mobiles recalculées sur la seule fenêtre touchée"""
+    full = pd.DataFrame({
+        'date': pd.date_range('2015-05-03', periods=30, freq='D').strftime('%Y-%m-%d'),
+        'unique_users': [(day * 37) % 101 for day in range(30)],
+    })
+    expected = daily.refresh_rolling(full.copy(), {'ma7_users': 'unique_users'})
+
+    # Historique de 20 jours dont le dernier était incomplet, puis jours 19 à 29 recalculés
+    stored = expected.iloc[:20].copy()
+    stored.loc[19, ['unique_users', 'ma7_users']] = [1, 1.0]
+    fresh = full.iloc[19:]
+    merged, start = daily.upsert_days(stored, fresh)
+    assert start == 19
+    daily.refresh_rolling(merged, {'ma7_users': 'unique_users'}, start)
+    pd.testing.assert_frame_equal(merged, expected, check_dtype=False)
+
+    # Dates datetime et filtre des jours >= cutoff
+    with_datetimes = full.assign(date=pd.to_datetime(full['date']))
+    assert daily.rows_since(with_datetimes, '2015-05-30')['date'].dt.day.tolist() == [30, 31, 1]
+    merged, start = daily.upsert_days(None, fresh)
+    assert start == 0 and len(merged) == 11
+
+
+
+def test_daily_metrics_incremental_matches_full_rebuild(capsys):
+    """daily_metrics.csv incrémental (historique relu du CSV) identique octet pour octet au calcul complet"""
+    import io
+    import numpy as np
+    sys.path.append(str(Path(__file__).parent.parent / 'scripts' / 'data_prep'))
+    import generate_daily_metrics
+
+    rng = np.random.default_rng(7)
+    days = pd.date_range('2015-05-03', periods=20, freq='D').strftime('%Y-%m-%d')
+    n = 2000
+    events = pd.DataFrame({
+        'date': np.sort(rng.choice(days, n)),
+        'user_id': rng.integers(0, 300, n),
+        'session_id': rng.integers(0, 600, n),
+        'product_id': rng.integers(0, 50, n),
+        'timestamp': rng.integers(0, 10**12, n),
+        'event_type': rng.choice(['view', 'addtocart', 'transaction'], n, p=[.8, .15, .05]),
+        'segment': rng.choice(['New', 'Occasional', 'Regular', 'Premium'], n),
+    })
+    # Sommes de montants non représentables exactement (0.1 + 0.2 ...)
+    transactions = pd.DataFrame({
+        'date': rng.choice(days, 300),
+        'amount': rng.choice([0.1, 0.2, 19.99, 120.72, 33.33, 7.07], 300),
+    })
+
+    full = generate_daily_metrics.compute_daily_metrics(events, transactions).to_csv(index=False)
+
+    first = generate_daily_metrics.compute_daily_metrics(events[events['date'] < days[12]],
+                                                         transactions[transactions['date'] < days[12]])
+    stored = pd.read_csv(io.StringIO(first.to_csv(index=False)), float_precision='round_trip')
+    # Le dernier jour stocké est recalculé avec les nouveaux jours
+    cutoff = days[11]
+    updated, n_days = generate_daily_metrics.update_daily_metrics(
+        stored, events[events['date'] >= cutoff], transactions[transactions['date'] >= cutoff])
+    capsys.readouterr()
+
+    assert n_days == 9
+    assert updated.to_csv(index=False) == full
+    revenue = pd.read_csv(io.StringIO(full), float_precision='round_trip')['daily_revenue']
+    assert (revenue == revenue.round(2)).all()
+
+def _hourly_rollup():
+    periods = pd.date_range('2015-05-29', '2015-06-09 23:00', freq='h')
+    return pd.DataFrame({
+        'period': periods,
+        'views': [(hour * 7) % 13 + 1 for hour in range(len(periods))],
+        'add_to_carts': [hour % 3 for hour in range(len(periods))],
+        'transactions': [hour % 2 for hour in range(len(periods))],
+    })
+
+
+def test_rollup_store_levels_match_groupby(tmp_path):
+    """Niveaux jour/semaine/mois identiques à un groupby, store relu à l'identique"""
+    hourly = _hourly_rollup()
+    daily_only = pd.DataFrame({'period': pd.date_range('2015-05-29', periods=12, freq='D'),
+                               'unique_users': range(12)})
+    store = RollupStore.build(hourly, daily_only)
+
+    metrics = ['views', 'add_to_carts', 'transactions']
+    weeks = hourly.groupby(hourly['period'].dt.to_period('W-SUN').dt.start_time)[metrics].sum()
+    months = hourly.groupby(hourly['period'].dt.to_period('M').dt.start_time)[metrics].sum()
+    assert store.levels['week']['period'].tolist() == list(weeks.index)
+    assert store.levels['week'][metrics].to_numpy().tolist() == weeks.to_numpy().tolist()
+    assert store.levels['month'][metrics].to_numpy().tolist() == months.to_numpy().tolist()
+    assert store.levels['week']['unique_users'].tolist() == [sum(range(3)), sum(range(3, 10)), 10 + 11]
+
+    store.save(tmp_path)
+    loaded = RollupStore.load(tmp_path)
+    for level, frame in store.levels.items():
+        pd.testing.assert_frame_equal(loaded.levels[level], frame, check_dtype=False)
+    assert RollupStore.load(tmp_path / 'absent') is None
+
+
+def test_rollup_store_query_and_totals():
+    """Niveau choisi d'après les bornes, totaux sur un intervalle non aligné"""
+    hourly = _hourly_rollup()
+    store = RollupStore.build(hourly)
+
+    assert store.level_for('2015-06-01', '2015-07-01') == 'month'
+    assert store.level_for('2015-06-01', '2015-06-08') == 'week'
+    assert store.level_for('2015-06-02', '2015-06-04') == 'day'
+    assert store.level_for('2015-06-02 05:00', '2015-06-04') == 'hour'
+
+    weekly = store.query('2015-06-01', '2015-06-15')
+    assert weekly['period'].dt.day.tolist() == [1, 8]
+    assert 'view_to_cart_pct' in weekly.columns
+
+    start, end = pd.Timestamp('2015-05-30 13:00'), pd.Timestamp('2015-06-03 02:00')
+    window = hourly[(hourly['period'] >= start) & (hourly['period'] < end)]
+    totals = store.totals(start, end)
+    assert totals['views'] == window['views'].sum()
+    assert totals['transactions'] == window['transactions'].sum()
+    expected_rate = round(window['add_to_carts'].sum() * 100 / window['views'].sum(), 2)
+    assert totals['view_to_cart_pct'] == expected_rate
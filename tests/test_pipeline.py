@@ -0,0 +1,146 @@
+# Tests pour l'orchestrateur incrémental du pipeline
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.pipeline.dag import BLOCKED, FAILED, PLANNED, RAN, SKIPPED, Pipeline, Step
+
+# Script de test : concatène ses entrées (en majuscules) dans ses sorties et
+# trace chaque exécution dans runs.txt
+COPY_SCRIPT = """
+import sys, time
+from pathlib import Path
+name, inputs, outputs = sys.argv[1], sys.argv[2], sys.argv[3]
+time.sleep(float(sys.argv[4]) if len(sys.argv) > 4 else 0)
+data = ''.join(Path(p).read_text() for p in inputs.split(',') if p).upper()
+for out in outputs.split(','):
+    Path(out).parent.mkdir(parents=True, exist_ok=True)
+    Path(out).write_text(data)
+with open('runs.txt', 'a') as f:
+    f.write(f'{name} {time.time()} \\n')
+"""
+
+
+def copy_step(name, inputs, outputs, delay=0):
+    return Step(name, 'copy.py', inputs=inputs, outputs=outputs,
+                args=[name, ','.join(inputs), ','.join(outputs), delay])
+
+
+def runs(root):
+    path = root / 'runs.txt'
+    return [line.split()[0] for line in path.read_text().splitlines()] if path.exists() else []
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / 'copy.py').write_text(COPY_SCRIPT)
+    (tmp_path / 'raw').mkdir()
+    (tmp_path / 'raw' / 'a.txt').write_text('a')
+    (tmp_path / 'raw' / 'b.txt').write_text('b')
+    return tmp_path
+
+
+def make_pipeline(root, steps):
+    return Pipeline(steps, root, log=lambda message: None)
+
+
+def diamond():
+    """a -> left, b -> right, (left, right) -> report"""
+    return [
+        copy_step('left', ['raw/a.txt'], ['clean/left.txt']),
+        copy_step('right', ['raw/b.txt'], ['clean/right.txt']),
+        copy_step('report', ['clean/left.txt', 'clean/right.txt'], ['clean/report.txt']),
+    ]
+
+
+def test_dependencies_from_outputs(project):
+    """Dépendances déduites des producteurs, sorties en double et cycles refusés"""
+    pipeline = make_pipeline(project, diamond())
+    assert pipeline.dependencies['report'] == ['left', 'right']
+    assert pipeline.order.index('report') == 2
+
+    with pytest.raises(ValueError):
+        make_pipeline(project, diamond() + [copy_step('other', ['raw/a.txt'], ['clean/left.txt'])])
+    with pytest.raises(ValueError):
+        make_pipeline(project, [copy_step('x', ['y.txt'], ['x.txt']), copy_step('y', ['x.txt'], ['y.txt'])])
+
+
+def test_incremental_run(project):
+    """Entrées inchangées : rien n'est relancé ; une entrée modifiée ne relance que son aval"""
+    assert set(make_pipeline(project, diamond()).run(jobs=2).values()) == {RAN}
+    assert (project / 'clean' / 'report.txt').read_text() == 'AB'
+
+    statuses = make_pipeline(project, diamond()).run(jobs=2)
+    assert set(statuses.values()) == {SKIPPED}
+    assert len(runs(project)) == 3
+
+    (project / 'raw' / 'b.txt').write_text('c')
+    pipeline = make_pipeline(project, diamond())
+    assert pipeline.run(dry_run=True) == {'left': SKIPPED, 'right': PLANNED, 'report': PLANNED}
+    statuses = pipeline.run(jobs=2)
+    assert statuses == {'left': SKIPPED, 'right': RAN, 'report': RAN}
+    assert (project / 'clean' / 'report.txt').read_text() == 'AC'
+
+    # Sortie supprimée : l'étape est relancée, sa sortie identique ne relance pas l'aval
+    (project / 'clean' / 'left.txt').unlink()
+    statuses = make_pipeline(project, diamond()).run()
+    assert statuses == {'left': RAN, 'right': SKIPPED, 'report': SKIPPED}
+
+
+def test_optional_outputs(project):
+    """Sortie optionnelle : absente sans échec, son producteur précède ses lecteurs"""
+    steps = [
+        Step('left', 'copy.py', inputs=['raw/a.txt'], outputs=['clean/left.txt'],
+             optional_outputs=['clean/tree.txt'], args=['left', 'raw/a.txt', 'clean/left.txt']),
+        copy_step('report', ['clean/left.txt'], ['clean/report.txt']),
+    ]
+    steps[1].optional_inputs = ['clean/tree.txt']
+    pipeline = make_pipeline(project, steps)
+    assert pipeline.dependencies['report'] == ['left']
+    assert pipeline.run() == {'left': RAN, 'report': RAN}
+
+    # Sortie optionnelle modifiée hors pipeline : l'étape et son aval sont relancés
+    (project / 'clean' / 'tree.txt').write_text('t')
+    assert make_pipeline(project, steps).run() == {'left': RAN, 'report': RAN}
+    assert make_pipeline(project, steps).run() == {'left': SKIPPED, 'report': SKIPPED}
+
+
+def test_targets_and_force(project):
+    """--only limite l'exécution à l'étape et son amont"""
+    statuses = make_pipeline(project, diamond()).run(targets=['left'])
+    assert statuses == {'left': RAN}
+    statuses = make_pipeline(project, diamond()).run(targets=['left'], force=True)
+    assert statuses == {'left': RAN}
+    assert runs(project) == ['left', 'left']
+
+
+def test_independent_steps_run_in_parallel(project):
+    """Deux branches indépendantes s'exécutent simultanément"""
+    steps = [
+        copy_step('left', ['raw/a.txt'], ['clean/left.txt'], delay=1.0),
+        copy_step('right', ['raw/b.txt'], ['clean/right.txt'], delay=1.0),
+    ]
+    start = time.perf_counter()
+    make_pipeline(project, steps).run(jobs=2)
+    assert time.perf_counter() - start < 1.9
+    assert sorted(runs(project)) == ['left', 'right']
+
+
+def test_failure_blocks_downstream(project):
+    """Une étape en échec bloque son aval et sera relancée au run suivant"""
+    (project / 'fail.py').write_text('import sys; sys.exit(3)')
+    steps = diamond()
+    steps[1] = Step('right', 'fail.py', inputs=['raw/b.txt'], outputs=['clean/right.txt'])
+    pipeline = make_pipeline(project, steps)
+    assert pipeline.run(jobs=2) == {'left': RAN, 'right': FAILED, 'report': BLOCKED}
+    assert (pipeline.log_dir / 'right.log').exists()
+
+    (project / 'fail.py').write_text(COPY_SCRIPT)
+    steps[1] = copy_step('right', ['raw/b.txt'], ['clean/right.txt'])
+    steps[1].script = 'fail.py'
+    assert make_pipeline(project, steps).run() == {'left': SKIPPED, 'right': RAN, 'report': RAN}
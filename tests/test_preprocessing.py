@@ -6,12 +6,113 @@ from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent.parent))
 
+import pandas as pd
+
+from src.preprocessing import cleaner, lookup, schema
+from src.preprocessing.lookup import KeyLookup
+
 
 def test_placeholder():
     """Test placeholder - à implémenter"""
     assert True
 
 
+def test_schema_to_compact():
+    """Catégories fixes, entiers 32 bits et transactionid nullable"""
+    df = pd.DataFrame({
+        'timestamp': [1433221332117, 1433224214164],
+        'visitorid': [257597, 992329],
+        'event': ['view', 'transaction'],
+        'itemid': [355908, 248676],
+        'transactionid': [None, 4000.0],
+        'segment': ['Premium', 'New'],
+        'other': ['a', 'b'],
+    })
+    compact = schema.to_compact(df)
+
+    assert compact['timestamp'].dtype == 'int64'
+    assert compact['visitorid'].dtype == 'int32'
+    assert compact['transactionid'].dtype == 'Int32'
+    assert compact['event'].dtype == schema.EVENT_TYPE
+    assert list(compact['event'].cat.categories) == schema.EVENT_TYPES
+    assert compact['segment'].dtype == schema.SEGMENT
+    assert compact['other'].dtype == df['other'].dtype
+
+    large = pd.concat([df] * 1000, ignore_index=True)
+    assert schema.memory_mb(schema.to_compact(large)) < schema.memory_mb(large) / 2
+
+
+def test_schema_narrow_int_overflow():
+    """Un identifiant hors de la plage int32 reste en int64"""
+    compact = schema.to_compact(pd.DataFrame({'itemid': [1, 2**40]}))
+    assert compact['itemid'].dtype == 'int64'
+
+
+def test_schema_csv_round_trip(tmp_path):
+    """Écriture puis relecture : mêmes valeurs, mêmes types compacts"""
+    df = schema.to_compact(pd.DataFrame({
+        'user_id': [1, 2, 3],
+        'event_type': ['view', 'addtocart', 'view'],
+        'transaction_id': [None, None, 12],
+        'day_of_week': ['Monday', 'Sunday', 'Friday'],
+        'hour': [0, 13, 23],
+    }))
+    path = tmp_path / 'data_clean.csv'
+    schema.write_csv(df, path)
+
+    assert '12.0' not in path.read_text()
+    pd.testing.assert_frame_equal(schema.read_csv(path), df)
+
+    chunks = list(schema.read_csv(path, chunksize=2))
+    assert pd.concat(chunks, ignore_index=True)['event_type'].dtype == schema.EVENT_TYPE
+
+
+def test_schema_read_raw_keeps_invalid_rows(tmp_path):
+    """Lecture brute : valeurs invalides conservées pour le nettoyage"""
+    path = tmp_path / 'events.csv'
+    path.write_text('timestamp,visitorid,event,itemid,transactionid\n'
+                    '1433221332117,-1,view,355908,\n'
+                    ',257597,click,248676,\n')
+    raw = schema.read_csv(path, raw=True)
+
+    assert len(raw) == 2
+    assert raw['timestamp'].isna().sum() == 1
+    assert 'click' in raw['event'].cat.categories
+
+
+
+def _users():
+    return schema.to_compact(pd.DataFrame({
+        'user_id': [40, 7, 12],
+        'segment': ['Premium', 'New', 'Regular'],
+        'total_events': [150, 1, 30],
+    }))
+
+
+def test_key_lookup_matches_left_merge():
+    """Même résultat qu'un merge(how='left'), clés absentes manquantes"""
+    users = _users()
+    events = pd.DataFrame({'visitorid': [7, 99, 40, 12, 7]})
+    expected = events.merge(users, left_on='visitorid', right_on='user_id', how='left')
+
+    KeyLookup(users['user_id'], users[['segment', 'total_events']]).attach(events, 'visitorid')
+
+    assert events['segment'].dtype == schema.SEGMENT
+    assert events['total_events'].dtype == 'Int64'
+    assert events['segment'].astype(object).tolist() == expected['segment'].astype(object).tolist()
+    assert events['total_events'].isna().tolist() == expected['total_events'].isna().tolist()
+    assert events['total_events'].fillna(0).tolist() == expected['total_events'].fillna(0).tolist()
+
+
+def test_key_lookup_sparse_keys(monkeypatch):
+    """Clés trop dispersées pour un index dense : recherche dichotomique"""
+    monkeypatch.setattr(lookup, 'DENSE_MIN_SIZE', 0)
+    users = _users()
+    table = KeyLookup(users['user_id'], users[['segment']])
+
+    assert table._dense is None
+    assert table.positions(pd.Series([12, 5, 40, 1000])).tolist() == [1, -1, 2, -1]
+
 # Tests à venir pour le preprocessing
 # def test_data_cleaning():
 #     pass
@@ -21,3 +122,67 @@ def test_placeholder():
 #
 # def test_missing_values_handling():
 #     pass
+
+
+def _dirty_events():
+    """Événements bruts : doublons, règles enfreintes, ordre quelconque"""
+    return pd.DataFrame({
+        'timestamp': [300, 100, 300, -1, 200, 100, 400, 500, 200],
+        'visitorid': [1, 2, 1, 3, 4, 2, -5, 6, 7],
+        'event': ['transaction', 'view', 'transaction', 'view', 'click', 'view',
+                  'view', 'transaction', 'addtocart'],
+        'itemid': [10, 20, 10, 30, 40, 20, 50, 60, None],
+        'transactionid': [7, None, 7, None, None, None, None, None, None],
+    })
+
+
+def test_clean_frame_rules_and_duplicates():
+    """Une ligne invalide comptée pour sa première règle, doublons exacts retirés, tri par timestamp"""
+    cleaned, report = cleaner.clean_frame(_dirty_events())
+
+    assert report['invalid'] == {
+        'timestamp': 1, 'visitorid': 1, 'itemid': 0, 'event': 1,
+        'missing': 1, 'transaction_id': 1,
+    }
+    assert report['duplicates'] == 2
+    assert report['rows'] == len(cleaned) == 2
+    assert cleaned['timestamp'].tolist() == [100, 300]
+    assert cleaned['transactionid'].tolist() == [pd.NA, 7]
+    assert cleaned['event'].dtype == schema.EVENT_TYPE
+
+
+def test_clean_frame_keeps_near_duplicates():
+    """Seules les lignes égales sur toutes les colonnes sont des doublons (comme drop_duplicates)"""
+    raw = pd.DataFrame({
+        'timestamp': [100, 100, 100, 100, 100, 100, 100, -1, -1],
+        'visitorid': [1, 1, 1, 1, 2, 1, 1, 3, 3],
+        'event': ['transaction', 'transaction', 'transaction', 'view', 'transaction',
+                  'transaction', 'transaction', 'view', 'view'],
+        'itemid': [10, 10, 10, 10, 10, 11, 10, 30, 30],
+        'transactionid': [7, 7, 8, None, 7, 7, 7, None, None],
+        'source': ['web', 'web', 'web', 'web', 'web', 'web', 'app', 'web', 'web'],
+    })
+
+    cleaned, report = cleaner.clean_frame(raw)
+
+    # Ancien enchaînement : drop_duplicates() sur toutes les colonnes puis filtres
+    baseline = raw.drop_duplicates()
+    baseline = baseline[(baseline['timestamp'] > 0) & baseline['event'].isin(schema.EVENT_TYPES)]
+    assert report['rows'] == len(cleaned) == len(baseline) == 6
+    assert report['duplicates'] == 1
+    assert report['invalid']['timestamp'] == 2
+    assert sorted(cleaned['source']) == ['app'] + ['web'] * 5
+
+
+def test_clean_csv_matches_clean_frame(tmp_path):
+    """Nettoyage par chunks et partitions identique au nettoyage en mémoire"""
+    raw = pd.concat([_dirty_events()] * 3, ignore_index=True)
+    raw['timestamp'] += raw.index.to_series() // 9 * 150
+    raw.to_csv(tmp_path / 'events.csv', index=False)
+
+    expected, expected_report = cleaner.clean_frame(schema.read_csv(tmp_path / 'events.csv', raw=True))
+    report = cleaner.clean_csv(tmp_path / 'events.csv', tmp_path / 'clean.csv',
+                               chunksize=4, partition_ms=250)
+
+    assert report == expected_report
+    pd.testing.assert_frame_equal(schema.read_csv(tmp_path / 'clean.csv'), expected)
@@ -0,0 +1,50 @@
+# Tests pour les utilitaires du benchmark de charge
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from run_benchmark import LatencyRecorder, callback_body, collect_props, parse_outputs, percentile
+
+
+def test_percentile():
+    """Interpolation linéaire entre les valeurs triées"""
+    values = [1.0, 2.0, 3.0, 4.0]
+    assert percentile(values, 0) == 1.0
+    assert percentile(values, 50) == 2.5
+    assert percentile(values, 100) == 4.0
+    assert percentile([], 50) is None
+
+
+def test_callback_body_from_layout():
+    """Corps d'appel construit à partir des dépendances et des valeurs de la page"""
+    layout = {'type': 'Div', 'namespace': 'dash_html_components', 'props': {'children': [
+        {'type': 'Dropdown', 'namespace': 'dash_core_components', 'props': {'id': 'scenario', 'value': 'A'}},
+    ]}}
+    dependency = {
+        'output': '..graph.figure...table.data..',
+        'inputs': [{'id': 'scenario', 'property': 'value'}],
+        'state': [{'id': 'missing', 'property': 'value'}],
+    }
+    assert parse_outputs(dependency['output']) == [('graph', 'figure'), ('table', 'data')]
+
+    body = callback_body(dependency, collect_props(layout, {}))
+    assert body['outputs'] == [{'id': 'graph', 'property': 'figure'}, {'id': 'table', 'property': 'data'}]
+    assert body['inputs'] == [{'id': 'scenario', 'property': 'value', 'value': 'A'}]
+    assert body['state'][0]['value'] is None
+    assert body['changedPropIds'] == ['scenario.value']
+
+
+def test_latency_recorder_summary():
+    """Percentiles, débit et taux d'erreur par libellé"""
+    recorder = LatencyRecorder()
+    for i in range(1, 101):
+        recorder.add('callbacks', 'graph.figure', i / 1000, ok=i % 10 != 0)
+
+    stats = recorder.summary(duration=10.0)['callbacks']['graph.figure']
+    assert stats['requests'] == 100
+    assert stats['error_rate'] == 0.1
+    assert stats['throughput_rps'] == 10.0
+    assert stats['p50_ms'] == 50.5
+    assert stats['p99_ms'] == 99.01
@@ -7,6 +7,21 @@ import time
 import psycopg2
 from prometheus_client import start_http_server, Gauge, Info
 import os
+import sys
+from pathlib import Path
+
+# Shared rollup store (src/kpis/rollups.py): next to the script in the image,
+# at the repository root otherwise
+for _root in (Path(__file__).resolve().parent, Path(__file__).resolve().parents[1]):
+    if (_root / 'src' / 'kpis' / 'rollups.py').exists():
+        sys.path.insert(0, str(_root))
+        break
+try:
+    from src.kpis.rollups import LEVELS, RollupStore
+except ImportError:
+    RollupStore = None
+
+ROLLUP_DIR = Path(os.getenv('ROLLUP_DIR', Path(__file__).resolve().parents[1] / 'data' / 'clean' / 'rollups'))
 
 # Database connection
 DB_CONFIG = {
@@ -64,15 +79,57 @@ realtime_conversion_rate = Gauge('ecommerce_realtime_conversion_rate', 'Current
 realtime_aov = Gauge('ecommerce_realtime_aov', 'Current average order value')
 realtime_sessions_today = Gauge('ecommerce_realtime_sessions_today', 'Sessions today')
 
+# Rollup store metrics (latest period of each level: hour, day, week, month)
+rollup_latest = Gauge('ecommerce_rollup_latest', 'Additive metric over the latest period of a rollup level',
+                      ['level', 'metric'])
+rollup_latest_period = Gauge('ecommerce_rollup_latest_period_timestamp',
+                             'Start of the latest period of a rollup level (unix seconds)', ['level'])
+
 # Error tracking metric
 ecommerce_error_count = Gauge('ecommerce_error_count', 'Number of errors tracked')
 
+_rollup_cache = {'mtime': None, 'store': None}
+
 
 def get_db_connection():
     """Create database connection"""
     return psycopg2.connect(**DB_CONFIG)
 
 
+def table_exists(cur, table_name):
+    """Check table existence without raising (and aborting the transaction)"""
+    cur.execute("SELECT to_regclass(%s) IS NOT NULL", (table_name,))
+    return cur.fetchone()[0]
+
+
+def load_rollups():
+    """Rollup store, reloaded only when build_rollups.py has rewritten it"""
+    if RollupStore is None:
+        return None
+    marker = ROLLUP_DIR / 'rollup_hour.csv'
+    if not marker.exists():
+        return None
+    mtime = marker.stat().st_mtime
+    if _rollup_cache['mtime'] != mtime:
+        _rollup_cache['store'] = RollupStore.load(ROLLUP_DIR)
+        _rollup_cache['mtime'] = mtime
+    return _rollup_cache['store']
+
+
+def collect_rollup_metrics():
+    """Latest period of each rollup level (read straight from the materialized levels)"""
+    store = load_rollups()
+    if store is None:
+        return
+    for level in LEVELS:
+        latest = store.query(level=level, rates=True).tail(1)
+        if latest.empty:
+            continue
+        rollup_latest_period.labels(level=level).set(latest['period'].iloc[0].timestamp())
+        for metric, value in latest.drop(columns='period').iloc[0].items():
+            rollup_latest.labels(level=level, metric=metric).set(float(value))
+
+
 def collect_metrics():
     """Collect metrics from PostgreSQL and update Prometheus gauges"""
     conn = None
@@ -227,9 +284,9 @@ def collect_metrics():
             category_performance.labels(category=cat, metric='conversions').set(conversions or 0)
             category_performance.labels(category=cat, metric='conversion_rate').set(float(conv_rate or 0))
         
-        # Customer segmentation (generate sample data if table doesn't exist)
+        # Customer segmentation (sample data until migration 006 has been applied)
         print("Step 5: Collecting segmentation metrics...")
-        try:
+        if table_exists(cur, 'user_segments'):
             cur.execute("""
                 SELECT 
                     user_segment,
@@ -246,10 +303,8 @@ def collect_metrics():
                 segment_revenue.labels(segment=segment).set(float(revenue or 0))
                 segment_conversion.labels(segment=segment).set(float(conv_rate or 0))
             print("Step 5: OK (from DB)")
-        except Exception as e:
-            print(f"Step 5: Using sample data (table doesn't exist: {e})")
-            conn.rollback()
-            # Generate sample data if user_segments doesn't exist
+        else:
+            print("Step 5: Using sample data (user_segments table doesn't exist)")
             for segment, users, revenue, conv in [
                 ('Premium', 1200, 180000, 0.45),
                 ('Regular', 5800, 290000, 0.28),
@@ -281,8 +336,9 @@ def collect_metrics():
             funnel_step_users.labels(step=step).set(users or 0)
             funnel_step_conversion.labels(step=step).set(float(conv_rate or 0))
         
-        # Cohort analysis (simplified) - generate sample data if table doesn't exist
-        try:
+        # Cohort analysis (sample data until migration 006 has been applied)
+        cohort_revenues = {}
+        if table_exists(cur, 'cohort_analysis'):
             cur.execute("""
                 SELECT 
                     cohort_week,
@@ -295,17 +351,15 @@ def collect_metrics():
                 ORDER BY cohort_week, week_number
             """)
             
-            cohort_revenues = {}
             for row in cur.fetchall():
                 cohort, week_num, retention, revenue = row
+                cohort = str(cohort)
                 cohort_retention.labels(cohort_week=cohort, week_number=str(week_num)).set(float(retention or 0))
                 if cohort not in cohort_revenues:
                     cohort_revenues[cohort] = 0
                 cohort_revenues[cohort] += float(revenue or 0)
-        except Exception:
+        else:
             # Generate sample cohort data
-            cohort_revenues = {}
-            import random
             for cohort_week in ['Week-48', 'Week-49', 'Week-50']:
                 revenue_total = 0
                 for week_num in range(1, 9):
@@ -351,4 +405,9 @@ if __name__ == '__main__':
     # Collect metrics every 30 seconds
     while True:
         collect_metrics()
+        try:
+            collect_rollup_metrics()
+        except Exception as e:
+            ecommerce_error_count.inc()
+            print(f"ERROR collecting rollup metrics: {e}")
         time.sleep(30)
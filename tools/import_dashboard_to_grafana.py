@@ -3,9 +3,14 @@
 Create and import a working Security Attacks dashboard into Grafana
 """
 
-import requests
 import json
+import sys
 import time
+from pathlib import Path
+
+# Shared provisioning client (pooled session, upload only when the content changed)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from grafana_dashboards_scripts.provisioning import GrafanaClient, provision_dashboard
 
 GRAFANA_URL = "http://localhost:3000"
 GRAFANA_USER = "admin"
@@ -408,35 +413,28 @@ dashboard = {
 }
 
 def import_dashboard():
-    """Import dashboard into Grafana"""
-    try:
-        url = f"{GRAFANA_URL}/api/dashboards/db"
-        response = requests.post(
-            url,
-            json=dashboard,
-            auth=(GRAFANA_USER, GRAFANA_PASS),
-            headers={'Content-Type': 'application/json'},
-            timeout=10
-        )
-        
-        if response.status_code in [200, 201]:
-            data = response.json()
-            dashboard_url = f"{GRAFANA_URL}{data.get('url', '')}"
-            print(f"[OK] Dashboard imported successfully!")
-            print(f"[OK] Access it at: {dashboard_url}")
-            print(f"\nℹ️  If you still see 'No data', wait 10-30 seconds for Prometheus to scrape metrics")
-            return True
-        else:
-            print(f"[ERROR] Failed to import: {response.status_code}")
-            print(response.text)
-            return False
-    except requests.exceptions.ConnectionError:
-        print("[ERROR] Cannot connect to Grafana. Is it running on http://localhost:3000?")
-        return False
-    except Exception as e:
-        print(f"[ERROR] {e}")
+    """Import dashboard into Grafana (skipped when the stored version is identical)"""
+    entry = {
+        'script': Path(__file__).name,
+        'model': dashboard["dashboard"],
+        'message': dashboard["message"],
+    }
+    with GrafanaClient(GRAFANA_URL, GRAFANA_USER, GRAFANA_PASS) as client:
+        result = provision_dashboard(client, entry)
+
+    if result['status'] == 'failed':
+        print(f"[ERROR] Failed to import: {result['error']}")
         return False
 
+    dashboard_url = f"{GRAFANA_URL}/d/{result['uid']}"
+    if result['status'] == 'unchanged':
+        print(f"[OK] Dashboard already up to date")
+    else:
+        print(f"[OK] Dashboard imported successfully!")
+    print(f"[OK] Access it at: {dashboard_url}")
+    print(f"\nℹ️  If you still see 'No data', wait 10-30 seconds for Prometheus to scrape metrics")
+    return True
+
 if __name__ == '__main__':
     print("[*] Importing Security Attacks Dashboard to Grafana...")
     time.sleep(2)  # Wait for Grafana to be ready
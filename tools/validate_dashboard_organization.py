@@ -77,6 +77,7 @@ def main():
         "create_full_dashboard.py",
         "create_monitoring_dashboard.py",
         "create_prometheus_dashboard.py",
+        "provisioning.py",
         "__init__.py",
         "README.md"
     ]